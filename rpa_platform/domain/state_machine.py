@@ -23,6 +23,11 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Runner outcome reported when a compare-and-swap status write found the task
+# already moved by another robot or an operator.
+TRANSITION_LOST = "transition_lost"
+
+
 TERMINAL_STATUSES = {
     TaskStatus.SUCCESS,
     TaskStatus.FAILED,
@@ -39,6 +44,8 @@ ALLOWED_TASK_TRANSITIONS = {
     TaskStatus.CHECKING_LOGIN: {
         TaskStatus.RUNNING,
         TaskStatus.WAITING_LOGIN,
+        TaskStatus.WAITING_WECOM_ONLINE_DELAY,
+        TaskStatus.SUCCESS,
         TaskStatus.FAILED,
     },
     TaskStatus.RUNNING: {
@@ -72,14 +79,17 @@ ALLOWED_TASK_TRANSITIONS = {
     },
     TaskStatus.WAITING_WECOM_REVIEW: {
         TaskStatus.CHECKING_LOGIN,
+        TaskStatus.WAITING_WECOM_REVIEW,
         TaskStatus.RUNNING,
         TaskStatus.READY_TO_ONLINE,
         TaskStatus.WAITING_MANUAL_INTERVENTION,
+        TaskStatus.SUCCESS,
         TaskStatus.FAILED,
         TaskStatus.CANCELLED,
     },
     TaskStatus.WAITING_WECOM_ONLINE_DELAY: {
         TaskStatus.CHECKING_LOGIN,
+        TaskStatus.WAITING_WECOM_ONLINE_DELAY,
         TaskStatus.RUNNING,
         TaskStatus.SUCCESS,
         TaskStatus.FAILED,
@@ -99,6 +109,7 @@ ALLOWED_TASK_TRANSITIONS = {
         TaskStatus.CANCELLED,
     },
     TaskStatus.JDY_CALLBACK_FAILED: {
+        TaskStatus.CHECKING_LOGIN,
         TaskStatus.RUNNING,
         TaskStatus.SUCCESS,
         TaskStatus.FAILED,
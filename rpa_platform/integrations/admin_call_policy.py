@@ -0,0 +1,422 @@
+import asyncio
+import http.client
+import os
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, TypeVar
+
+from rpa_platform.integrations.wecom_admin_client import WecomSessionExpiredError
+
+
+T = TypeVar("T")
+
+DEFAULT_READ_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 8.0
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+# 0 leaves a host unthrottled; the admin backends publish no rate limit.
+DEFAULT_RATE_LIMIT_PER_SECOND = 0.0
+# Gateway and overload answers; any other HTTP status means the backend is up.
+TRANSIENT_HTTP_STATUSES = frozenset({429, 500, 502, 503, 504})
+# The request never left this machine, so even a write may be sent again.
+NOT_SENT_ERRORS = (ConnectionRefusedError, socket.gaierror)
+
+ERROR_SESSION_EXPIRED = "session_expired"
+ERROR_CIRCUIT_OPEN = "circuit_open"
+ERROR_TRANSIENT = "transient"
+ERROR_OTHER = "error"
+
+
+class AdminCircuitOpenError(RuntimeError):
+    """Raised without calling the admin API while its host's circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """Retry budget of one admin endpoint: extra attempts after a transient failure.
+
+    The n-th retry waits ``backoff_seconds * 2 ** (n - 1)``, capped at
+    ``backoff_max_seconds``, with full jitter so queued tasks do not retry in step.
+    """
+
+    retries: int = 0
+    backoff_seconds: float = DEFAULT_BACKOFF_SECONDS
+    backoff_max_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS
+
+    def delay(self, retry: int, rng: Callable[[], float] = random.random) -> float:
+        ceiling = min(self.backoff_seconds * 2 ** (retry - 1), self.backoff_max_seconds)
+        return ceiling * rng()
+
+
+# Read-only calls, safe to repeat; every other endpoint (the writes) gets no retry
+# unless the failed attempt provably never reached the backend.
+READ_ENDPOINTS = frozenset(
+    {
+        "/api/fx_sa/wxwork/get_corp_deploy_list",
+        "/api/fx_sa/wxwork/get_owner",
+        "/wwopen/developer/customApp/tpl/app/list",
+        "/wwopen/api/customApp/privilege/getCustomizedAppPrivilege",
+        "/wwopen/api/customApp/price/GetStandardPriceInfoForCA",
+    }
+)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one admin host.
+
+    After ``failure_threshold`` transient failures in a row the circuit opens and
+    calls fail at once for ``reset_timeout_seconds``. Then one probe call goes
+    through: success closes the circuit, failure opens it for another period.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        reset_timeout_seconds: float = DEFAULT_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or self.clock() - self._opened_at >= self.reset_timeout_seconds:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """Raise while the circuit is open; ``True`` when this call is the half-open probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self._opened_at + self.reset_timeout_seconds - self.clock()
+            if remaining > 0 or self._probing:
+                raise AdminCircuitOpenError(
+                    "admin API circuit open after %d consecutive failures, retry in %.0fs"
+                    % (self.failure_threshold, max(remaining, 0.0))
+                )
+            self._probing = True
+            return True
+
+    def release_probe(self) -> None:
+        """End a probe that gave no verdict, so the next call probes again."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            # Failures of calls started before the circuit opened do not extend it.
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self.times_opened += 1
+                self._opened_at = self.clock()
+            self._probing = False
+
+
+class RateLimiter:
+    """Token bucket for one admin host; ``reserve`` returns how long the caller must wait."""
+
+    def __init__(self, rate_per_second: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate_per_second = rate_per_second
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+
+    def reserve(self) -> float:
+        if self.rate_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_second)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+
+class AdminCallPolicy:
+    """Retries, backoff, circuit breaking and rate limiting for admin API calls.
+
+    The cookie transports run every request through ``call`` (or ``call_async``)
+    with the request's host and endpoint path. Breakers and rate limiters are kept
+    per host and shared by every task using this policy, so once a backend keeps
+    failing, queued tasks get ``AdminCircuitOpenError`` at once instead of each
+    waiting out its own timeouts.
+    """
+
+    def __init__(
+        self,
+        endpoints: Optional[Mapping[str, EndpointPolicy]] = None,
+        default: EndpointPolicy = EndpointPolicy(),
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        reset_timeout_seconds: float = DEFAULT_BREAKER_RESET_SECONDS,
+        rate_limit_per_second: float = DEFAULT_RATE_LIMIT_PER_SECOND,
+        rate_limit_burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if rate_limit_per_second < 0:
+            raise ValueError("rate_limit_per_second must not be negative")
+        if endpoints is None:
+            endpoints = {path: EndpointPolicy(retries=DEFAULT_READ_RETRIES) for path in READ_ENDPOINTS}
+        self.endpoints = dict(endpoints)
+        self.default = default
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.rate_limit_per_second = rate_limit_per_second
+        self.rate_limit_burst = rate_limit_burst
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.rng = rng
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self.retries = 0
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "AdminCallPolicy":
+        values = os.environ if env is None else env
+        read_retries = _parse_non_negative_int(
+            values.get("RPA_ADMIN_READ_RETRIES"),
+            DEFAULT_READ_RETRIES,
+            "RPA_ADMIN_READ_RETRIES",
+        )
+        rate = _parse_non_negative_number(
+            values.get("RPA_ADMIN_RATE_LIMIT_PER_SECOND"),
+            DEFAULT_RATE_LIMIT_PER_SECOND,
+            "RPA_ADMIN_RATE_LIMIT_PER_SECOND",
+        )
+        return cls(
+            endpoints={path: EndpointPolicy(retries=read_retries) for path in READ_ENDPOINTS},
+            failure_threshold=max(
+                _parse_non_negative_int(
+                    values.get("RPA_ADMIN_BREAKER_FAILURES"),
+                    DEFAULT_BREAKER_FAILURES,
+                    "RPA_ADMIN_BREAKER_FAILURES",
+                ),
+                1,
+            ),
+            reset_timeout_seconds=_parse_non_negative_number(
+                values.get("RPA_ADMIN_BREAKER_RESET_SECONDS"),
+                DEFAULT_BREAKER_RESET_SECONDS,
+                "RPA_ADMIN_BREAKER_RESET_SECONDS",
+            ),
+            rate_limit_per_second=rate,
+            rate_limit_burst=max(int(rate), 1),
+        )
+
+    def endpoint(self, path: str) -> EndpointPolicy:
+        return self.endpoints.get(path, self.default)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    self.failure_threshold,
+                    self.reset_timeout_seconds,
+                    self.clock,
+                )
+            return breaker
+
+    def call(self, host: str, path: str, send: Callable[[], T]) -> T:
+        endpoint = self.endpoint(path)
+        breaker = self.breaker(host)
+        retry = 0
+        while True:
+            probe = breaker.before_call()
+            wait = self._limiter(host).reserve()
+            if wait > 0:
+                self.sleep(wait)
+            try:
+                result = send()
+            except BaseException as exc:
+                delay = self._after_failure(breaker, endpoint, exc, retry, probe)
+                if delay is None:
+                    raise
+                retry += 1
+                self.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    async def call_async(self, host: str, path: str, send: Callable[[], Awaitable[T]]) -> T:
+        endpoint = self.endpoint(path)
+        breaker = self.breaker(host)
+        retry = 0
+        while True:
+            probe = breaker.before_call()
+            wait = self._limiter(host).reserve()
+            if wait > 0:
+                await self.async_sleep(wait)
+            try:
+                result = await send()
+            except BaseException as exc:
+                delay = self._after_failure(breaker, endpoint, exc, retry, probe)
+                if delay is None:
+                    raise
+                retry += 1
+                await self.async_sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+            retries = self.retries
+        return {
+            "retries": retries,
+            "circuits": {
+                host: {"state": breaker.state, "times_opened": breaker.times_opened}
+                for host, breaker in sorted(breakers.items())
+            },
+        }
+
+    def _after_failure(
+        self,
+        breaker: CircuitBreaker,
+        endpoint: EndpointPolicy,
+        exc: BaseException,
+        retry: int,
+        probe: bool,
+    ) -> Optional[float]:
+        """Record ``exc`` on the breaker; the backoff before the next attempt, or None to give up."""
+        if not isinstance(exc, Exception):
+            # Cancellation or shutdown says nothing about the backend either way.
+            if probe:
+                breaker.release_probe()
+            return None
+        if not is_transient_admin_error(exc):
+            # The backend answered; a 4xx or a business error says nothing about its health.
+            breaker.record_success()
+            return None
+        breaker.record_failure()
+        budget = endpoint.retries if endpoint.retries or not _never_sent(exc) else 1
+        if retry >= budget or breaker.state == "open":
+            return None
+        with self._lock:
+            self.retries += 1
+        return endpoint.delay(retry + 1, self.rng)
+
+    def _limiter(self, host: str) -> RateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(
+                    self.rate_limit_per_second,
+                    self.rate_limit_burst,
+                    self.clock,
+                )
+            return limiter
+
+
+def is_transient_admin_error(exc: BaseException) -> bool:
+    """Whether ``exc`` says the admin backend or the network is failing, not the request.
+
+    Errors carrying an HTTP ``status`` (the cookie transports' ``JsonHttpError``)
+    are transient for gateway and overload statuses only. Otherwise an error is
+    transient when it, or the error it was raised from, is a connection failure or
+    timeout.
+    """
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status in TRANSIENT_HTTP_STATUSES
+    current: Optional[BaseException] = exc
+    while current is not None:
+        if isinstance(current, (OSError, http.client.HTTPException, asyncio.TimeoutError)):
+            return True
+        current = current.__cause__
+    return False
+
+
+def classify_admin_error(exc: BaseException) -> str:
+    """One of ``session_expired``, ``circuit_open``, ``transient`` or ``error`` for any admin call failure."""
+    if isinstance(exc, WecomSessionExpiredError) or is_jdy_session_expired_error(exc):
+        return ERROR_SESSION_EXPIRED
+    current: Optional[BaseException] = exc
+    while current is not None:
+        if isinstance(current, AdminCircuitOpenError):
+            return ERROR_CIRCUIT_OPEN
+        current = current.__cause__
+    if is_transient_admin_error(exc):
+        return ERROR_TRANSIENT
+    return ERROR_OTHER
+
+
+def is_jdy_session_expired_error(exc: BaseException) -> bool:
+    message = str(exc)
+    return '"code":1007' in message or "code=1007" in message or "用户尚未登录" in message
+
+
+def _never_sent(exc: BaseException) -> bool:
+    current: Optional[BaseException] = exc
+    while current is not None:
+        if isinstance(current, NOT_SENT_ERRORS):
+            return True
+        current = current.__cause__
+    return False
+
+
+_shared_policy: Optional[AdminCallPolicy] = None
+_shared_policy_lock = threading.Lock()
+
+
+def shared_admin_call_policy() -> AdminCallPolicy:
+    """Process-wide policy for the admin transports, configured from the environment on first use."""
+    global _shared_policy
+    with _shared_policy_lock:
+        if _shared_policy is None:
+            _shared_policy = AdminCallPolicy.from_env()
+        return _shared_policy
+
+
+def _parse_non_negative_int(value: Optional[str], default: int, name: str) -> int:
+    if value is None or not value.strip():
+        return default
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError("%s must be a non-negative integer" % name) from exc
+    if parsed < 0:
+        raise ValueError("%s must be a non-negative integer" % name)
+    return parsed
+
+
+def _parse_non_negative_number(value: Optional[str], default: float, name: str) -> float:
+    if value is None or not value.strip():
+        return default
+    try:
+        parsed = float(value)
+    except ValueError as exc:
+        raise ValueError("%s must be a non-negative number" % name) from exc
+    if parsed < 0:
+        raise ValueError("%s must be a non-negative number" % name)
+    return parsed
@@ -0,0 +1,275 @@
+import asyncio
+import http.client
+import re
+import ssl
+import weakref
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from rpa_platform.integrations.http_pool import (
+    DEFAULT_MAX_IDLE_PER_HOST,
+    DEFAULT_RETRIES,
+    DEFAULT_RETRY_BACKOFF_SECONDS,
+    DEFAULT_USER_AGENT,
+    IDEMPOTENT_METHODS,
+    STALE_CONNECTION_ERRORS,
+    HostKey,
+    HttpConnectionPool,
+    HttpResponseData,
+)
+
+
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 8
+# Status line and header block limit; admin API responses carry a handful of headers.
+MAX_HEADER_LINES = 100
+# Checked before anything is written, as http.client does, so no header can smuggle in a line break.
+_LEGAL_HEADER_NAME = re.compile(r"[^:\s][^:\r\n]*")
+_ILLEGAL_HEADER_VALUE = re.compile(r"[\r\n\0]")
+_CONTROL_CHARACTERS = re.compile(r"[\x00-\x20\x7f]")
+
+
+class AsyncHttpConnection:
+    """One HTTP/1.1 connection on asyncio streams, used for one request at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Mapping[str, str],
+    ) -> Tuple[HttpResponseData, bool]:
+        """Send one request and read the whole response; also returns whether the connection must close."""
+        await self.send_request(method, path, body, headers)
+        return await self.read_response(method)
+
+    async def send_request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Mapping[str, str],
+    ) -> None:
+        _validate_request(method, path, headers)
+        lines = ["%s %s HTTP/1.1" % (method, path)]
+        names = {name.lower() for name in headers}
+        if "host" not in names:
+            lines.append("Host: %s" % self.host)
+        lines.extend("%s: %s" % (name, value) for name, value in headers.items())
+        if body is not None or method.upper() in {"POST", "PUT", "PATCH"}:
+            lines.append("Content-Length: %d" % len(body or b""))
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self.writer.drain()
+
+    def close(self) -> None:
+        self.writer.close()
+
+    async def read_response(self, method: str) -> Tuple[HttpResponseData, bool]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        try:
+            version, status_text, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            status = int(status_text)
+        except ValueError as exc:
+            raise http.client.BadStatusLine(status_line.decode("latin-1", errors="replace")) from exc
+        if not version.startswith("HTTP/"):
+            raise http.client.BadStatusLine(status_line.decode("latin-1", errors="replace"))
+        response_headers = await self._read_headers()
+        connection = response_headers.get("connection", "").lower()
+        will_close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+        if method.upper() == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in response_headers.get("transfer-encoding", "").lower():
+            body = await self._read_chunked()
+        elif "content-length" in response_headers:
+            body = await self._read_exactly(int(response_headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            will_close = True
+        return HttpResponseData(status, reason[0] if reason else "", body), will_close
+
+    async def _read_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise http.client.HTTPException("got more than %d headers" % MAX_HEADER_LINES)
+
+    async def _read_chunked(self) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            size_line = await self.reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                await self._read_headers()  # trailers
+                return b"".join(chunks)
+            chunks.append(await self._read_exactly(size))
+            await self.reader.readline()
+
+    async def _read_exactly(self, size: int) -> bytes:
+        try:
+            return await self.reader.readexactly(size)
+        except asyncio.IncompleteReadError as exc:
+            raise http.client.IncompleteRead(exc.partial, size - len(exc.partial)) from exc
+
+
+class AsyncHttpConnectionPool:
+    """``HttpConnectionPool`` for coroutines: keep-alive asyncio connections per scheme, host and port.
+
+    Same reuse and retry rules as the blocking pool. At most
+    ``max_connections_per_host`` requests to one host are in flight; more wait for a
+    connection instead of opening another. ``timeout`` bounds connecting, sending and
+    reading the whole response. Connections belong to the loop that opened them, so
+    use one pool per event loop (``shared_async_http_pool`` does this).
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST,
+        max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        retries: int = DEFAULT_RETRIES,
+        retry_backoff_seconds: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+        connection_factory: Optional[Callable[[str, str, int], Awaitable[AsyncHttpConnection]]] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        if max_idle_per_host < 0:
+            raise ValueError("max_idle_per_host must not be negative")
+        if max_connections_per_host < 1:
+            raise ValueError("max_connections_per_host must be at least 1")
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        self.max_idle_per_host = max_idle_per_host
+        self.max_connections_per_host = max_connections_per_host
+        self.retries = retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.connection_factory = connection_factory or _open_connection
+        self.sleep = sleep
+        self._idle: Dict[HostKey, List[AsyncHttpConnection]] = defaultdict(list)
+        self._slots: Dict[HostKey, asyncio.Semaphore] = {}
+        self.connections_opened = 0
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "AsyncHttpConnectionPool":
+        settings = HttpConnectionPool.from_env(env)
+        return cls(max_idle_per_host=settings.max_idle_per_host, retries=settings.retries)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 20,
+    ) -> HttpResponseData:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        request_headers = dict(headers or {})
+        if not any(name.lower() == "user-agent" for name in request_headers):
+            request_headers["User-Agent"] = DEFAULT_USER_AGENT
+        slot = self._slots.setdefault(key, asyncio.Semaphore(self.max_connections_per_host))
+        attempts = 0
+        while True:
+            async with slot:
+                conn, reused = await self._checkout(key, timeout)
+                sent = False
+
+                async def exchange() -> Tuple[HttpResponseData, bool]:
+                    nonlocal sent
+                    await conn.send_request(method, path, body, request_headers)
+                    sent = True
+                    return await conn.read_response(method)
+
+                try:
+                    data, will_close = await asyncio.wait_for(exchange(), timeout)
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if reused and (not sent or method.upper() in IDEMPOTENT_METHODS):
+                        continue
+                    if method.upper() not in IDEMPOTENT_METHODS or attempts >= self.retries:
+                        raise
+                except OSError:
+                    conn.close()
+                    if method.upper() not in IDEMPOTENT_METHODS or attempts >= self.retries:
+                        raise
+                except BaseException:
+                    conn.close()
+                    raise
+                else:
+                    if will_close:
+                        conn.close()
+                    else:
+                        self._checkin(key, conn)
+                    return data
+            attempts += 1
+            await self.sleep(self.retry_backoff_seconds * attempts)
+
+    def close(self) -> None:
+        idle = [conn for connections in self._idle.values() for conn in connections]
+        self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    async def _checkout(self, key: HostKey, timeout: float) -> Tuple[AsyncHttpConnection, bool]:
+        connections = self._idle.get(key)
+        while connections:
+            conn = connections.pop()
+            # A connection the server closed while idle shows EOF without a request.
+            if not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+        self.connections_opened += 1
+        conn = await asyncio.wait_for(self.connection_factory(*key), timeout)
+        return conn, False
+
+    def _checkin(self, key: HostKey, conn: AsyncHttpConnection) -> None:
+        connections = self._idle[key]
+        if len(connections) < self.max_idle_per_host:
+            connections.append(conn)
+            return
+        conn.close()
+
+
+def _validate_request(method: str, path: str, headers: Mapping[str, str]) -> None:
+    if _CONTROL_CHARACTERS.search(method):
+        raise ValueError("method can't contain control characters. %r" % method)
+    if _CONTROL_CHARACTERS.search(path):
+        raise http.client.InvalidURL("URL can't contain control characters. %r" % path)
+    for name, value in headers.items():
+        if not _LEGAL_HEADER_NAME.fullmatch(name):
+            raise ValueError("Invalid header name %r" % name)
+        if _ILLEGAL_HEADER_VALUE.search(str(value)):
+            raise ValueError("Invalid header value %r" % value)
+
+
+_shared_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHttpConnectionPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def shared_async_http_pool() -> AsyncHttpConnectionPool:
+    """The running loop's pool for the async admin clients, configured from the environment on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _shared_pools.get(loop)
+    if pool is None:
+        pool = _shared_pools[loop] = AsyncHttpConnectionPool.from_env()
+    return pool
+
+
+async def _open_connection(scheme: str, host: str, port: int) -> AsyncHttpConnection:
+    ssl_context = ssl.create_default_context() if scheme == "https" else None
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+    default_port = 443 if scheme == "https" else 80
+    return AsyncHttpConnection(reader, writer, host if port == default_port else "%s:%s" % (host, port))
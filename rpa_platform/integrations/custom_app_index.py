@@ -0,0 +1,152 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from rpa_platform.integrations.wecom_admin_client import (
+    WecomAdminClient,
+    WecomCustomApp,
+    WecomOnlineOrder,
+    WecomSaveAppRequest,
+)
+
+
+class CustomAppIndex:
+    """A suite's custom apps listed once, fully paged, and indexed by ``authcorp_name``.
+
+    Built for runs that resolve many enterprises of the same suite: the first lookup
+    of a suite lists all of its apps and later lookups read the index. Apps a write
+    touched are dropped from the index, so their next lookup reads the admin API.
+    """
+
+    def __init__(self, wecom_client: WecomAdminClient, page_size: int = 100):
+        self.wecom_client = wecom_client
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._suite_locks: Dict[int, threading.Lock] = {}
+        self._suites: Dict[int, Dict[str, List[WecomCustomApp]]] = {}
+        self.list_calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def load(self, suiteid: int) -> None:
+        """List the suite's apps unless they are indexed already; concurrent callers wait for one listing."""
+        suiteid = int(suiteid)
+        with self._lock:
+            if suiteid in self._suites:
+                return
+            suite_lock = self._suite_locks.setdefault(suiteid, threading.Lock())
+        with suite_lock:
+            with self._lock:
+                if suiteid in self._suites:
+                    return
+                self.list_calls += 1
+            by_name: Dict[str, List[WecomCustomApp]] = {}
+            for app in self.wecom_client.iter_custom_apps(suiteid, page_size=self.page_size):
+                by_name.setdefault(app.authcorp_name, []).append(app)
+            with self._lock:
+                self._suites[suiteid] = by_name
+
+    def lookup(self, suiteid: int, authcorp_name: str, suite_name: str) -> Optional[List[WecomCustomApp]]:
+        """The indexed apps of the enterprise and suite name, or None when the admin API must be asked."""
+        self.load(suiteid)
+        with self._lock:
+            apps = self._suites[int(suiteid)].get(authcorp_name)
+            matches = [app for app in apps or [] if app.name == suite_name]
+            if not matches:
+                # Not listed yet (e.g. authorized after the listing) or dropped by a write.
+                self.misses += 1
+                return None
+            self.hits += 1
+            return matches
+
+    def invalidate(self, app_id: str = "", auditorderid: str = "") -> int:
+        with self._lock:
+            dropped = 0
+            for by_name in self._suites.values():
+                for name, apps in list(by_name.items()):
+                    if any(_touches(app, app_id, auditorderid) for app in apps):
+                        del by_name[name]
+                        dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "suites": len(self._suites),
+                "apps": sum(len(apps) for by_name in self._suites.values() for apps in by_name.values()),
+                "list_calls": self.list_calls,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+class IndexedWecomAdminClient(WecomAdminClient):
+    """``WecomAdminClient`` that resolves custom apps from a ``CustomAppIndex``.
+
+    Lookups the index cannot answer, and every write, go to the wrapped client, so a
+    caching client keeps invalidating its own entries.
+    """
+
+    def __init__(self, wecom_client: WecomAdminClient, index: CustomAppIndex):
+        super().__init__(wecom_client.transport)
+        self.wecom_client = wecom_client
+        self.index = index
+
+    def resolve_unique_custom_app(self, suiteid: int, enterprise_name: str, suite_name: str) -> WecomCustomApp:
+        matches = self.index.lookup(suiteid, enterprise_name, suite_name)
+        if matches is None:
+            return self.wecom_client.resolve_unique_custom_app(
+                suiteid=suiteid,
+                enterprise_name=enterprise_name,
+                suite_name=suite_name,
+            )
+        return self._unique_custom_app(matches[:2])
+
+    def save_development_info(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        with _invalidating(self.index, app_id=request.app.app_id):
+            return self.wecom_client.save_development_info(request)
+
+    def save_development_info_raw(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        with _invalidating(self.index, app_id=request.app.app_id):
+            return self.wecom_client.save_development_info_raw(request)
+
+    def set_target_privileges(self, suiteid: int, app_id: str) -> List[Dict[str, Any]]:
+        with _invalidating(self.index, app_id=app_id):
+            return self.wecom_client.set_target_privileges(suiteid=suiteid, app_id=app_id)
+
+    def set_trial_rule(self, app_id: str) -> Dict[str, Any]:
+        with _invalidating(self.index, app_id=app_id):
+            return self.wecom_client.set_trial_rule(app_id=app_id)
+
+    def set_sso_redirect_domain(self, suiteid: int, app_id: str, aes_app_id: str, redirect_domain: str) -> Dict[str, Any]:
+        with _invalidating(self.index, app_id=app_id):
+            return self.wecom_client.set_sso_redirect_domain(
+                suiteid=suiteid,
+                app_id=app_id,
+                aes_app_id=aes_app_id,
+                redirect_domain=redirect_domain,
+            )
+
+    def create_online_order(self, suiteid: int, app_id: str) -> WecomOnlineOrder:
+        with _invalidating(self.index, app_id=app_id):
+            return self.wecom_client.create_online_order(suiteid=suiteid, app_id=app_id)
+
+    def submit_online_order(self, auditorderid: str) -> WecomOnlineOrder:
+        with _invalidating(self.index, auditorderid=auditorderid):
+            return self.wecom_client.submit_online_order(auditorderid)
+
+
+@contextmanager
+def _invalidating(index: CustomAppIndex, **touched: str) -> Iterator[None]:
+    # A failed write may still have reached the admin API, so invalidate either way.
+    try:
+        yield
+    finally:
+        index.invalidate(**touched)
+
+
+def _touches(app: WecomCustomApp, app_id: str, auditorderid: str) -> bool:
+    return bool((app_id and app.app_id == app_id) or (auditorderid and app.auditorderid == auditorderid))
@@ -0,0 +1,207 @@
+import http.client
+import os
+import select
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+DEFAULT_MAX_IDLE_PER_HOST = 4
+# Retries with backoff belong to the admin call policy; the pool only resends on
+# connections that went stale while idle.
+DEFAULT_RETRIES = 0
+DEFAULT_RETRY_BACKOFF_SECONDS = 0.5
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# The admin APIs were called through urlopen; keep presenting the same client.
+DEFAULT_USER_AGENT = "Python-urllib/%d.%d" % sys.version_info[:2]
+# Raised when a kept-alive connection was closed by the server while it sat idle.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+    ConnectionAbortedError,
+)
+
+HostKey = Tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class HttpResponseData:
+    status: int
+    reason: str
+    body: bytes
+
+
+class HttpConnectionPool:
+    """Keep-alive ``http.client`` connections shared per scheme, host and port.
+
+    Each request borrows an idle connection for its host or opens a new one and
+    returns it afterwards, keeping at most ``max_idle_per_host`` idle; with ``0``
+    every request opens and closes its own connection, as ``urlopen`` does. Idle
+    connections the server already closed are dropped at checkout. A request that
+    still fails on a reused connection because the server dropped it is sent again on
+    a fresh one if it failed while being sent, or at any point for idempotent methods.
+    Other connection errors are retried ``retries`` times for idempotent methods only,
+    so a POST that may have reached the admin API is never repeated.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST,
+        retries: int = DEFAULT_RETRIES,
+        retry_backoff_seconds: float = DEFAULT_RETRY_BACKOFF_SECONDS,
+        connection_factory: Optional[Callable[[str, str, int, float], http.client.HTTPConnection]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_idle_per_host < 0:
+            raise ValueError("max_idle_per_host must not be negative")
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        self.max_idle_per_host = max_idle_per_host
+        self.retries = retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.connection_factory = connection_factory or _new_connection
+        self.sleep = sleep
+        self._idle: Dict[HostKey, List[http.client.HTTPConnection]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "HttpConnectionPool":
+        values = os.environ if env is None else env
+        return cls(
+            max_idle_per_host=_parse_non_negative_int(
+                values.get("RPA_ADMIN_HTTP_MAX_IDLE_PER_HOST"),
+                DEFAULT_MAX_IDLE_PER_HOST,
+                "RPA_ADMIN_HTTP_MAX_IDLE_PER_HOST",
+            ),
+            retries=_parse_non_negative_int(values.get("RPA_ADMIN_HTTP_RETRIES"), DEFAULT_RETRIES, "RPA_ADMIN_HTTP_RETRIES"),
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 20,
+    ) -> HttpResponseData:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        request_headers = dict(headers or {})
+        if not any(name.lower() == "user-agent" for name in request_headers):
+            request_headers["User-Agent"] = DEFAULT_USER_AGENT
+        attempts = 0
+        while True:
+            conn, reused = self._checkout(key, timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=request_headers)
+                sent = True
+                response = conn.getresponse()
+                data = HttpResponseData(response.status, response.reason, response.read())
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and (not sent or method.upper() in IDEMPOTENT_METHODS):
+                    continue
+                if method.upper() not in IDEMPOTENT_METHODS or attempts >= self.retries:
+                    raise
+            except OSError:
+                conn.close()
+                if method.upper() not in IDEMPOTENT_METHODS or attempts >= self.retries:
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+            else:
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._checkin(key, conn)
+                return data
+            attempts += 1
+            self.sleep(self.retry_backoff_seconds * attempts)
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for connections in self._idle.values() for conn in connections]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def _checkout(self, key: HostKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        while True:
+            with self._lock:
+                connections = self._idle.get(key)
+                conn = connections.pop() if connections else None
+            if conn is None:
+                break
+            if _closed_by_server(conn):
+                conn.close()
+                continue
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        with self._lock:
+            self.connections_opened += 1
+        return self.connection_factory(key[0], key[1], key[2], timeout), False
+
+    def _checkin(self, key: HostKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections = self._idle[key]
+            if len(connections) < self.max_idle_per_host:
+                connections.append(conn)
+                return
+        conn.close()
+
+
+_shared_pool: Optional[HttpConnectionPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_http_pool() -> HttpConnectionPool:
+    """Process-wide pool for the admin clients, configured from the environment on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = HttpConnectionPool.from_env()
+        return _shared_pool
+
+
+def _new_connection(scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+    if scheme == "https":
+        return http.client.HTTPSConnection(host, port, timeout=timeout)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+def _closed_by_server(conn: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket only turns readable when the server closed it.
+    if conn.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _parse_non_negative_int(value: Optional[str], default: int, name: str) -> int:
+    if value is None or not value.strip():
+        return default
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise ValueError("%s must be a non-negative integer" % name) from exc
+    if parsed < 0:
+        raise ValueError("%s must be a non-negative integer" % name)
+    return parsed
@@ -1,5 +1,11 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Protocol
+from typing import Any, AsyncIterator, Dict, Iterator, List, Protocol, Tuple
+
+from rpa_platform.integrations.paging import aiter_pages, atake_first, iter_pages, take_first
+
+
+# get_corp_deploy_list pages are fetched this size when walking every match.
+DEFAULT_CORP_DEPLOY_PAGE_SIZE = 50
 
 
 class JdyAdminTransport(Protocol):
@@ -7,6 +13,11 @@ class JdyAdminTransport(Protocol):
         raise NotImplementedError
 
 
+class AsyncJdyAdminTransport(Protocol):
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
 class JdyAdminError(RuntimeError):
     """Base error for Jiandaoyun admin API failures."""
 
@@ -79,41 +90,82 @@ class JdyAdminClient:
         skip: int = 0,
         limit: int = 10,
     ) -> JdyCorpDeploySearchResult:
-        data = self.transport.post_json(
-            "/api/fx_sa/wxwork/get_corp_deploy_list",
-            {"filter": filter_text.strip(), "skip": skip, "limit": limit},
-        )
-        rows = [self._parse_corp_row(row) for row in data.get("corp_deploy_list", [])]
-        return JdyCorpDeploySearchResult(rows=rows, has_more=bool(data.get("has_more")))
+        data = self.transport.post_json(*self._corp_deploy_list_request(filter_text, skip, limit))
+        return self._parse_corp_deploy_list(data)
+
+    def iter_corp_deploys(
+        self,
+        filter_text: str,
+        page_size: int = DEFAULT_CORP_DEPLOY_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[JdyCorpDeploy]:
+        """Every corp deploy row matching ``filter_text``, following ``has_more`` across pages."""
+
+        def fetch_page(skip: int):
+            result = self.search_corp_deploy_list(filter_text, skip=skip, limit=page_size)
+            return result.rows, result.has_more
+
+        return iter_pages(fetch_page, prefetch=prefetch)
 
     def resolve_unique_corp(self, plain_corp_id: str, enterprise_name: str) -> JdyCorpDeploy:
         corp_id = plain_corp_id.strip()
         name = enterprise_name.strip()
         if corp_id:
-            result = self.search_corp_deploy_list(corp_id)
-            if len(result.rows) == 1:
-                return result.rows[0]
-            if len(result.rows) > 1:
-                raise AmbiguousCorpDeployError("根据 CorpID 检索到多家企业，请联系管理员处理企业数据")
-            raise MissingCorpDeployError("根据 CorpID 未检索到企业，请检查 CorpID 是否填写正确")
-
+            return self._unique_corp_by_id(take_first(self.iter_corp_deploys(corp_id), 2))
         if not name:
             raise MissingCorpDeployError("请填写 CorpID 或企业名称后重试")
+        return self._unique_corp_by_name(
+            take_first((row for row in self.iter_corp_deploys(name) if row.name == name), 2)
+        )
 
-        result = self.search_corp_deploy_list(name)
-        exact_rows = [row for row in result.rows if row.name == name]
-        if len(exact_rows) == 1:
-            return exact_rows[0]
-        if len(exact_rows) > 1:
+    def check_wework_owner(self, user_id: str, suite_id: int, suite_scenario: str) -> JdyOwnerCheckResult:
+        data = self.transport.post_json(*self._owner_request(user_id, suite_id, suite_scenario))
+        return self._parse_owner(data)
+
+    def install_corp_deploy(self, request: JdyInstallRequest) -> JdyInstallResult:
+        data = self.transport.post_json(*self._install_request(request))
+        return self._parse_install(data)
+
+    # Request builders and response parsers below are shared with AsyncJdyAdminClient.
+
+    @staticmethod
+    def _corp_deploy_list_request(filter_text: str, skip: int, limit: int) -> Tuple[str, Dict[str, Any]]:
+        return (
+            "/api/fx_sa/wxwork/get_corp_deploy_list",
+            {"filter": filter_text.strip(), "skip": skip, "limit": limit},
+        )
+
+    @classmethod
+    def _parse_corp_deploy_list(cls, data: Dict[str, Any]) -> JdyCorpDeploySearchResult:
+        rows = [cls._parse_corp_row(row) for row in data.get("corp_deploy_list", [])]
+        return JdyCorpDeploySearchResult(rows=rows, has_more=bool(data.get("has_more")))
+
+    @staticmethod
+    def _unique_corp_by_id(rows: List[JdyCorpDeploy]) -> JdyCorpDeploy:
+        if len(rows) == 1:
+            return rows[0]
+        if len(rows) > 1:
+            raise AmbiguousCorpDeployError("根据 CorpID 检索到多家企业，请联系管理员处理企业数据")
+        raise MissingCorpDeployError("根据 CorpID 未检索到企业，请检查 CorpID 是否填写正确")
+
+    @staticmethod
+    def _unique_corp_by_name(rows: List[JdyCorpDeploy]) -> JdyCorpDeploy:
+        if len(rows) == 1:
+            return rows[0]
+        if len(rows) > 1:
             raise AmbiguousCorpDeployError("根据企业名称检索到多家企业，请补充 CorpID 后重试")
         raise MissingCorpDeployError("根据企业名称未检索到企业，请检查企业名称是否填写正确")
 
-    def check_wework_owner(self, user_id: str, suite_id: int, suite_scenario: str) -> JdyOwnerCheckResult:
+    @staticmethod
+    def _owner_request(user_id: str, suite_id: int, suite_scenario: str) -> Tuple[str, Dict[str, Any]]:
         payload = {"suite_id": suite_id, "suite_scenario": suite_scenario}
         normalized_user_id = user_id.strip()
         if normalized_user_id:
             payload["user_id"] = normalized_user_id
-        data = self.transport.post_json("/api/fx_sa/wxwork/get_owner", payload)
+        return "/api/fx_sa/wxwork/get_owner", payload
+
+    @staticmethod
+    def _parse_owner(data: Dict[str, Any]) -> JdyOwnerCheckResult:
         owner = data.get("owner")
         if not isinstance(owner, dict):
             owner = {}
@@ -129,7 +181,8 @@ class JdyAdminClient:
             existing_encoding_aes_key=str(corp.get("encoding_aes_key", "")),
         )
 
-    def install_corp_deploy(self, request: JdyInstallRequest) -> JdyInstallResult:
+    @staticmethod
+    def _install_request(request: JdyInstallRequest) -> Tuple[str, Dict[str, Any]]:
         payload = {
             "corp_id": request.corp_id,
             "corp_name": request.corp_name,
@@ -142,7 +195,10 @@ class JdyAdminClient:
         if tenant_id:
             payload["tenant_id"] = tenant_id
             payload["user_id"] = tenant_id
-        data = self.transport.post_json("/api/fx_sa/wxwork/install_corp_deploy", payload)
+        return "/api/fx_sa/wxwork/install_corp_deploy", payload
+
+    @staticmethod
+    def _parse_install(data: Dict[str, Any]) -> JdyInstallResult:
         return JdyInstallResult(
             tenant_id=str(data.get("tenant_id", "")),
             owner_id=str(data.get("owner_id", "")),
@@ -163,3 +219,55 @@ class JdyAdminClient:
             suite_id=int(row.get("suite_id") or 0),
             suite_scenario=str(row.get("suite_scenario", "")),
         )
+
+
+
+class AsyncJdyAdminClient:
+    """``JdyAdminClient`` for the worker's event loop, on an ``AsyncJdyAdminTransport``.
+
+    Same requests, results and errors as the blocking client; concurrent calls from
+    several tasks interleave their round trips instead of holding a thread each.
+    """
+
+    def __init__(self, transport: AsyncJdyAdminTransport):
+        self.transport = transport
+
+    async def search_corp_deploy_list(
+        self,
+        filter_text: str,
+        skip: int = 0,
+        limit: int = 10,
+    ) -> JdyCorpDeploySearchResult:
+        data = await self.transport.post_json(*JdyAdminClient._corp_deploy_list_request(filter_text, skip, limit))
+        return JdyAdminClient._parse_corp_deploy_list(data)
+
+    def iter_corp_deploys(
+        self,
+        filter_text: str,
+        page_size: int = DEFAULT_CORP_DEPLOY_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> AsyncIterator[JdyCorpDeploy]:
+        async def fetch_page(skip: int):
+            result = await self.search_corp_deploy_list(filter_text, skip=skip, limit=page_size)
+            return result.rows, result.has_more
+
+        return aiter_pages(fetch_page, prefetch=prefetch)
+
+    async def resolve_unique_corp(self, plain_corp_id: str, enterprise_name: str) -> JdyCorpDeploy:
+        corp_id = plain_corp_id.strip()
+        name = enterprise_name.strip()
+        if corp_id:
+            return JdyAdminClient._unique_corp_by_id(await atake_first(self.iter_corp_deploys(corp_id), 2))
+        if not name:
+            raise MissingCorpDeployError("请填写 CorpID 或企业名称后重试")
+        return JdyAdminClient._unique_corp_by_name(
+            await atake_first(self.iter_corp_deploys(name), 2, lambda row: row.name == name)
+        )
+
+    async def check_wework_owner(self, user_id: str, suite_id: int, suite_scenario: str) -> JdyOwnerCheckResult:
+        data = await self.transport.post_json(*JdyAdminClient._owner_request(user_id, suite_id, suite_scenario))
+        return JdyAdminClient._parse_owner(data)
+
+    async def install_corp_deploy(self, request: JdyInstallRequest) -> JdyInstallResult:
+        data = await self.transport.post_json(*JdyAdminClient._install_request(request))
+        return JdyAdminClient._parse_install(data)
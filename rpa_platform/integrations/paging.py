@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+def iter_pages(
+    fetch_page: Callable[[int], Tuple[List[T], bool]],
+    prefetch: bool = True,
+) -> Iterator[T]:
+    """Yield the rows of an offset-paged admin list, page after page.
+
+    ``fetch_page(offset)`` returns one page of rows and whether more pages follow.
+    With ``prefetch`` the next page is requested on a background thread as soon as
+    the current page is handed to the caller, so filtering a page overlaps the next
+    round trip. Only one request is in flight at a time; closing the iterator early
+    discards a prefetched page, and a prefetch error is raised only if the caller
+    goes on to read that page.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") if prefetch else None
+    try:
+        offset = 0
+        rows, has_more = fetch_page(offset)
+        while rows:
+            offset += len(rows)
+            pending: Optional[Future] = None
+            if has_more and executor is not None:
+                pending = executor.submit(fetch_page, offset)
+            yield from rows
+            if not has_more:
+                return
+            rows, has_more = pending.result() if pending is not None else fetch_page(offset)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def take_first(rows: Iterable[T], count: int) -> List[T]:
+    """Up to ``count`` rows, closing a generator so it fetches no further page.
+
+    Unique lookups take two: a second match already decides the lookup is ambiguous.
+    """
+    found = list(islice(rows, count))
+    close = getattr(rows, "close", None)
+    if close is not None:
+        close()
+    return found
+
+
+async def aiter_pages(
+    fetch_page: Callable[[int], Awaitable[Tuple[List[T], bool]]],
+    prefetch: bool = True,
+) -> AsyncIterator[T]:
+    """``iter_pages`` for coroutine fetchers; the prefetch runs as a task on the running loop."""
+    offset = 0
+    rows, has_more = await fetch_page(offset)
+    pending: Optional["asyncio.Task[Tuple[List[T], bool]]"] = None
+    try:
+        while rows:
+            offset += len(rows)
+            if has_more and prefetch:
+                pending = asyncio.ensure_future(fetch_page(offset))
+            for row in rows:
+                yield row
+            if not has_more:
+                return
+            if pending is not None:
+                task, pending = pending, None
+                rows, has_more = await task
+            else:
+                rows, has_more = await fetch_page(offset)
+    finally:
+        if pending is not None:
+            if pending.done() and not pending.cancelled():
+                # Mark a discarded prefetch error as retrieved so the loop does not log it.
+                pending.exception()
+            pending.cancel()
+
+
+async def atake_first(
+    rows: AsyncIterator[T],
+    count: int,
+    predicate: Optional[Callable[[T], bool]] = None,
+) -> List[T]:
+    """``take_first`` for an async generator, keeping only rows ``predicate`` accepts."""
+    found: List[T] = []
+    try:
+        if count > 0:
+            async for row in rows:
+                if predicate is None or predicate(row):
+                    found.append(row)
+                    if len(found) >= count:
+                        break
+    finally:
+        aclose = getattr(rows, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return found
@@ -0,0 +1,288 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple, Type
+
+from rpa_platform.integrations.jdy_admin_client import (
+    JdyAdminClient,
+    JdyCorpDeploy,
+    JdyInstallRequest,
+    JdyInstallResult,
+    MissingCorpDeployError,
+)
+from rpa_platform.integrations.wecom_admin_client import (
+    MissingWecomAppError,
+    WecomAdminClient,
+    WecomCustomApp,
+    WecomOnlineOrder,
+    WecomSaveAppRequest,
+)
+
+
+DEFAULT_RESOLUTION_TTL_SECONDS = 60.0
+DEFAULT_RESOLUTION_NEGATIVE_TTL_SECONDS = 15.0
+DEFAULT_RESOLUTION_MAX_ENTRIES = 512
+
+
+@dataclass
+class _CacheEntry:
+    expires_at: float
+    tags: FrozenSet[str]
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class ResolutionCache:
+    """Short-lived cache of corp-deploy and custom-app lookups shared across tasks.
+
+    Entries live ``ttl_seconds``; lookups that failed with a "not found" error are
+    cached for ``negative_ttl_seconds`` and raise the same error again. Each entry
+    carries tags (corp id, app id, audit order id) that the caching clients
+    invalidate after a write touching them. ``ttl_seconds=0`` disables caching.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_RESOLUTION_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_RESOLUTION_NEGATIVE_TTL_SECONDS,
+        max_entries: int = DEFAULT_RESOLUTION_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl_seconds < 0 or negative_ttl_seconds < 0:
+            raise ValueError("resolution cache TTLs must not be negative")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[Any, ...], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "ResolutionCache":
+        values = os.environ if env is None else env
+        return cls(
+            ttl_seconds=_parse_seconds(
+                values.get("RPA_ADMIN_RESOLUTION_TTL_SECONDS"),
+                DEFAULT_RESOLUTION_TTL_SECONDS,
+                "RPA_ADMIN_RESOLUTION_TTL_SECONDS",
+            ),
+            negative_ttl_seconds=_parse_seconds(
+                values.get("RPA_ADMIN_RESOLUTION_NEGATIVE_TTL_SECONDS"),
+                DEFAULT_RESOLUTION_NEGATIVE_TTL_SECONDS,
+                "RPA_ADMIN_RESOLUTION_NEGATIVE_TTL_SECONDS",
+            ),
+        )
+
+    def lookup(
+        self,
+        key: Tuple[Any, ...],
+        load: Callable[[], Any],
+        tags_for: Callable[[Any], Iterable[str]] = lambda _value: (),
+        negative_errors: Tuple[Type[BaseException], ...] = (),
+    ) -> Any:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                if entry.error is not None:
+                    self.negative_hits += 1
+                    raise entry.error
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+        try:
+            value = load()
+        except negative_errors as exc:
+            self._store(key, _CacheEntry(now + self.negative_ttl_seconds, frozenset(), error=exc))
+            raise
+        self._store(key, _CacheEntry(now + self.ttl_seconds, frozenset(tags_for(value)), value=value))
+        return value
+
+    def invalidate(self, tag: str) -> int:
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if tag in entry.tags]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _store(self, key: Tuple[Any, ...], entry: _CacheEntry) -> None:
+        if entry.expires_at <= self.clock():
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CachingJdyAdminClient(JdyAdminClient):
+    """``JdyAdminClient`` whose ``resolve_unique_corp`` goes through a ``ResolutionCache``."""
+
+    def __init__(self, transport: Any, cache: ResolutionCache):
+        super().__init__(transport)
+        self.cache = cache
+
+    def resolve_unique_corp(self, plain_corp_id: str, enterprise_name: str) -> JdyCorpDeploy:
+        return self.cache.lookup(
+            ("jdy_corp", plain_corp_id.strip(), enterprise_name.strip()),
+            lambda: super(CachingJdyAdminClient, self).resolve_unique_corp(plain_corp_id, enterprise_name),
+            tags_for=lambda corp: [_jdy_corp_tag(corp.corp_id)],
+            negative_errors=(MissingCorpDeployError,),
+        )
+
+    def install_corp_deploy(self, request: JdyInstallRequest) -> JdyInstallResult:
+        # Installing changes the deploy row's tenant even when the response is unusable.
+        with _invalidating(self.cache, _jdy_corp_tag(request.corp_id)):
+            return super().install_corp_deploy(request)
+
+
+class CachingWecomAdminClient(WecomAdminClient):
+    """``WecomAdminClient`` whose ``resolve_unique_custom_app`` goes through a ``ResolutionCache``.
+
+    Every write invalidates the cached app it touches, so a re-resolution after a
+    write (e.g. confirming the saved development info) always reads the admin API.
+    """
+
+    def __init__(self, transport: Any, cache: ResolutionCache):
+        super().__init__(transport)
+        self.cache = cache
+
+    def resolve_unique_custom_app(self, suiteid: int, enterprise_name: str, suite_name: str) -> WecomCustomApp:
+        return self.cache.lookup(
+            ("wecom_app", int(suiteid), enterprise_name, suite_name),
+            lambda: super(CachingWecomAdminClient, self).resolve_unique_custom_app(
+                suiteid=suiteid,
+                enterprise_name=enterprise_name,
+                suite_name=suite_name,
+            ),
+            tags_for=_wecom_app_tags,
+            negative_errors=(MissingWecomAppError,),
+        )
+
+    def save_development_info(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        with _invalidating(self.cache, _wecom_app_tag(request.app.app_id)):
+            return super().save_development_info(request)
+
+    def save_development_info_raw(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        with _invalidating(self.cache, _wecom_app_tag(request.app.app_id)):
+            return super().save_development_info_raw(request)
+
+    def set_target_privileges(self, suiteid: int, app_id: str) -> List[Dict[str, Any]]:
+        with _invalidating(self.cache, _wecom_app_tag(app_id)):
+            return super().set_target_privileges(suiteid=suiteid, app_id=app_id)
+
+    def set_trial_rule(self, app_id: str) -> Dict[str, Any]:
+        with _invalidating(self.cache, _wecom_app_tag(app_id)):
+            return super().set_trial_rule(app_id=app_id)
+
+    def set_sso_redirect_domain(self, suiteid: int, app_id: str, aes_app_id: str, redirect_domain: str) -> Dict[str, Any]:
+        with _invalidating(self.cache, _wecom_app_tag(app_id)):
+            return super().set_sso_redirect_domain(
+                suiteid=suiteid,
+                app_id=app_id,
+                aes_app_id=aes_app_id,
+                redirect_domain=redirect_domain,
+            )
+
+    def create_online_order(self, suiteid: int, app_id: str) -> WecomOnlineOrder:
+        with _invalidating(self.cache, _wecom_app_tag(app_id)):
+            return super().create_online_order(suiteid=suiteid, app_id=app_id)
+
+    def submit_online_order(self, auditorderid: str) -> WecomOnlineOrder:
+        with _invalidating(self.cache, _wecom_order_tag(auditorderid)):
+            return super().submit_online_order(auditorderid)
+
+
+@contextmanager
+def _invalidating(cache: ResolutionCache, tag: str) -> Iterator[None]:
+    # A failed write may still have reached the admin API, so invalidate either way.
+    try:
+        yield
+    finally:
+        cache.invalidate(tag)
+
+
+def with_resolution_cache(clients: Dict[str, Any], cache: ResolutionCache) -> Dict[str, Any]:
+    """Swap plain admin clients in ``clients`` for caching ones on the same transports."""
+    wrapped = dict(clients)
+    jdy_client = wrapped.get("jdy_client")
+    if type(jdy_client) is JdyAdminClient:
+        wrapped["jdy_client"] = CachingJdyAdminClient(jdy_client.transport, cache)
+    wecom_client = wrapped.get("wecom_client")
+    if type(wecom_client) is WecomAdminClient:
+        wrapped["wecom_client"] = CachingWecomAdminClient(wecom_client.transport, cache)
+    return wrapped
+
+
+_shared_cache: Optional[ResolutionCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_resolution_cache() -> ResolutionCache:
+    """Process-wide cache for the worker's admin clients, configured from the environment on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResolutionCache.from_env()
+        return _shared_cache
+
+
+def _jdy_corp_tag(corp_id: str) -> str:
+    return "jdy_corp:%s" % corp_id
+
+
+def _wecom_app_tag(app_id: str) -> str:
+    return "wecom_app:%s" % app_id
+
+
+def _wecom_order_tag(auditorderid: str) -> str:
+    return "wecom_order:%s" % auditorderid
+
+
+def _wecom_app_tags(app: WecomCustomApp) -> List[str]:
+    tags = [_wecom_app_tag(app.app_id)]
+    if app.auditorderid:
+        tags.append(_wecom_order_tag(app.auditorderid))
+    return tags
+
+
+def _parse_seconds(value: Optional[str], default: float, name: str) -> float:
+    if value is None or not value.strip():
+        return default
+    try:
+        parsed = float(value)
+    except ValueError as exc:
+        raise ValueError("%s must be a non-negative number" % name) from exc
+    if parsed < 0:
+        raise ValueError("%s must be a non-negative number" % name)
+    return parsed
@@ -1,6 +1,15 @@
 import copy
 from dataclasses import dataclass
-from typing import Any, Dict, List, Protocol
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from rpa_platform.integrations.paging import aiter_pages, atake_first, iter_pages, take_first
+
+
+# customApp/tpl/app/list page size for keyword searches that walk every match.
+DEFAULT_CUSTOM_APP_PAGE_SIZE = 50
+
+# (path, query params or JSON payload, extra headers) for one admin API call.
+WecomAdminRequest = Tuple[str, Dict[str, Any], Dict[str, str]]
 
 
 class WecomAdminTransport(Protocol):
@@ -21,6 +30,24 @@ class WecomAdminTransport(Protocol):
         raise NotImplementedError
 
 
+class AsyncWecomAdminTransport(Protocol):
+    async def get_json(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def post_json(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
 class WecomAdminError(RuntimeError):
     """Base error for WeCom developer admin API failures."""
 
@@ -51,6 +78,8 @@ class WecomCustomApp:
     customized_app_status: int
     aes_app_id: str
     raw: Dict[str, Any]
+    auditorderid: str = ""
+    auditorder_status: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -84,38 +113,142 @@ class WecomAdminClient:
         enterprise_name: str,
         suite_name: str,
     ) -> WecomCustomApp:
-        data = self.transport.get_json(
-            "/wwopen/developer/customApp/tpl/app/list",
-            {
-                "lang": "zh_CN",
-                "ajax": 1,
-                "f": "json",
-                "suiteid": str(suiteid),
-                "scene": 1,
-                "corp_name_keyword": enterprise_name,
-                "offset": 0,
-                "limit": 10,
-                "random": 0,
-            },
-            self._headers("/sass/customApp/tpl/info", "50"),
+        matches = take_first(
+            (
+                app
+                for app in self.iter_custom_apps(suiteid, corp_name_keyword=enterprise_name)
+                if app.authcorp_name == enterprise_name and app.name == suite_name
+            ),
+            2,
         )
-        matches = [
-            row
-            for row in self._extract_corpapp_rows(data)
-            if str(row.get("authcorp_name", "")) == enterprise_name
-            and str(row.get("name", "")) == suite_name
-        ]
-        if not matches:
-            raise MissingWecomAppError("no custom app matched authcorp name and app name")
-        if len(matches) > 1:
-            raise AmbiguousWecomAppError("authcorp name and app name matched multiple custom apps")
-        return self._parse_custom_app(matches[0])
+        return self._unique_custom_app(matches)
+
+    def iter_custom_apps(
+        self,
+        suiteid: int,
+        corp_name_keyword: Optional[str] = None,
+        page_size: int = DEFAULT_CUSTOM_APP_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[WecomCustomApp]:
+        """The suite's custom apps, optionally filtered by corp name keyword, across all pages."""
+
+        def fetch_page(offset: int):
+            data = self.transport.get_json(*self._custom_app_list_request(suiteid, corp_name_keyword, offset, page_size))
+            return self._parse_custom_app_page(data, page_size)
+
+        return iter_pages(fetch_page, prefetch=prefetch)
+
+    def list_custom_apps(
+        self,
+        suiteid: int,
+        app_ids: Optional[Iterable[str]] = None,
+        page_size: int = 100,
+    ) -> List[WecomCustomApp]:
+        """List the suite's custom apps page by page.
+
+        With ``app_ids`` paging stops as soon as every wanted app has been seen, so a
+        batch status check costs as few list calls as the apps' positions allow; the
+        next page is therefore only prefetched when listing everything.
+        """
+        wanted = set(app_ids) if app_ids is not None else None
+        apps: List[WecomCustomApp] = []
+        pages = self.iter_custom_apps(suiteid, page_size=page_size, prefetch=wanted is None)
+        for app in pages:
+            if wanted is None:
+                apps.append(app)
+            elif app.app_id in wanted:
+                apps.append(app)
+                wanted.discard(app.app_id)
+                if not wanted:
+                    pages.close()
+                    break
+        return apps
 
     def save_development_info(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
         response = self.save_development_info_raw(request)
         return self._extract_corpapp(response)
 
     def save_development_info_raw(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        return self.transport.post_json(*self._save_development_info_request(request))
+
+    def set_target_privileges(self, suiteid: int, app_id: str) -> List[Dict[str, Any]]:
+        data = self.transport.post_json(*self._get_privileges_request(suiteid, app_id))
+        patched = self._patch_target_privileges(data)
+        response = self.transport.post_json(*self._set_privileges_request(suiteid, app_id, patched))
+        return self._confirmed_privileges(response, patched)
+
+    def set_trial_rule(self, app_id: str) -> Dict[str, Any]:
+        self.transport.post_json(*self._get_trial_rule_request(app_id))
+        response = self.transport.post_json(*self._set_trial_rule_request(app_id))
+        self._validate_trial_rule_response(response)
+        return response
+
+    def set_sso_redirect_domain(
+        self,
+        suiteid: int,
+        app_id: str,
+        aes_app_id: str,
+        redirect_domain: str,
+    ) -> Dict[str, Any]:
+        response = self.transport.post_json(*self._sso_request(suiteid, app_id, aes_app_id, redirect_domain))
+        corpapp = self._extract_corpapp(response)
+        self._validate_sso_response(corpapp, aes_app_id, redirect_domain)
+        return corpapp
+
+    def create_online_order(self, suiteid: int, app_id: str) -> WecomOnlineOrder:
+        data = self.transport.post_json(*self._create_online_order_request(suiteid, app_id))
+        return self._parse_online_order(self._extract_order(data))
+
+    def submit_online_order(self, auditorderid: str) -> WecomOnlineOrder:
+        data = self.transport.post_json(*self._submit_online_order_request(auditorderid))
+        return self._parse_online_order(self._extract_order(data))
+
+    # Request builders below return (path, params or payload, headers) and, like the
+    # response parsers, are shared with AsyncWecomAdminClient.
+
+    @classmethod
+    def _custom_app_list_request(
+        cls,
+        suiteid: int,
+        corp_name_keyword: Optional[str],
+        offset: int,
+        page_size: int,
+    ) -> WecomAdminRequest:
+        params: Dict[str, Any] = {
+            "lang": "zh_CN",
+            "ajax": 1,
+            "f": "json",
+            "suiteid": str(suiteid),
+            "scene": 1,
+        }
+        if corp_name_keyword is not None:
+            params["corp_name_keyword"] = corp_name_keyword
+        params.update({"offset": offset, "limit": page_size, "random": 0})
+        return (
+            "/wwopen/developer/customApp/tpl/app/list",
+            params,
+            cls._headers("/sass/customApp/tpl/info", "50"),
+        )
+
+    @classmethod
+    def _parse_custom_app_page(cls, data: Dict[str, Any], page_size: int) -> Tuple[List[WecomCustomApp], bool]:
+        rows = cls._extract_corpapp_rows(data)
+        nested = data.get("data")
+        has_next_page = nested.get("has_next_page") if isinstance(nested, dict) else None
+        if has_next_page is None:
+            has_next_page = len(rows) >= page_size
+        return [cls._parse_custom_app(row) for row in rows], bool(has_next_page)
+
+    @staticmethod
+    def _unique_custom_app(matches: List[WecomCustomApp]) -> WecomCustomApp:
+        if not matches:
+            raise MissingWecomAppError("no custom app matched authcorp name and app name")
+        if len(matches) > 1:
+            raise AmbiguousWecomAppError("authcorp name and app name matched multiple custom apps")
+        return matches[0]
+
+    @classmethod
+    def _save_development_info_request(cls, request: WecomSaveAppRequest) -> WecomAdminRequest:
         corpapp = copy.deepcopy(dict(request.app.raw))
         corpapp.update(
             {
@@ -140,49 +273,66 @@ class WecomAdminClient:
                 "miniprogramInfo": {},
             }
         )
-        return self.transport.post_json(
+        return (
             "/wwopen/developer/customApp/tpl/corpApp",
             {"suiteid": str(request.suiteid), "corpapp": corpapp},
-            self._headers("/sass/customApp/app/create", "50"),
+            cls._headers("/sass/customApp/app/create", "50"),
         )
 
-    def set_target_privileges(self, suiteid: int, app_id: str) -> List[Dict[str, Any]]:
-        headers = self._headers("/sass/customApp/app/detail", "50,51")
-        request_payload = {"thirdapp_id": [app_id], "suiteid": str(suiteid)}
-        data = self.transport.post_json(
+    @classmethod
+    def _get_privileges_request(cls, suiteid: int, app_id: str) -> WecomAdminRequest:
+        return (
             "/wwopen/api/customApp/privilege/getCustomizedAppPrivilege",
-            request_payload,
-            headers,
+            {"thirdapp_id": [app_id], "suiteid": str(suiteid)},
+            cls._headers("/sass/customApp/app/detail", "50,51"),
         )
-        patched = []
-        for item in self._extract_required_privilege_list(data):
-            privilege = copy.deepcopy(item)
-            self._check_target_privileges(privilege)
-            patched.append(privilege)
-        response = self.transport.post_json(
+
+    @classmethod
+    def _set_privileges_request(
+        cls,
+        suiteid: int,
+        app_id: str,
+        privilege_list: List[Dict[str, Any]],
+    ) -> WecomAdminRequest:
+        return (
             "/wwopen/api/customApp/privilege/setCustomizedAppPrivilege",
             {
                 "thirdapp_id": [app_id],
                 "suiteid": str(suiteid),
-                "privilege_list": patched,
+                "privilege_list": privilege_list,
             },
-            headers,
+            cls._headers("/sass/customApp/app/detail", "50,51"),
         )
-        response_privileges = self._extract_privilege_list(response)
+
+    @classmethod
+    def _patch_target_privileges(cls, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        patched = []
+        for item in cls._extract_required_privilege_list(data):
+            privilege = copy.deepcopy(item)
+            cls._check_target_privileges(privilege)
+            patched.append(privilege)
+        return patched
+
+    @classmethod
+    def _confirmed_privileges(cls, response: Dict[str, Any], patched: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response_privileges = cls._extract_privilege_list(response)
         if response_privileges:
             return response_privileges
         if isinstance(response.get("data"), dict) and not response.get("result"):
             return patched
         raise WecomAdminError("WeCom admin response missing data.privilege_list")
 
-    def set_trial_rule(self, app_id: str) -> Dict[str, Any]:
-        headers = self._headers("/sass/customApp/app/detail", "50,51")
-        self.transport.post_json(
+    @classmethod
+    def _get_trial_rule_request(cls, app_id: str) -> WecomAdminRequest:
+        return (
             "/wwopen/api/customApp/price/GetStandardPriceInfoForCA",
             {"corpappid": app_id},
-            headers,
+            cls._headers("/sass/customApp/app/detail", "50,51"),
         )
-        response = self.transport.post_json(
+
+    @classmethod
+    def _set_trial_rule_request(cls, app_id: str) -> WecomAdminRequest:
+        return (
             "/wwopen/api/customApp/price/SetStandardPriceInfoForCA",
             {
                 "corpappid": app_id,
@@ -196,19 +346,12 @@ class WecomAdminClient:
                 },
                 "clear_base_price_info": False,
             },
-            headers,
+            cls._headers("/sass/customApp/app/detail", "50,51"),
         )
-        self._validate_trial_rule_response(response)
-        return response
 
-    def set_sso_redirect_domain(
-        self,
-        suiteid: int,
-        app_id: str,
-        aes_app_id: str,
-        redirect_domain: str,
-    ) -> Dict[str, Any]:
-        response = self.transport.post_json(
+    @classmethod
+    def _sso_request(cls, suiteid: int, app_id: str, aes_app_id: str, redirect_domain: str) -> WecomAdminRequest:
+        return (
             "/wwopen/developer/customApp/tpl/corpApp",
             {
                 "suiteid": str(suiteid),
@@ -225,30 +368,27 @@ class WecomAdminClient:
                     },
                 },
             },
-            self._headers("/sass/customApp/app/detail/sso", "50"),
+            cls._headers("/sass/customApp/app/detail/sso", "50"),
         )
-        corpapp = self._extract_corpapp(response)
-        self._validate_sso_response(corpapp, aes_app_id, redirect_domain)
-        return corpapp
 
-    def create_online_order(self, suiteid: int, app_id: str) -> WecomOnlineOrder:
-        data = self.transport.post_json(
+    @classmethod
+    def _create_online_order_request(cls, suiteid: int, app_id: str) -> WecomAdminRequest:
+        return (
             "/wwopen/developer/order/add",
             {
                 "auditorder": {"suiteid": suiteid, "corpappid": app_id},
                 "skipNotice": False,
             },
-            self._headers("/sass/customApp/deploy/list", "51"),
+            cls._headers("/sass/customApp/deploy/list", "51"),
         )
-        return self._parse_online_order(self._extract_order(data))
 
-    def submit_online_order(self, auditorderid: str) -> WecomOnlineOrder:
-        data = self.transport.post_json(
+    @classmethod
+    def _submit_online_order_request(cls, auditorderid: str) -> WecomAdminRequest:
+        return (
             "/wwopen/developer/order/set",
             {"auditorder": {"auditorderid": auditorderid, "status": 5}},
-            self._headers("/sass/customApp/deploy/detail", "51"),
+            cls._headers("/sass/customApp/deploy/detail", "51"),
         )
-        return self._parse_online_order(self._extract_order(data))
 
     @staticmethod
     def _headers(page: str, perm: str) -> Dict[str, str]:
@@ -385,6 +525,9 @@ class WecomAdminClient:
         sdk_auth = row.get("sdk_auth")
         if not isinstance(sdk_auth, dict):
             sdk_auth = {}
+        auditorder = row.get("auditorder")
+        if not isinstance(auditorder, dict):
+            auditorder = {}
         return WecomCustomApp(
             app_id=str(row.get("app_id", "")),
             authcorp_name=str(row.get("authcorp_name", "")),
@@ -394,6 +537,8 @@ class WecomAdminClient:
             customized_app_status=int(row.get("customized_app_status") or 0),
             aes_app_id=str(sdk_auth.get("aes_app_id", "")),
             raw=copy.deepcopy(row),
+            auditorderid=str(auditorder.get("auditorderid", "")),
+            auditorder_status=int(auditorder["status"]) if auditorder.get("status") is not None else None,
         )
 
     @staticmethod
@@ -404,3 +549,104 @@ class WecomAdminClient:
             authcorp_name=str(row.get("authcorp_name", "")),
             status=int(row.get("status") or 0),
         )
+
+
+class AsyncWecomAdminClient:
+    """``WecomAdminClient`` for the worker's event loop, on an ``AsyncWecomAdminTransport``.
+
+    Same requests, results and errors as the blocking client; concurrent calls from
+    several tasks interleave their round trips instead of holding a thread each.
+    """
+
+    def __init__(self, transport: AsyncWecomAdminTransport):
+        self.transport = transport
+
+    async def resolve_unique_custom_app(
+        self,
+        suiteid: int,
+        enterprise_name: str,
+        suite_name: str,
+    ) -> WecomCustomApp:
+        matches = await atake_first(
+            self.iter_custom_apps(suiteid, corp_name_keyword=enterprise_name),
+            2,
+            lambda app: app.authcorp_name == enterprise_name and app.name == suite_name,
+        )
+        return WecomAdminClient._unique_custom_app(matches)
+
+    def iter_custom_apps(
+        self,
+        suiteid: int,
+        corp_name_keyword: Optional[str] = None,
+        page_size: int = DEFAULT_CUSTOM_APP_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> AsyncIterator[WecomCustomApp]:
+        async def fetch_page(offset: int):
+            data = await self.transport.get_json(
+                *WecomAdminClient._custom_app_list_request(suiteid, corp_name_keyword, offset, page_size)
+            )
+            return WecomAdminClient._parse_custom_app_page(data, page_size)
+
+        return aiter_pages(fetch_page, prefetch=prefetch)
+
+    async def list_custom_apps(
+        self,
+        suiteid: int,
+        app_ids: Optional[Iterable[str]] = None,
+        page_size: int = 100,
+    ) -> List[WecomCustomApp]:
+        wanted = set(app_ids) if app_ids is not None else None
+        if wanted is None:
+            return [app async for app in self.iter_custom_apps(suiteid, page_size=page_size)]
+        if not wanted:
+            return []
+
+        def still_wanted(app: WecomCustomApp) -> bool:
+            if app.app_id not in wanted:
+                return False
+            wanted.discard(app.app_id)
+            return True
+
+        pages = self.iter_custom_apps(suiteid, page_size=page_size, prefetch=False)
+        return await atake_first(pages, len(wanted), still_wanted)
+
+    async def save_development_info(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        response = await self.save_development_info_raw(request)
+        return WecomAdminClient._extract_corpapp(response)
+
+    async def save_development_info_raw(self, request: WecomSaveAppRequest) -> Dict[str, Any]:
+        return await self.transport.post_json(*WecomAdminClient._save_development_info_request(request))
+
+    async def set_target_privileges(self, suiteid: int, app_id: str) -> List[Dict[str, Any]]:
+        data = await self.transport.post_json(*WecomAdminClient._get_privileges_request(suiteid, app_id))
+        patched = WecomAdminClient._patch_target_privileges(data)
+        response = await self.transport.post_json(*WecomAdminClient._set_privileges_request(suiteid, app_id, patched))
+        return WecomAdminClient._confirmed_privileges(response, patched)
+
+    async def set_trial_rule(self, app_id: str) -> Dict[str, Any]:
+        await self.transport.post_json(*WecomAdminClient._get_trial_rule_request(app_id))
+        response = await self.transport.post_json(*WecomAdminClient._set_trial_rule_request(app_id))
+        WecomAdminClient._validate_trial_rule_response(response)
+        return response
+
+    async def set_sso_redirect_domain(
+        self,
+        suiteid: int,
+        app_id: str,
+        aes_app_id: str,
+        redirect_domain: str,
+    ) -> Dict[str, Any]:
+        response = await self.transport.post_json(
+            *WecomAdminClient._sso_request(suiteid, app_id, aes_app_id, redirect_domain)
+        )
+        corpapp = WecomAdminClient._extract_corpapp(response)
+        WecomAdminClient._validate_sso_response(corpapp, aes_app_id, redirect_domain)
+        return corpapp
+
+    async def create_online_order(self, suiteid: int, app_id: str) -> WecomOnlineOrder:
+        data = await self.transport.post_json(*WecomAdminClient._create_online_order_request(suiteid, app_id))
+        return WecomAdminClient._parse_online_order(WecomAdminClient._extract_order(data))
+
+    async def submit_online_order(self, auditorderid: str) -> WecomOnlineOrder:
+        data = await self.transport.post_json(*WecomAdminClient._submit_online_order_request(auditorderid))
+        return WecomAdminClient._parse_online_order(WecomAdminClient._extract_order(data))
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import Body, FastAPI, HTTPException, status
 
@@ -6,11 +6,22 @@ from rpa_platform.server.flow_routes import create_flow_router
 from rpa_platform.server.task_routes import create_task_router
 from rpa_platform.server.webhook_service import JdyWebhookService, PayloadValidationError
 from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.scheduler_service import SchedulerService
 
 
-def create_app(store: SQLiteStore, default_team_id: str, default_flow_template_id: str) -> FastAPI:
+def create_app(
+    store: SQLiteStore,
+    default_team_id: str,
+    default_flow_template_id: str,
+    scheduler: Optional[SchedulerService] = None,
+) -> FastAPI:
     app = FastAPI(title="RPA Platform", docs_url="/platform/docs", redoc_url=None)
-    webhook_service = JdyWebhookService(store, default_team_id, default_flow_template_id)
+    webhook_service = JdyWebhookService(
+        store,
+        default_team_id,
+        default_flow_template_id,
+        on_task_created=scheduler.notify_new_task if scheduler is not None else None,
+    )
 
     @app.get("/platform/healthz", status_code=status.HTTP_200_OK)
     def healthz() -> Dict[str, str]:
@@ -28,6 +39,11 @@ def create_app(store: SQLiteStore, default_team_id: str, default_flow_template_i
             "status": "accepted",
         }
 
+    if scheduler is not None:
+        @app.get("/platform/scheduler/stats", status_code=status.HTTP_200_OK)
+        def scheduler_stats() -> Dict[str, Any]:
+            return scheduler.stats()
+
     app.include_router(create_flow_router(store))
     app.include_router(create_task_router(store))
     return app
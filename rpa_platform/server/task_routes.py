@@ -1,6 +1,6 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Body, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Query, status
 
 from rpa_platform.domain.state_machine import TaskStatus
 from rpa_platform.storage.sqlite_store import SQLiteStore
@@ -16,6 +16,31 @@ ACTION_STATUS_MAP = {
 def create_task_router(store: SQLiteStore) -> APIRouter:
     router = APIRouter(prefix="/platform")
 
+    @router.get("/tasks", status_code=status.HTTP_200_OK)
+    def list_tasks(
+        task_status: Optional[str] = Query(None, alias="status"),
+        team_id: Optional[str] = None,
+        assigned_robot_id: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        try:
+            return store.list_tasks(
+                status=task_status,
+                team_id=team_id,
+                assigned_robot_id=assigned_robot_id,
+                created_from=created_from,
+                created_to=created_to,
+                query=q,
+                limit=limit,
+                cursor=cursor,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
     @router.get("/tasks/{task_id}", status_code=status.HTTP_200_OK)
     def get_task(task_id: str) -> Dict[str, Any]:
         try:
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from rpa_platform.storage.sqlite_store import SQLiteStore, TaskCreateResult
 
@@ -8,17 +8,24 @@ class PayloadValidationError(ValueError):
 
 
 class JdyWebhookService:
-    def __init__(self, store: SQLiteStore, team_id: str, flow_template_id: str):
+    def __init__(
+        self,
+        store: SQLiteStore,
+        team_id: str,
+        flow_template_id: str,
+        on_task_created: Optional[Callable[[str], None]] = None,
+    ):
         self.store = store
         self.team_id = team_id
         self.flow_template_id = flow_template_id
+        self.on_task_created = on_task_created
 
     def receive(self, payload: Dict[str, Any]) -> TaskCreateResult:
         user_id = self._required_text(payload, "user_id")
         enterprise_name = self._required_text(payload, "企业客户名称")
         corp_id = self._required_text(payload, "企业微信明文 CorpID")
         idempotency_key = f"wecom_app_launch:{corp_id}:{user_id}"
-        return self.store.create_task_from_published_flow(
+        result = self.store.create_task_from_published_flow(
             team_id=self.team_id,
             flow_template_id=self.flow_template_id,
             enterprise_name=enterprise_name,
@@ -27,6 +34,9 @@ class JdyWebhookService:
             idempotency_key=idempotency_key,
             payload=payload,
         )
+        if result.created and self.on_task_created is not None:
+            self.on_task_created(result.task_id)
+        return result
 
     @staticmethod
     def _required_text(payload: Dict[str, Any], key: str) -> str:
@@ -0,0 +1,58 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class GraphStep:
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    requires: Tuple[str, ...] = ()
+
+
+def run_step_graph(steps: Sequence[GraphStep], max_workers: int) -> Dict[str, Any]:
+    """Run ``steps`` as a dependency graph on at most ``max_workers`` threads.
+
+    A step starts once every step it ``requires`` has finished and receives the
+    results so far, keyed by step name. Ready steps start in declaration order, so
+    ``max_workers=1`` is the plain sequential run. After a failure no further step
+    starts; steps already running finish, and the failure of the earliest declared
+    step is raised, which is the error the sequential run would have raised.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    order = {step.name: index for index, step in enumerate(steps)}
+    if len(order) != len(steps):
+        raise ValueError("step names must be unique")
+    for step in steps:
+        unknown = [name for name in step.requires if name not in order]
+        if unknown:
+            raise ValueError("step %s requires unknown steps: %s" % (step.name, ", ".join(unknown)))
+
+    results: Dict[str, Any] = {}
+    failures: Dict[int, BaseException] = {}
+    pending: List[GraphStep] = list(steps)
+    running: Dict[Future, GraphStep] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="step-graph") as executor:
+        while True:
+            if not failures:
+                for step in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if all(name in results for name in step.requires):
+                        pending.remove(step)
+                        running[executor.submit(step.run, dict(results))] = step
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    results[step.name] = future.result()
+                except BaseException as exc:
+                    failures[order[step.name]] = exc
+    if failures:
+        raise failures[min(failures)]
+    if pending:
+        raise ValueError("step graph has a dependency cycle: %s" % ", ".join(step.name for step in pending))
+    return results
@@ -2,21 +2,26 @@ from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 import secrets
 import string
-from typing import Any, Dict, Optional, Protocol
+from typing import Any, Dict, Optional, Protocol, Tuple
 
 from rpa_platform.integrations.jdy_admin_client import (
     JdyAdminClient,
     JdyAdminError,
+    JdyCorpDeploy,
     JdyInstallRequest,
+    JdyInstallResult,
     OwnerCannotBindError,
 )
-from rpa_platform.integrations.wecom_admin_client import WecomAdminClient, WecomSaveAppRequest
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient, WecomCustomApp, WecomSaveAppRequest
+from rpa_platform.services.step_graph import GraphStep, run_step_graph
 
 
 DEFAULT_WECOM_SUITEID = 1009479
 DEFAULT_WECOM_SUITE_NAME = "简道云"
 EDUCATION_WECOM_SUITEID = 1038071
 EDUCATION_WECOM_SUITE_NAME = "简道云教育版"
+# Widest stage of the bind graph: the WeCom app lookup beside the JDY owner check.
+DEFAULT_BIND_MAX_WORKERS = 2
 
 
 class WecomSecretGenerator(Protocol):
@@ -68,77 +73,85 @@ class JdyWecomBindService:
         jdy_client: JdyAdminClient,
         wecom_client: WecomAdminClient,
         secret_generator: WecomSecretGenerator,
+        max_workers: int = DEFAULT_BIND_MAX_WORKERS,
     ):
         self.jdy_client = jdy_client
         self.wecom_client = wecom_client
         self.secret_generator = secret_generator
+        self.max_workers = max_workers
 
     def start_bind(self, request: JdyWecomBindInput, now: Optional[datetime] = None) -> JdyWecomBindResult:
         if now is None:
             now = datetime.now()
 
-        corp = self.jdy_client.resolve_unique_corp(
-            request.plain_corp_id,
-            request.enterprise_short_name or request.enterprise_name,
-        )
-        request = _with_corp_default_userid(request, corp)
-        request = with_resolved_wecom_suite(request, corp)
-        wecom_authcorp_name = request.enterprise_short_name or corp.name or request.enterprise_name
-        app = self.wecom_client.resolve_unique_custom_app(
-            suiteid=request.wecom_suiteid,
-            enterprise_name=wecom_authcorp_name,
-            suite_name=request.suite_name,
-        )
         secrets_payload = self.secret_generator.generate()
-        homeurl = "https://wxwork.jiandaoyun.com/wxwork/%s/dashboard" % corp.corp_id
-        callbackurl = "https://wxwork.jiandaoyun.com/wxwork/corp/%s/service" % corp.corp_id
         redirect_domain = "wxwork.jiandaoyun.com"
-
-        owner = self.jdy_client.check_wework_owner(
-            request.requested_user_id,
-            suite_id=request.suite_id,
-            suite_scenario=request.suite_scenario,
+        # Only the read-only lookups run in parallel: the WeCom app lookup beside the
+        # owner check. JDY is installed only after both pass, and the WeCom admin writes
+        # then run one after another, so a failed write stops every write after it.
+        results = run_step_graph(
+            [
+                GraphStep("corp", lambda _done: self._resolve_corp(request)),
+                GraphStep("app", lambda done: self._resolve_app(*done["corp"]), ("corp",)),
+                GraphStep("owner", lambda done: self._check_owner(done["corp"][1]), ("corp",)),
+                GraphStep(
+                    "install",
+                    lambda done: self._install(*done["corp"], secrets_payload),
+                    ("app", "owner"),
+                ),
+                GraphStep(
+                    "development_info",
+                    lambda done: self.wecom_client.save_development_info(
+                        WecomSaveAppRequest(
+                            suiteid=done["corp"][1].wecom_suiteid,
+                            app=done["app"],
+                            homeurl=_homeurl(done["corp"][0]),
+                            callbackurl=_callbackurl(done["corp"][0]),
+                            redirect_domain=redirect_domain,
+                            token=secrets_payload["token"],
+                            encoding_aes_key=secrets_payload["encoding_aes_key"],
+                        )
+                    ),
+                    ("install",),
+                ),
+                GraphStep(
+                    "privileges",
+                    lambda done: self.wecom_client.set_target_privileges(
+                        suiteid=done["corp"][1].wecom_suiteid,
+                        app_id=done["app"].app_id,
+                    ),
+                    ("development_info",),
+                ),
+                GraphStep(
+                    "trial_rule",
+                    lambda done: self.wecom_client.set_trial_rule(app_id=done["app"].app_id),
+                    ("privileges",),
+                ),
+                GraphStep(
+                    "sso_redirect_domain",
+                    lambda done: self.wecom_client.set_sso_redirect_domain(
+                        suiteid=done["corp"][1].wecom_suiteid,
+                        app_id=done["app"].app_id,
+                        aes_app_id=done["app"].aes_app_id,
+                        redirect_domain=redirect_domain,
+                    ),
+                    ("trial_rule",),
+                ),
+                GraphStep(
+                    "order",
+                    lambda done: self.wecom_client.create_online_order(
+                        suiteid=done["corp"][1].wecom_suiteid,
+                        app_id=done["app"].app_id,
+                    ),
+                    ("sso_redirect_domain",),
+                ),
+            ],
+            max_workers=self.max_workers,
         )
-        if not owner.can_bind_corp_secret and not owner.can_update_corp_secret:
-            raise OwnerCannotBindError("User_ID cannot bind corp secret")
-
-        install = self.jdy_client.install_corp_deploy(
-            JdyInstallRequest(
-                corp_id=corp.corp_id,
-                corp_name=corp.name,
-                tenant_id=request.requested_user_id,
-                token=secrets_payload["token"],
-                encoding_aes_key=secrets_payload["encoding_aes_key"],
-                suite_id=request.suite_id,
-                suite_scenario=request.suite_scenario,
-            )
-        )
-        install_tenant_id = install.tenant_id.strip()
-        install_owner_id = install.owner_id.strip()
-        if not install_tenant_id or not install_owner_id:
-            raise JdyAdminError("install_corp_deploy returned empty tenant_id or owner_id")
-        bound_user_id = install_owner_id
-
-        self.wecom_client.save_development_info(
-            WecomSaveAppRequest(
-                suiteid=request.wecom_suiteid,
-                app=app,
-                homeurl=homeurl,
-                callbackurl=callbackurl,
-                redirect_domain=redirect_domain,
-                token=secrets_payload["token"],
-                encoding_aes_key=secrets_payload["encoding_aes_key"],
-            )
-        )
-        self.wecom_client.set_target_privileges(suiteid=request.wecom_suiteid, app_id=app.app_id)
-        self.wecom_client.set_trial_rule(app_id=app.app_id)
-        self.wecom_client.set_sso_redirect_domain(
-            suiteid=request.wecom_suiteid,
-            app_id=app.app_id,
-            aes_app_id=app.aes_app_id,
-            redirect_domain=redirect_domain,
-        )
-        order = self.wecom_client.create_online_order(suiteid=request.wecom_suiteid, app_id=app.app_id)
+        corp, request = results["corp"]
+        app = results["app"]
+        install = results["install"]
+        order = results["order"]
 
         context = {
             "jdy": {
@@ -146,9 +159,9 @@ class JdyWecomBindService:
                 "corp_name": corp.name,
                 "original_tenant_id": corp.tenant_id,
                 "requested_user_id": request.requested_user_id,
-                "install_tenant_id": install_tenant_id,
-                "install_owner_id": install_owner_id,
-                "bound_user_id": bound_user_id,
+                "install_tenant_id": install.tenant_id,
+                "install_owner_id": install.owner_id,
+                "bound_user_id": install.owner_id,
                 "suite_id": corp.suite_id,
                 "suite_scenario": corp.suite_scenario,
                 "suite_name": corp.suite_name,
@@ -159,8 +172,8 @@ class JdyWecomBindService:
                 "suite_name": request.suite_name,
                 "app_id": app.app_id,
                 "aes_app_id": app.aes_app_id,
-                "homeurl": homeurl,
-                "callbackurl": callbackurl,
+                "homeurl": _homeurl(corp),
+                "callbackurl": _callbackurl(corp),
                 "redirect_domain": redirect_domain,
                 "token": secrets_payload["token"],
                 "encoding_aes_key": secrets_payload["encoding_aes_key"],
@@ -175,6 +188,52 @@ class JdyWecomBindService:
             next_check_at=now + timedelta(minutes=5),
         )
 
+    def _resolve_corp(self, request: JdyWecomBindInput) -> Tuple[JdyCorpDeploy, JdyWecomBindInput]:
+        corp = self.jdy_client.resolve_unique_corp(
+            request.plain_corp_id,
+            request.enterprise_short_name or request.enterprise_name,
+        )
+        request = _with_corp_default_userid(request, corp)
+        return corp, with_resolved_wecom_suite(request, corp)
+
+    def _resolve_app(self, corp: JdyCorpDeploy, request: JdyWecomBindInput) -> WecomCustomApp:
+        return self.wecom_client.resolve_unique_custom_app(
+            suiteid=request.wecom_suiteid,
+            enterprise_name=request.enterprise_short_name or corp.name or request.enterprise_name,
+            suite_name=request.suite_name,
+        )
+
+    def _check_owner(self, request: JdyWecomBindInput) -> None:
+        owner = self.jdy_client.check_wework_owner(
+            request.requested_user_id,
+            suite_id=request.suite_id,
+            suite_scenario=request.suite_scenario,
+        )
+        if not owner.can_bind_corp_secret and not owner.can_update_corp_secret:
+            raise OwnerCannotBindError("User_ID cannot bind corp secret")
+
+    def _install(
+        self,
+        corp: JdyCorpDeploy,
+        request: JdyWecomBindInput,
+        secrets_payload: Dict[str, str],
+    ) -> JdyInstallResult:
+        install = self.jdy_client.install_corp_deploy(
+            JdyInstallRequest(
+                corp_id=corp.corp_id,
+                corp_name=corp.name,
+                tenant_id=request.requested_user_id,
+                token=secrets_payload["token"],
+                encoding_aes_key=secrets_payload["encoding_aes_key"],
+                suite_id=request.suite_id,
+                suite_scenario=request.suite_scenario,
+            )
+        )
+        install = replace(install, tenant_id=install.tenant_id.strip(), owner_id=install.owner_id.strip())
+        if not install.tenant_id or not install.owner_id:
+            raise JdyAdminError("install_corp_deploy returned empty tenant_id or owner_id")
+        return install
+
     def submit_online_order(self, context: Dict[str, Any]) -> JdyWecomBindResult:
         auditorderid = str(context["wecom"]["auditorderid"])
         order = self.wecom_client.submit_online_order(auditorderid)
@@ -184,6 +243,14 @@ class JdyWecomBindService:
         )
 
 
+def _homeurl(corp: JdyCorpDeploy) -> str:
+    return "https://wxwork.jiandaoyun.com/wxwork/%s/dashboard" % corp.corp_id
+
+
+def _callbackurl(corp: JdyCorpDeploy) -> str:
+    return "https://wxwork.jiandaoyun.com/wxwork/corp/%s/service" % corp.corp_id
+
+
 def _with_corp_default_userid(request: JdyWecomBindInput, corp: Any) -> JdyWecomBindInput:
     if request.requested_user_id.strip():
         return request
@@ -1,13 +1,37 @@
+import base64
+import functools
+import hashlib
 import json
 import sqlite3
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 from rpa_platform.domain.flow_steps import validate_steps
 from rpa_platform.domain.redaction import redact_context
-from rpa_platform.domain.state_machine import ensure_task_transition, TaskStatus
+from rpa_platform.domain.state_machine import ensure_task_transition, TaskStatus, TERMINAL_STATUSES
+
+
+@contextmanager
+def _schema_transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run a multi-statement schema migration atomically.
+
+    sqlite3 only opens transactions implicitly before DML, so the ALTER TABLE statements
+    of a migration would otherwise commit one by one and a failure halfway through would
+    leave a half-migrated table behind.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
 
 
 def _now() -> str:
@@ -22,6 +46,71 @@ def _format_datetime(value: Optional[Any]) -> Optional[str]:
     return str(value)
 
 
+def _now_ms() -> int:
+    return _to_epoch_ms(datetime.now())
+
+
+def _to_epoch_ms(value: Optional[Any]) -> Optional[int]:
+    """Convert a naive local datetime (or its text form) to epoch milliseconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return round(value.timestamp() * 1000)
+
+
+def _snapshot_hash(snapshot_json: str) -> str:
+    return hashlib.sha256(snapshot_json.encode("utf-8")).hexdigest()
+
+
+def _canonical_snapshot_json(snapshot: Dict[str, Any]) -> str:
+    return json.dumps(snapshot, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _status_guard(
+    target: TaskStatus,
+    expected: Union[TaskStatus, str, Iterable[Union[TaskStatus, str]]],
+) -> Tuple[str, List[str]]:
+    if isinstance(expected, str):
+        sources = [TaskStatus(expected)]
+    else:
+        sources = sorted({TaskStatus(item) for item in expected}, key=lambda item: item.value)
+    for source in sources:
+        ensure_task_transition(source, target)
+    placeholders = ", ".join("?" for _ in sources)
+    return " AND status IN (%s)" % placeholders, [source.value for source in sources]
+
+
+def _encode_task_cursor(*key: Any) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_task_cursor(cursor: str) -> Tuple[Any, ...]:
+    """Decode a list cursor: ``(created_at_ms, task_id)`` or ``(search_rowid,)``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid task cursor")
+    if not isinstance(key, list) or not key or not isinstance(key[0], int):
+        raise ValueError("Invalid task cursor")
+    if len(key) == 2 and isinstance(key[1], str) or len(key) == 1:
+        return tuple(key)
+    raise ValueError("Invalid task cursor")
+
+
+def _fts_phrase(query: str) -> str:
+    return '"%s"' % query.replace('"', '""')
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return "%%%s%%" % escaped
+
+
 def _mask_corp_id(corp_id: str) -> str:
     if len(corp_id) < 3:
         return "***"
@@ -39,23 +128,117 @@ def _deep_merge(base: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
     return merged
 
 
+# Columns returned by task listings; payload, context and snapshot JSON stay in the detail view.
+TASK_SUMMARY_COLUMNS = (
+    "id",
+    "team_id",
+    "flow_template_id",
+    "flow_version_id",
+    "status",
+    "enterprise_name",
+    "corp_id",
+    "source_user_id",
+    "current_step_key",
+    "next_check_at",
+    "check_attempts",
+    "assigned_robot_id",
+    "created_at",
+    "updated_at",
+    "created_at_ms",
+)
+# Read side of tasks: scheduling columns are epoch milliseconds in the table and are
+# rendered back to local-time text for callers and the API, keeping the six fractional
+# digits _now() writes elsewhere. Created per schema so the archive database gets the
+# same projection over its own tasks table.
+TASKS_VIEW_SQL = """
+CREATE VIEW IF NOT EXISTS {schema}.tasks_view AS
+SELECT
+    tasks.*,
+    strftime('%Y-%m-%d %H:%M:%S', next_check_at_ms / 1000.0, 'unixepoch', 'localtime') AS next_check_at,
+    strftime('%Y-%m-%d %H:%M:%S', created_at_ms / 1000, 'unixepoch', 'localtime')
+        || printf('.%06d', created_at_ms % 1000 * 1000) AS created_at,
+    strftime('%Y-%m-%d %H:%M:%S', updated_at_ms / 1000, 'unixepoch', 'localtime')
+        || printf('.%06d', updated_at_ms % 1000 * 1000) AS updated_at
+FROM tasks
+"""
+# Claimable statuses in priority order; True marks statuses that wait for next_check_at.
+RUNNABLE_STATUS_ORDER = (
+    (TaskStatus.PENDING, False),
+    (TaskStatus.READY_TO_ONLINE, False),
+    (TaskStatus.WAITING_WECOM_REVIEW, True),
+    (TaskStatus.JDY_CALLBACK_FAILED, False),
+    (TaskStatus.WAITING_WECOM_ONLINE_DELAY, True),
+)
+# How long a claim stays valid without a robot heartbeat before the reaper requeues it.
+DEFAULT_TASK_LEASE_SECONDS = 120
+# Statuses that park a task until next_check_at, keyed by the status that ends the wait.
+# Leaving a wait for its approval status records how long the wait took.
+WAIT_APPROVAL_STATUSES = {
+    TaskStatus.READY_TO_ONLINE: TaskStatus.WAITING_WECOM_REVIEW,
+    TaskStatus.SUCCESS: TaskStatus.WAITING_WECOM_ONLINE_DELAY,
+}
+# Statuses a waiting task passes through while a robot re-checks it.
+WAIT_RECHECK_STATUSES = (TaskStatus.CHECKING_LOGIN, TaskStatus.RUNNING)
+# Child tables in delete order; archival copies them with the task rows they belong to.
+TASK_CHILD_TABLES = ("task_artifacts", "task_steps", "manual_actions")
+# FTS5 trigram tokens need at least three characters; shorter terms fall back to LIKE.
+TASK_SEARCH_MIN_FTS_LENGTH = 3
+TASK_LIST_MAX_LIMIT = 200
+
+
 @dataclass(frozen=True)
 class TaskCreateResult:
     task_id: str
     created: bool
 
 
+@dataclass(frozen=True)
+class TaskArchiveResult:
+    archived_tasks: int
+    batches: int
+    freed_pages: int
+
+
+@dataclass(frozen=True)
+class TaskRecheckUpdate:
+    task_id: str
+    expected_status: TaskStatus
+    status: TaskStatus
+    next_check_at: Optional[Any] = None
+    step_output: Optional[Dict[str, Any]] = None
+
+
 class SQLiteStore:
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        flow_snapshot_cache_size: int = 128,
+        archive_path: Optional[str] = None,
+    ):
         self.db_path = db_path
+        self.archive_path = archive_path
+        # Snapshots are content-addressed and never change once written, so the
+        # JSON text can be cached without invalidation; each caller parses its own copy.
+        self._flow_snapshot_cache = functools.lru_cache(maxsize=flow_snapshot_cache_size)(
+            self._load_flow_snapshot_json
+        )
 
     def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self.db_path, timeout=30)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys=ON")
+        # Only takes effect while the file is still empty, so it must precede journal_mode.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
         conn.execute("PRAGMA journal_mode=WAL")
         return conn
 
+    def _connect_with_archive(self) -> sqlite3.Connection:
+        if not self.archive_path:
+            raise ValueError("SQLiteStore has no archive_path configured")
+        conn = self._connect()
+        conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+        return conn
+
     def init_schema(self) -> None:
         with self._connect() as conn:
             conn.executescript(
@@ -65,6 +248,8 @@ class SQLiteStore:
                     name TEXT NOT NULL,
                     webhook_url TEXT DEFAULT '',
                     notification_enabled INTEGER NOT NULL DEFAULT 1,
+                    scheduling_weight INTEGER NOT NULL DEFAULT 1,
+                    max_concurrent_tasks INTEGER,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL
                 );
@@ -93,12 +278,18 @@ class SQLiteStore:
                     UNIQUE(flow_template_id, version_no)
                 );
 
+                CREATE TABLE IF NOT EXISTS flow_snapshots (
+                    hash TEXT PRIMARY KEY,
+                    snapshot_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+
                 CREATE TABLE IF NOT EXISTS tasks (
                     id TEXT PRIMARY KEY,
                     team_id TEXT NOT NULL REFERENCES teams(id),
                     flow_template_id TEXT NOT NULL REFERENCES flow_templates(id),
                     flow_version_id TEXT NOT NULL REFERENCES flow_versions(id),
-                    flow_version_snapshot_json TEXT NOT NULL,
+                    flow_snapshot_hash TEXT NOT NULL REFERENCES flow_snapshots(hash),
                     status TEXT NOT NULL,
                     enterprise_name TEXT NOT NULL,
                     corp_id TEXT NOT NULL,
@@ -107,19 +298,17 @@ class SQLiteStore:
                     payload_json TEXT NOT NULL,
                     runtime_context_json TEXT NOT NULL DEFAULT '{}',
                     current_step_key TEXT DEFAULT '',
-                    next_check_at TEXT,
+                    next_check_at_ms INTEGER,
                     check_attempts INTEGER NOT NULL DEFAULT 0,
                     assigned_robot_id TEXT,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
+                    lease_expires_at_ms INTEGER,
+                    claimed_from_status TEXT,
+                    wait_started_at_ms INTEGER,
+                    created_at_ms INTEGER NOT NULL,
+                    updated_at_ms INTEGER NOT NULL,
                     finished_at TEXT
                 );
 
-                CREATE INDEX IF NOT EXISTS idx_platform_tasks_status
-                    ON tasks(status, created_at);
-                CREATE INDEX IF NOT EXISTS idx_platform_tasks_next_check
-                    ON tasks(next_check_at);
-
                 CREATE TABLE IF NOT EXISTS task_steps (
                     id TEXT PRIMARY KEY,
                     task_id TEXT NOT NULL REFERENCES tasks(id),
@@ -171,29 +360,101 @@ class SQLiteStore:
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL
                 );
+
+                CREATE TABLE IF NOT EXISTS task_wait_samples (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    status TEXT NOT NULL,
+                    waited_ms INTEGER NOT NULL,
+                    check_attempts INTEGER NOT NULL,
+                    recorded_at_ms INTEGER NOT NULL
+                );
+
+                -- Idempotency keys of tasks moved to the archive database, so a replayed
+                -- webhook still resolves to its archived task instead of creating a new one.
+                CREATE TABLE IF NOT EXISTS archived_task_keys (
+                    idempotency_key TEXT PRIMARY KEY,
+                    task_id TEXT NOT NULL
+                );
                 """
             )
+            # Column drops below are rejected while a view still references them.
+            conn.execute("DROP VIEW IF EXISTS tasks_view")
             self._ensure_tasks_runtime_context_column(conn)
+            self._ensure_teams_scheduling_columns(conn)
+            self._ensure_tasks_lease_columns(conn)
+            self._migrate_tasks_flow_snapshots(conn)
+            self._migrate_tasks_epoch_columns(conn)
+            conn.executescript(
+                """
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_status_created
+                    ON tasks(status, created_at_ms);
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_due
+                    ON tasks(status, next_check_at_ms);
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_created
+                    ON tasks(created_at_ms, id);
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_team_created
+                    ON tasks(team_id, created_at_ms, id);
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_robot_created
+                    ON tasks(assigned_robot_id, created_at_ms, id);
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_team_status_created
+                    ON tasks(team_id, status, created_at_ms);
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_lease
+                    ON tasks(lease_expires_at_ms) WHERE lease_expires_at_ms IS NOT NULL;
+                CREATE INDEX IF NOT EXISTS idx_platform_tasks_status_updated
+                    ON tasks(status, updated_at_ms);
+                CREATE INDEX IF NOT EXISTS idx_platform_task_steps_task
+                    ON task_steps(task_id);
+                CREATE INDEX IF NOT EXISTS idx_platform_task_artifacts_task
+                    ON task_artifacts(task_id);
+                CREATE INDEX IF NOT EXISTS idx_platform_manual_actions_task
+                    ON manual_actions(task_id);
+                CREATE INDEX IF NOT EXISTS idx_platform_task_wait_samples_status
+                    ON task_wait_samples(status, id);
+                """
+            )
+            conn.execute(TASKS_VIEW_SQL.format(schema="main"))
+            self._ensure_tasks_search_index(conn)
 
     def create_team(
         self,
         name: str,
         webhook_url: str = "",
         notification_enabled: bool = True,
+        scheduling_weight: int = 1,
+        max_concurrent_tasks: Optional[int] = None,
     ) -> str:
+        if scheduling_weight < 1:
+            raise ValueError("scheduling_weight must be positive")
         team_id = str(uuid.uuid4())
         now = _now()
         with self._connect() as conn:
             conn.execute(
                 """
                 INSERT INTO teams
-                    (id, name, webhook_url, notification_enabled, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
+                    (id, name, webhook_url, notification_enabled,
+                     scheduling_weight, max_concurrent_tasks, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (team_id, name, webhook_url, int(notification_enabled), now, now),
+                (
+                    team_id,
+                    name,
+                    webhook_url,
+                    int(notification_enabled),
+                    scheduling_weight,
+                    max_concurrent_tasks,
+                    now,
+                    now,
+                ),
             )
         return team_id
 
+    def get_team(self, team_id: str) -> Dict[str, Any]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM teams WHERE id=?", (team_id,)).fetchone()
+        if row is None:
+            raise KeyError(team_id)
+        return dict(row)
+
     def create_flow_template(self, team_id: str, name: str, description: str) -> str:
         flow_id = str(uuid.uuid4())
         now = _now()
@@ -366,10 +627,17 @@ class SQLiteStore:
     ) -> TaskCreateResult:
         task_id = str(uuid.uuid4())
         now = _now()
+        now_ms = _now_ms()
         with self._connect() as conn:
+            # One statement reads both tables from the same snapshot, so a concurrent
+            # archive batch cannot move the key between the two lookups.
             existing = conn.execute(
-                "SELECT id FROM tasks WHERE idempotency_key=?",
-                (idempotency_key,),
+                """
+                SELECT id FROM tasks WHERE idempotency_key=?
+                UNION ALL
+                SELECT task_id FROM archived_task_keys WHERE idempotency_key=?
+                """,
+                (idempotency_key, idempotency_key),
             ).fetchone()
             if existing is not None:
                 return TaskCreateResult(task_id=existing["id"], created=False)
@@ -393,13 +661,14 @@ class SQLiteStore:
                 "published_at": version["published_at"],
                 "steps": json.loads(version["steps_json"]),
             }
+            snapshot_hash = self._store_flow_snapshot(conn, _canonical_snapshot_json(snapshot), now)
             conn.execute(
                 """
                 INSERT INTO tasks
                     (id, team_id, flow_template_id, flow_version_id,
-                     flow_version_snapshot_json, status, enterprise_name, corp_id,
+                     flow_snapshot_hash, status, enterprise_name, corp_id,
                      source_user_id, idempotency_key, payload_json,
-                     created_at, updated_at)
+                     created_at_ms, updated_at_ms)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
@@ -407,32 +676,150 @@ class SQLiteStore:
                     team_id,
                     flow_template_id,
                     version["id"],
-                    json.dumps(snapshot, ensure_ascii=False),
+                    snapshot_hash,
                     TaskStatus.PENDING.value,
                     enterprise_name,
                     corp_id,
                     source_user_id,
                     idempotency_key,
                     json.dumps(payload, ensure_ascii=False),
-                    now,
-                    now,
+                    now_ms,
+                    now_ms,
                 ),
             )
         return TaskCreateResult(task_id=task_id, created=True)
 
     def get_task(self, task_id: str) -> Dict[str, Any]:
         with self._connect() as conn:
-            row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
+            row = conn.execute("SELECT * FROM tasks_view WHERE id=?", (task_id,)).fetchone()
         if row is None:
             raise KeyError(task_id)
         return dict(row)
 
+    def list_tasks(
+        self,
+        status: Optional[Union[TaskStatus, str]] = None,
+        team_id: Optional[str] = None,
+        assigned_robot_id: Optional[str] = None,
+        created_from: Optional[Any] = None,
+        created_to: Optional[Any] = None,
+        query: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List task summaries newest first with keyset pagination.
+
+        ``cursor`` is the opaque ``next_cursor`` of the previous page and is only valid
+        with the same filters. ``query`` searches enterprise name and CorpID as a
+        substring. ``created_to`` is exclusive.
+        """
+        if limit < 1 or limit > TASK_LIST_MAX_LIMIT:
+            raise ValueError("limit must be between 1 and %s" % TASK_LIST_MAX_LIMIT)
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status is not None:
+            clauses.append("t.status=?")
+            params.append(TaskStatus(status).value)
+        if team_id is not None:
+            clauses.append("t.team_id=?")
+            params.append(team_id)
+        if assigned_robot_id is not None:
+            clauses.append("t.assigned_robot_id=?")
+            params.append(assigned_robot_id)
+        if created_from is not None:
+            clauses.append("t.created_at_ms>=?")
+            params.append(_to_epoch_ms(created_from))
+        if created_to is not None:
+            clauses.append("t.created_at_ms<?")
+            params.append(_to_epoch_ms(created_to))
+        cursor_key = _decode_task_cursor(cursor) if cursor else None
+        query_text = (query or "").strip()
+        columns = ", ".join("t.%s" % column for column in TASK_SUMMARY_COLUMNS)
+        with self._connect() as conn:
+            use_fts = len(query_text) >= TASK_SEARCH_MIN_FTS_LENGTH and self._has_task_search_index(conn)
+            if use_fts:
+                # Walk the FTS index newest entry first so broad terms stop after one page
+                # instead of materialising every match; its rowid is the task's, in insert order.
+                clauses.insert(0, "tasks_fts MATCH ?")
+                params.insert(0, _fts_phrase(query_text))
+                if cursor_key is not None:
+                    clauses.append("f.rowid<?")
+                    params.append(cursor_key[0])
+                sql = """
+                    SELECT %s, f.rowid AS page_key FROM tasks_fts f
+                    JOIN tasks_view t ON t.id=f.task_id
+                    WHERE %s
+                    ORDER BY f.rowid DESC
+                    LIMIT ?
+                """ % (columns, " AND ".join(clauses))
+            else:
+                if query_text:
+                    pattern = _like_pattern(query_text)
+                    clauses.append("(t.enterprise_name LIKE ? ESCAPE '\\' OR t.corp_id LIKE ? ESCAPE '\\')")
+                    params.extend([pattern, pattern])
+                if cursor_key is not None:
+                    clauses.append("(t.created_at_ms<? OR (t.created_at_ms=? AND t.id<?))")
+                    params.extend([cursor_key[0], cursor_key[0], cursor_key[-1]])
+                sql = """
+                    SELECT %s FROM tasks_view t
+                    %s
+                    ORDER BY t.created_at_ms DESC, t.id DESC
+                    LIMIT ?
+                """ % (columns, "WHERE " + " AND ".join(clauses) if clauses else "")
+            rows = conn.execute(sql, (*params, limit + 1)).fetchall()
+        items = [self._task_summary(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            if use_fts:
+                next_cursor = _encode_task_cursor(last["page_key"])
+            else:
+                next_cursor = _encode_task_cursor(last["created_at_ms"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _has_task_search_index(conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='tasks_fts'").fetchone()
+        return row is not None
+
+    @staticmethod
+    def _task_summary(row: sqlite3.Row) -> Dict[str, Any]:
+        summary = {column: row[column] for column in TASK_SUMMARY_COLUMNS if column != "created_at_ms"}
+        summary["corp_id_masked"] = _mask_corp_id(summary.pop("corp_id"))
+        return summary
+
+    def get_flow_snapshot(self, snapshot_hash: str) -> Dict[str, Any]:
+        """Return the parsed flow snapshot, a fresh dict the caller may modify."""
+        return json.loads(self._flow_snapshot_cache(snapshot_hash))
+
+    def _load_flow_snapshot_json(self, snapshot_hash: str) -> str:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT snapshot_json FROM flow_snapshots WHERE hash=?",
+                (snapshot_hash,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(snapshot_hash)
+        return row["snapshot_json"]
+
+    @staticmethod
+    def _store_flow_snapshot(conn: sqlite3.Connection, snapshot_json: str, now: str) -> str:
+        snapshot_hash = _snapshot_hash(snapshot_json)
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO flow_snapshots (hash, snapshot_json, created_at)
+            VALUES (?, ?, ?)
+            """,
+            (snapshot_hash, snapshot_json, now),
+        )
+        return snapshot_hash
+
     def get_task_context(self, task_id: str) -> Dict[str, Any]:
         task = self.get_task(task_id)
         return json.loads(task.get("runtime_context_json") or "{}")
 
     def merge_task_context(self, task_id: str, patch: Dict[str, Any]) -> Dict[str, Any]:
-        now = _now()
+        now_ms = _now_ms()
         with self._connect() as conn:
             row = conn.execute(
                 "SELECT runtime_context_json FROM tasks WHERE id=?",
@@ -445,23 +832,23 @@ class SQLiteStore:
             conn.execute(
                 """
                 UPDATE tasks
-                SET runtime_context_json=?, updated_at=?
+                SET runtime_context_json=?, updated_at_ms=?
                 WHERE id=?
                 """,
-                (json.dumps(merged, ensure_ascii=False), now, task_id),
+                (json.dumps(merged, ensure_ascii=False), now_ms, task_id),
             )
         return merged
 
     def set_task_current_step(self, task_id: str, step_key: str) -> None:
-        now = _now()
+        now_ms = _now_ms()
         with self._connect() as conn:
             cur = conn.execute(
                 """
                 UPDATE tasks
-                SET current_step_key=?, updated_at=?
+                SET current_step_key=?, updated_at_ms=?
                 WHERE id=?
                 """,
-                (step_key, now, task_id),
+                (step_key, now_ms, task_id),
             )
             if cur.rowcount == 0:
                 raise KeyError(task_id)
@@ -473,34 +860,135 @@ class SQLiteStore:
         next_check_at: Optional[Any] = None,
         check_attempts: Optional[int] = None,
         assigned_robot_id: Optional[str] = None,
-    ) -> None:
-        now = _now()
+        expected: Optional[Union[TaskStatus, str, Iterable[Union[TaskStatus, str]]]] = None,
+        claimed_by: Optional[str] = None,
+    ) -> bool:
+        """Write a task status and return whether the row was updated.
+
+        Without ``expected`` the status is overwritten unconditionally, which is what
+        operator actions want. With ``expected`` the write is a compare-and-swap: the
+        UPDATE only matches while the task is still in one of the expected statuses,
+        each of which must be an allowed predecessor of ``status``. A runner that lost
+        a race to another robot or an operator gets ``False`` without re-reading.
+
+        Runners also pass their robot as ``claimed_by``: the write then fails while the
+        task is assigned to a different robot. The status alone cannot tell a runner
+        whose lease was reaped that another robot has since claimed the task again.
+
+        Entering a waiting status stamps ``wait_started_at_ms`` once; the stamp survives
+        re-checks and is cleared when the task moves on. Leaving a wait for its approval
+        status records the wait duration in ``task_wait_samples``.
+        """
+        target = TaskStatus(status)
+        guard_sql, guard_params = ("", []) if expected is None else _status_guard(target, expected)
+        if claimed_by is not None:
+            guard_sql += " AND (assigned_robot_id IS NULL OR assigned_robot_id=?)"
+            guard_params = [*guard_params, claimed_by]
+        now_ms = _now_ms()
+        if target in WAIT_APPROVAL_STATUSES.values():
+            wait_sql, wait_params = "COALESCE(wait_started_at_ms, ?)", [now_ms]
+        elif target in WAIT_RECHECK_STATUSES:
+            wait_sql, wait_params = "wait_started_at_ms", []
+        else:
+            wait_sql, wait_params = "NULL", []
         with self._connect() as conn:
-            conn.execute(
+            waited_for = WAIT_APPROVAL_STATUSES.get(target)
+            if waited_for is not None:
+                self._record_wait_sample(conn, task_id, waited_for, now_ms, guard_sql, guard_params)
+            cur = conn.execute(
                 """
                 UPDATE tasks
                 SET status=?,
-                    next_check_at=?,
+                    next_check_at_ms=?,
                     check_attempts=COALESCE(?, check_attempts),
                     assigned_robot_id=?,
-                    updated_at=?
-                WHERE id=?
-                """,
+                    lease_expires_at_ms=CASE WHEN ? IS NULL THEN NULL ELSE lease_expires_at_ms END,
+                    wait_started_at_ms=%s,
+                    updated_at_ms=?
+                WHERE id=?%s
+                """ % (wait_sql, guard_sql),
                 (
-                    TaskStatus(status).value,
-                    _format_datetime(next_check_at),
+                    target.value,
+                    _to_epoch_ms(next_check_at),
                     check_attempts,
                     assigned_robot_id,
-                    now,
+                    assigned_robot_id,
+                    *wait_params,
+                    now_ms,
                     task_id,
+                    *guard_params,
                 ),
             )
+        return cur.rowcount == 1
+
+    @staticmethod
+    def _record_wait_sample(
+        conn: sqlite3.Connection,
+        task_id: str,
+        waited_for: TaskStatus,
+        now_ms: int,
+        guard_sql: str,
+        guard_params: Sequence[Any],
+    ) -> None:
+        # Runs before the status UPDATE in the same transaction, under the same guard.
+        conn.execute(
+            """
+            INSERT INTO task_wait_samples (status, waited_ms, check_attempts, recorded_at_ms)
+            SELECT ?, ? - wait_started_at_ms, check_attempts, ?
+            FROM tasks
+            WHERE id=?
+              AND wait_started_at_ms IS NOT NULL
+              AND CASE WHEN status=? THEN status ELSE claimed_from_status END=?%s
+            """ % guard_sql,
+            (
+                waited_for.value,
+                now_ms,
+                now_ms,
+                task_id,
+                waited_for.value,
+                waited_for.value,
+                *guard_params,
+            ),
+        )
+
+    def get_wait_duration_quantile(
+        self,
+        status: TaskStatus,
+        quantile: float = 0.5,
+        sample_size: int = 200,
+        min_samples: int = 5,
+    ) -> Optional[float]:
+        """Return the given quantile of recent wait durations in seconds, if enough were recorded."""
+        if not 0 <= quantile <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT waited_ms
+                FROM task_wait_samples
+                WHERE status=?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (TaskStatus(status).value, sample_size),
+            ).fetchall()
+        if len(rows) < max(min_samples, 1):
+            return None
+        ordered = sorted(row["waited_ms"] for row in rows)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)] / 1000.0
 
     def get_task_detail(self, task_id: str) -> Dict[str, Any]:
-        task = self.get_task(task_id)
+        """Return the admin view of a task, falling back to the archive database."""
+        try:
+            task = self.get_task(task_id)
+        except KeyError:
+            if not self.archive_path:
+                raise
+            return self._get_archived_task_detail(task_id)
         detail = dict(task)
+        detail["archived"] = False
         detail["corp_id_masked"] = _mask_corp_id(task["corp_id"])
-        detail["flow_version_snapshot"] = json.loads(task["flow_version_snapshot_json"])
+        detail["flow_version_snapshot"] = self.get_flow_snapshot(task["flow_snapshot_hash"])
         detail["payload"] = json.loads(task["payload_json"])
         detail["runtime_context"] = redact_context(json.loads(task.get("runtime_context_json") or "{}"))
         detail["steps"] = self.list_task_steps(task_id)
@@ -510,6 +998,182 @@ class SQLiteStore:
         detail["robot"] = self.get_robot(robot_id) if robot_id else None
         return detail
 
+    def _get_archived_task_detail(self, task_id: str) -> Dict[str, Any]:
+        if not Path(self.archive_path).exists():
+            raise KeyError(task_id)
+        conn = self._connect_with_archive()
+        try:
+            has_archive = conn.execute(
+                "SELECT 1 FROM archive.sqlite_master WHERE type='view' AND name='tasks_view'"
+            ).fetchone()
+            row = None
+            if has_archive is not None:
+                row = conn.execute("SELECT * FROM archive.tasks_view WHERE id=?", (task_id,)).fetchone()
+            if row is None:
+                raise KeyError(task_id)
+            steps = conn.execute(
+                "SELECT * FROM archive.task_steps WHERE task_id=? ORDER BY started_at ASC, id ASC",
+                (task_id,),
+            ).fetchall()
+            artifacts = conn.execute(
+                "SELECT * FROM archive.task_artifacts WHERE task_id=? ORDER BY created_at ASC, id ASC",
+                (task_id,),
+            ).fetchall()
+            manual_actions = conn.execute(
+                "SELECT * FROM archive.manual_actions WHERE task_id=? ORDER BY created_at ASC, id ASC",
+                (task_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+        task = dict(row)
+        detail = dict(task)
+        detail["archived"] = True
+        detail["corp_id_masked"] = _mask_corp_id(task["corp_id"])
+        detail["flow_version_snapshot"] = self.get_flow_snapshot(task["flow_snapshot_hash"])
+        detail["payload"] = json.loads(task["payload_json"])
+        detail["runtime_context"] = redact_context(json.loads(task.get("runtime_context_json") or "{}"))
+        detail["steps"] = [dict(step) for step in steps]
+        detail["artifacts"] = [dict(artifact) for artifact in artifacts]
+        detail["manual_actions"] = [dict(action) for action in manual_actions]
+        detail["robot"] = None
+        return detail
+
+    def archive_terminal_tasks(
+        self,
+        older_than_days: int,
+        batch_size: int = 200,
+        now: Optional[Any] = None,
+        vacuum_pages: Optional[int] = None,
+    ) -> TaskArchiveResult:
+        """Move terminal tasks not updated for ``older_than_days`` into the archive database.
+
+        Each batch copies tasks with their steps, artifacts and manual actions and deletes
+        them from the live tables in one short IMMEDIATE transaction, so claims wait for at
+        most one batch. Archived idempotency keys stay in the live ``archived_task_keys``
+        table so task creation keeps deduplicating against them. Pages freed on the main
+        file are then released with incremental vacuum (``vacuum_pages`` caps the work;
+        ``None`` releases all of them).
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        cutoff_ms = _to_epoch_ms(now or datetime.now()) - older_than_days * 24 * 60 * 60 * 1000
+        statuses = sorted(status.value for status in TERMINAL_STATUSES)
+        archived = 0
+        batches = 0
+        conn = self._connect_with_archive()
+        try:
+            self._ensure_archive_schema(conn)
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                task_ids = [
+                    row["id"]
+                    for row in conn.execute(
+                        """
+                        SELECT id FROM main.tasks
+                        WHERE status IN (%s) AND updated_at_ms<?
+                        LIMIT ?
+                        """ % ", ".join("?" for _ in statuses),
+                        (*statuses, cutoff_ms, batch_size),
+                    ).fetchall()
+                ]
+                if not task_ids:
+                    conn.rollback()
+                    break
+                self._move_tasks_to_archive(conn, task_ids)
+                conn.commit()
+                archived += len(task_ids)
+                batches += 1
+            freed_pages = self._incremental_vacuum(conn, vacuum_pages)
+        finally:
+            conn.close()
+        return TaskArchiveResult(archived_tasks=archived, batches=batches, freed_pages=freed_pages)
+
+    def vacuum(self) -> None:
+        """Rebuild the main database file with a full VACUUM.
+
+        Databases created before incremental auto-vacuum was enabled only switch over
+        after one full VACUUM. It holds an exclusive lock for the whole rebuild, so run it
+        in a maintenance window rather than from the regular retention job.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("VACUUM")
+            if self._has_task_search_index(conn):
+                # VACUUM may renumber task rowids, which key the search index.
+                self._rebuild_tasks_search_index(conn)
+                conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _ensure_archive_schema(conn: sqlite3.Connection) -> None:
+        for table in ("tasks",) + TASK_CHILD_TABLES:
+            # CREATE TABLE AS copies column names without constraints; columns added to the
+            # live table later are appended so archived rows keep the full shape.
+            conn.execute("CREATE TABLE IF NOT EXISTS archive.%s AS SELECT * FROM main.%s WHERE 0" % (table, table))
+            archive_columns = {
+                row["name"] for row in conn.execute("PRAGMA archive.table_info(%s)" % table).fetchall()
+            }
+            for row in conn.execute("PRAGMA main.table_info(%s)" % table).fetchall():
+                if row["name"] not in archive_columns:
+                    conn.execute("ALTER TABLE archive.%s ADD COLUMN %s" % (table, row["name"]))
+        conn.executescript(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_tasks_id ON tasks(id);
+            CREATE INDEX IF NOT EXISTS archive.idx_archive_task_steps_task ON task_steps(task_id);
+            CREATE INDEX IF NOT EXISTS archive.idx_archive_task_artifacts_task ON task_artifacts(task_id);
+            CREATE INDEX IF NOT EXISTS archive.idx_archive_manual_actions_task ON manual_actions(task_id);
+            """
+        )
+        if conn.execute("SELECT 1 FROM main.archived_task_keys LIMIT 1").fetchone() is None:
+            # Archives written before the key table existed: backfill their keys once.
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO main.archived_task_keys (idempotency_key, task_id)
+                SELECT idempotency_key, id FROM archive.tasks
+                """
+            )
+            conn.commit()
+        # Recreated so archives attached by an older build pick up the current projection.
+        conn.execute("DROP VIEW IF EXISTS archive.tasks_view")
+        conn.execute(TASKS_VIEW_SQL.format(schema="archive"))
+
+    @staticmethod
+    def _move_tasks_to_archive(conn: sqlite3.Connection, task_ids: List[str]) -> None:
+        placeholders = ", ".join("?" for _ in task_ids)
+        for table, key in [("tasks", "id")] + [(table, "task_id") for table in TASK_CHILD_TABLES]:
+            columns = ", ".join(
+                row["name"] for row in conn.execute("PRAGMA main.table_info(%s)" % table).fetchall()
+            )
+            conn.execute(
+                "INSERT INTO archive.%s (%s) SELECT %s FROM main.%s WHERE %s IN (%s)"
+                % (table, columns, columns, table, key, placeholders),
+                task_ids,
+            )
+        conn.execute(
+            "INSERT OR IGNORE INTO main.archived_task_keys (idempotency_key, task_id) "
+            "SELECT idempotency_key, id FROM main.tasks WHERE id IN (%s)" % placeholders,
+            task_ids,
+        )
+        for table in TASK_CHILD_TABLES:
+            conn.execute("DELETE FROM main.%s WHERE task_id IN (%s)" % (table, placeholders), task_ids)
+        if conn.execute("SELECT 1 FROM main.sqlite_master WHERE name='tasks_fts'").fetchone() is not None:
+            rowids = conn.execute(
+                "SELECT rowid FROM main.tasks WHERE id IN (%s)" % placeholders, task_ids
+            ).fetchall()
+            conn.executemany("DELETE FROM main.tasks_fts WHERE rowid=?", [(row[0],) for row in rowids])
+        conn.execute("DELETE FROM main.tasks WHERE id IN (%s)" % placeholders, task_ids)
+
+    @staticmethod
+    def _incremental_vacuum(conn: sqlite3.Connection, max_pages: Optional[int]) -> int:
+        before = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+        if max_pages is None:
+            conn.execute("PRAGMA main.incremental_vacuum").fetchall()
+        else:
+            conn.execute("PRAGMA main.incremental_vacuum(%d)" % max_pages).fetchall()
+        after = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+        return before - after
+
     @staticmethod
     def _ensure_tasks_runtime_context_column(conn: sqlite3.Connection) -> None:
         columns = {
@@ -519,6 +1183,165 @@ class SQLiteStore:
         if "runtime_context_json" not in columns:
             conn.execute("ALTER TABLE tasks ADD COLUMN runtime_context_json TEXT NOT NULL DEFAULT '{}'")
 
+    @staticmethod
+    def _ensure_teams_scheduling_columns(conn: sqlite3.Connection) -> None:
+        columns = {
+            row["name"]
+            for row in conn.execute("PRAGMA table_info(teams)").fetchall()
+        }
+        if "scheduling_weight" not in columns:
+            conn.execute("ALTER TABLE teams ADD COLUMN scheduling_weight INTEGER NOT NULL DEFAULT 1")
+        if "max_concurrent_tasks" not in columns:
+            conn.execute("ALTER TABLE teams ADD COLUMN max_concurrent_tasks INTEGER")
+
+    @staticmethod
+    def _ensure_tasks_lease_columns(conn: sqlite3.Connection) -> None:
+        columns = {
+            row["name"]
+            for row in conn.execute("PRAGMA table_info(tasks)").fetchall()
+        }
+        if "lease_expires_at_ms" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN lease_expires_at_ms INTEGER")
+        if "claimed_from_status" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN claimed_from_status TEXT")
+        if "wait_started_at_ms" not in columns:
+            conn.execute("ALTER TABLE tasks ADD COLUMN wait_started_at_ms INTEGER")
+
+    @classmethod
+    def _migrate_tasks_flow_snapshots(cls, conn: sqlite3.Connection) -> None:
+        """Move legacy per-task snapshot copies into the content-addressed flow_snapshots table."""
+        columns = {
+            row["name"]
+            for row in conn.execute("PRAGMA table_info(tasks)").fetchall()
+        }
+        if "flow_version_snapshot_json" not in columns:
+            return
+        with _schema_transaction(conn):
+            if "flow_snapshot_hash" not in columns:
+                conn.execute("ALTER TABLE tasks ADD COLUMN flow_snapshot_hash TEXT REFERENCES flow_snapshots(hash)")
+            now = _now()
+            legacy_rows = conn.execute(
+                """
+                SELECT DISTINCT flow_version_snapshot_json FROM tasks
+                WHERE flow_snapshot_hash IS NULL
+                """
+            ).fetchall()
+            for row in legacy_rows:
+                legacy_json = row["flow_version_snapshot_json"]
+                snapshot_hash = cls._store_flow_snapshot(
+                    conn,
+                    _canonical_snapshot_json(json.loads(legacy_json)),
+                    now,
+                )
+                conn.execute(
+                    """
+                    UPDATE tasks
+                    SET flow_snapshot_hash=?
+                    WHERE flow_snapshot_hash IS NULL AND flow_version_snapshot_json=?
+                    """,
+                    (snapshot_hash, legacy_json),
+                )
+            conn.execute("ALTER TABLE tasks DROP COLUMN flow_version_snapshot_json")
+
+    @staticmethod
+    def _migrate_tasks_epoch_columns(conn: sqlite3.Connection) -> None:
+        """Convert legacy text scheduling timestamps on tasks to epoch-millisecond integers.
+
+        The conversion runs as a single UPDATE inside SQLite and the text columns are
+        dropped afterwards, so no table rebuild or row round-trip through Python is
+        needed. Unparseable legacy values fall back to the migration time.
+        """
+        columns = {
+            row["name"]
+            for row in conn.execute("PRAGMA table_info(tasks)").fetchall()
+        }
+        if "created_at_ms" in columns:
+            return
+        with _schema_transaction(conn):
+            conn.execute("DROP INDEX IF EXISTS idx_platform_tasks_status")
+            conn.execute("DROP INDEX IF EXISTS idx_platform_tasks_next_check")
+            conn.execute("ALTER TABLE tasks ADD COLUMN next_check_at_ms INTEGER")
+            conn.execute("ALTER TABLE tasks ADD COLUMN created_at_ms INTEGER NOT NULL DEFAULT 0")
+            conn.execute("ALTER TABLE tasks ADD COLUMN updated_at_ms INTEGER NOT NULL DEFAULT 0")
+            # julianday(..., 'utc') reads the text as local time, matching _to_epoch_ms.
+            conn.execute(
+                """
+                UPDATE tasks
+                SET next_check_at_ms=CAST(ROUND((julianday(next_check_at, 'utc') - 2440587.5) * 86400000) AS INTEGER),
+                    created_at_ms=COALESCE(
+                        CAST(ROUND((julianday(created_at, 'utc') - 2440587.5) * 86400000) AS INTEGER), ?
+                    ),
+                    updated_at_ms=COALESCE(
+                        CAST(ROUND((julianday(updated_at, 'utc') - 2440587.5) * 86400000) AS INTEGER), ?
+                    )
+                """,
+                (_now_ms(), _now_ms()),
+            )
+            for column in ("next_check_at", "created_at", "updated_at"):
+                conn.execute("ALTER TABLE tasks DROP COLUMN %s" % column)
+
+    @staticmethod
+    def _ensure_tasks_search_index(conn: sqlite3.Connection) -> None:
+        """Create the trigram FTS5 index over enterprise name and CorpID, if FTS5 is built in.
+
+        Each index row shares the rowid of its task, so the update trigger and archiving
+        delete it by rowid instead of scanning the UNINDEXED task_id column. The index
+        keeps its own copy of the text rather than external content on tasks, and
+        vacuum() rebuilds it because VACUUM may renumber rowids of a table without an
+        INTEGER PRIMARY KEY. Indexes built by older releases, keyed by insert order,
+        are re-keyed here.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tasks_fts'"
+        ).fetchone()
+        if exists is None:
+            try:
+                conn.execute(
+                    """
+                    CREATE VIRTUAL TABLE tasks_fts USING fts5(
+                        task_id UNINDEXED,
+                        enterprise_name,
+                        corp_id,
+                        tokenize='trigram'
+                    )
+                    """
+                )
+            except sqlite3.OperationalError:
+                # Without FTS5 (or the trigram tokenizer) list_tasks falls back to LIKE.
+                return
+        else:
+            trigger = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type='trigger' AND name='tasks_fts_after_update'"
+            ).fetchone()
+            if trigger is not None and "old.rowid" in trigger["sql"]:
+                return
+            conn.execute("DROP TRIGGER IF EXISTS tasks_fts_after_insert")
+            conn.execute("DROP TRIGGER IF EXISTS tasks_fts_after_update")
+        SQLiteStore._rebuild_tasks_search_index(conn)
+        conn.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_after_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts (rowid, task_id, enterprise_name, corp_id)
+                VALUES (new.rowid, new.id, new.enterprise_name, new.corp_id);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_after_update AFTER UPDATE OF enterprise_name, corp_id ON tasks
+            BEGIN
+                DELETE FROM tasks_fts WHERE rowid=old.rowid;
+                INSERT INTO tasks_fts (rowid, task_id, enterprise_name, corp_id)
+                VALUES (new.rowid, new.id, new.enterprise_name, new.corp_id);
+            END;
+            """
+        )
+
+    @staticmethod
+    def _rebuild_tasks_search_index(conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM tasks_fts")
+        conn.execute(
+            "INSERT INTO tasks_fts (rowid, task_id, enterprise_name, corp_id) "
+            "SELECT rowid, id, enterprise_name, corp_id FROM tasks"
+        )
+
     def create_task_artifact(
         self,
         task_id: str,
@@ -618,17 +1441,19 @@ class SQLiteStore:
         task = self.get_task(task_id)
         current = TaskStatus(task["status"])
         target = self._resume_target_status(current)
-        ensure_task_transition(current, target)
+        guard_sql, guard_params = _status_guard(target, current)
         now = _now()
         with self._connect() as conn:
-            conn.execute(
+            cur = conn.execute(
                 """
                 UPDATE tasks
-                SET status=?, assigned_robot_id=NULL, updated_at=?
-                WHERE id=?
-                """,
-                (target.value, now, task_id),
+                SET status=?, assigned_robot_id=NULL, lease_expires_at_ms=NULL, updated_at_ms=?
+                WHERE id=?%s
+                """ % guard_sql,
+                (target.value, _now_ms(), task_id, *guard_params),
             )
+            if cur.rowcount == 0:
+                raise ValueError("Task status changed concurrently: %s" % current.value)
             conn.execute(
                 """
                 UPDATE manual_actions
@@ -704,11 +1529,134 @@ class SQLiteStore:
             raise KeyError(robot_id)
         return dict(row)
 
+    def list_robots(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            if status is None:
+                rows = conn.execute("SELECT * FROM robots ORDER BY created_at ASC, id ASC").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM robots WHERE status=? ORDER BY created_at ASC, id ASC",
+                    (status,),
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_next_due_check_ms(self) -> Optional[int]:
+        """Return the earliest next_check_at_ms among tasks waiting for a timed re-check."""
+        with self._connect() as conn:
+            # One MIN per status so each is answered from the (status, next_check_at_ms) index.
+            row = conn.execute(
+                """
+                SELECT MIN(due_ms) AS due_ms FROM (
+                    SELECT MIN(next_check_at_ms) AS due_ms FROM tasks WHERE status=?
+                    UNION ALL
+                    SELECT MIN(next_check_at_ms) AS due_ms FROM tasks WHERE status=?
+                )
+                """,
+                (TaskStatus.WAITING_WECOM_REVIEW.value, TaskStatus.WAITING_WECOM_ONLINE_DELAY.value),
+            ).fetchone()
+        return row["due_ms"]
+
+    def list_due_waiting_tasks(
+        self,
+        statuses: Sequence[TaskStatus] = (TaskStatus.WAITING_WECOM_REVIEW, TaskStatus.WAITING_WECOM_ONLINE_DELAY),
+        now: Optional[Any] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Return unclaimed tasks in ``statuses`` whose next_check_at has passed, oldest due first."""
+        now_ms = _to_epoch_ms(_format_datetime(now) or _now())
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM tasks_view
+                WHERE status IN (%s)
+                  AND next_check_at_ms IS NOT NULL
+                  AND next_check_at_ms<=?
+                  AND assigned_robot_id IS NULL
+                ORDER BY next_check_at_ms ASC
+                LIMIT ?
+                """ % ", ".join("?" for _ in statuses),
+                (*[TaskStatus(status).value for status in statuses], now_ms, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def apply_task_rechecks(self, updates: Sequence[TaskRecheckUpdate], now: Optional[Any] = None) -> List[str]:
+        """Apply the outcome of out-of-band re-checks in one transaction; return the updated task ids.
+
+        An update that keeps the waiting status counts as a check attempt and moves
+        next_check_at. One that changes status is validated like any transition and
+        records the wait sample. Tasks claimed or moved since they were read are skipped.
+        """
+        for update in updates:
+            if update.status != update.expected_status:
+                ensure_task_transition(update.expected_status, update.status)
+        now_text = _format_datetime(now) or _now()
+        now_ms = _to_epoch_ms(now_text)
+        applied = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for update in updates:
+                expected = TaskStatus(update.expected_status)
+                target = TaskStatus(update.status)
+                guard_sql = " AND status=? AND assigned_robot_id IS NULL"
+                guard_params = [expected.value]
+                if target == expected:
+                    cur = conn.execute(
+                        """
+                        UPDATE tasks
+                        SET next_check_at_ms=?, check_attempts=check_attempts + 1, updated_at_ms=?
+                        WHERE id=?%s
+                        """ % guard_sql,
+                        (_to_epoch_ms(update.next_check_at), now_ms, update.task_id, *guard_params),
+                    )
+                else:
+                    waited_for = WAIT_APPROVAL_STATUSES.get(target)
+                    if waited_for is not None:
+                        self._record_wait_sample(conn, update.task_id, waited_for, now_ms, guard_sql, guard_params)
+                    cur = conn.execute(
+                        """
+                        UPDATE tasks
+                        SET status=?,
+                            next_check_at_ms=?,
+                            wait_started_at_ms=CASE WHEN ? THEN wait_started_at_ms ELSE NULL END,
+                            updated_at_ms=?
+                        WHERE id=?%s
+                        """ % guard_sql,
+                        (
+                            target.value,
+                            _to_epoch_ms(update.next_check_at),
+                            target in WAIT_APPROVAL_STATUSES.values(),
+                            now_ms,
+                            update.task_id,
+                            *guard_params,
+                        ),
+                    )
+                if cur.rowcount != 1:
+                    continue
+                applied.append(update.task_id)
+                if update.step_output is not None:
+                    conn.execute(
+                        """
+                        INSERT INTO task_steps
+                            (id, task_id, step_key, step_name, status, attempt,
+                             started_at, finished_at, input_json, output_json)
+                        VALUES (?, ?, 'wecom_batch_check', '批量检查企微上线单状态', 'success', 1, ?, ?, '{}', ?)
+                        """,
+                        (
+                            str(uuid.uuid4()),
+                            update.task_id,
+                            now_text,
+                            now_text,
+                            json.dumps(update.step_output, ensure_ascii=False),
+                        ),
+                    )
+        return applied
+
     def get_robot_capabilities(self, robot_id: str) -> Dict[str, Any]:
         robot = self.get_robot(robot_id)
         return json.loads(robot["capabilities_json"])
 
     def update_robot_status(self, robot_id: str, status: str) -> None:
+        """Record a robot status report; a busy report also counts as a lease heartbeat."""
         now = _now()
         with self._connect() as conn:
             conn.execute(
@@ -719,84 +1667,236 @@ class SQLiteStore:
                 """,
                 (status, now, now, robot_id),
             )
+            if status == "busy":
+                self._extend_leases(conn, robot_id, _to_epoch_ms(now), DEFAULT_TASK_LEASE_SECONDS)
 
-    def claim_next_runnable_task(self, robot_id: str, now: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+    def heartbeat_robot(
+        self,
+        robot_id: str,
+        lease_seconds: float = DEFAULT_TASK_LEASE_SECONDS,
+        now: Optional[Any] = None,
+    ) -> int:
+        """Refresh last_heartbeat_at and extend the leases of the robot's claimed tasks.
+
+        Returns how many leases were extended; 0 means the robot no longer holds a claim,
+        for example because the reaper already requeued it.
+        """
         now_text = _format_datetime(now) or _now()
         with self._connect() as conn:
-            conn.execute("BEGIN IMMEDIATE")
-            robot = conn.execute("SELECT * FROM robots WHERE id=?", (robot_id,)).fetchone()
-            if robot is None:
+            cur = conn.execute(
+                "UPDATE robots SET last_heartbeat_at=?, updated_at=? WHERE id=?",
+                (now_text, now_text, robot_id),
+            )
+            if cur.rowcount == 0:
                 raise KeyError(robot_id)
-            if robot["status"] != "idle":
-                return None
-
-            task = conn.execute(
-                """
-                SELECT * FROM tasks
-                WHERE
-                    status='pending'
-                    OR status='ready_to_online'
-                    OR status='jdy_callback_failed'
-                    OR (
-                        status='waiting_wecom_review'
-                        AND next_check_at IS NOT NULL
-                        AND next_check_at != ''
-                        AND next_check_at <= ?
-                    )
-                    OR (
-                        status='waiting_wecom_online_delay'
-                        AND next_check_at IS NOT NULL
-                        AND next_check_at != ''
-                        AND next_check_at <= ?
-                    )
-                ORDER BY
-                    CASE status
-                        WHEN 'pending' THEN 1
-                        WHEN 'ready_to_online' THEN 2
-                        WHEN 'waiting_wecom_review' THEN 3
-                        WHEN 'jdy_callback_failed' THEN 4
-                        WHEN 'waiting_wecom_online_delay' THEN 5
-                        ELSE 9
-                    END,
-                    created_at ASC
-                LIMIT 1
-                """,
-                (now_text, now_text),
-            ).fetchone()
-            if task is None:
-                return None
+            return self._extend_leases(conn, robot_id, _to_epoch_ms(now_text), lease_seconds)
 
-            increment_attempts = 1 if task["status"] in {
-                TaskStatus.WAITING_WECOM_REVIEW.value,
-                TaskStatus.WAITING_WECOM_ONLINE_DELAY.value,
-            } else 0
-            conn.execute(
+    @staticmethod
+    def _extend_leases(conn: sqlite3.Connection, robot_id: str, now_ms: int, lease_seconds: float) -> int:
+        cur = conn.execute(
+            """
+            UPDATE tasks
+            SET lease_expires_at_ms=?
+            WHERE assigned_robot_id=? AND lease_expires_at_ms IS NOT NULL
+            """,
+            (now_ms + int(lease_seconds * 1000), robot_id),
+        )
+        return cur.rowcount
+
+    def reap_expired_leases(self, now: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Requeue claimed tasks whose lease ran out and free the robots holding them.
+
+        A reaped task goes back to the status it was claimed from (due immediately when
+        that status waits for next_check_at) so the scheduler picks it up again. The sweep
+        reads only the partial lease index, so it is cheap to run every few seconds. A
+        runner that resurfaces afterwards loses its compare-and-swap writes.
+        """
+        now_text = _format_datetime(now) or _now()
+        now_ms = _to_epoch_ms(now_text)
+        due_statuses = [status.value for status, due_only in RUNNABLE_STATUS_ORDER if due_only]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute(
                 """
-                UPDATE tasks
-                SET status=?,
-                    assigned_robot_id=?,
-                    check_attempts=check_attempts + ?,
-                    updated_at=?
-                WHERE id=?
+                SELECT id, status, assigned_robot_id, claimed_from_status FROM tasks
+                WHERE lease_expires_at_ms IS NOT NULL AND lease_expires_at_ms<?
                 """,
-                (
-                    TaskStatus.CHECKING_LOGIN.value,
-                    robot_id,
-                    increment_attempts,
-                    now_text,
-                    task["id"],
-                ),
-            )
-            conn.execute(
+                (now_ms,),
+            ).fetchall()
+            reaped = []
+            for task in expired:
+                requeue_status = task["claimed_from_status"] or TaskStatus.PENDING.value
+                conn.execute(
+                    """
+                    UPDATE tasks
+                    SET status=?,
+                        assigned_robot_id=NULL,
+                        lease_expires_at_ms=NULL,
+                        next_check_at_ms=CASE WHEN ? THEN ? ELSE next_check_at_ms END,
+                        updated_at_ms=?
+                    WHERE id=?
+                    """,
+                    (requeue_status, requeue_status in due_statuses, now_ms, now_ms, task["id"]),
+                )
+                if task["assigned_robot_id"]:
+                    conn.execute(
+                        "UPDATE robots SET status='idle', updated_at=? WHERE id=? AND status='busy'",
+                        (now_text, task["assigned_robot_id"]),
+                    )
+                conn.execute(
+                    """
+                    INSERT INTO task_steps
+                        (id, task_id, step_key, step_name, status, attempt,
+                         started_at, finished_at, input_json, output_json)
+                    VALUES (?, ?, 'lease_expired', '认领租约过期回收', 'failed', 1, ?, ?, '{}', ?)
+                    """,
+                    (
+                        str(uuid.uuid4()),
+                        task["id"],
+                        now_text,
+                        now_text,
+                        json.dumps(
+                            {
+                                "robot_id": task["assigned_robot_id"],
+                                "from_status": task["status"],
+                                "requeued_status": requeue_status,
+                            },
+                            ensure_ascii=False,
+                        ),
+                    ),
+                )
+                reaped.append(
+                    {"task_id": task["id"], "robot_id": task["assigned_robot_id"], "status": requeue_status}
+                )
+        return reaped
+
+    def claim_next_runnable_task(self, robot_id: str, now: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        claimed = self.claim_runnable_tasks([robot_id], now=now)
+        return claimed[0] if claimed else None
+
+    def claim_runnable_tasks(
+        self,
+        robot_ids: Sequence[str],
+        now: Optional[Any] = None,
+        limit: Optional[int] = None,
+        lease_seconds: float = DEFAULT_TASK_LEASE_SECONDS,
+    ) -> List[Dict[str, Any]]:
+        """Claim up to one runnable task per idle robot in a single write transaction.
+
+        Tasks are shared out across teams by weighted fair queuing: each team starts at
+        a virtual time of its running tasks divided by ``teams.scheduling_weight`` and
+        the team with the smallest next finish tag gets the next robot, so a team that
+        floods the webhook only fills the robots its weight entitles it to. Teams at
+        ``teams.max_concurrent_tasks`` are skipped. Within a team tasks keep the status
+        rank then creation order. Each claim holds a lease of ``lease_seconds`` that the
+        robot keeps alive with heartbeats; see reap_expired_leases.
+        """
+        now_text = _format_datetime(now) or _now()
+        now_ms = _to_epoch_ms(now_text)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            idle_robot_ids = []
+            for robot_id in robot_ids:
+                robot = conn.execute("SELECT status FROM robots WHERE id=?", (robot_id,)).fetchone()
+                if robot is None:
+                    raise KeyError(robot_id)
+                if robot["status"] == "idle" and robot_id not in idle_robot_ids:
+                    idle_robot_ids.append(robot_id)
+            slots = len(idle_robot_ids) if limit is None else min(limit, len(idle_robot_ids))
+            if slots == 0:
+                return []
+
+            task_ids = self._fair_claim_order(conn, slots, now_ms)
+            claimed = []
+            for robot_id, task_id in zip(idle_robot_ids, task_ids):
+                conn.execute(
+                    """
+                    UPDATE tasks
+                    SET status=?,
+                        assigned_robot_id=?,
+                        check_attempts=check_attempts + (CASE WHEN status IN (?, ?) THEN 1 ELSE 0 END),
+                        claimed_from_status=status,
+                        lease_expires_at_ms=?,
+                        updated_at_ms=?
+                    WHERE id=?
+                    """,
+                    (
+                        TaskStatus.CHECKING_LOGIN.value,
+                        robot_id,
+                        TaskStatus.WAITING_WECOM_REVIEW.value,
+                        TaskStatus.WAITING_WECOM_ONLINE_DELAY.value,
+                        now_ms + int(lease_seconds * 1000),
+                        now_ms,
+                        task_id,
+                    ),
+                )
+                conn.execute(
+                    """
+                    UPDATE robots
+                    SET status='busy', last_heartbeat_at=?, updated_at=?
+                    WHERE id=?
+                    """,
+                    (now_text, now_text, robot_id),
+                )
+                claimed.append(dict(conn.execute("SELECT * FROM tasks_view WHERE id=?", (task_id,)).fetchone()))
+        return claimed
+
+    @staticmethod
+    def _fair_claim_order(conn: sqlite3.Connection, slots: int, now_ms: int) -> List[str]:
+        active = {
+            row["team_id"]: row["active"]
+            for row in conn.execute(
                 """
-                UPDATE robots
-                SET status='busy', last_heartbeat_at=?, updated_at=?
-                WHERE id=?
+                SELECT team_id, COUNT(*) AS active FROM tasks
+                WHERE status IN (?, ?) AND assigned_robot_id IS NOT NULL
+                GROUP BY team_id
                 """,
-                (now_text, now_text, robot_id),
+                (TaskStatus.CHECKING_LOGIN.value, TaskStatus.RUNNING.value),
+            ).fetchall()
+        }
+        queues: Dict[str, List[Tuple[int, int, str]]] = {}
+        virtual_time: Dict[str, float] = {}
+        weights: Dict[str, float] = {}
+        for team in conn.execute("SELECT id, scheduling_weight, max_concurrent_tasks FROM teams").fetchall():
+            running = active.get(team["id"], 0)
+            allowance = slots
+            if team["max_concurrent_tasks"] is not None:
+                allowance = min(allowance, team["max_concurrent_tasks"] - running)
+            if allowance <= 0:
+                continue
+            candidates = []
+            for rank, (status, due_only) in enumerate(RUNNABLE_STATUS_ORDER):
+                if len(candidates) >= allowance:
+                    break
+                # One (team_id, status, created_at_ms) index range per status keeps a flooded
+                # team's backlog from being sorted on every claim.
+                rows = conn.execute(
+                    """
+                    SELECT id, created_at_ms FROM tasks
+                    WHERE team_id=? AND status=?%s
+                    ORDER BY created_at_ms ASC
+                    LIMIT ?
+                    """ % (" AND next_check_at_ms<=?" if due_only else ""),
+                    (team["id"], status.value, *([now_ms] if due_only else []), allowance - len(candidates)),
+                ).fetchall()
+                candidates.extend((rank, row["created_at_ms"], row["id"]) for row in rows)
+            if candidates:
+                weight = max(float(team["scheduling_weight"] or 1), 1e-9)
+                queues[team["id"]] = candidates
+                weights[team["id"]] = weight
+                virtual_time[team["id"]] = running / weight
+
+        order: List[str] = []
+        while len(order) < slots and queues:
+            team_id = min(
+                queues,
+                key=lambda key: (virtual_time[key] + 1 / weights[key], queues[key][0][:2]),
             )
-            claimed = conn.execute("SELECT * FROM tasks WHERE id=?", (task["id"],)).fetchone()
-        return dict(claimed)
+            order.append(queues[team_id].pop(0)[2])
+            virtual_time[team_id] += 1 / weights[team_id]
+            if not queues[team_id]:
+                del queues[team_id]
+        return order
 
     def append_task_step(
         self,
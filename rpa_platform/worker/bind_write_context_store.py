@@ -0,0 +1,303 @@
+import base64
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Protocol, Tuple
+
+from rpa_platform.domain.redaction import SECRET_KEYS
+
+
+DEFAULT_BIND_WRITE_CONTEXT_PATH = ".local/wecom-bind-write-contexts.db"
+LEGACY_CONTEXT_FILE_PATTERN = "wecom-bind-real-write-*.json"
+LEGACY_CONTEXT_FILE_PREFIX = "wecom-bind-real-write-"
+# wecom-bind-real-write-context.json belongs to the manual run_wecom_bind_real_write CLI.
+LEGACY_CLI_CONTEXT_TASK_ID = "context"
+
+# Phases derived from the stored context; a deferred continuation supplies its own.
+PHASE_STARTED = "started"
+PHASE_ORDER_CREATED = "order_created"
+PHASE_COMPLETED = "completed"
+
+
+class SecretCipher(Protocol):
+    def encrypt(self, data: bytes) -> bytes:
+        ...
+
+    def decrypt(self, data: bytes) -> bytes:
+        ...
+
+
+class DpapiSecretCipher:
+    """Windows DPAPI, bound to the worker's user account; needs no key management."""
+
+    def encrypt(self, data: bytes) -> bytes:
+        return _dpapi(data, protect=True)
+
+    def decrypt(self, data: bytes) -> bytes:
+        return _dpapi(data, protect=False)
+
+
+class FernetSecretCipher:
+    """Fernet from the optional ``cryptography`` package, keyed by ``RPA_WORKER_CONTEXT_KEY``."""
+
+    def __init__(self, key: str):
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError as exc:
+            raise RuntimeError("RPA_WORKER_CONTEXT_KEY requires the cryptography package") from exc
+        try:
+            self._fernet = Fernet(key.encode("ascii"))
+        except ValueError as exc:
+            raise RuntimeError("RPA_WORKER_CONTEXT_KEY is not a valid Fernet key") from exc
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data)
+
+    def decrypt(self, data: bytes) -> bytes:
+        return self._fernet.decrypt(data)
+
+
+def default_secret_cipher(env: Optional[Mapping[str, str]] = None) -> SecretCipher:
+    values = os.environ if env is None else env
+    key = values.get("RPA_WORKER_CONTEXT_KEY", "").strip()
+    if key:
+        return FernetSecretCipher(key)
+    if os.name == "nt":
+        return DpapiSecretCipher()
+    raise RuntimeError("RPA_WORKER_CONTEXT_KEY must be set to store bind write secrets outside Windows")
+
+
+class BindWriteContextStore:
+    """SQLite store of the recoverable context of each unattended bind write.
+
+    One row per task, indexed by corp id and phase so half-done binds can be listed.
+    Values under secret keys (token, encoding_aes_key, ...) are split out of the
+    context and stored encrypted by ``cipher``; the rest stays queryable JSON. Every
+    ``save`` is a single upsert, so a reader sees either the old or the new context.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_BIND_WRITE_CONTEXT_PATH, cipher: Optional[SecretCipher] = None):
+        self.db_path = db_path
+        self._cipher = cipher
+        self._schema_ready = False
+
+    @property
+    def cipher(self) -> SecretCipher:
+        # Resolved on first use so callers that never persist a write need no key.
+        if self._cipher is None:
+            self._cipher = default_secret_cipher()
+        return self._cipher
+
+    def check_cipher(self) -> None:
+        """Resolve the cipher now; raises ``RuntimeError`` if none is configured, before a write starts."""
+        if self._cipher is None:
+            self._cipher = default_secret_cipher()
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._schema_ready:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        if not self._schema_ready:
+            self._init_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS unattended_write_contexts (
+                task_id TEXT PRIMARY KEY,
+                corp_id TEXT NOT NULL DEFAULT '',
+                app_id TEXT NOT NULL DEFAULT '',
+                phase TEXT NOT NULL,
+                context_json TEXT NOT NULL,
+                secrets_blob TEXT NOT NULL DEFAULT '',
+                created_at_ms INTEGER NOT NULL,
+                updated_at_ms INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_unattended_write_contexts_corp
+            ON unattended_write_contexts(corp_id);
+            CREATE INDEX IF NOT EXISTS idx_unattended_write_contexts_phase
+            ON unattended_write_contexts(phase, updated_at_ms);
+            """
+        )
+
+    def load(self, task_id: str) -> Dict[str, Any]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT context_json, secrets_blob FROM unattended_write_contexts WHERE task_id = ?",
+                (task_id,),
+            ).fetchone()
+        if row is None:
+            return {}
+        context = json.loads(row["context_json"])
+        if row["secrets_blob"]:
+            secrets = json.loads(self.cipher.decrypt(base64.b64decode(row["secrets_blob"])).decode("utf-8"))
+            _merge_secrets(context, secrets)
+        return context
+
+    def save(self, task_id: str, context: Dict[str, Any], corp_id: str = "") -> None:
+        with self._connect() as conn:
+            self._upsert(conn, task_id, context, corp_id, replace=True)
+
+    def list_tasks(self, phase: Optional[str] = None, corp_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Task rows without their context, e.g. every bind left ``waiting_online_delay``."""
+        clauses, params = [], []
+        if phase is not None:
+            clauses.append("phase = ?")
+            params.append(phase)
+        if corp_id is not None:
+            clauses.append("corp_id = ?")
+            params.append(corp_id)
+        where = "WHERE %s" % " AND ".join(clauses) if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT task_id, corp_id, app_id, phase, created_at_ms, updated_at_ms
+                FROM unattended_write_contexts
+                %s
+                ORDER BY updated_at_ms
+                """
+                % where,
+                params,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def import_context_files(self, directory: Path) -> int:
+        """One-time import of the ``wecom-bind-real-write-<task_id>.json`` files.
+
+        Tasks already in the table are left alone. Imported files are renamed to
+        ``*.json.imported`` so the next run skips them; unreadable files stay in place.
+        """
+        imported = 0
+        for path in sorted(Path(directory).glob(LEGACY_CONTEXT_FILE_PATTERN)):
+            try:
+                context = json.loads(path.read_text(encoding="utf-8"))
+            except (ValueError, OSError):
+                continue
+            if not isinstance(context, dict):
+                continue
+            task_id = path.stem[len(LEGACY_CONTEXT_FILE_PREFIX):]
+            if task_id == LEGACY_CLI_CONTEXT_TASK_ID:
+                continue
+            with self._connect() as conn:
+                inserted = self._upsert(conn, task_id, context, "", replace=False)
+            path.replace(path.with_name(path.name + ".imported"))
+            imported += int(inserted)
+        return imported
+
+    def _upsert(
+        self,
+        conn: sqlite3.Connection,
+        task_id: str,
+        context: Dict[str, Any],
+        corp_id: str,
+        replace: bool,
+    ) -> bool:
+        public, secrets = _split_secrets(context)
+        secrets_blob = (
+            base64.b64encode(self.cipher.encrypt(json.dumps(secrets, ensure_ascii=False).encode("utf-8"))).decode("ascii")
+            if secrets
+            else ""
+        )
+        jdy = context.get("jdy") if isinstance(context.get("jdy"), dict) else {}
+        wecom = context.get("wecom") if isinstance(context.get("wecom"), dict) else {}
+        now_ms = int(time.time() * 1000)
+        conflict = (
+            """
+            DO UPDATE SET
+                corp_id = CASE WHEN :corp_id != '' THEN :corp_id ELSE corp_id END,
+                app_id = excluded.app_id,
+                phase = excluded.phase,
+                context_json = excluded.context_json,
+                secrets_blob = excluded.secrets_blob,
+                updated_at_ms = excluded.updated_at_ms
+            """
+            if replace
+            else "DO NOTHING"
+        )
+        cursor = conn.execute(
+            """
+            INSERT INTO unattended_write_contexts (
+                task_id, corp_id, app_id, phase, context_json, secrets_blob, created_at_ms, updated_at_ms
+            )
+            VALUES (:task_id, :insert_corp_id, :app_id, :phase, :context_json, :secrets_blob, :now_ms, :now_ms)
+            ON CONFLICT(task_id) %s
+            """
+            % conflict,
+            {
+                "task_id": task_id,
+                "corp_id": corp_id,
+                # Contexts saved without a corp id (e.g. imported files) fall back to the Jiandaoyun one.
+                "insert_corp_id": corp_id or str(jdy.get("corp_secret_id") or ""),
+                "app_id": str(wecom.get("app_id") or ""),
+                "phase": context_phase(context),
+                "context_json": json.dumps(public, ensure_ascii=False, sort_keys=True),
+                "secrets_blob": secrets_blob,
+                "now_ms": now_ms,
+            },
+        )
+        return cursor.rowcount > 0
+
+
+def context_phase(context: Dict[str, Any]) -> str:
+    wecom = context.get("wecom") if isinstance(context.get("wecom"), dict) else {}
+    if wecom.get("auditorder_status") == 5:
+        return PHASE_COMPLETED
+    continuation = context.get("unattended_write")
+    if isinstance(continuation, dict) and continuation.get("phase"):
+        return str(continuation["phase"])
+    if wecom.get("auditorderid"):
+        return PHASE_ORDER_CREATED
+    return PHASE_STARTED
+
+
+def _split_secrets(value: Any, path: Tuple[str, ...] = ()) -> Tuple[Any, Dict[str, Any]]:
+    if not isinstance(value, dict):
+        return value, {}
+    public: Dict[str, Any] = {}
+    secrets: Dict[str, Any] = {}
+    for key, child in value.items():
+        child_path = path + (str(key),)
+        if key in SECRET_KEYS:
+            secrets[json.dumps(child_path)] = child
+        else:
+            public[key], child_secrets = _split_secrets(child, child_path)
+            secrets.update(child_secrets)
+    return public, secrets
+
+
+def _merge_secrets(context: Dict[str, Any], secrets: Dict[str, Any]) -> None:
+    for encoded_path, value in secrets.items():
+        path = json.loads(encoded_path)
+        target = context
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+
+
+def _dpapi(data: bytes, protect: bool) -> bytes:
+    import ctypes
+    from ctypes import wintypes
+
+    class DataBlob(ctypes.Structure):
+        _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in = DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char)))
+    blob_out = DataBlob()
+    crypt32 = ctypes.windll.crypt32
+    if protect:
+        ok = crypt32.CryptProtectData(ctypes.byref(blob_in), None, None, None, None, 0, ctypes.byref(blob_out))
+    else:
+        ok = crypt32.CryptUnprotectData(ctypes.byref(blob_in), None, None, None, None, 0, ctypes.byref(blob_out))
+    if not ok:
+        raise ctypes.WinError()
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)
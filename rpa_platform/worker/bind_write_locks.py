@@ -0,0 +1,182 @@
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+DEFAULT_BIND_WRITE_LOCK_LEASE_SECONDS = 900.0
+
+
+class BindWriteLockManager:
+    """File locks that stop two unattended bind writes for the same enterprise.
+
+    Each lock is one ``<key>.lock`` file in ``lock_dir``, created with ``O_EXCL`` and
+    holding the owner task id, host, pid and lease expiry, so writes for different
+    enterprises run in parallel. A lock is stale once its lease has expired or, on the
+    owning host, once the owning process is gone; the next ``acquire`` takes it over.
+    Long writes call ``heartbeat`` to extend the lease.
+    """
+
+    def __init__(
+        self,
+        lock_dir: Path,
+        lease_seconds: float = DEFAULT_BIND_WRITE_LOCK_LEASE_SECONDS,
+        clock: Callable[[], float] = time.time,
+        pid_alive: Optional[Callable[[int], bool]] = None,
+    ):
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive")
+        self.lock_dir = Path(lock_dir)
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self.pid_alive = pid_alive or _pid_alive
+        self.hostname = socket.gethostname()
+
+    @staticmethod
+    def key_for(corp_id: str, app_id: Any = "") -> str:
+        key = "%s-%s" % (corp_id, app_id) if str(app_id or "") else str(corp_id)
+        return "".join(char for char in key if char.isalnum() or char in {"-", "_"}) or "unknown"
+
+    def acquire(self, key: str, task_id: str) -> bool:
+        """Take the lock for ``key``; a task that already owns it gets its lease renewed."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self._create(path, task_id):
+            return True
+        owner = self._read(path)
+        if owner is not None and owner.get("task_id") == task_id:
+            self._write(path, task_id)
+            return True
+        if owner is not None and not self._is_stale(owner):
+            return False
+        return self._take_over(path, task_id)
+
+    def heartbeat(self, key: str, task_id: str) -> bool:
+        path = self._path(key)
+        owner = self._read(path)
+        if owner is None or owner.get("task_id") != task_id:
+            return False
+        self._write(path, task_id)
+        return True
+
+    def release(self, key: str, task_id: str) -> bool:
+        """Remove the lock if ``task_id`` owns it; a lock taken over by another task stays."""
+        path = self._path(key)
+        owner = self._read(path)
+        if owner is None or owner.get("task_id") != task_id:
+            return False
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def owner(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._read(self._path(key))
+
+    def _path(self, key: str) -> Path:
+        return self.lock_dir / ("%s.lock" % key)
+
+    def _record(self, task_id: str) -> Dict[str, Any]:
+        now = self.clock()
+        return {
+            "task_id": task_id,
+            "host": self.hostname,
+            "pid": os.getpid(),
+            "heartbeat_at": now,
+            "expires_at": now + self.lease_seconds,
+        }
+
+    def _create(self, path: Path, task_id: str) -> bool:
+        try:
+            fd = os.open(str(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(self._record(task_id), handle)
+        return True
+
+    def _write(self, path: Path, task_id: str) -> None:
+        tmp_path = path.with_name("%s.%s.tmp" % (path.name, os.getpid()))
+        tmp_path.write_text(json.dumps(self._record(task_id)), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            text = path.read_text(encoding="utf-8")
+            modified_at = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        try:
+            owner = json.loads(text)
+        except ValueError:
+            owner = None
+        if not isinstance(owner, dict):
+            # Plain task id written by the old single-file lock; lease runs from the file's mtime.
+            owner = {"task_id": text.strip(), "expires_at": modified_at + self.lease_seconds}
+        return owner
+
+    def _is_stale(self, owner: Dict[str, Any]) -> bool:
+        try:
+            if float(owner.get("expires_at") or 0) <= self.clock():
+                return True
+        except (TypeError, ValueError):
+            return True
+        if owner.get("host") == self.hostname and owner.get("pid"):
+            return not self.pid_alive(int(owner["pid"]))
+        return False
+
+    def _take_over(self, path: Path, task_id: str) -> bool:
+        # Move the stale file aside first so two takers cannot both delete and recreate it.
+        tombstone = path.with_name("%s.%s.stale" % (path.name, os.getpid()))
+        try:
+            os.replace(path, tombstone)
+        except FileNotFoundError:
+            return self._create(path, task_id)
+        moved = self._read(tombstone)
+        if moved is not None and not self._is_stale(moved):
+            # Another process took the lock over in between; put its lock back.
+            try:
+                os.link(tombstone, path)
+            except OSError:
+                pass
+            tombstone.unlink()
+            return False
+        tombstone.unlink()
+        return self._create(path, task_id)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        return _windows_pid_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _windows_pid_alive(pid: int) -> bool:
+    # os.kill(pid, 0) terminates the process on Windows, so ask the kernel instead.
+    import ctypes
+
+    process_query_limited_information = 0x1000
+    still_active = 259
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(process_query_limited_information, False, pid)
+    if not handle:
+        access_denied = 5
+        return kernel32.GetLastError() == access_denied
+    try:
+        exit_code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == still_active
+    finally:
+        kernel32.CloseHandle(handle)
@@ -1,7 +1,10 @@
 import os
 from typing import Any, Dict, Mapping, Optional
 
+from rpa_platform.integrations.admin_call_policy import shared_admin_call_policy
+from rpa_platform.integrations.resolution_cache import shared_resolution_cache
 from rpa_platform.worker.c360_worker_client import C360WorkerConfig
+from rpa_platform.worker.c360_worker_runtime import ProgressEmitter, accepts_progress
 from rpa_platform.worker.simulated_handlers import SimulatedTaskHandlers
 
 
@@ -19,9 +22,14 @@ class C360TaskHandlers:
         self._wecom_bind_unattended_handler = wecom_bind_unattended_handler
         self._env = dict(env or {})
 
-    async def handle(self, dispatch: Dict[str, Any]) -> Any:
+    async def handle(self, dispatch: Dict[str, Any], progress: Optional[ProgressEmitter] = None) -> Any:
         task_type = _task_type(dispatch)
-        if task_type in {"diagnostics", "runtime_health_check"}:
+        if task_type == "diagnostics":
+            result = await self._safe_handlers.handle(dispatch)
+            result["resolution_cache"] = shared_resolution_cache().stats()
+            result["admin_call_policy"] = shared_admin_call_policy().stats()
+            return result
+        if task_type == "runtime_health_check":
             return await self._safe_handlers.handle(dispatch)
         if task_type == "wecom_bind_service":
             payload = dispatch.get("payload") if isinstance(dispatch.get("payload"), dict) else {}
@@ -29,8 +37,8 @@ class C360TaskHandlers:
                 self._wecom_bind_unattended_handler is not None
                 and is_unattended_write_enabled(self._env, payload)
             ):
-                return await self._wecom_bind_unattended_handler.handle(dispatch)
-            return await self._wecom_bind_handler.handle(dispatch)
+                return await _handle_with_progress(self._wecom_bind_unattended_handler, dispatch, progress)
+            return await _handle_with_progress(self._wecom_bind_handler, dispatch, progress)
         raise ValueError("Unsupported task_type: %s" % task_type)
 
 
@@ -55,6 +63,12 @@ def build_c360_task_handlers(
     )
 
 
+async def _handle_with_progress(handler: Any, dispatch: Dict[str, Any], progress: Optional[ProgressEmitter]) -> Any:
+    if progress is not None and accepts_progress(handler.handle):
+        return await handler.handle(dispatch, progress=progress)
+    return await handler.handle(dispatch)
+
+
 def _task_type(dispatch: Dict[str, Any]) -> str:
     payload = dispatch.get("payload")
     if isinstance(payload, dict) and payload.get("task_type"):
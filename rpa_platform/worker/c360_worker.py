@@ -1,7 +1,9 @@
 import argparse
 import asyncio
 import os
+import random
 import sys
+from functools import cached_property
 from typing import List, Mapping, Optional
 
 from rpa_platform.worker.c360_worker_client import (
@@ -12,6 +14,7 @@ from rpa_platform.worker.c360_worker_client import (
 from rpa_platform.worker.c360_task_handlers import build_c360_task_handlers
 from rpa_platform.worker.c360_worker_runtime import (
     C360WorkerRuntime,
+    CompletionOutbox,
     HttpWorkerMessageReporter,
     connect_json_transport,
 )
@@ -61,22 +64,53 @@ def main(argv: Optional[List[str]] = None, env: Optional[Mapping[str, str]] = No
     return 0
 
 
-async def _run(config, event_logger=None) -> None:
-    diagnostics = build_default_diagnostics(config)
+class WorkerHandlerGraph:
+    """Diagnostics and task handlers built on first use and kept for the whole process.
+
+    Building the handlers parses the recovery env and sets up clients and Playwright
+    helpers; a persistent worker shares one graph across reconnects.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    @cached_property
+    def diagnostics(self):
+        return build_default_diagnostics(self.config)
+
+    @cached_property
+    def handlers(self):
+        return build_c360_task_handlers(self.config, self.diagnostics)
+
+
+# Reconnect delays grow per consecutive failed cycle up to this cap.
+MAX_RECONNECT_DELAY_SECONDS = 60.0
+# Reconnect delays are jittered downwards by up to this share so workers spread out.
+RECONNECT_JITTER_RATIO = 0.5
+
+
+async def _run(config, event_logger=None, outbox=None, handler_graph=None) -> None:
+    graph = handler_graph or WorkerHandlerGraph(config)
+    diagnostics = graph.diagnostics
     if event_logger is not None:
         event_logger("worker connecting worker_id=%s ws_url=%s simulate=%s" % (config.worker_id, config.ws_url, config.simulate))
     transport = await connect_json_transport(config)
+    reporter = HttpWorkerMessageReporter(config, event_logger=event_logger)
+    # Flush messages a previous run left in the outbox while this one connects.
+    reporter.start()
     try:
         runtime = C360WorkerRuntime(
             config=config,
             transport=transport,
-            handlers=build_c360_task_handlers(config, diagnostics),
+            handlers=graph.handlers,
             diagnostics=diagnostics,
             event_logger=event_logger,
-            message_reporter=HttpWorkerMessageReporter(config),
+            message_reporter=reporter,
+            outbox=outbox,
         )
         await runtime.run_until_idle()
     finally:
+        await reporter.close()
         close = getattr(transport, "close", None)
         if close is not None:
             await close()
@@ -88,19 +122,40 @@ async def _run_forever(
     reconnect_delay_seconds: float = 5.0,
     sleep=asyncio.sleep,
     run_once=None,
+    max_reconnect_delay_seconds: float = MAX_RECONNECT_DELAY_SECONDS,
+    rng=None,
 ) -> None:
+    """Reconnect until cancelled, backing off exponentially while cycles keep failing.
+
+    A cycle that ends because the control plane closed the socket resets the backoff,
+    so a failover costs one jittered ``reconnect_delay_seconds``. Completions that were
+    not acknowledged survive in a shared outbox and are re-sent on the next connection,
+    and the task handlers are built once and reused by every connection.
+    """
     runner = run_once or _run
+    jitter = rng or random.Random()
+    outbox = CompletionOutbox()
+    handler_graph = WorkerHandlerGraph(config)
+    failures = 0
     while True:
         try:
-            await runner(config, event_logger=event_logger)
+            await runner(config, event_logger=event_logger, outbox=outbox, handler_graph=handler_graph)
+            failures = 0
         except asyncio.CancelledError:
             raise
         except Exception as exc:
+            failures += 1
             if event_logger is not None:
                 event_logger("worker cycle failed: %s" % _redact_string(str(exc)))
+        delay = _reconnect_delay(reconnect_delay_seconds, failures, max_reconnect_delay_seconds, jitter)
         if event_logger is not None:
-            event_logger("worker reconnecting in %ss" % _format_seconds(reconnect_delay_seconds))
-        await sleep(reconnect_delay_seconds)
+            event_logger("worker reconnecting in %ss" % _format_seconds(delay))
+        await sleep(delay)
+
+
+def _reconnect_delay(base_seconds: float, failures: int, max_seconds: float, rng) -> float:
+    delay = min(base_seconds * 2 ** min(failures, 16), max(max_seconds, base_seconds))
+    return round(delay * (1 - RECONNECT_JITTER_RATIO * rng.random()), 3)
 
 
 def _reconnect_delay_seconds_from_env(env: Optional[Mapping[str, str]] = None) -> float:
@@ -1,15 +1,19 @@
 import os
 import platform
 import socket
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Mapping, Optional
 from urllib.parse import urlparse, urlunparse
 
 from rpa_platform.worker.diagnostics import sanitize_diagnostic_payload
+from rpa_platform.worker.worker_message_outbox import DEFAULT_WORKER_OUTBOX_PATH
 
 
 C360_WORKER_WS_PATH = "/v1/rpa/workers/ws"
 DEFAULT_CAPABILITIES = ["wecom_bind_service", "diagnostics", "runtime_health_check"]
+# Dispatches of one task_type that may run at once; unlisted task types run one at a time.
+DEFAULT_CONCURRENCY = {"wecom_bind_service": 1, "diagnostics": 2, "runtime_health_check": 4}
+DEFAULT_HEARTBEAT_INTERVAL_SECONDS = 15.0
 
 
 class C360WorkerConfigError(ValueError):
@@ -24,6 +28,12 @@ class C360WorkerConfig:
     worker_id: str
     capabilities: List[str]
     simulate: bool = True
+    concurrency: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_CONCURRENCY))
+    heartbeat_interval_seconds: float = DEFAULT_HEARTBEAT_INTERVAL_SECONDS
+    outbox_path: str = DEFAULT_WORKER_OUTBOX_PATH
+
+    def concurrency_limit(self, task_type: str) -> int:
+        return self.concurrency.get(task_type, 1)
 
 
 def build_c360_worker_ws_url(base_url: str) -> str:
@@ -45,6 +55,8 @@ def load_c360_worker_config_from_env(env: Optional[Mapping[str, str]] = None) ->
     worker_id = values.get("RPA_WORKER_ID") or values.get("RPA_ROBOT_ID") or "win-sim-001"
     capabilities = _split_capabilities(values.get("RPA_WORKER_CAPABILITIES", ""))
     simulate = _parse_bool(values.get("RPA_WORKER_SIMULATE", "true"))
+    concurrency = _parse_concurrency(values.get("RPA_WORKER_CONCURRENCY", ""))
+    heartbeat_interval_seconds = _parse_heartbeat_interval(values.get("RPA_WORKER_HEARTBEAT_SECONDS", ""))
     return C360WorkerConfig(
         base_url=base_url.rstrip("/"),
         ws_url=build_c360_worker_ws_url(base_url),
@@ -52,17 +64,29 @@ def load_c360_worker_config_from_env(env: Optional[Mapping[str, str]] = None) ->
         worker_id=worker_id,
         capabilities=capabilities,
         simulate=simulate,
+        concurrency=concurrency,
+        heartbeat_interval_seconds=heartbeat_interval_seconds,
+        outbox_path=values.get("RPA_WORKER_OUTBOX_PATH") or DEFAULT_WORKER_OUTBOX_PATH,
     )
 
 
-def build_worker_hello(config: C360WorkerConfig, diagnostics: Dict[str, Any]) -> Dict[str, Any]:
-    return {
+def build_worker_hello(
+    config: C360WorkerConfig,
+    diagnostics: Dict[str, Any],
+    resume_task_ids: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    hello = {
         "type": "worker.hello",
         "worker_id": config.worker_id,
         "capabilities": list(config.capabilities),
+        "capacity": {capability: config.concurrency_limit(capability) for capability in config.capabilities},
         "simulate": bool(config.simulate),
         "diagnostics": sanitize_diagnostic_payload(diagnostics),
     }
+    if resume_task_ids:
+        # Completions the control plane has not acknowledged; re-sent after worker.accepted.
+        hello["resume"] = {"unacked_task_ids": list(resume_task_ids)}
+    return hello
 
 
 def build_default_diagnostics(
@@ -99,5 +123,34 @@ def _split_capabilities(raw: str) -> List[str]:
     return items or list(DEFAULT_CAPABILITIES)
 
 
+def _parse_concurrency(raw: str) -> Dict[str, int]:
+    """Parse ``task_type=limit`` pairs, e.g. ``wecom_bind_service=1,runtime_health_check=4``."""
+    concurrency = dict(DEFAULT_CONCURRENCY)
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        task_type, separator, limit = item.partition("=")
+        try:
+            value = int(limit)
+        except ValueError:
+            value = 0
+        if not separator or not task_type.strip() or value < 1:
+            raise C360WorkerConfigError("RPA_WORKER_CONCURRENCY entries must look like task_type=positive_int")
+        concurrency[task_type.strip()] = value
+    return concurrency
+
+
+def _parse_heartbeat_interval(raw: str) -> float:
+    if not raw.strip():
+        return DEFAULT_HEARTBEAT_INTERVAL_SECONDS
+    try:
+        value = float(raw)
+    except ValueError:
+        value = 0
+    if value <= 0:
+        raise C360WorkerConfigError("RPA_WORKER_HEARTBEAT_SECONDS must be a positive number")
+    return value
+
+
 def _parse_bool(raw: str) -> bool:
     return raw.strip().lower() not in ("0", "false", "no", "off")
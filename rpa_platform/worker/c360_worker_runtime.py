@@ -1,9 +1,13 @@
 import asyncio
+import http.client
 import inspect
 import json
-import urllib.request
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Protocol
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Set, Tuple
+from urllib.parse import urlsplit
 
 from rpa_platform.worker.c360_worker_client import (
     C360WorkerConfig,
@@ -11,6 +15,8 @@ from rpa_platform.worker.c360_worker_client import (
     build_worker_hello,
 )
 from rpa_platform.worker.diagnostics import _redact_string
+from rpa_platform.worker.simulated_handlers import _task_type
+from rpa_platform.worker.worker_message_outbox import OutboxMessage, WorkerMessageOutbox
 
 
 class AsyncJsonTransport(Protocol):
@@ -28,7 +34,162 @@ class WorkerTaskResult:
     progress: List[Dict[str, Any]] = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class DeferredTaskResult:
+    """Handler outcome for a task that has to wait before it can finish.
+
+    ``progress`` is sent straight away; at ``resume_at`` the runtime awaits ``resume()``,
+    which returns what ``handle`` would have returned, possibly another deferral.
+    """
+
+    resume_at: datetime
+    resume: Callable[[], Awaitable[Any]]
+    progress: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ProgressEmitter:
+    """Forward a running handler's progress events to the control plane as they happen.
+
+    Handlers call :meth:`emit` from the event loop or from a worker thread. At most one
+    event per ``min_interval_seconds`` is sent for the task; while an event waits, a
+    newer event with the same ``status`` replaces it, so high-frequency updates such as
+    percentages collapse to the latest value. :meth:`aclose` sends what is still
+    waiting without delay, so every status reaches the control plane before the result.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        min_interval_seconds: float = 1.0,
+        event_logger: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self._send = send
+        self.min_interval_seconds = min_interval_seconds
+        self.event_logger = event_logger
+        self.emitted_statuses: Set[str] = set()
+        self.coalesced = 0
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._pump: Optional["asyncio.Task[None]"] = None
+
+    def emit(self, status: str, message: str = "", **fields: Any) -> None:
+        event: Dict[str, Any] = {"status": status}
+        if message:
+            event["message"] = message
+        event.update(fields)
+        self.emit_event(event)
+
+    def emit_event(self, event: Dict[str, Any]) -> None:
+        if threading.get_ident() == self._loop_thread:
+            self._enqueue(dict(event))
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, dict(event))
+
+    async def aclose(self) -> None:
+        self._closing.set()
+        self._wakeup.set()
+        if self._pump is not None:
+            await self._pump
+
+    def _enqueue(self, event: Dict[str, Any]) -> None:
+        if self._closing.is_set():
+            return
+        self.emitted_statuses.add(str(event.get("status")))
+        if self._pending and self._pending[-1].get("status") == event.get("status"):
+            self._pending[-1] = event
+            self.coalesced += 1
+        else:
+            self._pending.append(event)
+        if self._pump is None:
+            self._pump = self._loop.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        last_sent: Optional[float] = None
+        while True:
+            if not self._pending:
+                if self._closing.is_set():
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if last_sent is not None and not self._closing.is_set():
+                remaining = last_sent + self.min_interval_seconds - self._loop.time()
+                if remaining > 0:
+                    try:
+                        await asyncio.wait_for(self._closing.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+            event = self._pending.pop(0)
+            try:
+                await self._send(event)
+            except Exception as exc:
+                # Progress is best effort; the completion has its own delivery guarantees.
+                if self.event_logger is not None:
+                    self.event_logger("task progress send failed status=%s: %s" % (event.get("status"), exc))
+            last_sent = self._loop.time()
+
+
+class CompletionOutbox:
+    """Keep ``task.completed`` messages until the control plane has them.
+
+    A completion leaves the outbox once the message reporter has delivered it (for a
+    queueing reporter such as :class:`HttpWorkerMessageReporter`, when its POST
+    succeeded rather than when it was queued) or the control plane answers
+    ``task.completed.ack``. A persistent worker shares one outbox across
+    connections, so completions written into a dying socket are listed in the next
+    ``worker.hello`` and re-sent once the worker is accepted again.
+    """
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, payload: Dict[str, Any]) -> None:
+        task_id = str(payload.get("task_id", ""))
+        self._entries.pop(task_id, None)
+        self._entries[task_id] = dict(payload)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def ack(self, task_id: Any) -> bool:
+        return self._entries.pop(str(task_id), None) is not None
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return [dict(payload) for payload in self._entries.values()]
+
+    def task_ids(self) -> List[str]:
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class C360WorkerRuntime:
+    """Read control-plane messages and run each dispatch as its own asyncio task.
+
+    Dispatches are limited per task type by ``config.concurrency`` (advertised as
+    ``capacity`` in ``worker.hello``), so a long ``wecom_bind_service`` never holds up
+    health checks or diagnostics. When the socket goes idle the runtime drains the
+    dispatches still running, cancelling them after ``drain_timeout_seconds``.
+
+    While connected the runtime sends ``worker.heartbeat`` every
+    ``config.heartbeat_interval_seconds`` with its load and in-flight task ids, and
+    re-sends the completions still in ``outbox`` after ``worker.accepted``.
+
+    Handlers whose ``handle`` takes a ``progress`` argument get a :class:`ProgressEmitter`,
+    and handlers written as async generators may yield progress dicts followed by a
+    :class:`WorkerTaskResult`; both are forwarded while the handler is still running.
+    A handler returning :class:`DeferredTaskResult` gives its slot back until
+    ``resume_at``, so a long fixed wait does not block other tasks of its type. Such
+    waits end with the connection: draining completes them with ``result.status``
+    ``deferred`` and their ``resume_at``, kept in ``outbox`` until acknowledged, so the
+    control plane dispatches the task again and the handler resumes its continuation.
+    """
+
     def __init__(
         self,
         config: C360WorkerConfig,
@@ -37,6 +198,9 @@ class C360WorkerRuntime:
         diagnostics: Optional[Dict[str, Any]] = None,
         event_logger: Optional[Callable[[str], None]] = None,
         message_reporter: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        drain_timeout_seconds: Optional[float] = None,
+        outbox: Optional[CompletionOutbox] = None,
+        progress_interval_seconds: float = 1.0,
     ) -> None:
         self.config = config
         self.transport = transport
@@ -44,18 +208,81 @@ class C360WorkerRuntime:
         self.diagnostics = diagnostics if diagnostics is not None else getattr(handlers, "diagnostics", {})
         self.event_logger = event_logger
         self.message_reporter = message_reporter
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.outbox = outbox if outbox is not None else CompletionOutbox()
+        self.progress_interval_seconds = progress_interval_seconds
+        self._running: Dict[str, str] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+        self._deferred_waits: Set["asyncio.Future[None]"] = set()
+        self._closing = False
+        self._dispatch_errors: List[BaseException] = []
+        self._send_lock = asyncio.Lock()
+        # A queueing reporter returns before delivery and reports it through a listener.
+        add_delivery_listener = getattr(message_reporter, "add_delivery_listener", None)
+        self._reporter_confirms_delivery = add_delivery_listener is not None
+        if add_delivery_listener is not None:
+            add_delivery_listener(self._message_delivered)
 
     async def run_until_idle(self) -> None:
-        await self.transport.send_json(build_worker_hello(self.config, self.diagnostics))
-        self._log("worker hello sent worker_id=%s simulate=%s" % (self.config.worker_id, self.config.simulate))
+        resume_task_ids = self.outbox.task_ids()
+        await self.transport.send_json(build_worker_hello(self.config, self.diagnostics, resume_task_ids))
+        self._log(
+            "worker hello sent worker_id=%s simulate=%s unacked=%s"
+            % (self.config.worker_id, self.config.simulate, len(resume_task_ids))
+        )
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            await self._receive_loop()
+        except asyncio.CancelledError:
+            await self._cancel_in_flight()
+            raise
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        await self.drain()
+        self._log("worker idle")
+
+    async def drain(self) -> None:
+        """Wait for running dispatches; re-raise the first failure to send a result.
+
+        Dispatches waiting for a deferred ``resume_at`` are handed back to the control
+        plane at once rather than holding the reconnect for the rest of their delay.
+        """
+        self._closing = True
+        for task in list(self._deferred_waits):
+            task.cancel()
+        if self._in_flight:
+            self._log("worker draining in_flight=%s" % len(self._in_flight))
+            _, pending = await asyncio.wait(set(self._in_flight), timeout=self.drain_timeout_seconds)
+            if pending:
+                self._log("worker drain timed out cancelling=%s" % len(pending))
+                await self._cancel_in_flight()
+        if self._dispatch_errors:
+            error = self._dispatch_errors[0]
+            self._dispatch_errors = []
+            raise error
+
+    async def _cancel_in_flight(self) -> None:
+        self._closing = True
+        pending = list(self._in_flight)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _receive_loop(self) -> None:
         while True:
             message = await self.transport.receive_json()
             if message is None:
-                self._log("worker idle")
                 return
             message_type = message.get("type")
             if message_type == "worker.accepted":
                 self._log("worker accepted worker_id=%s" % _safe_text(message.get("worker_id")))
+                await self._resend_unacked()
+                continue
+            if message_type == "task.completed.ack":
+                if self.outbox.ack(message.get("task_id")):
+                    self._log("task completion acked task_id=%s" % _safe_text(message.get("task_id")))
                 continue
             if message_type == "task.dispatch":
                 self._log(
@@ -66,12 +293,122 @@ class C360WorkerRuntime:
                         bool(message.get("simulate")),
                     )
                 )
-                await self._handle_dispatch(message)
+                task = asyncio.create_task(self._run_dispatch(message))
+                self._in_flight.add(task)
+                task.add_done_callback(self._dispatch_done)
+
+    def _dispatch_done(self, task: "asyncio.Task[None]") -> None:
+        self._in_flight.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._dispatch_errors.append(task.exception())
+
+    async def _resend_unacked(self) -> None:
+        for payload in self.outbox.pending():
+            try:
+                await self._send_worker_message(payload)
+            except Exception as exc:
+                self._log("task completion resend failed task_id=%s: %s" % (_safe_text(payload.get("task_id")), _safe_text(exc)))
+                return
+            self._log("task completion resent task_id=%s" % _safe_text(payload.get("task_id")))
 
-    async def _handle_dispatch(self, dispatch: Dict[str, Any]) -> None:
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.heartbeat_interval_seconds)
+            try:
+                async with self._send_lock:
+                    await self.transport.send_json(self._heartbeat())
+            except Exception as exc:
+                # The receive loop sees the broken socket and ends the cycle.
+                self._log("worker heartbeat failed: %s" % _safe_text(exc))
+                return
+
+    def _heartbeat(self) -> Dict[str, Any]:
+        load: Dict[str, int] = {}
+        for task_type in self._running.values():
+            load[task_type] = load.get(task_type, 0) + 1
+        return {
+            "type": "worker.heartbeat",
+            "worker_id": self.config.worker_id,
+            "in_flight_task_ids": sorted(self._running),
+            "load": load,
+            "unacked_task_ids": self.outbox.task_ids(),
+        }
+
+    async def _run_dispatch(self, dispatch: Dict[str, Any]) -> None:
+        task_id = str(dispatch.get("task_id", ""))
+        task_type = _task_type(dispatch)
+        slots = self._slots.get(task_type)
+        if slots is None:
+            slots = self._slots[task_type] = asyncio.Semaphore(self.config.concurrency_limit(task_type))
+        self._running[task_id] = task_type
+        try:
+            await self._send_worker_message({"type": "task.accepted", "task_id": task_id})
+            self._log("task accepted task_id=%s" % _safe_text(task_id))
+            async with slots:
+                deferred = await self._handle_dispatch(dispatch)
+            while deferred is not None:
+                if not await self._wait_for_resume(deferred):
+                    await self._hand_back_deferred(task_id, deferred)
+                    return
+                async with slots:
+                    deferred = await self._run_handler(task_id, deferred.resume())
+        except asyncio.CancelledError:
+            self._log("task cancelled task_id=%s" % _safe_text(task_id))
+            try:
+                await self._send_worker_message(
+                    {
+                        "type": "task.completed",
+                        "task_id": task_id,
+                        "status": "failed",
+                        "error_message": "worker shut down before the task finished",
+                    }
+                )
+            except Exception:
+                pass
+            raise
+        finally:
+            self._running.pop(task_id, None)
+
+    async def _hand_back_deferred(self, task_id: str, deferred: DeferredTaskResult) -> None:
+        """Complete a deferral cut short by the connection so the control plane redispatches it."""
+        resume_at = deferred.resume_at.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            await self._send_worker_message(
+                {
+                    "type": "task.completed",
+                    "task_id": task_id,
+                    "status": "succeeded",
+                    "result": {
+                        "status": "deferred",
+                        "reason": "worker_disconnected_before_resume",
+                        "resume_at": resume_at,
+                        "next_action": "redispatch_after_resume_at",
+                    },
+                }
+            )
+        except Exception as exc:
+            # Still in the outbox: re-sent after the next worker.accepted.
+            self._log("task deferral hand-back not delivered task_id=%s: %s" % (_safe_text(task_id), _safe_text(exc)))
+        self._log("task deferral handed back task_id=%s resume_at=%s" % (_safe_text(task_id), resume_at))
+
+    async def _wait_for_resume(self, deferred: DeferredTaskResult) -> bool:
+        """Sleep until ``resume_at``; return ``False`` when the connection closes first."""
+        if self._closing:
+            return False
+        waiting = asyncio.ensure_future(asyncio.sleep(max((deferred.resume_at - datetime.now()).total_seconds(), 0)))
+        self._deferred_waits.add(waiting)
+        try:
+            await waiting
+        except asyncio.CancelledError:
+            if not self._closing:
+                raise
+            return False
+        finally:
+            self._deferred_waits.discard(waiting)
+        return True
+
+    async def _handle_dispatch(self, dispatch: Dict[str, Any]) -> Optional[DeferredTaskResult]:
         task_id = str(dispatch.get("task_id", ""))
-        await self._send_worker_message({"type": "task.accepted", "task_id": task_id})
-        self._log("task accepted task_id=%s" % _safe_text(task_id))
         await self._send_worker_message(
             {
                 "type": "task.progress",
@@ -81,8 +418,23 @@ class C360WorkerRuntime:
             }
         )
         self._log("task progress task_id=%s status=running" % _safe_text(task_id))
+        emitter = ProgressEmitter(
+            lambda event: self._send_progress(task_id, event),
+            min_interval_seconds=self.progress_interval_seconds,
+            event_logger=self._log,
+        )
+
+        async def invoke() -> Any:
+            try:
+                return await self._invoke_handler(dispatch, emitter)
+            finally:
+                await emitter.aclose()
+
+        return await self._run_handler(task_id, invoke())
+
+    async def _run_handler(self, task_id: str, call: Awaitable[Any]) -> Optional[DeferredTaskResult]:
         try:
-            result = await self.handlers.handle(dispatch)
+            result = await call
         except Exception as exc:
             await self._send_worker_message(
                 {
@@ -93,16 +445,18 @@ class C360WorkerRuntime:
                 }
             )
             self._log("task completed task_id=%s status=failed" % _safe_text(task_id))
-            return
+            return None
+        if isinstance(result, DeferredTaskResult):
+            for progress in result.progress:
+                await self._send_progress(task_id, progress)
+            self._log(
+                "task deferred task_id=%s resume_at=%s"
+                % (_safe_text(task_id), result.resume_at.strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            return result
         if isinstance(result, WorkerTaskResult):
             for progress in result.progress:
-                payload = {"type": "task.progress", "task_id": task_id}
-                payload.update(progress)
-                await self._send_worker_message(payload)
-                self._log(
-                    "task progress task_id=%s status=%s"
-                    % (_safe_text(task_id), _safe_text(progress.get("status")))
-                )
+                await self._send_progress(task_id, progress)
             await self._send_worker_message(
                 {
                     "type": "task.completed",
@@ -112,7 +466,7 @@ class C360WorkerRuntime:
                 }
             )
             self._log("task completed task_id=%s status=%s" % (_safe_text(task_id), _safe_text(result.status)))
-            return
+            return None
         await self._send_worker_message(
             {
                 "type": "task.completed",
@@ -122,12 +476,40 @@ class C360WorkerRuntime:
             }
         )
         self._log("task completed task_id=%s status=succeeded" % _safe_text(task_id))
+        return None
+
+    async def _invoke_handler(self, dispatch: Dict[str, Any], emitter: ProgressEmitter) -> Any:
+        if accepts_progress(self.handlers.handle):
+            outcome = self.handlers.handle(dispatch, progress=emitter)
+        else:
+            outcome = self.handlers.handle(dispatch)
+        if not hasattr(outcome, "__aiter__"):
+            return await outcome
+        result: Any = {}
+        async for item in outcome:
+            if isinstance(item, WorkerTaskResult):
+                result = item
+            elif isinstance(item, dict):
+                emitter.emit_event(item)
+        return result
+
+    async def _send_progress(self, task_id: str, event: Dict[str, Any]) -> None:
+        payload = {"type": "task.progress", "task_id": task_id}
+        payload.update(event)
+        await self._send_worker_message(payload)
+        self._log("task progress task_id=%s status=%s" % (_safe_text(task_id), _safe_text(event.get("status"))))
 
     async def _send_worker_message(self, payload: Dict[str, Any]) -> None:
         send_error = None
         reported = False
+        completion = payload.get("type") == "task.completed"
+        if completion:
+            # Kept until the reporter or a task.completed.ack confirms delivery.
+            self.outbox.add(payload)
         try:
-            await self.transport.send_json(payload)
+            # Dispatch tasks share one socket; frames must not interleave.
+            async with self._send_lock:
+                await self.transport.send_json(payload)
         except Exception as exc:
             send_error = exc
         if self.message_reporter is not None:
@@ -138,14 +520,28 @@ class C360WorkerRuntime:
                 reported = True
             except Exception as exc:
                 self._log("worker message reporter failed: %s" % _safe_text(exc))
+        if reported and completion and not self._reporter_confirms_delivery:
+            self.outbox.ack(payload.get("task_id"))
         if send_error is not None and not reported:
             raise send_error
 
+    def _message_delivered(self, payload: Dict[str, Any]) -> None:
+        if payload.get("type") == "task.completed" and self.outbox.ack(payload.get("task_id")):
+            self._log("task completion delivered task_id=%s" % _safe_text(payload.get("task_id")))
+
     def _log(self, message: str) -> None:
         if self.event_logger is not None:
             self.event_logger(_redact_string(message))
 
 
+def accepts_progress(handle: Callable[..., Any]) -> bool:
+    """Return True when ``handle`` takes the ``progress`` emitter argument."""
+    try:
+        return "progress" in inspect.signature(handle).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 def _safe_text(value: Any) -> str:
     return _redact_string(str(value or ""))
 
@@ -154,29 +550,186 @@ def _worker_completed_status(status: str) -> str:
     return "failed" if status in {"failed", "blocked"} else "succeeded"
 
 
+# Statuses meaning the batch endpoint is not deployed; fall back to one POST per message.
+BATCH_UNSUPPORTED_STATUSES = frozenset({404, 405, 501})
+# Statuses that will not change on retry; the message is dropped so it cannot block the queue.
+REJECTED_STATUSES = frozenset({400, 413, 422})
+
+
 class HttpWorkerMessageReporter:
-    def __init__(self, config: C360WorkerConfig, timeout_seconds: float = 10.0):
+    """Deliver worker messages over HTTP through a durable SQLite outbox.
+
+    Calling the reporter only appends the message to ``outbox``; one sender task posts
+    the backlog in ``seq`` order over a kept-alive connection, up to ``batch_size``
+    messages per request when the control plane serves the batch endpoint. While the
+    control plane is unreachable the sender backs off exponentially and messages stay
+    on disk, so they are delivered after an outage or a worker restart. Listeners
+    added with :meth:`add_delivery_listener` are called with each message once the
+    control plane has settled it. Outbox reads and writes run in a worker thread so
+    they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        config: C360WorkerConfig,
+        timeout_seconds: float = 10.0,
+        outbox: Optional[WorkerMessageOutbox] = None,
+        batch_size: int = 20,
+        retry_initial_seconds: float = 1.0,
+        retry_max_seconds: float = 60.0,
+        connection_factory: Optional[Callable[[], http.client.HTTPConnection]] = None,
+        event_logger: Optional[Callable[[str], None]] = None,
+    ):
         self.config = config
         self.timeout_seconds = timeout_seconds
+        self.outbox = outbox if outbox is not None else WorkerMessageOutbox(config.outbox_path)
+        self.batch_size = batch_size
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.event_logger = event_logger
         self.url = "%s/v1/rpa/workers/messages" % config.base_url.rstrip("/")
+        self.batch_url = self.url + "/batch"
+        self._connection_factory = connection_factory or self._connect
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._batch_supported: Optional[bool] = None
+        self._sender: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._delivery_listeners: List[Callable[[Dict[str, Any]], None]] = []
 
     async def __call__(self, payload: Dict[str, Any]) -> None:
-        await asyncio.to_thread(self._post, payload)
-
-    def _post(self, payload: Dict[str, Any]) -> None:
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        request = urllib.request.Request(
-            self.url,
-            data=body,
-            headers={
-                "Content-Type": "application/json",
-                "X-RPA-Worker-Token": self.config.worker_token,
-                "X-RPA-Worker-Id": self.config.worker_id,
-            },
-            method="POST",
-        )
-        with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+        await asyncio.to_thread(self.outbox.enqueue, payload)
+        self.start()
+        self._wakeup.set()
+
+    def add_delivery_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call ``listener`` on the event loop with each message the control plane settled."""
+        self._delivery_listeners.append(listener)
+
+    def start(self) -> None:
+        """Start the sender, which also flushes messages left from earlier runs."""
+        if self._sender is None or self._sender.done():
+            self._wakeup = asyncio.Event()
+            self._sender = asyncio.create_task(self._send_loop())
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the outbox is empty; return False if ``timeout`` passed first."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while await asyncio.to_thread(self.outbox.count):
+            if self._sender is None or self._sender.done():
+                self.start()
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def close(self, flush_timeout: float = 5.0) -> None:
+        if self._sender is not None:
+            await self.flush(flush_timeout)
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def _send_loop(self) -> None:
+        failures = 0
+        while True:
+            # Cleared before the read so a message queued meanwhile still wakes the sender.
+            self._wakeup.clear()
+            messages = await asyncio.to_thread(self.outbox.peek, self.batch_size)
+            if not messages:
+                await self._wakeup.wait()
+                continue
+            delivered, error = await asyncio.to_thread(self._deliver, messages)
+            self._notify_delivered([message for message in messages if message.seq in set(delivered)])
+            await asyncio.to_thread(self.outbox.ack, delivered)
+            if error is None:
+                failures = 0
+                continue
+            undelivered = [message.seq for message in messages if message.seq not in set(delivered)]
+            await asyncio.to_thread(self.outbox.mark_failed, undelivered, str(error))
+            delay = min(self.retry_initial_seconds * 2 ** min(failures, 16), self.retry_max_seconds)
+            failures += 1
+            self._log("worker message delivery failed pending=%s retry_in=%gs: %s" % (len(undelivered), delay, _safe_text(error)))
+            await asyncio.sleep(delay)
+
+    def _notify_delivered(self, messages: List[OutboxMessage]) -> None:
+        for message in messages:
+            for listener in self._delivery_listeners:
+                try:
+                    listener(dict(message.payload))
+                except Exception as exc:
+                    self._log("worker message delivery listener failed: %s" % _safe_text(exc))
+
+    def _deliver(self, messages: List[OutboxMessage]) -> Tuple[List[int], Optional[Exception]]:
+        if len(messages) > 1 and self._batch_supported is not False:
+            try:
+                status = self._post(self.batch_url, {"messages": [message.payload for message in messages]})
+            except Exception as exc:
+                return [], exc
+            if status not in BATCH_UNSUPPORTED_STATUSES:
+                self._batch_supported = True
+                return self._settle(messages, status)
+            self._batch_supported = False
+        delivered: List[int] = []
+        for message in messages:
+            try:
+                status = self._post(self.url, message.payload)
+            except Exception as exc:
+                return delivered, exc
+            settled, error = self._settle([message], status)
+            if error is not None:
+                return delivered, error
+            delivered.extend(settled)
+        return delivered, None
+
+    def _settle(self, messages: List[OutboxMessage], status: int) -> Tuple[List[int], Optional[Exception]]:
+        seqs = [message.seq for message in messages]
+        if 200 <= status < 300:
+            return seqs, None
+        if status in REJECTED_STATUSES:
+            self._log("worker message rejected status=%s dropped=%s" % (status, len(seqs)))
+            return seqs, None
+        return [], RuntimeError("control plane returned HTTP %s" % status)
+
+    def _post(self, url: str, body: Dict[str, Any]) -> int:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "X-RPA-Worker-Token": self.config.worker_token,
+            "X-RPA-Worker-Id": self.config.worker_id,
+        }
+        path = urlsplit(url).path
+        try:
+            return self._request(path, data, headers)
+        except (http.client.HTTPException, OSError):
+            # A kept-alive connection may have been closed by the server while idle.
+            return self._request(path, data, headers)
+
+    def _request(self, path: str, data: bytes, headers: Dict[str, str]) -> int:
+        if self._connection is None:
+            self._connection = self._connection_factory()
+        try:
+            self._connection.request("POST", path, body=data, headers=headers)
+            response = self._connection.getresponse()
+            # Reading the body to the end lets the connection be reused.
             response.read()
+        except (http.client.HTTPException, OSError):
+            self._connection.close()
+            self._connection = None
+            raise
+        return response.status
+
+    def _connect(self) -> http.client.HTTPConnection:
+        parsed = urlsplit(self.url)
+        connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        return connection_class(parsed.netloc, timeout=self.timeout_seconds)
+
+    def _log(self, message: str) -> None:
+        if self.event_logger is not None:
+            self.event_logger(_redact_string(message))
 
 
 class WebSocketsJsonTransport:
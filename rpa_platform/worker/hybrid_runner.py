@@ -1,18 +1,25 @@
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict, Optional
 
-from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.domain.state_machine import TaskStatus, TRANSITION_LOST
 from rpa_platform.integrations.jdy_admin_client import JdyAdminClient, JdyInstallRequest, OwnerCannotBindError
 from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.recheck_policy import RecheckPolicy
 from rpa_platform.worker.wecom_rpa import WecomReviewStatus, WecomRpa
 
 
 class HybridFlowRunner:
-    def __init__(self, store: SQLiteStore, jdy_client: JdyAdminClient, wecom_rpa: WecomRpa):
+    def __init__(
+        self,
+        store: SQLiteStore,
+        jdy_client: JdyAdminClient,
+        wecom_rpa: WecomRpa,
+        recheck_policy: Optional[RecheckPolicy] = None,
+    ):
         self.store = store
         self.jdy_client = jdy_client
         self.wecom_rpa = wecom_rpa
+        self.recheck_policy = recheck_policy or RecheckPolicy()
 
     def run_claimed_task(
         self,
@@ -20,15 +27,22 @@ class HybridFlowRunner:
         robot_id: str,
         now: Optional[datetime] = None,
     ) -> Dict[str, Any]:
-        current = TaskStatus(self.store.get_task(task_id)["status"])
+        task = self.store.get_task(task_id)
+        current = TaskStatus(task["status"])
         if current == TaskStatus.WAITING_WECOM_REVIEW:
             return self._check_review(task_id, robot_id, now)
         if current == TaskStatus.READY_TO_ONLINE:
             return self._submit_online(task_id, robot_id)
 
-        self.store.set_task_status(task_id, TaskStatus.RUNNING, assigned_robot_id=robot_id)
-        task = self.store.get_task(task_id)
-        for step in _snapshot_steps(task):
+        if not self.store.set_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            assigned_robot_id=robot_id,
+            expected=current,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
+        for step in self.store.get_flow_snapshot(task["flow_snapshot_hash"])["steps"]:
             if not step.get("enabled", True):
                 continue
             self.store.set_task_current_step(task_id, step["key"])
@@ -51,7 +65,14 @@ class HybridFlowRunner:
                 continue
             else:
                 raise ValueError("Unsupported hybrid action: %s" % action)
-        self.store.set_task_status(task_id, TaskStatus.SUCCESS, assigned_robot_id=None)
+        if not self.store.set_task_status(
+            task_id,
+            TaskStatus.SUCCESS,
+            assigned_robot_id=None,
+            expected=TaskStatus.RUNNING,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": TaskStatus.SUCCESS.value}
 
@@ -154,13 +175,21 @@ class HybridFlowRunner:
         output = {"review_status": result.get("review_status", "审核中")}
         self.store.merge_task_context(task_id, {"wecom": output})
         self.store.append_task_step(task_id, step["key"], step["name"], "success", output_data=output)
-        next_check = (now or datetime.now()) + timedelta(minutes=10)
-        self.store.set_task_status(
+        next_check = self.recheck_policy.next_check_at(
+            self.store,
+            task,
+            TaskStatus.WAITING_WECOM_REVIEW,
+            now or datetime.now(),
+        )
+        if not self.store.set_task_status(
             task_id,
             TaskStatus.WAITING_WECOM_REVIEW,
             next_check_at=next_check,
             assigned_robot_id=None,
-        )
+            expected=TaskStatus.RUNNING,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": TaskStatus.WAITING_WECOM_REVIEW.value}
 
@@ -178,16 +207,31 @@ class HybridFlowRunner:
         self.store.merge_task_context(task_id, {"wecom": output})
         self.store.append_task_step(task_id, "wecom_wait_review", "等待企微审核通过", "success", output_data=output)
         if status == WecomReviewStatus.READY_TO_ONLINE:
-            self.store.set_task_status(task_id, TaskStatus.READY_TO_ONLINE, assigned_robot_id=None)
+            if not self.store.set_task_status(
+                task_id,
+                TaskStatus.READY_TO_ONLINE,
+                assigned_robot_id=None,
+                expected=TaskStatus.WAITING_WECOM_REVIEW,
+                claimed_by=robot_id,
+            ):
+                return self._release_lost_task(task_id, robot_id)
             self.store.update_robot_status(robot_id, "idle")
             return {"task_id": task_id, "status": TaskStatus.READY_TO_ONLINE.value}
-        next_check = (now or datetime.now()) + timedelta(minutes=10)
-        self.store.set_task_status(
+        next_check = self.recheck_policy.next_check_at(
+            self.store,
+            task,
+            TaskStatus.WAITING_WECOM_REVIEW,
+            now or datetime.now(),
+        )
+        if not self.store.set_task_status(
             task_id,
             TaskStatus.WAITING_WECOM_REVIEW,
             next_check_at=next_check,
             assigned_robot_id=None,
-        )
+            expected=TaskStatus.WAITING_WECOM_REVIEW,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": TaskStatus.WAITING_WECOM_REVIEW.value}
 
@@ -199,7 +243,14 @@ class HybridFlowRunner:
         output = {"review_status": result.get("review_status", WecomReviewStatus.ONLINE.value)}
         self.store.merge_task_context(task_id, {"wecom": output})
         self.store.append_task_step(task_id, "wecom_submit_online", "企微待上线后提交上线", "success", output_data=output)
-        self.store.set_task_status(task_id, TaskStatus.SUCCESS, assigned_robot_id=None)
+        if not self.store.set_task_status(
+            task_id,
+            TaskStatus.SUCCESS,
+            assigned_robot_id=None,
+            expected=TaskStatus.READY_TO_ONLINE,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": TaskStatus.SUCCESS.value}
 
@@ -245,10 +296,17 @@ class HybridFlowRunner:
     ) -> Dict[str, Any]:
         self.store.append_task_step(task_id, step["key"], step["name"], status.value, output_data=output)
         self.store.create_manual_action(task_id, action_type=action_type, reason=reason, candidates=[])
-        self.store.set_task_status(task_id, status, assigned_robot_id=None)
+        if not self.store.set_task_status(
+            task_id,
+            status,
+            assigned_robot_id=None,
+            expected=TaskStatus.RUNNING,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": status.value, "reason": reason}
 
-
-def _snapshot_steps(task: Dict[str, Any]):
-    return json.loads(task["flow_version_snapshot_json"])["steps"]
+    def _release_lost_task(self, task_id: str, robot_id: str) -> Dict[str, Any]:
+        self.store.update_robot_status(robot_id, "idle")
+        return {"task_id": task_id, "status": TRANSITION_LOST}
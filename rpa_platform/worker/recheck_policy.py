@@ -0,0 +1,118 @@
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Mapping, Optional
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.storage.sqlite_store import SQLiteStore
+
+
+@dataclass(frozen=True)
+class RecheckSchedule:
+    initial_seconds: float
+    max_seconds: float
+    multiplier: float = 2.0
+
+
+DEFAULT_RECHECK_SCHEDULES = {
+    TaskStatus.WAITING_WECOM_REVIEW: RecheckSchedule(initial_seconds=600, max_seconds=3600),
+    TaskStatus.WAITING_WECOM_ONLINE_DELAY: RecheckSchedule(initial_seconds=120, max_seconds=900),
+}
+RECHECK_ENV_PREFIXES = {
+    TaskStatus.WAITING_WECOM_REVIEW: "RPA_WECOM_REVIEW_RECHECK",
+    TaskStatus.WAITING_WECOM_ONLINE_DELAY: "RPA_WECOM_ONLINE_DELAY_RECHECK",
+}
+
+
+class RecheckPolicy:
+    """Decide when a task parked in a waiting status is probed again.
+
+    The delay grows by ``multiplier`` per ``check_attempts`` up to the per-status cap.
+    Once enough waits have been recorded, a task that has waited less than the typical
+    time to approval jumps ``history_fraction`` of the remaining gap instead, so robots
+    stop probing tasks that are almost certainly still in review. The result is jittered
+    downwards by up to ``jitter_ratio`` so tasks parked together do not come due together.
+    """
+
+    def __init__(
+        self,
+        schedules: Optional[Mapping[TaskStatus, RecheckSchedule]] = None,
+        jitter_ratio: float = 0.2,
+        history_fraction: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ):
+        if not 0 <= jitter_ratio < 1:
+            raise ValueError("jitter_ratio must be in [0, 1)")
+        if not 0 <= history_fraction <= 1:
+            raise ValueError("history_fraction must be between 0 and 1")
+        self.schedules: Dict[TaskStatus, RecheckSchedule] = dict(DEFAULT_RECHECK_SCHEDULES)
+        self.schedules.update(schedules or {})
+        self.jitter_ratio = jitter_ratio
+        self.history_fraction = history_fraction
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "RecheckPolicy":
+        source = env if env is not None else os.environ
+        schedules = {}
+        for status, prefix in RECHECK_ENV_PREFIXES.items():
+            default = DEFAULT_RECHECK_SCHEDULES[status]
+            schedules[status] = RecheckSchedule(
+                initial_seconds=_non_negative_float(source, prefix + "_INITIAL_SECONDS", default.initial_seconds),
+                max_seconds=_non_negative_float(source, prefix + "_MAX_SECONDS", default.max_seconds),
+                multiplier=_non_negative_float(source, prefix + "_MULTIPLIER", default.multiplier),
+            )
+        return cls(
+            schedules=schedules,
+            jitter_ratio=_non_negative_float(source, "RPA_RECHECK_JITTER_RATIO", 0.2),
+        )
+
+    def delay_seconds(
+        self,
+        status: TaskStatus,
+        attempts: int,
+        waited_seconds: float = 0.0,
+        typical_wait_seconds: Optional[float] = None,
+    ) -> float:
+        schedule = self.schedules[TaskStatus(status)]
+        delay = schedule.initial_seconds * schedule.multiplier ** max(attempts, 0)
+        if typical_wait_seconds is not None and waited_seconds < typical_wait_seconds:
+            delay = max(delay, (typical_wait_seconds - waited_seconds) * self.history_fraction)
+        delay = min(delay, schedule.max_seconds)
+        return delay * (1 - self.jitter_ratio * self.rng.random())
+
+    def next_check_at(
+        self,
+        store: SQLiteStore,
+        task: Dict[str, Any],
+        status: TaskStatus,
+        now: datetime,
+        not_before: Optional[datetime] = None,
+    ) -> datetime:
+        """Return the next check time for ``task`` parking in ``status``, using recorded waits."""
+        wait_started_ms = task.get("wait_started_at_ms")
+        waited_seconds = max(now.timestamp() - wait_started_ms / 1000.0, 0.0) if wait_started_ms else 0.0
+        delay = self.delay_seconds(
+            status,
+            int(task.get("check_attempts") or 0),
+            waited_seconds=waited_seconds,
+            typical_wait_seconds=store.get_wait_duration_quantile(status),
+        )
+        next_check = now + timedelta(seconds=delay)
+        if not_before is not None and next_check < not_before:
+            return not_before
+        return next_check
+
+
+def _non_negative_float(source: Mapping[str, str], key: str, default: float) -> float:
+    raw = source.get(key)
+    if raw is None or raw == "":
+        return default
+    try:
+        value = float(raw)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("%s must be a number" % key) from exc
+    if value < 0:
+        raise ValueError("%s must be non-negative" % key)
+    return value
@@ -0,0 +1,122 @@
+import json
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
+from rpa_platform.storage.sqlite_store import SQLiteStore, TaskRecheckUpdate
+from rpa_platform.worker.recheck_policy import RecheckPolicy
+
+
+# WeCom online-order statuses the batch check can settle on its own. Any other status
+# (rejected, or one not seen before) is left to the per-task robot check. A new order
+# is already at status 1, so for an online-delay wait it means "ready to submit".
+REVIEWING_ORDER_STATUS = 1
+ONLINE_ORDER_STATUS = 5
+
+
+class WecomReviewBatchChecker:
+    """Re-check every due WeCom wait of one suite with a few admin list calls.
+
+    Due ``waiting_wecom_review`` and ``waiting_wecom_online_delay`` tasks are matched to
+    the suite's custom apps by ``wecom.app_id`` and judged by the app's online-order
+    status, all in one transaction: review waits whose order is still under review
+    (status 1) are pushed back by the recheck policy and orders already online
+    (status 5) finish the task. Online-delay waits at status 1 still need the robot to
+    submit the order, so they stay due like tasks with any other status or that cannot
+    be matched; one still unclaimed at the next pass is pushed back by the recheck
+    policy so a wait no robot picks up is not listed again on every pass.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteStore,
+        wecom_client: WecomAdminClient,
+        suiteid: int,
+        recheck_policy: Optional[RecheckPolicy] = None,
+        page_size: int = 100,
+        event_logger: Optional[Callable[[str], None]] = None,
+    ):
+        self.store = store
+        self.wecom_client = wecom_client
+        self.suiteid = suiteid
+        self.recheck_policy = recheck_policy or RecheckPolicy()
+        self.page_size = page_size
+        self.event_logger = event_logger
+        # Task id -> next_check_at_ms of the waits handed to robots by the previous pass.
+        self._handed_off: Dict[str, int] = {}
+
+    def check_due(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        current_time = now or datetime.now()
+        candidates = []
+        for task in self.store.list_due_waiting_tasks(now=current_time):
+            wecom = json.loads(task.get("runtime_context_json") or "{}").get("wecom", {})
+            if wecom.get("app_id") and str(wecom.get("suiteid", "")) == str(self.suiteid):
+                candidates.append((task, str(wecom["app_id"])))
+        summary = {"checked": len(candidates), "rescheduled": 0, "succeeded": 0, "handed_off": 0, "held": 0}
+        if not candidates:
+            self._handed_off = {}
+            return summary
+
+        apps = {
+            app.app_id: app
+            for app in self.wecom_client.list_custom_apps(
+                self.suiteid,
+                app_ids={app_id for _, app_id in candidates},
+                page_size=self.page_size,
+            )
+        }
+        updates: List[TaskRecheckUpdate] = []
+        handed_off: Dict[str, int] = {}
+        for task, app_id in candidates:
+            app = apps.get(app_id)
+            order_status = app.auditorder_status if app is not None else None
+            status = TaskStatus(task["status"])
+            if order_status == ONLINE_ORDER_STATUS:
+                updates.append(
+                    TaskRecheckUpdate(
+                        task_id=task["id"],
+                        expected_status=status,
+                        status=TaskStatus.SUCCESS,
+                        step_output={"app_id": app_id, "auditorder_status": order_status},
+                    )
+                )
+                summary["succeeded"] += 1
+                continue
+            if order_status != REVIEWING_ORDER_STATUS or status != TaskStatus.WAITING_WECOM_REVIEW:
+                if self._handed_off.get(task["id"]) != task["next_check_at_ms"]:
+                    handed_off[task["id"]] = task["next_check_at_ms"]
+                    summary["handed_off"] += 1
+                    continue
+                # Handed off last pass and still unclaimed: back off like an unchanged wait.
+                summary["held"] += 1
+            else:
+                summary["rescheduled"] += 1
+            # The check happened here, so it counts towards the backoff.
+            checked_task = dict(task, check_attempts=int(task["check_attempts"] or 0) + 1)
+            updates.append(
+                TaskRecheckUpdate(
+                    task_id=task["id"],
+                    expected_status=status,
+                    status=status,
+                    next_check_at=self.recheck_policy.next_check_at(self.store, checked_task, status, current_time),
+                )
+            )
+        self.store.apply_task_rechecks(updates, now=current_time)
+        self._handed_off = handed_off
+        self._log(
+            "review batch check suiteid=%s checked=%s rescheduled=%s succeeded=%s handed_off=%s held=%s"
+            % (
+                self.suiteid,
+                summary["checked"],
+                summary["rescheduled"],
+                summary["succeeded"],
+                summary["handed_off"],
+                summary["held"],
+            )
+        )
+        return summary
+
+    def _log(self, message: str) -> None:
+        if self.event_logger is not None:
+            self.event_logger(message)
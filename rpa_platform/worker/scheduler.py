@@ -1,7 +1,9 @@
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Optional, Protocol
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence
 
-from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.storage.sqlite_store import DEFAULT_TASK_LEASE_SECONDS, SQLiteStore
 
 
 class ClaimedTaskRunner(Protocol):
@@ -25,19 +27,57 @@ class TaskScheduler:
     ) -> Optional[Dict[str, Any]]:
         return self.store.claim_next_runnable_task(robot_id, now=now)
 
+    def claim_tasks(
+        self,
+        robot_ids: Sequence[str],
+        now: Optional[datetime] = None,
+        lease_seconds: float = DEFAULT_TASK_LEASE_SECONDS,
+    ) -> List[Dict[str, Any]]:
+        return self.store.claim_runnable_tasks(robot_ids, now=now, lease_seconds=lease_seconds)
+
     def run_once(
         self,
         robot_id: str,
         runner: ClaimedTaskRunner,
         now: Optional[datetime] = None,
+        lease_seconds: float = DEFAULT_TASK_LEASE_SECONDS,
     ) -> Dict[str, Any]:
-        claimed = self.claim_next_task(robot_id, now=now)
-        if claimed is None:
+        """Claim one task for ``robot_id`` and run it inline.
+
+        The claim's lease is kept alive from a background thread while the runner works,
+        so a lease reaper elsewhere (e.g. the server's SchedulerService) does not requeue
+        a run that simply takes longer than ``lease_seconds``.
+        """
+        claimed_tasks = self.claim_tasks([robot_id], now=now, lease_seconds=lease_seconds)
+        if not claimed_tasks:
             return {"claimed": False, "robot_id": robot_id}
-        runner_result = runner.run_claimed_task(claimed["id"], robot_id, now=now)
+        claimed = claimed_tasks[0]
+        with _heartbeating(self.store, robot_id, lease_seconds):
+            runner_result = runner.run_claimed_task(claimed["id"], robot_id, now=now)
         return {
             "claimed": True,
             "robot_id": robot_id,
             "task_id": claimed["id"],
             "runner_result": runner_result,
         }
+
+
+@contextmanager
+def _heartbeating(store: SQLiteStore, robot_id: str, lease_seconds: float) -> Iterator[None]:
+    stopped = threading.Event()
+
+    def beat() -> None:
+        while not stopped.wait(lease_seconds / 3):
+            try:
+                store.heartbeat_robot(robot_id, lease_seconds=lease_seconds)
+            except Exception:
+                # A missed beat only shortens the lease; the next one extends it again.
+                continue
+
+    thread = threading.Thread(target=beat, name="rpa-lease-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,305 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.storage.sqlite_store import DEFAULT_TASK_LEASE_SECONDS, SQLiteStore
+from rpa_platform.worker.review_batch_checker import WecomReviewBatchChecker
+from rpa_platform.worker.scheduler import ClaimedTaskRunner, TaskScheduler
+
+
+# Floor for a computed wait so a deadline that is due but not yet claimable cannot spin.
+MIN_WAIT_SECONDS = 0.01
+LATENCY_SAMPLE_SIZE = 256
+
+
+class SchedulerService:
+    """Long-running dispatcher that keeps every idle robot in the robots table busy.
+
+    The loop claims tasks for idle robots, hands them to ``runner`` on a thread pool and
+    then sleeps until the earliest ``next_check_at`` of a waiting task, a new-task
+    notification or a worker finishing, whichever comes first. A deadline that was
+    already due when the last dispatch claimed nothing (robots busy or held elsewhere,
+    team at its concurrency cap) is not slept towards again. ``max_idle_seconds``
+    bounds the sleep so writes made by other processes are still picked up.
+
+    Every ``reap_interval_seconds`` the loop heartbeats the robots it is running tasks
+    for and requeues claims whose lease expired, e.g. after another worker died.
+    With a ``review_checker`` due WeCom waits are settled in bulk before each dispatch,
+    so robots are only claimed for the tasks that became actionable. A runner that
+    raises fails its still-claimed task; a failing loop iteration is logged and retried.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteStore,
+        runner: ClaimedTaskRunner,
+        max_workers: int = 4,
+        max_idle_seconds: float = 60.0,
+        lease_seconds: float = DEFAULT_TASK_LEASE_SECONDS,
+        reap_interval_seconds: float = 5.0,
+        review_checker: Optional[WecomReviewBatchChecker] = None,
+        event_logger: Optional[Callable[[str], None]] = None,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive")
+        if reap_interval_seconds >= lease_seconds:
+            raise ValueError("reap_interval_seconds must be shorter than lease_seconds")
+        self.store = store
+        self.runner = runner
+        self.scheduler = TaskScheduler(store)
+        self.max_workers = max_workers
+        self.max_idle_seconds = max_idle_seconds
+        self.lease_seconds = lease_seconds
+        self.reap_interval_seconds = reap_interval_seconds
+        self.review_checker = review_checker
+        self.event_logger = event_logger
+        self._next_maintenance = 0.0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._notified_at: Optional[float] = None
+        self._worker_finished = False
+        # Deadlines at or before this were due at the last dispatch, which claimed nothing.
+        self._unclaimable_due_ms: Optional[int] = None
+        self._running_robots: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._counters = {
+            "claimed": 0,
+            "completed": 0,
+            "failed": 0,
+            "reaped": 0,
+        }
+        self._wakeups = {
+            "notify": 0,
+            "due": 0,
+            "worker": 0,
+            "idle": 0,
+        }
+        self._due_latency_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self._notify_latency_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("SchedulerService already started")
+        self._thread = threading.Thread(target=self.run_forever, name="rpa-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def notify_new_task(self, task_id: Optional[str] = None) -> None:
+        """Wake the loop early; safe to call from the webhook request thread."""
+        with self._condition:
+            if self._notified_at is None:
+                self._notified_at = time.monotonic()
+            self._condition.notify_all()
+
+    def run_forever(self) -> None:
+        self._started_at = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rpa-scheduler-task")
+        try:
+            while not self._stopping:
+                try:
+                    if time.monotonic() >= self._next_maintenance:
+                        self.maintain_leases()
+                        self._next_maintenance = time.monotonic() + self.reap_interval_seconds
+                    self._check_reviews()
+                    self.dispatch_ready()
+                    self._wait_for_work()
+                except Exception as exc:
+                    # A transient store error (e.g. database locked) must not end the loop.
+                    self._log("scheduler loop iteration failed error=%s" % exc)
+                    self._pause_after_error()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def dispatch_ready(self, now: Optional[datetime] = None) -> int:
+        """Claim tasks for every idle robot with a free worker in one batch and start them."""
+        with self._condition:
+            notified_at = self._notified_at
+            self._notified_at = None
+            running = set(self._running_robots)
+        claim_time = now or datetime.now()
+        free_workers = self.max_workers - len(running)
+        robot_ids = [
+            robot["id"]
+            for robot in self.store.list_robots(status="idle")
+            if robot["id"] not in running
+        ][:max(free_workers, 0)]
+        claimed_tasks = (
+            self.scheduler.claim_tasks(robot_ids, now=claim_time, lease_seconds=self.lease_seconds) if robot_ids else []
+        )
+        self._unclaimable_due_ms = None if claimed_tasks else int(claim_time.timestamp() * 1000)
+        for index, claimed in enumerate(claimed_tasks):
+            robot_id = claimed["assigned_robot_id"]
+            self._record_claim(claimed, claim_time, notified_at if index == 0 else None)
+            with self._condition:
+                self._running_robots.add(robot_id)
+            self._submit(claimed["id"], robot_id)
+        return len(claimed_tasks)
+
+    def maintain_leases(self, now: Optional[datetime] = None) -> int:
+        """Heartbeat robots running tasks in this process, then requeue expired claims."""
+        with self._condition:
+            running = list(self._running_robots)
+        for robot_id in running:
+            self.store.heartbeat_robot(robot_id, lease_seconds=self.lease_seconds, now=now)
+        reaped = self.store.reap_expired_leases(now=now)
+        for item in reaped:
+            self._log("scheduler reaped expired lease task_id=%s robot_id=%s" % (item["task_id"], item["robot_id"]))
+        with self._condition:
+            self._counters["reaped"] += len(reaped)
+        return len(reaped)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            uptime = time.monotonic() - self._started_at if self._started_at is not None else 0.0
+            completed = self._counters["completed"]
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "uptime_seconds": round(uptime, 3),
+                "max_workers": self.max_workers,
+                "busy_workers": len(self._running_robots),
+                "claimed_total": self._counters["claimed"],
+                "completed_total": completed,
+                "failed_total": self._counters["failed"],
+                "reaped_total": self._counters["reaped"],
+                "throughput_per_minute": round(completed * 60.0 / uptime, 3) if uptime else 0.0,
+                "wakeups": dict(self._wakeups),
+                "wake_latency_ms": {
+                    "due": _latency_summary(self._due_latency_ms),
+                    "notify": _latency_summary(self._notify_latency_ms),
+                },
+            }
+
+    def _check_reviews(self) -> None:
+        if self.review_checker is None:
+            return
+        try:
+            self.review_checker.check_due()
+        except Exception as exc:
+            # Robots still re-check the due tasks one by one.
+            self._log("scheduler review batch check failed error=%s" % exc)
+
+    def _submit(self, task_id: str, robot_id: str) -> None:
+        if self._executor is None:
+            # dispatch_ready used outside run_forever: run inline.
+            self._run_task(task_id, robot_id)
+            return
+        self._executor.submit(self._run_task, task_id, robot_id)
+
+    def _run_task(self, task_id: str, robot_id: str) -> None:
+        outcome = "failed"
+        try:
+            self.runner.run_claimed_task(task_id, robot_id)
+            outcome = "completed"
+        except Exception as exc:
+            self._log("scheduler runner failed task_id=%s robot_id=%s error=%s" % (task_id, robot_id, exc))
+            try:
+                self._fail_claimed_task(task_id, robot_id, exc)
+            except Exception as release_exc:
+                # The claim keeps its lease and is requeued by the reaper once it expires.
+                self._log("scheduler failed to release task_id=%s error=%s" % (task_id, release_exc))
+        finally:
+            with self._condition:
+                self._counters[outcome] += 1
+                self._running_robots.discard(robot_id)
+                self._worker_finished = True
+                self._condition.notify_all()
+
+    def _fail_claimed_task(self, task_id: str, robot_id: str, exc: Exception) -> None:
+        """Fail a task whose runner raised while it was still claimed, and free its robot.
+
+        The write is a compare-and-swap on the claimed statuses and clears the lease, so
+        the reaper does not requeue the task into the same error over and over; a runner
+        that already moved the task on keeps its own status.
+        """
+        self.store.append_task_step(
+            task_id,
+            "scheduler_dispatch",
+            "调度执行异常",
+            "failed",
+            output_data={"error_type": exc.__class__.__name__, "error_message": str(exc)},
+        )
+        self.store.set_task_status(
+            task_id,
+            TaskStatus.FAILED,
+            assigned_robot_id=None,
+            expected=(TaskStatus.CHECKING_LOGIN, TaskStatus.RUNNING),
+            claimed_by=robot_id,
+        )
+        self.store.update_robot_status(robot_id, "idle")
+
+    def _pause_after_error(self) -> None:
+        with self._condition:
+            if not self._stopping:
+                self._condition.wait(min(self.reap_interval_seconds, self.max_idle_seconds))
+
+    def _wait_for_work(self) -> None:
+        timeout, due_ms = self._next_wait()
+        with self._condition:
+            if self._stopping or self._notified_at is not None or self._worker_finished:
+                reason = "notify" if self._notified_at is not None else "worker"
+            else:
+                self._condition.wait(timeout)
+                if self._notified_at is not None:
+                    reason = "notify"
+                elif self._worker_finished:
+                    reason = "worker"
+                elif due_ms is not None and time.time() * 1000 >= due_ms:
+                    reason = "due"
+                else:
+                    reason = "idle"
+            self._worker_finished = False
+            if not self._stopping:
+                self._wakeups[reason] += 1
+
+    def _next_wait(self) -> Tuple[float, Optional[int]]:
+        idle_timeout = self.max_idle_seconds
+        if self._next_maintenance:
+            idle_timeout = min(idle_timeout, max(self._next_maintenance - time.monotonic(), MIN_WAIT_SECONDS))
+        with self._condition:
+            saturated = len(self._running_robots) >= self.max_workers
+        if saturated:
+            # A due deadline is not actionable until a worker frees up.
+            return idle_timeout, None
+        due_ms = self.store.get_next_due_check_ms()
+        if due_ms is None or (self._unclaimable_due_ms is not None and due_ms <= self._unclaimable_due_ms):
+            # Still unclaimable until a robot frees up or a task arrives, both of which wake the loop.
+            return idle_timeout, None
+        until_due = max(due_ms / 1000.0 - time.time(), MIN_WAIT_SECONDS)
+        return min(until_due, idle_timeout), due_ms
+
+    def _record_claim(self, claimed: Dict[str, Any], claim_time: datetime, notified_at: Optional[float]) -> None:
+        with self._condition:
+            self._counters["claimed"] += 1
+            due_ms = claimed.get("next_check_at_ms")
+            if due_ms:
+                self._due_latency_ms.append(max(claim_time.timestamp() * 1000 - due_ms, 0.0))
+            elif notified_at is not None:
+                self._notify_latency_ms.append((time.monotonic() - notified_at) * 1000)
+
+    def _log(self, message: str) -> None:
+        if self.event_logger is not None:
+            self.event_logger(message)
+
+
+def _latency_summary(samples: Deque[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"samples": 0, "p50": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "samples": len(ordered),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "max": round(ordered[-1], 3),
+    }
@@ -0,0 +1,172 @@
+import heapq
+import itertools
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rpa_platform.integrations.custom_app_index import CustomAppIndex, IndexedWecomAdminClient
+from rpa_platform.integrations.jdy_admin_client import JdyAdminClient
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
+from rpa_platform.services.wecom_bind_service import WecomSecretGenerator
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore
+from rpa_platform.worker.bind_write_locks import BindWriteLockManager
+from rpa_platform.worker.wecom_bind_real_recovery import build_bind_input_from_context
+from rpa_platform.worker.wecom_bind_unattended_write import (
+    _continuation,
+    _is_success_context,
+    _parse_datetime,
+    _write_failed_result,
+    default_context_store,
+    default_lock_manager,
+    resume_unattended_wecom_bind_write,
+    run_unattended_wecom_bind_write,
+)
+from scripts.dev.check_wecom_bind_real_readonly import run_readonly_preflight
+
+
+DEFAULT_BULK_RESOLVE_WORKERS = 4
+DEFAULT_BULK_WRITE_WORKERS = 2
+
+BulkBindItem = Tuple[str, Dict[str, Any]]
+
+
+def run_bulk_wecom_bind_write(
+    items: Sequence[BulkBindItem],
+    jdy_client: JdyAdminClient,
+    wecom_client: WecomAdminClient,
+    secret_generator: WecomSecretGenerator,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    preflight_runner: Optional[Callable[..., Dict[str, Any]]] = None,
+    context_store: Optional[BindWriteContextStore] = None,
+    locks: Optional[BindWriteLockManager] = None,
+    wait_seconds: int = 300,
+    resolve_workers: int = DEFAULT_BULK_RESOLVE_WORKERS,
+    write_workers: int = DEFAULT_BULK_WRITE_WORKERS,
+    clock: Callable[[], datetime] = datetime.now,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, Any]:
+    """Run the unattended bind write for many ``(task_id, context)`` enterprises with one pair of clients.
+
+    The suite's custom apps are listed once and served from a :class:`CustomAppIndex`;
+    readonly preflights (JDY corp, owner and app resolution) run on ``resolve_workers``
+    threads. Each enterprise's write starts on ``write_workers`` threads as soon as its
+    preflight is done and, as with ``defer``, leaves the online-order submit pending;
+    submits run once their delay expires, so the delays of all enterprises overlap.
+    Each enterprise goes through :func:`run_unattended_wecom_bind_write`, keeping its
+    lock, context store and result shape; ``on_result`` receives every final result as
+    soon as it is known. A context store without a cipher raises ``RuntimeError``
+    before any enterprise starts.
+    """
+    if resolve_workers < 1 or write_workers < 1:
+        raise ValueError("resolve_workers and write_workers must be at least 1")
+    contexts = dict(items)
+    if len(contexts) != len(items):
+        raise ValueError("bulk bind task ids must be unique")
+    context_store = context_store or default_context_store()
+    context_store.check_cipher()
+    locks = locks or default_lock_manager()
+    preflight_runner = preflight_runner or run_readonly_preflight
+    index = CustomAppIndex(wecom_client)
+    indexed_wecom_client = IndexedWecomAdminClient(wecom_client, index)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def preflight(context: Dict[str, Any]) -> Callable[..., Dict[str, Any]]:
+        # Errors are replayed inside the write so they are reported the way a single write reports them.
+        try:
+            outcome = preflight_runner(
+                build_bind_input_from_context(context),
+                jdy_client=jdy_client,
+                wecom_client=indexed_wecom_client,
+            )
+        except Exception as exc:
+            error = exc
+
+            def replay_error(*_args: Any, **_kwargs: Any) -> Dict[str, Any]:
+                raise error
+
+            return replay_error
+        return lambda *_args, **_kwargs: outcome
+
+    def write(task_id: str, replay: Optional[Callable[..., Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            return run_unattended_wecom_bind_write(
+                task_id=task_id,
+                context=contexts[task_id],
+                jdy_client=jdy_client,
+                wecom_client=indexed_wecom_client,
+                secret_generator=secret_generator,
+                preflight_runner=replay,
+                context_store=context_store,
+                locks=locks,
+                now=clock(),
+                wait_seconds=wait_seconds,
+                defer=True,
+            )
+        except Exception as exc:
+            # Raised before the write's own handling, e.g. by an unparsable context.
+            return _write_failed_result(exc)
+
+    def resume(task_id: str) -> Dict[str, Any]:
+        try:
+            return resume_unattended_wecom_bind_write(
+                task_id=task_id,
+                context=contexts[task_id],
+                jdy_client=jdy_client,
+                wecom_client=indexed_wecom_client,
+                secret_generator=secret_generator,
+                context_store=context_store,
+                locks=locks,
+                now=clock(),
+            )
+        except Exception as exc:
+            return _write_failed_result(exc)
+
+    def report(task_id: str, result: Dict[str, Any]) -> None:
+        results[task_id] = result
+        if on_result is not None:
+            on_result(task_id, result)
+
+    due: List[Tuple[datetime, int, str]] = []
+    sequence = itertools.count()
+    running: Dict[Future, Tuple[str, str]] = {}
+    with ThreadPoolExecutor(resolve_workers, thread_name_prefix="bulk-bind-resolve") as resolver, ThreadPoolExecutor(
+        write_workers, thread_name_prefix="bulk-bind-write"
+    ) as writer:
+        for task_id, _context in items:
+            existing = context_store.load(task_id)
+            if _is_success_context(existing) or _continuation(existing):
+                # Completed or already waiting for its submit: no preflight needed.
+                running[writer.submit(write, task_id, None)] = ("write", task_id)
+            else:
+                running[resolver.submit(preflight, contexts[task_id])] = ("preflight", task_id)
+        while running or due:
+            now = clock()
+            while due and due[0][0] <= now:
+                _resume_at, _seq, task_id = heapq.heappop(due)
+                running[writer.submit(resume, task_id)] = ("write", task_id)
+            timeout = (due[0][0] - now).total_seconds() if due else None
+            if not running:
+                sleep(max(timeout or 0.0, 0.0))
+                continue
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, task_id = running.pop(future)
+                if stage == "preflight":
+                    running[writer.submit(write, task_id, future.result())] = ("write", task_id)
+                    continue
+                result = future.result()
+                if result.get("status") == "online_delay_pending":
+                    heapq.heappush(due, (_parse_datetime(result["resume_at"]), next(sequence), task_id))
+                    continue
+                report(task_id, result)
+
+    statuses = Counter(str(result.get("status") or "") for result in results.values())
+    return {
+        "mode": "bulk_unattended_write",
+        "total": len(items),
+        "statuses": dict(sorted(statuses.items())),
+        "custom_app_index": index.stats(),
+        "results": [{"task_id": task_id, **results[task_id]} for task_id, _context in items],
+    }
@@ -1,7 +1,10 @@
+from functools import cached_property
 from pathlib import Path
 import os
-from typing import Any, Callable, Dict, Mapping, Optional
+import threading
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
+from rpa_platform.integrations.resolution_cache import ResolutionCache, shared_resolution_cache, with_resolution_cache
 from rpa_platform.notifications.wecom_bot import WecomBotClient
 from rpa_platform.services.wecom_bind_service import (
     DEFAULT_WECOM_SUITEID,
@@ -9,6 +12,7 @@ from rpa_platform.services.wecom_bind_service import (
     JdyWecomBindInput,
     RandomWecomSecretGenerator,
 )
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore
 from rpa_platform.worker.wecom_bind_recovery_handler import WecomBindRecoveryTaskHandler
 from rpa_platform.worker.wecom_login_recovery import (
     GenericQrLoginNotifier,
@@ -67,24 +71,29 @@ class RealWecomBindUnattendedWriteRecovery:
         env: Optional[Mapping[str, str]] = None,
         wait_seconds: int = 300,
         login_recovery_factory: Optional[Callable[[Dict[str, Any]], Any]] = None,
-        clients_builder: Callable[..., Dict[str, Any]] = build_real_clients,
+        clients_builder: Optional[Callable[..., Dict[str, Any]]] = None,
         write_runner: Optional[Callable[..., Dict[str, Any]]] = None,
+        defer_online_delay: bool = False,
+        context_store: Optional[BindWriteContextStore] = None,
     ):
         self.env = dict(os.environ if env is None else env)
         self.wait_seconds = wait_seconds
         self.login_recovery_factory = login_recovery_factory
-        self.clients_builder = clients_builder
+        self.clients_builder = clients_builder or shared_real_clients
         self.write_runner = write_runner
+        # Return online_delay_pending instead of sleeping; the caller then calls resume().
+        self.defer_online_delay = defer_online_delay
+        # None lets the write runner use its default SQLite context store.
+        self.context_store = context_store
 
-    def run(self, task_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def run(self, task_id: str, context: Dict[str, Any], progress: Any = None) -> Dict[str, Any]:
         context = _with_default_userid(context, self.env)
         missing = _missing_required_fields(context)
         if missing:
             return _missing_required_business_result(missing, mode="unattended_write")
 
         from rpa_platform.worker.wecom_bind_unattended_write import (
-            default_context_file,
-            default_lock_file,
+            default_lock_manager,
             run_unattended_wecom_bind_write,
         )
 
@@ -97,22 +106,13 @@ class RealWecomBindUnattendedWriteRecovery:
             return result
 
         try:
-            clients = self.clients_builder(
-                jdy_cookie_file=str(context.get("jdy_cookie_file") or self.env.get("JDY_ADMIN_COOKIE_FILE") or ""),
-                wecom_cookie_file=str(
-                    context.get("wecom_cookie_file")
-                    or self.env.get("WECOM_ADMIN_COOKIE_FILE")
-                    or ""
-                ),
-            )
+            clients = self._build_clients(context)
         except Exception as exc:
-            return {
-                "mode": "unattended_write",
-                "status": "blocked",
-                "reason": "missing_cookie_source",
-                "detail": str(exc),
-            }
+            return _missing_cookie_source_result(exc)
         runner = self.write_runner or run_unattended_wecom_bind_write
+        if progress is not None:
+            progress.emit("readonly_preflight_completed", "wecom bind readonly preflight completed")
+            progress.emit("real_write_started", "wecom bind unattended real write started")
         result = runner(
             task_id=task_id,
             context=context,
@@ -121,17 +121,59 @@ class RealWecomBindUnattendedWriteRecovery:
             secret_generator=RandomWecomSecretGenerator(),
             preflight_runner=lambda *_args, **_kwargs: recoverable_preflight,
             login_recovery=recoverable_preflight.get("login_recovery", {}),
-            context_file=default_context_file(task_id),
-            lock_file=default_lock_file(),
+            context_store=self.context_store,
+            locks=default_lock_manager(),
             wait_seconds=self.wait_seconds,
+            defer=self.defer_online_delay,
+        )
+        _copy_userid_source(result, context)
+        return result
+
+    def resume(self, task_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit the online order of a write that ``run`` left ``online_delay_pending``."""
+        from rpa_platform.worker.wecom_bind_unattended_write import (
+            default_lock_manager,
+            resume_unattended_wecom_bind_write,
+        )
+
+        context = _with_default_userid(context, self.env)
+        try:
+            clients = self._build_clients(context)
+        except Exception as exc:
+            return _missing_cookie_source_result(exc)
+        result = resume_unattended_wecom_bind_write(
+            task_id=task_id,
+            context=context,
+            jdy_client=clients["jdy_client"],
+            wecom_client=clients["wecom_client"],
+            secret_generator=RandomWecomSecretGenerator(),
+            context_store=self.context_store,
+            locks=default_lock_manager(),
         )
         _copy_userid_source(result, context)
         return result
 
+    def _build_clients(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return self.clients_builder(
+            jdy_cookie_file=str(context.get("jdy_cookie_file") or self.env.get("JDY_ADMIN_COOKIE_FILE") or ""),
+            wecom_cookie_file=str(
+                context.get("wecom_cookie_file")
+                or self.env.get("WECOM_ADMIN_COOKIE_FILE")
+                or ""
+            ),
+        )
+
     def _build_login_recovery(self, context: Dict[str, Any]) -> Any:
         if self.login_recovery_factory is not None:
             return self.login_recovery_factory(context)
-        return _build_chained_login_recovery(self.env, context)
+        return _build_chained_login_recovery(self.env, context, self._login_components)
+
+    @cached_property
+    def _login_components(self) -> Tuple["LoginRecoveryComponents", "LoginRecoveryComponents"]:
+        return (
+            _jdy_login_components(_jdy_login_recovery_config_from_env(self.env)),
+            _wecom_login_components(LoginRecoveryConfig.from_env(dict(self.env))),
+        )
 
 
 class ChainedLoginRecoveryOrchestrator:
@@ -164,8 +206,9 @@ def build_wecom_bind_recovery_handler_from_env(
     env: Optional[Mapping[str, str]] = None,
 ) -> WecomBindRecoveryTaskHandler:
     config = LoginRecoveryConfig.from_env(dict(env) if env is not None else None)
+    components = _wecom_login_components(config)
     recovery = RealWecomBindRecovery(
-        orchestrator_factory=lambda context: _build_orchestrator(config, context),
+        orchestrator_factory=lambda context: _build_orchestrator(config, context, components),
         env=env,
     )
     return WecomBindRecoveryTaskHandler(recovery)
@@ -175,15 +218,155 @@ def build_wecom_bind_unattended_write_handler_from_env(
     env: Optional[Mapping[str, str]] = None,
 ) -> WecomBindRecoveryTaskHandler:
     wait_seconds = _parse_int((env or {}).get("RPA_WORKER_UNATTENDED_WRITE_WAIT_SECONDS"), 300)
-    return WecomBindRecoveryTaskHandler(RealWecomBindUnattendedWriteRecovery(env=env, wait_seconds=wait_seconds))
+    return WecomBindRecoveryTaskHandler(
+        RealWecomBindUnattendedWriteRecovery(env=env, wait_seconds=wait_seconds, defer_online_delay=True)
+    )
+
+
+class CachedRealClients:
+    """Reuse the admin clients built from the cookie sources until a cookie changes.
+
+    Entries are keyed by the cookie file paths and validated against each file's mtime
+    and size (and the cookie env vars), so a session refreshed by a QR login is picked
+    up on the next call while repeated preflights share one set of clients. With a
+    ``resolution_cache`` the clients' corp and app lookups are cached across rebuilds.
+    """
+
+    def __init__(
+        self,
+        builder: Optional[Callable[..., Dict[str, Any]]] = None,
+        resolution_cache: Optional[Callable[[], ResolutionCache]] = None,
+    ):
+        self.builder = builder
+        # Called per build so the shared cache is configured from the env on first use.
+        self.resolution_cache = resolution_cache
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+
+    def __call__(self, jdy_cookie_file: str = "", wecom_cookie_file: str = "") -> Dict[str, Any]:
+        key = (jdy_cookie_file or "", wecom_cookie_file or "")
+        signature = (
+            _cookie_signature("JDY_ADMIN_COOKIE", "JDY_ADMIN_COOKIE_FILE", jdy_cookie_file),
+            _cookie_signature("WECOM_ADMIN_COOKIE", "WECOM_ADMIN_COOKIE_FILE", wecom_cookie_file),
+        )
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == signature:
+                return dict(cached[1])
+        # Resolved at call time so the module-level builder can be swapped in tests.
+        builder = self.builder or build_real_clients
+        clients = builder(jdy_cookie_file=jdy_cookie_file, wecom_cookie_file=wecom_cookie_file)
+        if self.resolution_cache is not None:
+            clients = with_resolution_cache(clients, self.resolution_cache())
+        with self._lock:
+            self._entries[key] = (signature, clients)
+        return dict(clients)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+shared_real_clients = CachedRealClients(resolution_cache=shared_resolution_cache)
+
+
+def _cookie_signature(env_name: str, file_env_name: str, explicit_file: Optional[str]) -> Tuple[Any, ...]:
+    path = explicit_file or os.environ.get(file_env_name, "").strip()
+    try:
+        stat = Path(path).stat() if path else None
+    except OSError:
+        stat = None
+    file_state = (stat.st_mtime_ns, stat.st_size) if stat is not None else None
+    return (os.environ.get(env_name, "").strip(), path, file_state)
+
+
+class LoginRecoveryComponents:
+    """The parts of a login recovery that depend only on its config, built on first use.
+
+    Orchestrators are still built per task because their preflight and health probe
+    depend on the enterprise; the QR provider, notifier and session refresher are
+    shared so reconnects and repeated tasks do not rebuild them.
+    """
 
+    def __init__(self, config: LoginRecoveryConfig, notifier_factory: Callable[[LoginRecoveryConfig], Any]):
+        self.config = config
+        self._notifier_factory = notifier_factory
 
-def _build_orchestrator(config: LoginRecoveryConfig, context: Dict[str, Any]) -> WecomLoginRecoveryOrchestrator:
+    @cached_property
+    def qr_provider(self) -> PlaywrightQrArtifactProvider:
+        config = self.config
+        return PlaywrightQrArtifactProvider(
+            profile_dir=Path(config.browser_profile_dir),
+            artifact_dir=Path(config.artifact_dir),
+            node_work_dir=Path(config.node_work_dir),
+            login_url=config.login_url,
+            qr_selector=config.qr_selector,
+            browser_channel=config.browser_channel,
+            keepalive_seconds=config.ttl_seconds,
+        )
+
+    @cached_property
+    def notifier(self) -> Any:
+        return self._notifier_factory(self.config)
+
+    @cached_property
+    def session_refresher(self) -> WecomCookieSessionRefresher:
+        config = self.config
+        return WecomCookieSessionRefresher(
+            Path(config.cookie_file),
+            PlaywrightWecomCookieExporter(
+                profile_dir=Path(config.browser_profile_dir),
+                node_work_dir=Path(config.node_work_dir),
+                wecom_url=config.login_url,
+                browser_channel=config.browser_channel,
+            ),
+        )
+
+
+def _wecom_login_components(config: LoginRecoveryConfig) -> LoginRecoveryComponents:
+    return LoginRecoveryComponents(
+        config,
+        lambda config: WecomQrLoginNotifier(
+            WecomBotClient(config.qr_notify_webhook_url),
+            mentioned_mobile_list=config.qr_notify_mention_mobiles,
+            notify_mode=config.qr_notify_mode,
+        ),
+    )
+
+
+def _jdy_login_components(config: LoginRecoveryConfig) -> LoginRecoveryComponents:
+    return LoginRecoveryComponents(
+        config,
+        lambda config: GenericQrLoginNotifier(
+            WecomBotClient(config.qr_notify_webhook_url),
+            title="简道眼登录",
+            status_text="简道眼登录态失效，等待管理员扫码恢复",
+            mentioned_mobile_list=config.qr_notify_mention_mobiles,
+            notify_mode=config.qr_notify_mode,
+        ),
+    )
+
+
+def _missing_cookie_source_result(exc: Exception) -> Dict[str, Any]:
+    return {
+        "mode": "unattended_write",
+        "status": "blocked",
+        "reason": "missing_cookie_source",
+        "detail": str(exc),
+    }
+
+
+def _build_orchestrator(
+    config: LoginRecoveryConfig,
+    context: Dict[str, Any],
+    components: Optional[LoginRecoveryComponents] = None,
+) -> WecomLoginRecoveryOrchestrator:
     bind_input = build_bind_input_from_context(context)
+    components = components or _wecom_login_components(config)
 
     def preflight() -> Dict[str, Any]:
         try:
-            clients = build_real_clients(
+            clients = shared_real_clients(
                 jdy_cookie_file=str(context.get("jdy_cookie_file") or ""),
                 wecom_cookie_file=config.cookie_file,
             )
@@ -198,43 +381,30 @@ def _build_orchestrator(config: LoginRecoveryConfig, context: Dict[str, Any]) ->
             enterprise_name=bind_input.enterprise_short_name or bind_input.enterprise_name,
         )
     )
-    qr_provider = PlaywrightQrArtifactProvider(
-        profile_dir=Path(config.browser_profile_dir),
-        artifact_dir=Path(config.artifact_dir),
-        node_work_dir=Path(config.node_work_dir),
-        login_url=config.login_url,
-        qr_selector=config.qr_selector,
-        browser_channel=config.browser_channel,
-        keepalive_seconds=config.ttl_seconds,
-    )
-    notifier = WecomQrLoginNotifier(
-        WecomBotClient(config.qr_notify_webhook_url),
-        mentioned_mobile_list=config.qr_notify_mention_mobiles,
-        notify_mode=config.qr_notify_mode,
-    )
-    session_refresher = WecomCookieSessionRefresher(
-        Path(config.cookie_file),
-        PlaywrightWecomCookieExporter(
-            profile_dir=Path(config.browser_profile_dir),
-            node_work_dir=Path(config.node_work_dir),
-            wecom_url=config.login_url,
-            browser_channel=config.browser_channel,
-        ),
-    )
     return WecomLoginRecoveryOrchestrator(
         config=config,
         preflight=preflight,
         health_checker=health_checker,
-        qr_provider=qr_provider,
-        notifier=notifier,
-        session_refresher=session_refresher,
+        qr_provider=components.qr_provider,
+        notifier=components.notifier,
+        session_refresher=components.session_refresher,
     )
 
 
-def _build_chained_login_recovery(env: Mapping[str, str], context: Dict[str, Any]) -> ChainedLoginRecoveryOrchestrator:
+def _build_chained_login_recovery(
+    env: Mapping[str, str],
+    context: Dict[str, Any],
+    components: Optional[Tuple[LoginRecoveryComponents, LoginRecoveryComponents]] = None,
+) -> ChainedLoginRecoveryOrchestrator:
+    if components is None:
+        components = (
+            _jdy_login_components(_jdy_login_recovery_config_from_env(env)),
+            _wecom_login_components(LoginRecoveryConfig.from_env(dict(env))),
+        )
+    jdy_components, wecom_components = components
     return ChainedLoginRecoveryOrchestrator(
-        jdy_recovery=_build_jdy_orchestrator(_jdy_login_recovery_config_from_env(env), env, context),
-        wecom_recovery=_build_orchestrator(LoginRecoveryConfig.from_env(dict(env)), context),
+        jdy_recovery=_build_jdy_orchestrator(jdy_components.config, env, context, jdy_components),
+        wecom_recovery=_build_orchestrator(wecom_components.config, context, wecom_components),
     )
 
 
@@ -242,12 +412,14 @@ def _build_jdy_orchestrator(
     config: LoginRecoveryConfig,
     env: Mapping[str, str],
     context: Dict[str, Any],
+    components: Optional[LoginRecoveryComponents] = None,
 ) -> WecomLoginRecoveryOrchestrator:
     bind_input = build_bind_input_from_context(context)
+    components = components or _jdy_login_components(config)
 
     def preflight() -> Dict[str, Any]:
         try:
-            clients = build_real_clients(
+            clients = shared_real_clients(
                 jdy_cookie_file=config.cookie_file,
                 wecom_cookie_file=str(context.get("wecom_cookie_file") or env.get("WECOM_ADMIN_COOKIE_FILE") or ""),
             )
@@ -263,38 +435,13 @@ def _build_jdy_orchestrator(
             filter_text=bind_input.plain_corp_id or bind_input.enterprise_short_name or bind_input.enterprise_name,
         )
     )
-    qr_provider = PlaywrightQrArtifactProvider(
-        profile_dir=Path(config.browser_profile_dir),
-        artifact_dir=Path(config.artifact_dir),
-        node_work_dir=Path(config.node_work_dir),
-        login_url=config.login_url,
-        qr_selector=config.qr_selector,
-        browser_channel=config.browser_channel,
-        keepalive_seconds=config.ttl_seconds,
-    )
-    notifier = GenericQrLoginNotifier(
-        WecomBotClient(config.qr_notify_webhook_url),
-        title="简道眼登录",
-        status_text="简道眼登录态失效，等待管理员扫码恢复",
-        mentioned_mobile_list=config.qr_notify_mention_mobiles,
-        notify_mode=config.qr_notify_mode,
-    )
-    session_refresher = WecomCookieSessionRefresher(
-        Path(config.cookie_file),
-        PlaywrightWecomCookieExporter(
-            profile_dir=Path(config.browser_profile_dir),
-            node_work_dir=Path(config.node_work_dir),
-            wecom_url=config.login_url,
-            browser_channel=config.browser_channel,
-        ),
-    )
     return WecomLoginRecoveryOrchestrator(
         config=config,
         preflight=preflight,
         health_checker=health_checker,
-        qr_provider=qr_provider,
-        notifier=notifier,
-        session_refresher=session_refresher,
+        qr_provider=components.qr_provider,
+        notifier=components.notifier,
+        session_refresher=components.session_refresher,
     )
 
 
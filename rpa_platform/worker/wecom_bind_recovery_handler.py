@@ -1,93 +1,176 @@
-from typing import Any, Dict
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Collection, Dict, Optional, Union
 
 from rpa_platform.domain.redaction import mask_identifier, redact_context
-from rpa_platform.worker.c360_worker_runtime import WorkerTaskResult
+from rpa_platform.worker.c360_worker_runtime import (
+    DeferredTaskResult,
+    ProgressEmitter,
+    WorkerTaskResult,
+    accepts_progress,
+)
+
+
+# Recovery status of an unattended write waiting out the WeCom online-order delay.
+ONLINE_DELAY_PENDING_STATUS = "online_delay_pending"
 
 
 class WecomBindRecoveryTaskHandler:
     def __init__(self, recovery: Any):
         self.recovery = recovery
 
-    async def handle(self, dispatch: Dict[str, Any]) -> WorkerTaskResult:
+    async def handle(
+        self,
+        dispatch: Dict[str, Any],
+        progress: Optional[ProgressEmitter] = None,
+    ) -> Union[WorkerTaskResult, DeferredTaskResult]:
         task_type = _task_type(dispatch)
         if task_type != "wecom_bind_service":
             raise ValueError("Unsupported task_type: %s" % task_type)
 
         task_id = str(dispatch.get("task_id", ""))
         payload = dispatch.get("payload") if isinstance(dispatch.get("payload"), dict) else {}
-        recovery_result = self.recovery.run(task_id=task_id, context=dict(payload))
-        safe_result = _redact_bind_payload(dict(recovery_result))
-        status = str(safe_result.get("status") or "failed")
+        if progress is None:
+            recovery_result = self.recovery.run(task_id=task_id, context=dict(payload))
+            return self._deferred_result(task_id, dict(payload), recovery_result, ()) or _task_result(recovery_result)
+
+        progress.emit("readonly_preflight_started", "wecom bind readonly preflight started")
+        kwargs = {"progress": progress} if accepts_progress(self.recovery.run) else {}
+        # Off the event loop, so streamed progress and other dispatches keep moving.
+        recovery_result = await asyncio.to_thread(self.recovery.run, task_id=task_id, context=dict(payload), **kwargs)
+        streamed = progress.emitted_statuses
+        deferred = self._deferred_result(task_id, dict(payload), recovery_result, streamed)
+        if deferred is not None:
+            return deferred
+        return _without_sent_progress(_task_result(recovery_result), streamed)
+
+    def _deferred_result(
+        self,
+        task_id: str,
+        context: Dict[str, Any],
+        recovery_result: Dict[str, Any],
+        sent_statuses: Collection[str],
+    ) -> Optional[DeferredTaskResult]:
+        if recovery_result.get("status") != ONLINE_DELAY_PENDING_STATUS or not hasattr(self.recovery, "resume"):
+            return None
+        resume_at = datetime.strptime(str(recovery_result["resume_at"]), "%Y-%m-%d %H:%M:%S")
         progress = [
-            {
-                "status": "readonly_preflight_started",
-                "message": "wecom bind readonly preflight started",
-            }
+            item
+            for item in _online_delay_progress(recovery_result)
+            if item["status"] not in sent_statuses
         ]
+        sent = set(sent_statuses) | {item["status"] for item in progress}
+
+        async def resume() -> Union[WorkerTaskResult, DeferredTaskResult]:
+            resumed = await asyncio.to_thread(self.recovery.resume, task_id=task_id, context=context)
+            deferred = self._deferred_result(task_id, context, resumed, sent)
+            if deferred is not None:
+                return deferred
+            return _without_sent_progress(_task_result(resumed), sent)
+
+        return DeferredTaskResult(resume_at=resume_at, resume=resume, progress=progress)
 
-        if safe_result.get("mode") == "unattended_write":
-            return _unattended_write_task_result(status, safe_result, progress)
-
-        if status == "waiting_login":
-            safe_result["manual_action"] = "scan_wecom_admin_qr"
-            safe_result["queue_control"] = _pause_wecom_bind_queue_control()
-            progress.append(
-                {
-                    "status": "waiting_login",
-                    "message": "wecom admin QR notification sent",
-                    "queue_control": _pause_wecom_bind_queue_control(),
-                    "expires_at": safe_result.get("expires_at"),
-                    "notify_attempts": safe_result.get("notify_attempts"),
-                    "remaining_notify_attempts": safe_result.get("remaining_notify_attempts"),
-                    "next_action": safe_result.get("next_action"),
-                    "retry_after": safe_result.get("retry_after"),
-                }
-            )
-            return WorkerTaskResult(
-                status="manual_action_required",
-                result=safe_result,
-                progress=progress,
-            )
-
-        if status == "login_recovery_notify_exhausted":
-            safe_result["manual_action"] = "manual_escalation_required"
-            safe_result["queue_control"] = _pause_wecom_bind_queue_control()
-            progress.append(
-                {
-                    "status": "login_recovery_notify_exhausted",
-                    "message": "wecom admin QR notify attempts exhausted",
-                    "queue_control": _pause_wecom_bind_queue_control(),
-                    "notify_attempts": safe_result.get("notify_attempts"),
-                    "remaining_notify_attempts": safe_result.get("remaining_notify_attempts"),
-                    "next_action": safe_result.get("next_action"),
-                }
-            )
-            return WorkerTaskResult(
-                status="manual_action_required",
-                result=safe_result,
-                progress=progress,
-            )
-
-        if status in ("ready_for_real_bind", "manual_confirm_required"):
-            safe_result["queue_control"] = _resume_wecom_bind_queue_control()
-            progress_control = _resume_wecom_bind_queue_control()
-        else:
-            progress_control = None
-
-        progress_item = {
-            "status": "readonly_preflight_completed" if progress_control is not None else status,
+
+def _without_sent_progress(result: WorkerTaskResult, sent_statuses: Collection[str]) -> WorkerTaskResult:
+    return replace(result, progress=[item for item in result.progress if item.get("status") not in sent_statuses])
+
+
+def _online_delay_progress(recovery_result: Dict[str, Any]) -> list[Dict[str, Any]]:
+    return [
+        {
+            "status": "readonly_preflight_started",
+            "message": "wecom bind readonly preflight started",
+        },
+        {
+            "status": "readonly_preflight_completed",
             "message": "wecom bind readonly preflight completed",
+        },
+        {
+            "status": "real_write_started",
+            "message": "wecom bind unattended real write started",
+        },
+        {
+            "status": "waiting_online_delay",
+            "message": "wecom online order submit deferred",
+            "resume_at": recovery_result.get("resume_at"),
+        },
+    ]
+
+
+def _task_result(recovery_result: Dict[str, Any]) -> WorkerTaskResult:
+    safe_result = _redact_bind_payload(dict(recovery_result))
+    status = str(safe_result.get("status") or "failed")
+    progress = [
+        {
+            "status": "readonly_preflight_started",
+            "message": "wecom bind readonly preflight started",
         }
-        if progress_control is not None:
-            progress_item["queue_control"] = progress_control
-        progress.append(progress_item)
+    ]
+
+    if safe_result.get("mode") == "unattended_write":
+        return _unattended_write_task_result(status, safe_result, progress)
+
+    if status == "waiting_login":
+        safe_result["manual_action"] = "scan_wecom_admin_qr"
+        safe_result["queue_control"] = _pause_wecom_bind_queue_control()
+        progress.append(
+            {
+                "status": "waiting_login",
+                "message": "wecom admin QR notification sent",
+                "queue_control": _pause_wecom_bind_queue_control(),
+                "expires_at": safe_result.get("expires_at"),
+                "notify_attempts": safe_result.get("notify_attempts"),
+                "remaining_notify_attempts": safe_result.get("remaining_notify_attempts"),
+                "next_action": safe_result.get("next_action"),
+                "retry_after": safe_result.get("retry_after"),
+            }
+        )
+        return WorkerTaskResult(
+            status="manual_action_required",
+            result=safe_result,
+            progress=progress,
+        )
 
+    if status == "login_recovery_notify_exhausted":
+        safe_result["manual_action"] = "manual_escalation_required"
+        safe_result["queue_control"] = _pause_wecom_bind_queue_control()
+        progress.append(
+            {
+                "status": "login_recovery_notify_exhausted",
+                "message": "wecom admin QR notify attempts exhausted",
+                "queue_control": _pause_wecom_bind_queue_control(),
+                "notify_attempts": safe_result.get("notify_attempts"),
+                "remaining_notify_attempts": safe_result.get("remaining_notify_attempts"),
+                "next_action": safe_result.get("next_action"),
+            }
+        )
         return WorkerTaskResult(
-            status=status,
+            status="manual_action_required",
             result=safe_result,
             progress=progress,
         )
 
+    if status in ("ready_for_real_bind", "manual_confirm_required"):
+        safe_result["queue_control"] = _resume_wecom_bind_queue_control()
+        progress_control = _resume_wecom_bind_queue_control()
+    else:
+        progress_control = None
+
+    progress_item = {
+        "status": "readonly_preflight_completed" if progress_control is not None else status,
+        "message": "wecom bind readonly preflight completed",
+    }
+    if progress_control is not None:
+        progress_item["queue_control"] = progress_control
+    progress.append(progress_item)
+
+    return WorkerTaskResult(
+        status=status,
+        result=safe_result,
+        progress=progress,
+    )
+
 
 def _task_type(dispatch: Dict[str, Any]) -> str:
     payload = dispatch.get("payload")
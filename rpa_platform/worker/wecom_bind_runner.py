@@ -1,16 +1,24 @@
-from datetime import datetime, timedelta
+import json
+from datetime import datetime
 from typing import Any, Dict, Optional
 
-from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.domain.state_machine import TaskStatus, TRANSITION_LOST
 from rpa_platform.integrations.wecom_admin_client import RetryableWecomOrderError
 from rpa_platform.services.wecom_bind_service import JdyWecomBindInput, JdyWecomBindService
 from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.recheck_policy import RecheckPolicy
 
 
 class WecomBindServiceRunner:
-    def __init__(self, store: SQLiteStore, service: JdyWecomBindService):
+    def __init__(
+        self,
+        store: SQLiteStore,
+        service: JdyWecomBindService,
+        recheck_policy: Optional[RecheckPolicy] = None,
+    ):
         self.store = store
         self.service = service
+        self.recheck_policy = recheck_policy or RecheckPolicy()
 
     def run_claimed_task(
         self,
@@ -19,17 +27,31 @@ class WecomBindServiceRunner:
         now: Optional[datetime] = None,
     ) -> Dict[str, Any]:
         current_time = now or datetime.now()
-        current_status = TaskStatus(self.store.get_task(task_id)["status"])
-        if current_status == TaskStatus.WAITING_WECOM_ONLINE_DELAY or self._is_claimed_online_delay(task_id, current_status):
+        task = self.store.get_task(task_id)
+        current_status = TaskStatus(task["status"])
+        if current_status == TaskStatus.WAITING_WECOM_ONLINE_DELAY or self._is_claimed_online_delay(task, current_status):
             try:
-                return self._submit_online(task_id, robot_id, current_time)
+                return self._submit_online(task_id, robot_id, current_time, current_status)
             except Exception as exc:
-                self._record_failure(task_id, robot_id, "wecom_submit_online_order", "企微提交上线订单", exc)
+                self._record_failure(
+                    task_id,
+                    robot_id,
+                    "wecom_submit_online_order",
+                    "企微提交上线订单",
+                    exc,
+                    expected=current_status,
+                )
                 raise
 
-        self.store.set_task_status(task_id, TaskStatus.RUNNING, assigned_robot_id=robot_id)
+        if not self.store.set_task_status(
+            task_id,
+            TaskStatus.RUNNING,
+            assigned_robot_id=robot_id,
+            expected=current_status,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.set_task_current_step(task_id, "jdy_wecom_bind_service")
-        task = self.store.get_task(task_id)
         try:
             result = self.service.start_bind(
                 JdyWecomBindInput(
@@ -44,7 +66,14 @@ class WecomBindServiceRunner:
                 now=current_time,
             )
         except Exception as exc:
-            self._record_failure(task_id, robot_id, "jdy_wecom_bind_service", "企微绑定接口服务", exc)
+            self._record_failure(
+                task_id,
+                robot_id,
+                "jdy_wecom_bind_service",
+                "企微绑定接口服务",
+                exc,
+                expected=TaskStatus.RUNNING,
+            )
             raise
         self.store.merge_task_context(task_id, result.context)
         self.store.append_task_step(
@@ -54,16 +83,33 @@ class WecomBindServiceRunner:
             "success",
             output_data=_step_output_from_context(result.context),
         )
-        self.store.set_task_status(
+        # WeCom rejects online orders submitted too early, so the service's time is a floor.
+        next_check_at = self.recheck_policy.next_check_at(
+            self.store,
+            task,
+            TaskStatus.WAITING_WECOM_ONLINE_DELAY,
+            current_time,
+            not_before=result.next_check_at,
+        )
+        if not self.store.set_task_status(
             task_id,
             TaskStatus.WAITING_WECOM_ONLINE_DELAY,
-            next_check_at=result.next_check_at,
+            next_check_at=next_check_at,
             assigned_robot_id=None,
-        )
+            expected=TaskStatus.RUNNING,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": TaskStatus.WAITING_WECOM_ONLINE_DELAY.value}
 
-    def _submit_online(self, task_id: str, robot_id: str, now: datetime) -> Dict[str, Any]:
+    def _submit_online(
+        self,
+        task_id: str,
+        robot_id: str,
+        now: datetime,
+        current_status: TaskStatus,
+    ) -> Dict[str, Any]:
         self.store.set_task_current_step(task_id, "wecom_submit_online_order")
         try:
             result = self.service.submit_online_order(self.store.get_task_context(task_id))
@@ -72,7 +118,12 @@ class WecomBindServiceRunner:
                 "error_type": "retryable_wecom_order",
                 "error_detail": str(exc),
             }
-            next_check_at = now + timedelta(minutes=2)
+            next_check_at = self.recheck_policy.next_check_at(
+                self.store,
+                self.store.get_task(task_id),
+                TaskStatus.WAITING_WECOM_ONLINE_DELAY,
+                now,
+            )
             self.store.append_task_step(
                 task_id,
                 "wecom_submit_online_order",
@@ -80,12 +131,15 @@ class WecomBindServiceRunner:
                 TaskStatus.WAITING_WECOM_ONLINE_DELAY.value,
                 output_data=output,
             )
-            self.store.set_task_status(
+            if not self.store.set_task_status(
                 task_id,
                 TaskStatus.WAITING_WECOM_ONLINE_DELAY,
                 next_check_at=next_check_at,
                 assigned_robot_id=None,
-            )
+                expected=current_status,
+                claimed_by=robot_id,
+            ):
+                return self._release_lost_task(task_id, robot_id)
             self.store.update_robot_status(robot_id, "idle")
             return {"task_id": task_id, "status": TaskStatus.WAITING_WECOM_ONLINE_DELAY.value}
 
@@ -97,16 +151,28 @@ class WecomBindServiceRunner:
             "success",
             output_data=_step_output_from_context(result.context),
         )
-        self.store.set_task_status(task_id, TaskStatus.SUCCESS, assigned_robot_id=None)
+        if not self.store.set_task_status(
+            task_id,
+            TaskStatus.SUCCESS,
+            assigned_robot_id=None,
+            expected=current_status,
+            claimed_by=robot_id,
+        ):
+            return self._release_lost_task(task_id, robot_id)
         self.store.update_robot_status(robot_id, "idle")
         return {"task_id": task_id, "status": TaskStatus.SUCCESS.value}
 
-    def _is_claimed_online_delay(self, task_id: str, current_status: TaskStatus) -> bool:
+    @staticmethod
+    def _is_claimed_online_delay(task: Dict[str, Any], current_status: TaskStatus) -> bool:
         if current_status != TaskStatus.CHECKING_LOGIN:
             return False
-        context = self.store.get_task_context(task_id)
+        context = json.loads(task.get("runtime_context_json") or "{}")
         return bool(context.get("wecom", {}).get("auditorderid"))
 
+    def _release_lost_task(self, task_id: str, robot_id: str) -> Dict[str, Any]:
+        self.store.update_robot_status(robot_id, "idle")
+        return {"task_id": task_id, "status": TRANSITION_LOST}
+
     def _record_failure(
         self,
         task_id: str,
@@ -114,6 +180,7 @@ class WecomBindServiceRunner:
         step_key: str,
         step_name: str,
         exc: Exception,
+        expected: TaskStatus,
     ) -> None:
         self.store.append_task_step(
             task_id,
@@ -125,7 +192,13 @@ class WecomBindServiceRunner:
                 "error_detail": str(exc),
             },
         )
-        self.store.set_task_status(task_id, TaskStatus.FAILED, assigned_robot_id=None)
+        self.store.set_task_status(
+            task_id,
+            TaskStatus.FAILED,
+            assigned_robot_id=None,
+            expected=expected,
+            claimed_by=robot_id,
+        )
         self.store.update_robot_status(robot_id, "idle")
 
 
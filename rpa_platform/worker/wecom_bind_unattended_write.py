@@ -1,15 +1,16 @@
-import json
-import os
-import stat
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 
 from rpa_platform.domain.redaction import redact_context
+from rpa_platform.integrations.admin_call_policy import ERROR_CIRCUIT_OPEN, ERROR_TRANSIENT, classify_admin_error
 from rpa_platform.integrations.jdy_admin_client import JdyAdminClient
 from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
-from rpa_platform.services.wecom_bind_service import JdyWecomBindService, WecomSecretGenerator
+from rpa_platform.services.wecom_bind_service import JdyWecomBindResult, JdyWecomBindService, WecomSecretGenerator
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore
+from rpa_platform.worker.bind_write_locks import BindWriteLockManager
 from rpa_platform.worker.wecom_bind_real_recovery import (
     BUSINESS_UNEXECUTABLE_REASONS,
     build_bind_input_from_context,
@@ -20,6 +21,8 @@ from scripts.dev.run_wecom_bind_real_write import _start_bind_with_recoverable_c
 
 
 PRIVATE_WEWORK_BIND_ENTRY_ID = "5e4ba3a09c38890006fbdf71"
+# Context-file phase of a write whose online order is created but not yet submitted.
+ONLINE_DELAY_PHASE = "waiting_online_delay"
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -33,26 +36,51 @@ def run_unattended_wecom_bind_write(
     secret_generator: WecomSecretGenerator,
     preflight_runner: Optional[Callable[..., Dict[str, Any]]] = None,
     login_recovery: Optional[Dict[str, Any]] = None,
-    context_file: Optional[Path] = None,
-    lock_file: Optional[Path] = None,
+    context_store: Optional[BindWriteContextStore] = None,
+    locks: Optional[BindWriteLockManager] = None,
     now: Optional[datetime] = None,
     wait_seconds: int = 300,
+    defer: bool = False,
 ) -> Dict[str, Any]:
-    context_file = context_file or default_context_file(task_id)
-    lock_file = lock_file or default_lock_file()
+    """Run the unattended bind write for one enterprise.
 
-    existing = _load_json(context_file)
+    WeCom only accepts the online-order submit ``wait_seconds`` after the order was
+    created. With ``defer`` the first phase persists the continuation in the context
+    store, keeps the write lock and returns ``online_delay_pending``; the submit then
+    runs from :func:`resume_unattended_wecom_bind_write`, or from a later call for the
+    same task. Without ``defer`` the call sleeps through the delay as before.
+
+    The write lock is per enterprise and suite (see :class:`BindWriteLockManager`), so
+    binds of different enterprises run in parallel.
+    """
+    try:
+        context_store = context_store or default_context_store()
+        context_store.check_cipher()
+    except RuntimeError as exc:
+        return _cipher_unavailable_result(exc)
+    locks = locks or default_lock_manager()
+
+    existing = context_store.load(task_id)
     if _is_success_context(existing):
-        return _already_completed_result(existing, context_file, source_context=context)
+        return _already_completed_result(existing, context_store, source_context=context)
+    if _continuation(existing):
+        return resume_unattended_wecom_bind_write(
+            task_id=task_id,
+            context=context,
+            jdy_client=jdy_client,
+            wecom_client=wecom_client,
+            secret_generator=secret_generator,
+            context_store=context_store,
+            locks=locks,
+            now=now,
+            wait=not defer,
+        )
 
-    if not _acquire_lock(lock_file, task_id):
-        return {
-            "mode": "unattended_write",
-            "status": "blocked",
-            "reason": "write_already_running",
-            "detail": "another unattended wecom bind write is running",
-        }
+    lock_key = _lock_key(context)
+    if not locks.acquire(lock_key, task_id):
+        return _write_already_running_result(locks, lock_key)
 
+    deferred = False
     try:
         bind_input = build_bind_input_from_context(context)
         preflight_runner = preflight_runner or run_readonly_preflight
@@ -80,11 +108,28 @@ def run_unattended_wecom_bind_write(
             jdy_client=jdy_client,
             wecom_client=wecom_client,
             secret_generator=secret_generator,
-            context_file=context_file,
+            context_file=None,
             now=now,
+            persist=lambda value: context_store.save(task_id, value, corp_id=bind_input.plain_corp_id),
         )
+        if defer and wait_seconds > 0:
+            start_result.context["unattended_write"] = {
+                "phase": ONLINE_DELAY_PHASE,
+                "lock_key": lock_key,
+                "resume_at": (now + timedelta(seconds=wait_seconds)).strftime("%Y-%m-%d %H:%M:%S"),
+                "preflight": write_preflight,
+                "preflight_metadata": preflight_metadata,
+                "start_status": start_result.status,
+                "start_next_check_at": start_result.next_check_at.strftime("%Y-%m-%d %H:%M:%S")
+                if start_result.next_check_at
+                else None,
+            }
+            context_store.save(task_id, start_result.context, corp_id=bind_input.plain_corp_id)
+            deferred = True
+            return _pending_result(start_result.context, context_store)
         if wait_seconds > 0:
             time.sleep(wait_seconds)
+            locks.heartbeat(lock_key, task_id)
 
         service = JdyWecomBindService(
             jdy_client=jdy_client,
@@ -93,41 +138,128 @@ def run_unattended_wecom_bind_write(
         )
         submit_result = service.submit_online_order(start_result.context)
         start_result.context["wecom"]["auditorder_status"] = submit_result.context["wecom"]["auditorder_status"]
-        _write_private_json(context_file, start_result.context)
+        context_store.save(task_id, start_result.context, corp_id=bind_input.plain_corp_id)
         return _success_result(
             write_preflight,
-            context_file,
+            context_store,
             start_result,
             submit_result,
             preflight_metadata,
             source_context=context,
         )
     except Exception as exc:
-        detail = str(exc)
-        error_msg = known_public_error_msg(detail)
+        return _write_failed_result(exc)
+    finally:
+        # A deferred write keeps its lease so no other task for the enterprise starts a
+        # second bind before the submit; the resume re-acquires it with the same task id.
+        if not deferred:
+            locks.release(lock_key, task_id)
+
+
+def resume_unattended_wecom_bind_write(
+    task_id: str,
+    context: Dict[str, Any],
+    jdy_client: JdyAdminClient,
+    wecom_client: WecomAdminClient,
+    secret_generator: WecomSecretGenerator,
+    context_store: Optional[BindWriteContextStore] = None,
+    locks: Optional[BindWriteLockManager] = None,
+    now: Optional[datetime] = None,
+    wait: bool = False,
+) -> Dict[str, Any]:
+    """Submit the online order of a write deferred by ``run_unattended_wecom_bind_write``.
+
+    Returns ``online_delay_pending`` again while the delay has not expired, unless
+    ``wait`` is set, in which case the call sleeps until it has.
+    """
+    try:
+        context_store = context_store or default_context_store()
+        context_store.check_cipher()
+    except RuntimeError as exc:
+        return _cipher_unavailable_result(exc)
+    locks = locks or default_lock_manager()
+    existing = context_store.load(task_id)
+    if _is_success_context(existing):
+        return _already_completed_result(existing, context_store, source_context=context)
+    continuation = _continuation(existing)
+    if continuation is None:
         return {
             "mode": "unattended_write",
             "status": "failed",
-            "reason": "real_write_failed",
-            "detail": detail,
-            **({"error_msg": error_msg} if error_msg else {}),
+            "reason": "continuation_missing",
+            "detail": "no deferred unattended write found in context store",
+            "context_store": context_store.db_path,
         }
+    remaining = (_parse_datetime(continuation.get("resume_at")) - (now or datetime.now())).total_seconds()
+    if remaining > 0:
+        if not wait:
+            return _pending_result(existing, context_store)
+        time.sleep(remaining)
+
+    lock_key = str(continuation.get("lock_key") or _lock_key(context))
+    if not locks.acquire(lock_key, task_id):
+        return _write_already_running_result(locks, lock_key)
+    try:
+        service = JdyWecomBindService(
+            jdy_client=jdy_client,
+            wecom_client=wecom_client,
+            secret_generator=secret_generator,
+        )
+        submit_result = service.submit_online_order(existing)
+        existing.pop("unattended_write", None)
+        existing["wecom"]["auditorder_status"] = submit_result.context["wecom"]["auditorder_status"]
+        context_store.save(task_id, existing)
+        start_next_check_at = continuation.get("start_next_check_at")
+        start_result = JdyWecomBindResult(
+            status=str(continuation.get("start_status") or ""),
+            context=existing,
+            next_check_at=_parse_datetime(start_next_check_at) if start_next_check_at else None,
+        )
+        return _success_result(
+            continuation.get("preflight") or {},
+            context_store,
+            start_result,
+            submit_result,
+            continuation.get("preflight_metadata") or {},
+            source_context=context,
+        )
+    except Exception as exc:
+        return _write_failed_result(exc)
     finally:
-        _release_lock(lock_file)
+        locks.release(lock_key, task_id)
+
+
+def _write_failed_result(exc: Exception) -> Dict[str, Any]:
+    detail = str(exc)
+    error_msg = known_public_error_msg(detail)
+    # Admin backend down or its circuit open: the same write can be retried later as is.
+    unavailable = classify_admin_error(exc) in {ERROR_TRANSIENT, ERROR_CIRCUIT_OPEN}
+    return {
+        "mode": "unattended_write",
+        "status": "failed",
+        "reason": "admin_api_unavailable" if unavailable else "real_write_failed",
+        "detail": detail,
+        **({"error_msg": error_msg} if error_msg else {}),
+    }
 
 
-def default_context_file(task_id: str) -> Path:
-    safe_task_id = "".join(char for char in task_id if char.isalnum() or char in {"-", "_"})
-    return REPO_ROOT / ".local" / ("wecom-bind-real-write-%s.json" % safe_task_id)
+@lru_cache(maxsize=None)
+def default_context_store() -> BindWriteContextStore:
+    store = BindWriteContextStore(str(REPO_ROOT / ".local" / "wecom-bind-write-contexts.db"))
+    # Secrets are never written in the clear: without a cipher no write may start.
+    store.check_cipher()
+    # Contexts written as JSON files by earlier versions move into the table once.
+    store.import_context_files(REPO_ROOT / ".local")
+    return store
 
 
-def default_lock_file() -> Path:
-    return REPO_ROOT / ".local" / "wecom-bind-write.lock"
+def default_lock_manager() -> BindWriteLockManager:
+    return BindWriteLockManager(REPO_ROOT / ".local" / "wecom-bind-write-locks")
 
 
 def _success_result(
     preflight: Dict[str, Any],
-    context_file: Path,
+    context_store: BindWriteContextStore,
     start_result: Any,
     submit_result: Any,
     preflight_metadata: Optional[Dict[str, Any]] = None,
@@ -137,7 +269,7 @@ def _success_result(
         "mode": "unattended_write",
         "status": submit_result.status,
         "preflight": redact_context(preflight),
-        "context_file": str(context_file),
+        "context_store": context_store.db_path,
         "wecom": {
             "auditorderid": start_result.context["wecom"].get("auditorderid", ""),
             "auditorder_status": submit_result.context["wecom"].get("auditorder_status"),
@@ -206,7 +338,7 @@ def _blocked_preflight_result(preflight: Dict[str, Any]) -> Dict[str, Any]:
 
 def _already_completed_result(
     existing: Dict[str, Any],
-    context_file: Path,
+    context_store: BindWriteContextStore,
     source_context: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     wecom = existing.get("wecom") if isinstance(existing.get("wecom"), dict) else {}
@@ -214,7 +346,7 @@ def _already_completed_result(
         "mode": "unattended_write",
         "status": "already_completed",
         "reason": "context_already_has_successful_auditorder",
-        "context_file": str(context_file),
+        "context_store": context_store.db_path,
         "wecom": {
             "auditorderid": str(wecom.get("auditorderid", "")),
             "auditorder_status": wecom.get("auditorder_status"),
@@ -247,43 +379,57 @@ def _source_entry_id(context: Dict[str, Any]) -> str:
     return ""
 
 
+def _pending_result(context: Dict[str, Any], context_store: BindWriteContextStore) -> Dict[str, Any]:
+    wecom = context.get("wecom") if isinstance(context.get("wecom"), dict) else {}
+    return {
+        "mode": "unattended_write",
+        "status": "online_delay_pending",
+        "reason": "wecom_online_order_delay",
+        "resume_at": context["unattended_write"]["resume_at"],
+        "context_store": context_store.db_path,
+        "wecom": {
+            "auditorderid": str(wecom.get("auditorderid", "")),
+            "auditorder_status": wecom.get("auditorder_status"),
+        },
+    }
+
+
+def _continuation(context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    continuation = context.get("unattended_write")
+    if isinstance(continuation, dict) and continuation.get("phase") == ONLINE_DELAY_PHASE:
+        return continuation
+    return None
+
+
+def _parse_datetime(value: Any) -> datetime:
+    return datetime.strptime(str(value), "%Y-%m-%d %H:%M:%S")
+
+
 def _is_success_context(value: Dict[str, Any]) -> bool:
     wecom = value.get("wecom") if isinstance(value.get("wecom"), dict) else {}
     return wecom.get("auditorder_status") == 5
 
 
-def _load_json(path: Path) -> Dict[str, Any]:
-    if not path.exists():
-        return {}
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return {}
-    return data if isinstance(data, dict) else {}
-
-
-def _write_private_json(path: Path, value: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(value, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
-    try:
-        path.chmod(stat.S_IRUSR | stat.S_IWUSR)
-    except PermissionError:
-        pass
+def _lock_key(context: Dict[str, Any]) -> str:
+    bind_input = build_bind_input_from_context(context)
+    return BindWriteLockManager.key_for(bind_input.plain_corp_id, bind_input.wecom_suiteid)
 
 
-def _acquire_lock(path: Path, task_id: str) -> bool:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    try:
-        fd = os.open(str(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-    except FileExistsError:
-        return False
-    with os.fdopen(fd, "w", encoding="utf-8") as handle:
-        handle.write(task_id)
-    return True
+def _cipher_unavailable_result(exc: RuntimeError) -> Dict[str, Any]:
+    return {
+        "mode": "unattended_write",
+        "status": "blocked",
+        "reason": "context_cipher_unavailable",
+        "detail": str(exc),
+    }
 
 
-def _release_lock(path: Path) -> None:
-    try:
-        path.unlink()
-    except FileNotFoundError:
-        pass
+def _write_already_running_result(locks: BindWriteLockManager, lock_key: str) -> Dict[str, Any]:
+    owner = locks.owner(lock_key) or {}
+    return {
+        "mode": "unattended_write",
+        "status": "blocked",
+        "reason": "write_already_running",
+        "detail": "another unattended wecom bind write is running for this enterprise",
+        "lock_owner_task_id": str(owner.get("task_id") or ""),
+    }
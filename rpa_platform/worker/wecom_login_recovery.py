@@ -9,9 +9,10 @@ from datetime import datetime, timedelta, timezone
 from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Mapping, Optional, Protocol
-from urllib import error, parse, request
+from urllib import parse
 
 from rpa_platform.domain.redaction import mask_identifier, redact_context
+from rpa_platform.integrations.http_pool import HttpConnectionPool, shared_http_pool
 from rpa_platform.notifications.wecom_bot import build_image_payload, build_markdown_payload, build_text_payload
 
 WECOM_BASE_URL = "https://open.work.weixin.qq.com"
@@ -377,6 +378,7 @@ class WecomCookieFileReadonlyProbe:
         base_url: str = WECOM_BASE_URL,
         timeout: int = 20,
         request_json: Optional[Callable[[str, Dict[str, Any], Dict[str, str]], Dict[str, Any]]] = None,
+        pool: Optional[HttpConnectionPool] = None,
     ):
         self.cookie_file = Path(cookie_file)
         self.suiteid = suiteid
@@ -384,6 +386,7 @@ class WecomCookieFileReadonlyProbe:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.request_json = request_json or self._request_json
+        self.pool = pool or shared_http_pool()
 
     def __call__(self) -> Dict[str, Any]:
         cookie = self._read_cookie()
@@ -420,14 +423,13 @@ class WecomCookieFileReadonlyProbe:
     def _request_json(self, path: str, params: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
         query = parse.urlencode(params)
         url = self.base_url + path + ("?" + query if query else "")
-        req = request.Request(url=url, headers=headers, method="GET")
         try:
-            with request.urlopen(req, timeout=self.timeout) as response:
-                raw = response.read().decode("utf-8")
-        except error.HTTPError as exc:
-            return {"status_code": exc.code, "body": "wecom readonly probe HTTP error"}
+            response = self.pool.request("GET", url, headers=headers, timeout=self.timeout)
         except Exception as exc:
             return {"status_code": 0, "body": "wecom readonly probe failed: %s" % exc.__class__.__name__}
+        if response.status >= 400:
+            return {"status_code": response.status, "body": "wecom readonly probe HTTP error"}
+        raw = response.body.decode("utf-8")
         try:
             data = json.loads(raw)
         except json.JSONDecodeError:
@@ -445,12 +447,14 @@ class JdyCookieFileReadonlyProbe:
         base_url: str = "https://dc.jdydevelop.com",
         timeout: int = 20,
         request_json: Optional[Callable[[str, Dict[str, Any], Dict[str, str]], Dict[str, Any]]] = None,
+        pool: Optional[HttpConnectionPool] = None,
     ):
         self.cookie_file = Path(cookie_file)
         self.filter_text = filter_text
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.request_json = request_json or self._request_json
+        self.pool = pool or shared_http_pool()
 
     def __call__(self) -> Dict[str, Any]:
         cookie = self._read_cookie()
@@ -474,18 +478,13 @@ class JdyCookieFileReadonlyProbe:
 
     def _request_json(self, path: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
         body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        req = request.Request(url=self.base_url + path, data=body, headers=headers, method="POST")
         try:
-            with request.urlopen(req, timeout=self.timeout) as response:
-                raw = response.read().decode("utf-8")
-        except error.HTTPError as exc:
-            try:
-                raw = exc.read().decode("utf-8")
-            except Exception:
-                raw = ""
-            return {"status_code": exc.code, "body": raw or "jdy readonly probe HTTP error"}
+            response = self.pool.request("POST", self.base_url + path, body=body, headers=headers, timeout=self.timeout)
         except Exception as exc:
             return {"status_code": 0, "body": "jdy readonly probe failed: %s" % exc.__class__.__name__}
+        raw = response.body.decode("utf-8", errors="replace")
+        if response.status >= 400:
+            return {"status_code": response.status, "body": raw or "jdy readonly probe HTTP error"}
         try:
             data = json.loads(raw)
         except json.JSONDecodeError:
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+
+DEFAULT_WORKER_OUTBOX_PATH = ".local/c360-worker-outbox.db"
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    seq: int
+    message_id: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class WorkerMessageOutbox:
+    """SQLite queue of worker messages waiting for HTTP delivery to the control plane.
+
+    Messages are numbered by ``seq`` in arrival order and carry a ``message_id`` the
+    control plane can deduplicate on, since a POST whose response was lost is sent
+    again. A ``task.completed`` with the same content is queued only once, so the
+    runtime re-sending an unacknowledged completion does not add a second row.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_WORKER_OUTBOX_PATH):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS worker_message_outbox (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    message_id TEXT NOT NULL UNIQUE,
+                    payload_json TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT DEFAULT '',
+                    created_at_ms INTEGER NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, payload: Dict[str, Any]) -> str:
+        message_id = _message_id(payload)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO worker_message_outbox (message_id, payload_json, created_at_ms)
+                VALUES (?, ?, ?)
+                """,
+                (message_id, json.dumps(payload, ensure_ascii=False), int(time.time() * 1000)),
+            )
+        return message_id
+
+    def peek(self, limit: int = 20) -> List[OutboxMessage]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT seq, message_id, payload_json, attempts
+                FROM worker_message_outbox
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        messages = []
+        for row in rows:
+            payload = json.loads(row["payload_json"])
+            payload.update({"message_id": row["message_id"], "seq": row["seq"]})
+            messages.append(OutboxMessage(row["seq"], row["message_id"], payload, row["attempts"]))
+        return messages
+
+    def ack(self, seqs: Iterable[int]) -> int:
+        seq_list = list(seqs)
+        if not seq_list:
+            return 0
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM worker_message_outbox WHERE seq IN (%s)" % ",".join("?" for _ in seq_list),
+                seq_list,
+            )
+        return cursor.rowcount
+
+    def mark_failed(self, seqs: Iterable[int], error: str) -> None:
+        seq_list = list(seqs)
+        if not seq_list:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE worker_message_outbox
+                SET attempts = attempts + 1, last_error = ?
+                WHERE seq IN (%s)
+                """
+                % ",".join("?" for _ in seq_list),
+                [error[:500]] + seq_list,
+            )
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM worker_message_outbox").fetchone()[0]
+
+
+def _message_id(payload: Dict[str, Any]) -> str:
+    if payload.get("message_id"):
+        return str(payload["message_id"])
+    if payload.get("type") == "task.completed":
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return "completed_%s" % digest.hexdigest()[:24]
+    return "msg_%s" % uuid.uuid4().hex
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib import parse
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from rpa_platform.integrations.async_http_pool import AsyncHttpConnectionPool
+from rpa_platform.integrations.http_pool import HttpConnectionPool
+from rpa_platform.integrations.jdy_admin_client import AsyncJdyAdminClient, JdyAdminClient
+from rpa_platform.integrations.wecom_admin_client import AsyncWecomAdminClient, WecomAdminClient
+from rpa_platform.services.wecom_bind_service import FixedWecomSecretGenerator, JdyWecomBindInput, JdyWecomBindService
+from scripts.dev.check_wecom_bind_real_readonly import (
+    AsyncJdyCookieTransport,
+    AsyncWecomCookieTransport,
+    JdyCookieTransport,
+    WecomCookieTransport,
+)
+from scripts.dev.run_platform_dryrun import FakeServiceJdyAdminTransport, FakeServiceWecomAdminTransport
+
+
+JDY_PATH_PREFIX = "/api/fx_sa/"
+
+
+class StubAdminHandler(BaseHTTPRequestHandler):
+    """Serves the JDY and WeCom admin paths from the dry-run fakes over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this Nagle holds the body
+    # back for the client's delayed ACK on every kept-alive response.
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        # Runs once per accepted connection; stands in for TCP + TLS handshake cost.
+        time.sleep(self.server.connect_delay_seconds)
+        super().setup()
+
+    def do_GET(self) -> None:
+        url = parse.urlsplit(self.path)
+        params = dict(parse.parse_qsl(url.query))
+        self._reply(lambda: self.server.wecom.get_json(url.path, params, {}))
+
+    def do_POST(self) -> None:
+        url = parse.urlsplit(self.path)
+        length = int(self.headers.get("content-length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if url.path.startswith(JDY_PATH_PREFIX):
+            self._reply(lambda: self.server.jdy.post_json(url.path, payload))
+        else:
+            self._reply(lambda: self.server.wecom.post_json(url.path, payload, {}))
+
+    def _reply(self, call) -> None:
+        # Stands in for the admin API's server-side time per call.
+        time.sleep(self.server.response_delay_seconds)
+        try:
+            status, data = 200, call()
+        except ValueError as exc:
+            status, data = 404, {"error": str(exc)}
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+
+class StubAdminServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Concurrent clients connect in bursts; the default backlog of 5 drops SYNs and
+    # adds the 1s retransmit to whichever connection lost the race.
+    request_queue_size = 64
+
+
+def start_stub_server(connect_delay_ms: float, response_delay_ms: float = 0.0) -> ThreadingHTTPServer:
+    server = StubAdminServer(("127.0.0.1", 0), StubAdminHandler)
+    server.connect_delay_seconds = connect_delay_ms / 1000
+    server.response_delay_seconds = response_delay_ms / 1000
+    server.jdy = FakeServiceJdyAdminTransport()
+    server.wecom = FakeServiceWecomAdminTransport()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(base_url: str, pool: HttpConnectionPool, binds: int) -> Dict[str, Any]:
+    """Run ``binds`` start_bind + submit_online_order round trips through cookie transports on ``pool``."""
+    service = JdyWecomBindService(
+        jdy_client=JdyAdminClient(JdyCookieTransport("cookie", base_url=base_url, pool=pool)),
+        wecom_client=WecomAdminClient(WecomCookieTransport("cookie", base_url=base_url, pool=pool)),
+        secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
+    )
+    latencies_ms: List[float] = []
+    for _ in range(binds):
+        started = time.perf_counter()
+        result = service.start_bind(_bind_input(), now=datetime(2026, 6, 16, 10, 0, 0))
+        service.submit_online_order(result.context)
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+    pool.close()
+    return {
+        "binds": binds,
+        "connections_opened": pool.connections_opened,
+        "mean_ms": round(statistics.mean(latencies_ms), 2),
+        "p50_ms": round(statistics.median(latencies_ms), 2),
+        "max_ms": round(max(latencies_ms), 2),
+    }
+
+
+def measure_async_lookups(base_url: str, binds: int) -> Dict[str, Any]:
+    """Resolve corp, owner and custom app for ``binds`` binds, one by one and then interleaved on one loop."""
+    bind_input = _bind_input()
+
+    def lookup_sync(jdy: JdyAdminClient, wecom: WecomAdminClient) -> None:
+        corp = jdy.resolve_unique_corp(bind_input.plain_corp_id, bind_input.enterprise_name)
+        jdy.check_wework_owner(bind_input.requested_user_id, corp.suite_id, corp.suite_scenario)
+        wecom.resolve_unique_custom_app(bind_input.wecom_suiteid, corp.name, bind_input.suite_name)
+
+    async def lookup_async(jdy: AsyncJdyAdminClient, wecom: AsyncWecomAdminClient) -> None:
+        corp = await jdy.resolve_unique_corp(bind_input.plain_corp_id, bind_input.enterprise_name)
+        await jdy.check_wework_owner(bind_input.requested_user_id, corp.suite_id, corp.suite_scenario)
+        await wecom.resolve_unique_custom_app(bind_input.wecom_suiteid, corp.name, bind_input.suite_name)
+
+    async def interleaved() -> int:
+        pool = AsyncHttpConnectionPool()
+        jdy = AsyncJdyAdminClient(AsyncJdyCookieTransport("cookie", base_url=base_url, pool=pool))
+        wecom = AsyncWecomAdminClient(AsyncWecomCookieTransport("cookie", base_url=base_url, pool=pool))
+        await asyncio.gather(*(lookup_async(jdy, wecom) for _ in range(binds)))
+        pool.close()
+        return pool.connections_opened
+
+    pool = HttpConnectionPool()
+    jdy = JdyAdminClient(JdyCookieTransport("cookie", base_url=base_url, pool=pool))
+    wecom = WecomAdminClient(WecomCookieTransport("cookie", base_url=base_url, pool=pool))
+    started = time.perf_counter()
+    for _ in range(binds):
+        lookup_sync(jdy, wecom)
+    sequential_ms = (time.perf_counter() - started) * 1000
+    pool.close()
+    started = time.perf_counter()
+    connections_opened = asyncio.run(interleaved())
+    interleaved_ms = (time.perf_counter() - started) * 1000
+    return {
+        "binds": binds,
+        "sequential_ms": round(sequential_ms, 2),
+        "interleaved_ms": round(interleaved_ms, 2),
+        "interleaved_connections_opened": connections_opened,
+    }
+
+
+def _bind_input() -> JdyWecomBindInput:
+    return JdyWecomBindInput(
+        enterprise_name="上海测试客户",
+        plain_corp_id="ww001",
+        requested_user_id="user-1",
+        suite_id=1,
+        suite_scenario="main",
+        wecom_suiteid=1009479,
+        suite_name="简道云",
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare bind latency with and without pooled admin HTTP connections and async clients.")
+    parser.add_argument("--binds", type=int, default=20)
+    parser.add_argument(
+        "--connect-delay-ms",
+        type=float,
+        default=30.0,
+        help="Delay the stub adds to every new connection, standing in for the TLS handshake.",
+    )
+    parser.add_argument(
+        "--response-delay-ms",
+        type=float,
+        default=0.0,
+        help="Delay the stub adds before every response, standing in for admin API processing time.",
+    )
+    args = parser.parse_args(argv)
+
+    server = start_stub_server(args.connect_delay_ms, args.response_delay_ms)
+    base_url = "http://127.0.0.1:%s" % server.server_address[1]
+    try:
+        before = measure(base_url, HttpConnectionPool(max_idle_per_host=0), args.binds)
+        after = measure(base_url, HttpConnectionPool(), args.binds)
+        lookups = measure_async_lookups(base_url, args.binds)
+    finally:
+        server.shutdown()
+        server.server_close()
+    result = {
+        "connect_delay_ms": args.connect_delay_ms,
+        "response_delay_ms": args.response_delay_ms,
+        "without_pool": before,
+        "with_pool": after,
+        "async_lookups": lookups,
+        "mean_speedup": round(before["mean_ms"] / after["mean_ms"], 2) if after["mean_ms"] else 0.0,
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,21 +5,43 @@ import sys
 from dataclasses import replace
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-from urllib import parse, request
+from urllib import parse
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from rpa_platform.domain.redaction import mask_identifier
-from rpa_platform.integrations.jdy_admin_client import JdyAdminClient, JdyAdminError, JdyCorpDeploy
-from rpa_platform.integrations.wecom_admin_client import WecomAdminClient, WecomAdminError, WecomSessionExpiredError
+from rpa_platform.integrations.admin_call_policy import (
+    ERROR_CIRCUIT_OPEN,
+    ERROR_SESSION_EXPIRED,
+    ERROR_TRANSIENT,
+    AdminCallPolicy,
+    AdminCircuitOpenError,
+    classify_admin_error,
+    shared_admin_call_policy,
+)
+from rpa_platform.integrations.async_http_pool import AsyncHttpConnectionPool, shared_async_http_pool
+from rpa_platform.integrations.http_pool import HttpConnectionPool, HttpResponseData, shared_http_pool
+from rpa_platform.integrations.jdy_admin_client import AsyncJdyAdminClient, JdyAdminClient, JdyAdminError, JdyCorpDeploy
+from rpa_platform.integrations.wecom_admin_client import (
+    AsyncWecomAdminClient,
+    WecomAdminClient,
+    WecomAdminError,
+    WecomSessionExpiredError,
+)
 from rpa_platform.services.wecom_bind_service import JdyWecomBindInput, with_resolved_wecom_suite
 from rpa_platform.worker.wecom_bind_error_messages import known_public_error_msg
 
 
 JDY_BASE_URL = "https://dc.jdydevelop.com"
 WECOM_BASE_URL = "https://open.work.weixin.qq.com"
+# Transient failures and open circuits: the request may succeed later as it is.
+ADMIN_UNAVAILABLE_ERRORS = frozenset({ERROR_TRANSIENT, ERROR_CIRCUIT_OPEN})
+ADMIN_UNAVAILABLE_ERROR_MSGS = {
+    "jdy_admin_unavailable": "简道云后台接口暂时不可用，请稍后重试",
+    "wecom_admin_unavailable": "企微后台接口暂时不可用，请稍后重试",
+}
 
 
 class CookieSourceError(RuntimeError):
@@ -29,33 +51,84 @@ class CookieSourceError(RuntimeError):
 class JsonHttpError(RuntimeError):
     """Raised for HTTP or JSON transport errors without exposing Cookie headers."""
 
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status of an error response; None when no response was received.
+        self.status = status
+
 
 class JdyCookieTransport:
-    def __init__(self, cookie: str, base_url: str = JDY_BASE_URL, timeout: int = 20):
+    def __init__(
+        self,
+        cookie: str,
+        base_url: str = JDY_BASE_URL,
+        timeout: int = 20,
+        pool: Optional[HttpConnectionPool] = None,
+        policy: Optional[AdminCallPolicy] = None,
+    ):
         self.cookie = cookie
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.pool = pool or shared_http_pool()
+        self.policy = policy or shared_admin_call_policy()
 
     def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        return _request_json(
+        return _request_json_with_policy(
+            self.policy,
+            path,
             method="POST",
             url=self.base_url + path,
             payload=payload,
-            headers={
-                "content-type": "application/json",
-                "cookie": self.cookie,
-                "origin": self.base_url,
-                "referer": self.base_url + "/",
-            },
+            headers=_jdy_headers(self.cookie, self.base_url),
             timeout=self.timeout,
+            pool=self.pool,
+        )
+
+
+class AsyncJdyCookieTransport:
+    """``JdyCookieTransport`` for ``AsyncJdyAdminClient``, on the running loop's async pool."""
+
+    def __init__(
+        self,
+        cookie: str,
+        base_url: str = JDY_BASE_URL,
+        timeout: int = 20,
+        pool: Optional[AsyncHttpConnectionPool] = None,
+        policy: Optional[AdminCallPolicy] = None,
+    ):
+        self.cookie = cookie
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool = pool
+        self.policy = policy or shared_admin_call_policy()
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await _request_json_async_with_policy(
+            self.policy,
+            path,
+            method="POST",
+            url=self.base_url + path,
+            payload=payload,
+            headers=_jdy_headers(self.cookie, self.base_url),
+            timeout=self.timeout,
+            pool=self.pool,
         )
 
 
 class WecomCookieTransport:
-    def __init__(self, cookie: str, base_url: str = WECOM_BASE_URL, timeout: int = 20):
+    def __init__(
+        self,
+        cookie: str,
+        base_url: str = WECOM_BASE_URL,
+        timeout: int = 20,
+        pool: Optional[HttpConnectionPool] = None,
+        policy: Optional[AdminCallPolicy] = None,
+    ):
         self.cookie = cookie
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.pool = pool or shared_http_pool()
+        self.policy = policy or shared_admin_call_policy()
 
     def get_json(
         self,
@@ -63,14 +136,15 @@ class WecomCookieTransport:
         params: Dict[str, Any],
         headers: Dict[str, str],
     ) -> Dict[str, Any]:
-        query = parse.urlencode(params)
-        url = self.base_url + path + ("?" + query if query else "")
-        return _request_json(
+        return _request_json_with_policy(
+            self.policy,
+            path,
             method="GET",
-            url=url,
+            url=_wecom_get_url(self.base_url, path, params),
             payload=None,
-            headers=self._headers(headers),
+            headers=_wecom_headers(self.cookie, self.base_url, headers),
             timeout=self.timeout,
+            pool=self.pool,
         )
 
     def post_json(
@@ -79,24 +153,68 @@ class WecomCookieTransport:
         payload: Dict[str, Any],
         headers: Dict[str, str],
     ) -> Dict[str, Any]:
-        query = parse.urlencode({"lang": "zh_CN", "ajax": 1, "f": "json", "random": 0})
-        return _request_json(
+        return _request_json_with_policy(
+            self.policy,
+            path,
             method="POST",
-            url=self.base_url + path + "?" + query,
+            url=_wecom_post_url(self.base_url, path),
             payload=payload,
-            headers=self._headers(headers),
+            headers=_wecom_headers(self.cookie, self.base_url, headers),
             timeout=self.timeout,
+            pool=self.pool,
         )
 
-    def _headers(self, headers: Dict[str, str]) -> Dict[str, str]:
-        merged = {
-            "content-type": "application/json",
-            "cookie": self.cookie,
-            "origin": self.base_url,
-            "referer": self.base_url + "/wwopen/developers/tools",
-        }
-        merged.update(headers)
-        return merged
+
+class AsyncWecomCookieTransport:
+    """``WecomCookieTransport`` for ``AsyncWecomAdminClient``, on the running loop's async pool."""
+
+    def __init__(
+        self,
+        cookie: str,
+        base_url: str = WECOM_BASE_URL,
+        timeout: int = 20,
+        pool: Optional[AsyncHttpConnectionPool] = None,
+        policy: Optional[AdminCallPolicy] = None,
+    ):
+        self.cookie = cookie
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool = pool
+        self.policy = policy or shared_admin_call_policy()
+
+    async def get_json(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+    ) -> Dict[str, Any]:
+        return await _request_json_async_with_policy(
+            self.policy,
+            path,
+            method="GET",
+            url=_wecom_get_url(self.base_url, path, params),
+            payload=None,
+            headers=_wecom_headers(self.cookie, self.base_url, headers),
+            timeout=self.timeout,
+            pool=self.pool,
+        )
+
+    async def post_json(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+    ) -> Dict[str, Any]:
+        return await _request_json_async_with_policy(
+            self.policy,
+            path,
+            method="POST",
+            url=_wecom_post_url(self.base_url, path),
+            payload=payload,
+            headers=_wecom_headers(self.cookie, self.base_url, headers),
+            timeout=self.timeout,
+            pool=self.pool,
+        )
 
 
 def run_readonly_preflight(
@@ -113,8 +231,8 @@ def run_readonly_preflight(
         bind_input = with_resolved_wecom_suite(bind_input, corp)
     except (JdyAdminError, JsonHttpError) as exc:
         userid_source = "payload" if bind_input.requested_user_id.strip() else "default"
-        if _is_jdy_session_expired_error(exc):
-            return _failure_summary(bind_input, "jdy_session_expired", exc)
+        if _jdy_failure_reason(exc):
+            return _failure_summary(bind_input, _jdy_failure_reason(exc), exc)
         try:
             owner = jdy_client.check_wework_owner(
                 bind_input.requested_user_id,
@@ -122,9 +240,8 @@ def run_readonly_preflight(
                 suite_scenario=bind_input.suite_scenario,
             )
         except (JdyAdminError, JsonHttpError) as owner_exc:
-            if _is_jdy_session_expired_error(owner_exc):
-                return _failure_summary(bind_input, "jdy_session_expired", owner_exc)
-            return _failure_summary(bind_input, "jdy_corp_not_unique_or_missing", owner_exc)
+            reason = _jdy_failure_reason(owner_exc) or "jdy_corp_not_unique_or_missing"
+            return _failure_summary(bind_input, reason, owner_exc)
         corp = _recover_corp_from_owner(bind_input, owner)
         if corp is None:
             return _failure_summary(bind_input, "jdy_corp_not_unique_or_missing", exc)
@@ -140,9 +257,8 @@ def run_readonly_preflight(
                 suite_scenario=bind_input.suite_scenario,
             )
         except (JdyAdminError, JsonHttpError) as exc:
-            if _is_jdy_session_expired_error(exc):
-                return _failure_summary(bind_input, "jdy_session_expired", exc, corp=corp)
-            return _failure_summary(bind_input, "jdy_owner_check_failed", exc, corp=corp)
+            reason = _jdy_failure_reason(exc) or "jdy_owner_check_failed"
+            return _failure_summary(bind_input, reason, exc, corp=corp)
 
     owner_state = _owner_state(owner.can_bind_corp_secret, owner.can_update_corp_secret)
     if owner_state == "cannot_bind_or_update":
@@ -174,9 +290,10 @@ def run_readonly_preflight(
             owner_state=owner_state,
         )
     except (WecomAdminError, JsonHttpError) as exc:
+        unavailable = classify_admin_error(exc) in ADMIN_UNAVAILABLE_ERRORS
         return _failure_summary(
             bind_input,
-            "wecom_app_not_unique_or_missing",
+            "wecom_admin_unavailable" if unavailable else "wecom_app_not_unique_or_missing",
             exc,
             corp=corp,
             owner_state=owner_state,
@@ -210,12 +327,28 @@ def build_real_clients(
     jdy_cookie_file: Optional[str] = None,
     wecom_cookie_file: Optional[str] = None,
     timeout: int = 20,
+    pool: Optional[HttpConnectionPool] = None,
 ) -> Dict[str, Any]:
     jdy_cookie = _read_cookie("JDY_ADMIN_COOKIE", "JDY_ADMIN_COOKIE_FILE", jdy_cookie_file)
     wecom_cookie = _read_cookie("WECOM_ADMIN_COOKIE", "WECOM_ADMIN_COOKIE_FILE", wecom_cookie_file)
     return {
-        "jdy_client": JdyAdminClient(JdyCookieTransport(jdy_cookie, timeout=timeout)),
-        "wecom_client": WecomAdminClient(WecomCookieTransport(wecom_cookie, timeout=timeout)),
+        "jdy_client": JdyAdminClient(JdyCookieTransport(jdy_cookie, timeout=timeout, pool=pool)),
+        "wecom_client": WecomAdminClient(WecomCookieTransport(wecom_cookie, timeout=timeout, pool=pool)),
+    }
+
+
+def build_real_async_clients(
+    jdy_cookie_file: Optional[str] = None,
+    wecom_cookie_file: Optional[str] = None,
+    timeout: int = 20,
+    pool: Optional[AsyncHttpConnectionPool] = None,
+) -> Dict[str, Any]:
+    """``build_real_clients`` for coroutine callers; both clients share one pool per event loop."""
+    jdy_cookie = _read_cookie("JDY_ADMIN_COOKIE", "JDY_ADMIN_COOKIE_FILE", jdy_cookie_file)
+    wecom_cookie = _read_cookie("WECOM_ADMIN_COOKIE", "WECOM_ADMIN_COOKIE_FILE", wecom_cookie_file)
+    return {
+        "jdy_client": AsyncJdyAdminClient(AsyncJdyCookieTransport(jdy_cookie, timeout=timeout, pool=pool)),
+        "wecom_client": AsyncWecomAdminClient(AsyncWecomCookieTransport(wecom_cookie, timeout=timeout, pool=pool)),
     }
 
 
@@ -269,28 +402,68 @@ def main(argv: Optional[List[str]] = None) -> int:
     return 0 if result["status"] in {"ok", "review"} else 2
 
 
+def _request_json_with_policy(policy: AdminCallPolicy, path: str, **request: Any) -> Dict[str, Any]:
+    url = request["url"]
+    try:
+        return policy.call(parse.urlsplit(url).netloc, path, lambda: _request_json(**request))
+    except AdminCircuitOpenError as exc:
+        raise JsonHttpError("%s %s failed: %s" % (request["method"], _safe_url(url), exc)) from exc
+
+
+async def _request_json_async_with_policy(policy: AdminCallPolicy, path: str, **request: Any) -> Dict[str, Any]:
+    url = request["url"]
+    try:
+        return await policy.call_async(parse.urlsplit(url).netloc, path, lambda: _request_json_async(**request))
+    except AdminCircuitOpenError as exc:
+        raise JsonHttpError("%s %s failed: %s" % (request["method"], _safe_url(url), exc)) from exc
+
+
 def _request_json(
     method: str,
     url: str,
     payload: Optional[Dict[str, Any]],
     headers: Dict[str, str],
     timeout: int,
+    pool: Optional[HttpConnectionPool] = None,
 ) -> Dict[str, Any]:
     body = None if payload is None else json.dumps(payload).encode("utf-8")
-    req = request.Request(url=url, data=body, headers=headers, method=method)
     try:
-        with request.urlopen(req, timeout=timeout) as response:
-            raw = response.read().decode("utf-8")
+        response = (pool or shared_http_pool()).request(method, url, body=body, headers=headers, timeout=timeout)
     except Exception as exc:
-        detail = str(exc)
-        if hasattr(exc, "read"):
-            try:
-                error_body = exc.read().decode("utf-8")
-            except Exception:
-                error_body = ""
-            if error_body:
-                detail = "%s %s" % (detail, error_body)
-        raise JsonHttpError("%s %s failed: %s" % (method, _safe_url(url), detail)) from exc
+        raise JsonHttpError("%s %s failed: %s" % (method, _safe_url(url), exc)) from exc
+    return _decode_json_response(method, url, response)
+
+
+async def _request_json_async(
+    method: str,
+    url: str,
+    payload: Optional[Dict[str, Any]],
+    headers: Dict[str, str],
+    timeout: int,
+    pool: Optional[AsyncHttpConnectionPool] = None,
+) -> Dict[str, Any]:
+    body = None if payload is None else json.dumps(payload).encode("utf-8")
+    try:
+        response = await (pool or shared_async_http_pool()).request(
+            method,
+            url,
+            body=body,
+            headers=headers,
+            timeout=timeout,
+        )
+    except Exception as exc:
+        raise JsonHttpError("%s %s failed: %s" % (method, _safe_url(url), exc)) from exc
+    return _decode_json_response(method, url, response)
+
+
+def _decode_json_response(method: str, url: str, response: HttpResponseData) -> Dict[str, Any]:
+    raw = response.body.decode("utf-8", errors="replace")
+    if response.status >= 400:
+        # Same wording as urllib's HTTPError, which the error-message mapping matches on.
+        detail = "HTTP Error %s: %s" % (response.status, response.reason)
+        if raw:
+            detail = "%s %s" % (detail, raw)
+        raise JsonHttpError("%s %s failed: %s" % (method, _safe_url(url), detail), status=response.status)
     try:
         data = json.loads(raw)
     except json.JSONDecodeError as exc:
@@ -300,6 +473,36 @@ def _request_json(
     return data
 
 
+def _jdy_headers(cookie: str, base_url: str) -> Dict[str, str]:
+    return {
+        "content-type": "application/json",
+        "cookie": cookie,
+        "origin": base_url,
+        "referer": base_url + "/",
+    }
+
+
+def _wecom_headers(cookie: str, base_url: str, headers: Dict[str, str]) -> Dict[str, str]:
+    merged = {
+        "content-type": "application/json",
+        "cookie": cookie,
+        "origin": base_url,
+        "referer": base_url + "/wwopen/developers/tools",
+    }
+    merged.update(headers)
+    return merged
+
+
+def _wecom_get_url(base_url: str, path: str, params: Dict[str, Any]) -> str:
+    query = parse.urlencode(params)
+    return base_url + path + ("?" + query if query else "")
+
+
+def _wecom_post_url(base_url: str, path: str) -> str:
+    query = parse.urlencode({"lang": "zh_CN", "ajax": 1, "f": "json", "random": 0})
+    return base_url + path + "?" + query
+
+
 def _read_cookie(env_name: str, file_env_name: str, explicit_file: Optional[str]) -> str:
     value = os.environ.get(env_name, "").strip()
     if value:
@@ -326,9 +529,14 @@ def _safe_url(url: str) -> str:
     return parse.urlunsplit((parsed.scheme, parsed.netloc, parsed.path, "", ""))
 
 
-def _is_jdy_session_expired_error(exc: Exception) -> bool:
-    message = str(exc)
-    return '"code":1007' in message or "code=1007" in message or "用户尚未登录" in message
+def _jdy_failure_reason(exc: Exception) -> str:
+    """Preflight reason for JDY failures that no fallback lookup can fix, else ""."""
+    kind = classify_admin_error(exc)
+    if kind == ERROR_SESSION_EXPIRED:
+        return "jdy_session_expired"
+    if kind in ADMIN_UNAVAILABLE_ERRORS:
+        return "jdy_admin_unavailable"
+    return ""
 
 
 def _owner_state(can_bind: bool, can_update: bool) -> str:
@@ -477,6 +685,8 @@ def _public_error_msg(reason: str, exc: Exception) -> str:
         return "当前填写的 UserID 不是该企业的简道云拥有者，请填写企业拥有者 UserID 后重试"
     if reason == "jdy_corp_not_unique_or_missing" and detail:
         return detail
+    if reason in ADMIN_UNAVAILABLE_ERROR_MSGS:
+        return ADMIN_UNAVAILABLE_ERROR_MSGS[reason]
     return detail or reason
 
 
@@ -0,0 +1,126 @@
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from rpa_platform.domain.default_flows import WECOM_APP_LAUNCH_FLOW_STEPS
+from rpa_platform.storage.sqlite_store import SQLiteStore
+
+
+LEGACY_TASKS_DDL = """
+CREATE TABLE tasks (
+    id TEXT PRIMARY KEY,
+    team_id TEXT NOT NULL,
+    flow_template_id TEXT NOT NULL,
+    flow_version_id TEXT NOT NULL,
+    flow_version_snapshot_json TEXT NOT NULL,
+    status TEXT NOT NULL,
+    enterprise_name TEXT NOT NULL,
+    corp_id TEXT NOT NULL,
+    source_user_id TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload_json TEXT NOT NULL,
+    runtime_context_json TEXT NOT NULL DEFAULT '{}',
+    current_step_key TEXT DEFAULT '',
+    next_check_at TEXT,
+    check_attempts INTEGER NOT NULL DEFAULT 0,
+    assigned_robot_id TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    finished_at TEXT
+);
+"""
+
+
+def measure(task_count: int, version_count: int, db_path: Path) -> Dict[str, Any]:
+    """Build a legacy-layout DB with per-task snapshot copies, migrate it in place and compare sizes."""
+    snapshots = [_snapshot(version_no) for version_no in range(1, version_count + 1)]
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.executescript(LEGACY_TASKS_DDL)
+        conn.executemany(
+            """
+            INSERT INTO tasks
+                (id, team_id, flow_template_id, flow_version_id, flow_version_snapshot_json,
+                 status, enterprise_name, corp_id, source_user_id, idempotency_key,
+                 payload_json, created_at, updated_at)
+            VALUES (?, 'team', 'flow', ?, ?, 'pending', ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [_legacy_row(index, snapshots[index % version_count]) for index in range(task_count)],
+        )
+    legacy_bytes = _vacuumed_size(db_path)
+
+    SQLiteStore(str(db_path)).init_schema()
+    migrated_bytes = _vacuumed_size(db_path)
+    return {
+        "tasks": task_count,
+        "published_versions": version_count,
+        "legacy_bytes": legacy_bytes,
+        "migrated_bytes": migrated_bytes,
+        "reduction_ratio": round(1 - migrated_bytes / legacy_bytes, 4) if legacy_bytes else 0.0,
+    }
+
+
+def _snapshot(version_no: int) -> Dict[str, Any]:
+    return {
+        "id": "version-%s" % version_no,
+        "version_no": version_no,
+        "status": "published",
+        "published_at": "2026-06-0%s 10:00:00.000000" % min(version_no, 9),
+        "steps": WECOM_APP_LAUNCH_FLOW_STEPS,
+    }
+
+
+def _legacy_row(index: int, snapshot: Dict[str, Any]) -> tuple:
+    corp_id = "ww%016d" % index
+    user_id = "user-%06d" % index
+    enterprise_name = "测试客户企业%06d有限公司" % index
+    payload = {"user_id": user_id, "企业客户名称": enterprise_name, "企业微信明文 CorpID": corp_id}
+    created_at = "2026-06-08 10:%02d:%02d.000000" % (index // 60 % 60, index % 60)
+    return (
+        str(uuid.uuid4()),
+        snapshot["id"],
+        json.dumps(snapshot, ensure_ascii=False),
+        enterprise_name,
+        corp_id,
+        user_id,
+        "wecom_app_launch:%s:%s" % (corp_id, user_id),
+        json.dumps(payload, ensure_ascii=False),
+        created_at,
+        created_at,
+    )
+
+
+def _vacuumed_size(db_path: Path) -> int:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+    return int(page_count) * int(page_size)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure SQLite size saved by content-addressed flow snapshots.")
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--versions", type=int, default=3, help="Distinct published versions tasks were created from.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = measure(args.tasks, args.versions, Path(tmpdir) / "platform.db")
+    print(json.dumps(result, ensure_ascii=False, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
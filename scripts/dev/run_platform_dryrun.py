@@ -374,7 +374,6 @@ def _redact_task_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
     redacted["manual_actions"] = redact_context(redacted.get("manual_actions", []))
     redacted.pop("payload_json", None)
     redacted.pop("runtime_context_json", None)
-    redacted.pop("flow_version_snapshot_json", None)
     return redacted
 
 
@@ -0,0 +1,49 @@
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from rpa_platform.storage.sqlite_store import SQLiteStore
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Archive old terminal platform tasks into a side database.")
+    parser.add_argument("--db-path", required=True, help="Live platform SQLite path.")
+    parser.add_argument(
+        "--archive-path",
+        default=None,
+        help="Archive SQLite path. Defaults to <db-path stem>-archive.db next to the live database.",
+    )
+    parser.add_argument("--older-than-days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--vacuum-pages", type=int, default=None, help="Cap incremental vacuum work per run.")
+    parser.add_argument(
+        "--full-vacuum",
+        action="store_true",
+        help="Run one full VACUUM first; needed once for databases created without incremental auto-vacuum.",
+    )
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.db_path)
+    archive_path = args.archive_path or str(db_path.with_name("%s-archive.db" % db_path.stem))
+    store = SQLiteStore(str(db_path), archive_path=archive_path)
+    store.init_schema()
+    if args.full_vacuum:
+        store.vacuum()
+    result = store.archive_terminal_tasks(
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+        vacuum_pages=args.vacuum_pages,
+    )
+    print(json.dumps(dict(asdict(result), archive_path=archive_path), ensure_ascii=False, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
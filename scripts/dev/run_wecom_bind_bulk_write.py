@@ -0,0 +1,100 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from rpa_platform.integrations.jdy_admin_client import JdyAdminClient
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
+from rpa_platform.services.wecom_bind_service import FixedWecomSecretGenerator, RandomWecomSecretGenerator
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore
+from rpa_platform.worker.bind_write_locks import BindWriteLockManager
+from rpa_platform.worker.wecom_bind_bulk_write import (
+    DEFAULT_BULK_RESOLVE_WORKERS,
+    DEFAULT_BULK_WRITE_WORKERS,
+    run_bulk_wecom_bind_write,
+)
+from scripts.dev.check_wecom_bind_real_readonly import build_real_clients
+from scripts.dev.run_platform_dryrun import FakeServiceJdyAdminTransport, FakeServiceWecomAdminTransport
+
+
+SUCCESS_STATUSES = {"success", "already_completed"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the unattended Jiandaoyun-WeCom bind write for many enterprises.")
+    parser.add_argument(
+        "--enterprises-file",
+        required=True,
+        help="JSON list of bind contexts, each with a unique task_id",
+    )
+    parser.add_argument("--jdy-cookie-file", default=".local/jdy-admin.cookie")
+    parser.add_argument("--wecom-cookie-file", default=".local/wecom-admin.cookie")
+    parser.add_argument("--context-store", default="", help="SQLite context store; defaults to the worker's store")
+    parser.add_argument("--lock-dir", default="", help="write lock directory; defaults to the worker's locks")
+    parser.add_argument("--wait-seconds", type=int, default=300)
+    parser.add_argument("--resolve-workers", type=int, default=DEFAULT_BULK_RESOLVE_WORKERS)
+    parser.add_argument("--write-workers", type=int, default=DEFAULT_BULK_WRITE_WORKERS)
+    parser.add_argument("--confirm-write", action="store_true")
+    parser.add_argument("--use-fake-transport-for-test", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    items = _load_items(Path(args.enterprises_file))
+    if not args.confirm_write:
+        _print_json(
+            {
+                "status": "blocked",
+                "reason": "missing_confirm_write",
+                "task_ids": [task_id for task_id, _context in items],
+            }
+        )
+        return 2
+
+    if args.use_fake_transport_for_test:
+        jdy_client = JdyAdminClient(FakeServiceJdyAdminTransport())
+        wecom_client = WecomAdminClient(FakeServiceWecomAdminTransport())
+        secret_generator: Any = FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret")
+    else:
+        clients = build_real_clients(
+            jdy_cookie_file=args.jdy_cookie_file,
+            wecom_cookie_file=args.wecom_cookie_file,
+        )
+        jdy_client = clients["jdy_client"]
+        wecom_client = clients["wecom_client"]
+        secret_generator = RandomWecomSecretGenerator()
+
+    summary = run_bulk_wecom_bind_write(
+        items,
+        jdy_client=jdy_client,
+        wecom_client=wecom_client,
+        secret_generator=secret_generator,
+        # One line per enterprise as soon as its write is final.
+        on_result=lambda task_id, result: _print_json({"task_id": task_id, **result}, indent=None),
+        context_store=BindWriteContextStore(args.context_store) if args.context_store else None,
+        locks=BindWriteLockManager(Path(args.lock_dir)) if args.lock_dir else None,
+        wait_seconds=args.wait_seconds,
+        resolve_workers=args.resolve_workers,
+        write_workers=args.write_workers,
+    )
+    summary.pop("results")
+    _print_json(summary)
+    return 0 if set(summary["statuses"]) <= SUCCESS_STATUSES else 2
+
+
+def _load_items(path: Path) -> List[Any]:
+    rows = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(rows, list) or not all(isinstance(row, dict) and row.get("task_id") for row in rows):
+        raise SystemExit("%s must be a JSON list of objects with a task_id" % path)
+    return [(str(row["task_id"]), {key: value for key, value in row.items() if key != "task_id"}) for row in rows]
+
+
+def _print_json(value: Dict[str, Any], indent: Optional[int] = 2) -> None:
+    print(json.dumps(value, ensure_ascii=False, indent=indent, sort_keys=True), flush=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,7 +6,7 @@ import time
 from dataclasses import replace
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
@@ -164,9 +164,11 @@ def _start_bind_with_recoverable_context(
     jdy_client: JdyAdminClient,
     wecom_client: WecomAdminClient,
     secret_generator: Any,
-    context_file: Path,
+    context_file: Optional[Path],
     now: datetime,
+    persist: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> JdyWecomBindResult:
+    save_context = persist or (lambda value: _write_private_json(context_file, value))
     owner = None
     try:
         corp = jdy_client.resolve_unique_corp(
@@ -257,7 +259,7 @@ def _start_bind_with_recoverable_context(
             "order_created_at": "",
         },
     }
-    _write_private_json(context_file, context)
+    save_context(context)
 
     save_request = WecomSaveAppRequest(
         suiteid=bind_input.wecom_suiteid,
@@ -281,7 +283,7 @@ def _start_bind_with_recoverable_context(
     context["wecom"]["auditorderid"] = order.auditorderid
     context["wecom"]["auditorder_status"] = order.status
     context["wecom"]["order_created_at"] = now.strftime("%Y-%m-%d %H:%M:%S")
-    _write_private_json(context_file, context)
+    save_context(context)
     return JdyWecomBindResult(
         status="waiting_wecom_online_delay",
         context=context,
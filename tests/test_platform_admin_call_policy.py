@@ -0,0 +1,282 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rpa_platform.integrations.admin_call_policy import (
+    AdminCallPolicy,
+    AdminCircuitOpenError,
+    EndpointPolicy,
+    classify_admin_error,
+)
+from rpa_platform.integrations.http_pool import HttpConnectionPool
+from rpa_platform.integrations.wecom_admin_client import WecomSessionExpiredError
+from scripts.dev.check_wecom_bind_real_readonly import JdyCookieTransport, JsonHttpError
+
+
+READ_PATH = "/api/fx_sa/wxwork/get_corp_deploy_list"
+WRITE_PATH = "/api/fx_sa/wxwork/install_corp_deploy"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_policy(clock, sleeps, **kwargs):
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.sleep(seconds)
+
+    return AdminCallPolicy(clock=clock, sleep=sleep, rng=lambda: 1.0, **kwargs)
+
+
+def failing(errors, result="ok"):
+    calls = []
+
+    def send():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return send, calls
+
+
+def transient(status=503):
+    return JsonHttpError("HTTP Error %s" % status, status=status)
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.server.requests += 1
+        body = json.dumps({"has_more": False, "corp_deploy_list": []}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+class AdminCallPolicyTest(unittest.TestCase):
+    def test_read_endpoint_retries_transient_errors_with_exponential_backoff(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps)
+        send, calls = failing([transient(), TimeoutError("timed out")])
+
+        self.assertEqual(policy.call("jdy", READ_PATH, send), "ok")
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleeps, [0.5, 1.0])
+        self.assertEqual(policy.stats()["retries"], 2)
+
+    def test_write_endpoint_retries_only_when_the_request_was_never_sent(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps)
+        send, calls = failing([TimeoutError("timed out")])
+
+        with self.assertRaises(TimeoutError):
+            policy.call("jdy", WRITE_PATH, send)
+        self.assertEqual(len(calls), 1)
+
+        send_refused, refused_calls = failing([], result="installed")
+        errors = [ConnectionRefusedError("refused")]
+
+        def refused_once():
+            if errors:
+                try:
+                    raise errors.pop(0)
+                except ConnectionRefusedError as exc:
+                    raise JsonHttpError("POST failed: refused") from exc
+            return send_refused()
+
+        self.assertEqual(policy.call("jdy", WRITE_PATH, refused_once), "installed")
+        self.assertEqual(len(refused_calls), 1)
+
+    def test_client_errors_are_neither_retried_nor_counted_against_the_host(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps, failure_threshold=1)
+        send, calls = failing([transient(status=404)])
+
+        with self.assertRaises(JsonHttpError):
+            policy.call("jdy", READ_PATH, send)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(policy.breaker("jdy").state, "closed")
+
+    def test_open_circuit_fails_fast_for_every_caller_until_a_probe_succeeds(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(
+            clock,
+            sleeps,
+            endpoints={READ_PATH: EndpointPolicy(retries=5)},
+            failure_threshold=3,
+            reset_timeout_seconds=30,
+        )
+        send, calls = failing([transient() for _ in range(10)])
+
+        with self.assertRaises(JsonHttpError):
+            policy.call("wecom", READ_PATH, send)
+        self.assertEqual(len(calls), 3)
+
+        other, other_calls = failing([])
+        with self.assertRaises(AdminCircuitOpenError):
+            policy.call("wecom", WRITE_PATH, other)
+        self.assertEqual(other_calls, [])
+        self.assertEqual(policy.call("jdy", WRITE_PATH, other), "ok")
+
+        clock.now += 30
+        self.assertEqual(policy.breaker("wecom").state, "half_open")
+        self.assertEqual(policy.call("wecom", WRITE_PATH, other), "ok")
+        self.assertEqual(policy.stats()["circuits"]["wecom"], {"state": "closed", "times_opened": 1})
+
+    def test_failed_probe_reopens_the_circuit(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps, failure_threshold=1, reset_timeout_seconds=10)
+        send, _calls = failing([transient(), transient()])
+        with self.assertRaises(JsonHttpError):
+            policy.call("wecom", WRITE_PATH, send)
+
+        clock.now += 10
+        with self.assertRaises(JsonHttpError):
+            policy.call("wecom", WRITE_PATH, send)
+
+        self.assertEqual(policy.breaker("wecom").state, "open")
+        self.assertEqual(policy.breaker("wecom").times_opened, 2)
+
+    def test_interrupted_call_neither_resets_nor_counts_host_failures(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps, failure_threshold=2)
+        send, _calls = failing([transient(), KeyboardInterrupt(), transient()])
+
+        with self.assertRaises(JsonHttpError):
+            policy.call("wecom", WRITE_PATH, send)
+        with self.assertRaises(KeyboardInterrupt):
+            policy.call("wecom", WRITE_PATH, send)
+        self.assertEqual(policy.breaker("wecom").state, "closed")
+        with self.assertRaises(JsonHttpError):
+            policy.call("wecom", WRITE_PATH, send)
+
+        self.assertEqual(policy.breaker("wecom").state, "open")
+
+    def test_cancelled_probe_keeps_the_circuit_half_open_for_the_next_caller(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps, failure_threshold=1, reset_timeout_seconds=10)
+        send, _calls = failing([transient()])
+        with self.assertRaises(JsonHttpError):
+            policy.call("wecom", WRITE_PATH, send)
+        clock.now += 10
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(policy.call_async("wecom", WRITE_PATH, cancelled))
+
+        self.assertEqual(policy.breaker("wecom").state, "half_open")
+        self.assertEqual(policy.call("wecom", WRITE_PATH, send), "ok")
+        self.assertEqual(policy.breaker("wecom").state, "closed")
+
+    def test_rate_limit_spaces_calls_to_one_host(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps, rate_limit_per_second=2, rate_limit_burst=1)
+        send, _calls = failing([])
+
+        for _ in range(3):
+            policy.call("wecom", WRITE_PATH, send)
+
+        self.assertEqual(sleeps, [0.5, 0.5])
+
+    def test_async_calls_share_the_host_circuit(self):
+        clock, sleeps = FakeClock(), []
+
+        async def async_sleep(seconds):
+            sleeps.append(seconds)
+
+        policy = AdminCallPolicy(clock=clock, async_sleep=async_sleep, rng=lambda: 1.0, failure_threshold=2)
+
+        async def run():
+            async def send():
+                raise transient()
+
+            with self.assertRaises(JsonHttpError):
+                await policy.call_async("wecom", READ_PATH, send)
+            with self.assertRaises(AdminCircuitOpenError):
+                policy.call("wecom", READ_PATH, lambda: "never")
+
+        asyncio.run(run())
+
+        self.assertEqual(sleeps, [0.5])
+
+    def test_classify_admin_error_separates_session_transient_and_circuit_failures(self):
+        circuit = AdminCircuitOpenError("open")
+        try:
+            raise JsonHttpError("POST failed") from circuit
+        except JsonHttpError as exc:
+            wrapped_circuit = exc
+
+        self.assertEqual(classify_admin_error(WecomSessionExpiredError("outsession")), "session_expired")
+        self.assertEqual(classify_admin_error(JsonHttpError('failed: {"code":1007}', status=400)), "session_expired")
+        self.assertEqual(classify_admin_error(wrapped_circuit), "circuit_open")
+        self.assertEqual(classify_admin_error(transient(status=502)), "transient")
+        self.assertEqual(classify_admin_error(JsonHttpError("returned non-JSON response")), "error")
+
+    def test_from_env_reads_budgets_and_rejects_negative_values(self):
+        policy = AdminCallPolicy.from_env({"RPA_ADMIN_READ_RETRIES": "4", "RPA_ADMIN_BREAKER_FAILURES": "2"})
+
+        self.assertEqual(policy.endpoint(READ_PATH).retries, 4)
+        self.assertEqual(policy.endpoint(WRITE_PATH).retries, 0)
+        self.assertEqual(policy.failure_threshold, 2)
+        with self.assertRaises(ValueError):
+            AdminCallPolicy.from_env({"RPA_ADMIN_RATE_LIMIT_PER_SECOND": "-1"})
+
+
+class CookieTransportPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StatusHandler)
+        self.server.daemon_threads = True
+        self.server.statuses = []
+        self.server.requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = "http://127.0.0.1:%s" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_transport_retries_gateway_errors_and_reports_an_open_circuit_as_json_http_error(self):
+        clock, sleeps = FakeClock(), []
+        policy = make_policy(clock, sleeps, failure_threshold=3)
+        transport = JdyCookieTransport("cookie", base_url=self.base_url, pool=HttpConnectionPool(), policy=policy)
+        self.server.statuses = [502, 200]
+
+        self.assertEqual(transport.post_json(READ_PATH, {})["corp_deploy_list"], [])
+        self.assertEqual(self.server.requests, 2)
+
+        self.server.statuses = [503, 503, 503]
+        with self.assertRaises(JsonHttpError) as raised:
+            transport.post_json(READ_PATH, {})
+        self.assertEqual(raised.exception.status, 503)
+        with self.assertRaisesRegex(JsonHttpError, "circuit open"):
+            transport.post_json(WRITE_PATH, {})
+
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(sleeps, [0.5, 0.5, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
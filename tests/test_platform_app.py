@@ -6,6 +6,7 @@ from fastapi import HTTPException
 
 from rpa_platform.server.app import create_app
 from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.scheduler_service import SchedulerService
 
 
 class PlatformAppTest(unittest.TestCase):
@@ -56,6 +57,17 @@ class PlatformAppTest(unittest.TestCase):
         self.assertEqual(ctx.exception.status_code, 422)
         self.assertIn("企业微信明文 CorpID", ctx.exception.detail)
 
+    def test_scheduler_stats_endpoint_is_mounted_with_scheduler(self):
+        scheduler = SchedulerService(self.store, runner=None)
+        app = create_app(self.store, self.team_id, self.flow_id, scheduler=scheduler)
+        route = next(route for route in app.routes if getattr(route, "path", None) == "/platform/scheduler/stats")
+
+        stats = route.endpoint()
+
+        self.assertEqual(stats["claimed_total"], 0)
+        self.assertFalse(stats["running"])
+        self.assertIn("notify", stats["wake_latency_ms"])
+
     def _route(self, path, method):
         for route in self.app.routes:
             if getattr(route, "path", None) == path and method in getattr(route, "methods", set()):
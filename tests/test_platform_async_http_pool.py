@@ -0,0 +1,246 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rpa_platform.integrations.async_http_pool import AsyncHttpConnection, AsyncHttpConnectionPool
+from rpa_platform.integrations.http_pool import HttpResponseData
+from rpa_platform.integrations.jdy_admin_client import AsyncJdyAdminClient
+from rpa_platform.integrations.wecom_admin_client import AsyncWecomAdminClient
+from scripts.dev.benchmark_admin_http_pool import start_stub_server
+from scripts.dev.check_wecom_bind_real_readonly import AsyncJdyCookieTransport, AsyncWecomCookieTransport, JsonHttpError
+
+
+class SlowEchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._reply(b"")
+
+    def do_POST(self):
+        self._reply(self.rfile.read(int(self.headers.get("content-length") or 0)))
+
+    def _reply(self, request_body):
+        self.server.client_ports.add(self.client_address[1])
+        time.sleep(self.server.delay_seconds)
+        body = json.dumps({"path": self.path, "echo": request_body.decode("utf-8")}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        if self.path == "/chunked":
+            self.send_header("transfer-encoding", "chunked")
+            self.end_headers()
+            for index in range(0, len(body), 7):
+                chunk = body[index : index + 7]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+class FakeReader:
+    def at_eof(self):
+        return False
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.written = b""
+
+    def write(self, data):
+        self.written += data
+
+    async def drain(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, failures, response_failures=None):
+        self.failures = failures
+        self.response_failures = response_failures or []
+        self.reader = FakeReader()
+        self.requests = 0
+        self.closed = False
+
+    async def send_request(self, method, path, body, headers):
+        self.requests += 1
+        if self.failures:
+            raise self.failures.pop(0)
+
+    async def read_response(self, method):
+        if self.response_failures:
+            raise self.response_failures.pop(0)
+        return HttpResponseData(200, "OK", b"{}"), False
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncHttpConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowEchoHandler)
+        self.server.daemon_threads = True
+        self.server.client_ports = set()
+        self.server.delay_seconds = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = "http://127.0.0.1:%s" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sequential_requests_reuse_one_kept_alive_connection(self):
+        pool = AsyncHttpConnectionPool()
+
+        async def run():
+            responses = [await pool.request("POST", self.base_url + "/api", body=b'{"n": 1}') for _ in range(4)]
+            responses.append(await pool.request("GET", self.base_url + "/chunked"))
+            pool.close()
+            return responses
+
+        responses = asyncio.run(run())
+
+        self.assertEqual({response.status for response in responses}, {200})
+        self.assertEqual(json.loads(responses[0].body)["echo"], '{"n": 1}')
+        self.assertEqual(json.loads(responses[-1].body)["path"], "/chunked")
+        self.assertEqual(pool.connections_opened, 1)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_concurrent_requests_wait_on_the_network_together_within_the_host_limit(self):
+        self.server.delay_seconds = 0.2
+        pool = AsyncHttpConnectionPool(max_connections_per_host=3)
+
+        async def run():
+            started = time.perf_counter()
+            await asyncio.gather(*(pool.request("GET", self.base_url + "/api") for _ in range(6)))
+            pool.close()
+            return time.perf_counter() - started
+
+        elapsed = asyncio.run(run())
+
+        self.assertLess(elapsed, 6 * 0.2 * 0.75)
+        self.assertEqual(pool.connections_opened, 3)
+
+    def test_timeout_covers_the_whole_response_and_is_not_retried_for_post(self):
+        self.server.delay_seconds = 0.5
+        # The handler's late write hits the closed socket; that error is expected.
+        self.server.handle_error = lambda *_args: None
+        pool = AsyncHttpConnectionPool(retries=2)
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(pool.request("POST", self.base_url + "/api", body=b"{}", timeout=0.1))
+
+        self.assertEqual(pool.connections_opened, 1)
+
+    def test_request_on_connection_dropped_while_idle_is_sent_again_on_a_new_one(self):
+        stale = FakeConnection([])
+        fresh = FakeConnection([])
+        created = [stale, fresh]
+
+        async def factory(*_args):
+            return created.pop(0)
+
+        pool = AsyncHttpConnectionPool(connection_factory=factory)
+
+        async def run():
+            await pool.request("POST", "http://admin.example/api")
+            stale.failures.append(http.client.RemoteDisconnected("closed"))
+            return await pool.request("POST", "http://admin.example/api")
+
+        response = asyncio.run(run())
+
+        self.assertEqual(response.status, 200)
+        self.assertTrue(stale.closed)
+        self.assertEqual(fresh.requests, 1)
+
+
+    def test_post_whose_response_was_lost_on_a_reused_connection_is_not_sent_again(self):
+        reused = FakeConnection([])
+        created = [reused, FakeConnection([])]
+
+        async def factory(*_args):
+            return created.pop(0)
+
+        pool = AsyncHttpConnectionPool(connection_factory=factory)
+
+        async def run():
+            await pool.request("POST", "http://admin.example/api")
+            reused.response_failures.append(http.client.RemoteDisconnected("closed"))
+            await pool.request("POST", "http://admin.example/api")
+
+        with self.assertRaises(http.client.RemoteDisconnected):
+            asyncio.run(run())
+
+        self.assertEqual(reused.requests, 2)
+        self.assertEqual(pool.connections_opened, 1)
+
+
+class AsyncHttpConnectionTest(unittest.TestCase):
+    def test_line_breaks_in_the_request_line_or_headers_are_rejected_before_sending(self):
+        writer = RecordingWriter()
+        conn = AsyncHttpConnection(FakeReader(), writer, "admin.example")
+
+        async def send(method="POST", path="/api", headers=None):
+            await conn.send_request(method, path, b"{}", headers or {})
+
+        with self.assertRaises(ValueError):
+            asyncio.run(send(headers={"Cookie": "sid=1\r\nX-Injected: 1"}))
+        with self.assertRaises(ValueError):
+            asyncio.run(send(headers={"X-Bad\r\nName": "1"}))
+        with self.assertRaises(http.client.InvalidURL):
+            asyncio.run(send(path="/api HTTP/1.1\r\nX-Injected: 1"))
+        with self.assertRaises(ValueError):
+            asyncio.run(send(method="POST /x"))
+        self.assertEqual(writer.written, b"")
+
+        asyncio.run(send(headers={"Cookie": "sid=1"}))
+        self.assertTrue(writer.written.startswith(b"POST /api HTTP/1.1\r\nHost: admin.example\r\nCookie: sid=1\r\n"))
+
+
+class AsyncAdminClientsOverHttpTest(unittest.TestCase):
+    def setUp(self):
+        self.server = start_stub_server(connect_delay_ms=0, response_delay_ms=100)
+        self.base_url = "http://127.0.0.1:%s" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_lookups_for_several_binds_interleave_on_one_event_loop(self):
+        async def resolve(jdy, wecom):
+            corp = await jdy.resolve_unique_corp("ww001", "")
+            app = await wecom.resolve_unique_custom_app(1009479, corp.name, "简道云")
+            return corp.corp_id, app.app_id
+
+        async def run():
+            pool = AsyncHttpConnectionPool()
+            jdy = AsyncJdyAdminClient(AsyncJdyCookieTransport("cookie", base_url=self.base_url, pool=pool))
+            wecom = AsyncWecomAdminClient(AsyncWecomCookieTransport("cookie", base_url=self.base_url, pool=pool))
+            started = time.perf_counter()
+            results = await asyncio.gather(*(resolve(jdy, wecom) for _ in range(4)))
+            pool.close()
+            return results, time.perf_counter() - started
+
+        results, elapsed = asyncio.run(run())
+
+        self.assertEqual(set(results), {("corp-secret", "app-1")})
+        # Four binds of two sequential lookups each: 0.8s end to end if run one by one.
+        self.assertLess(elapsed, 0.6)
+
+    def test_http_errors_surface_as_json_http_error(self):
+        transport = AsyncJdyCookieTransport("cookie", base_url=self.base_url, pool=AsyncHttpConnectionPool())
+
+        with self.assertRaisesRegex(JsonHttpError, "HTTP Error 404"):
+            asyncio.run(transport.post_json("/api/fx_sa/wxwork/unknown", {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
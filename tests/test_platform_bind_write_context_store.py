@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore, default_secret_cipher
+
+
+class ReversingCipher:
+    def encrypt(self, data):
+        return data[::-1]
+
+    def decrypt(self, data):
+        return data[::-1]
+
+
+class BindWriteContextStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmpdir.name) / "contexts.db")
+        self.store = BindWriteContextStore(self.db_path, cipher=ReversingCipher())
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _context(self, **wecom):
+        context = {
+            "jdy": {"corp_secret_id": "jdy-corp-1"},
+            "wecom": {"app_id": "app-1", "auditorderid": "", "token": "token-secret", "encoding_aes_key": "aes-secret"},
+        }
+        context["wecom"].update(wecom)
+        return context
+
+    def test_round_trip_keeps_secrets_out_of_the_plain_columns(self):
+        self.store.save("task-1", self._context(), corp_id="ww001")
+
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM unattended_write_contexts").fetchone()
+
+        self.assertNotIn("token-secret", json.dumps(row))
+        self.assertNotIn("aes-secret", json.dumps(row))
+        self.assertEqual(self.store.load("task-1"), self._context())
+        self.assertEqual(self.store.load("task-missing"), {})
+
+    def test_list_tasks_filters_by_phase_and_keeps_first_corp_id(self):
+        self.store.save("task-1", self._context(), corp_id="ww001")
+        self.store.save("task-2", self._context(auditorderid="order-2"), corp_id="ww002")
+        self.store.save("task-1", self._context(auditorderid="order-1", auditorder_status=5))
+
+        completed = self.store.list_tasks(phase="completed")
+        order_created = self.store.list_tasks(phase="order_created")
+
+        self.assertEqual([(row["task_id"], row["corp_id"]) for row in completed], [("task-1", "ww001")])
+        self.assertEqual([row["task_id"] for row in order_created], ["task-2"])
+        self.assertEqual([row["task_id"] for row in self.store.list_tasks(corp_id="ww002")], ["task-2"])
+
+    def test_import_moves_legacy_files_once_and_keeps_existing_rows(self):
+        legacy_dir = Path(self.tmpdir.name) / "legacy"
+        legacy_dir.mkdir()
+        (legacy_dir / "wecom-bind-real-write-task-1.json").write_text(
+            json.dumps(self._context(auditorderid="order-old")), encoding="utf-8"
+        )
+        (legacy_dir / "wecom-bind-real-write-task-2.json").write_text(
+            json.dumps(self._context(auditorderid="order-file")), encoding="utf-8"
+        )
+        (legacy_dir / "wecom-bind-real-write-context.json").write_text("{}", encoding="utf-8")
+        self.store.save("task-2", self._context(auditorderid="order-db"), corp_id="ww002")
+
+        imported = self.store.import_context_files(legacy_dir)
+
+        self.assertEqual(imported, 1)
+        self.assertEqual(self.store.load("task-1")["wecom"]["auditorderid"], "order-old")
+        self.assertEqual(self.store.load("task-1")["wecom"]["token"], "token-secret")
+        self.assertEqual(self.store.load("task-2")["wecom"]["auditorderid"], "order-db")
+        corp_ids = {row["task_id"]: row["corp_id"] for row in self.store.list_tasks()}
+        self.assertEqual(corp_ids, {"task-1": "jdy-corp-1", "task-2": "ww002"})
+        self.assertEqual(
+            sorted(path.name for path in legacy_dir.iterdir()),
+            [
+                "wecom-bind-real-write-context.json",
+                "wecom-bind-real-write-task-1.json.imported",
+                "wecom-bind-real-write-task-2.json.imported",
+            ],
+        )
+        self.assertEqual(self.store.import_context_files(legacy_dir), 0)
+
+    @unittest.skipIf(os.name == "nt", "DPAPI is the default cipher on Windows")
+    def test_default_cipher_requires_a_key_outside_windows(self):
+        with self.assertRaises(RuntimeError):
+            default_secret_cipher({})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from rpa_platform.worker.bind_write_locks import BindWriteLockManager
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class BindWriteLockManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.lock_dir = Path(self.tmpdir.name) / "locks"
+        self.clock = FakeClock()
+        self.dead_pids = set()
+        self.locks = self._manager()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _manager(self):
+        return BindWriteLockManager(
+            self.lock_dir,
+            lease_seconds=60,
+            clock=self.clock,
+            pid_alive=lambda pid: pid not in self.dead_pids,
+        )
+
+    def test_locks_are_per_enterprise_and_exclusive_per_key(self):
+        self.assertTrue(self.locks.acquire("ww001-1", "task-a"))
+        self.assertTrue(self.locks.acquire("ww002-1", "task-b"))
+        self.assertFalse(self.locks.acquire("ww001-1", "task-c"))
+
+        self.assertEqual(self.locks.owner("ww001-1")["task_id"], "task-a")
+        self.assertEqual(self.locks.owner("ww001-1")["pid"], os.getpid())
+
+    def test_release_only_removes_lock_held_by_the_owner(self):
+        self.locks.acquire("ww001-1", "task-a")
+
+        self.assertFalse(self.locks.release("ww001-1", "task-b"))
+        self.assertTrue(self.locks.release("ww001-1", "task-a"))
+        self.assertIsNone(self.locks.owner("ww001-1"))
+        self.assertTrue(self.locks.acquire("ww001-1", "task-b"))
+
+    def test_expired_lease_is_taken_over_unless_heartbeat_extended_it(self):
+        self.locks.acquire("ww001-1", "task-a")
+        self.clock.now += 50
+        self.assertTrue(self.locks.heartbeat("ww001-1", "task-a"))
+        self.clock.now += 50
+
+        self.assertFalse(self.locks.acquire("ww001-1", "task-b"))
+
+        self.clock.now += 11
+        self.assertTrue(self.locks.acquire("ww001-1", "task-b"))
+        self.assertFalse(self.locks.heartbeat("ww001-1", "task-a"))
+        self.assertEqual(list(self.lock_dir.iterdir()), [self.lock_dir / "ww001-1.lock"])
+
+    def test_lock_of_dead_process_on_this_host_is_stale_before_lease_ends(self):
+        self.locks.acquire("ww001-1", "task-a")
+        self.dead_pids.add(os.getpid())
+
+        self.assertTrue(self.locks.acquire("ww001-1", "task-b"))
+
+    def test_lock_of_other_host_waits_for_lease_even_if_pid_is_unknown(self):
+        self.lock_dir.mkdir(parents=True)
+        (self.lock_dir / "ww001-1.lock").write_text(
+            json.dumps({"task_id": "task-a", "host": "other-host", "pid": 999999, "expires_at": self.clock.now + 30}),
+            encoding="utf-8",
+        )
+        self.dead_pids.add(999999)
+
+        self.assertFalse(self.locks.acquire("ww001-1", "task-b"))
+
+    def test_plain_text_lock_from_old_format_expires_from_its_mtime(self):
+        self.lock_dir.mkdir(parents=True)
+        path = self.lock_dir / "ww001-1.lock"
+        path.write_text("task-old", encoding="utf-8")
+        os.utime(path, (self.clock.now - 120, self.clock.now - 120))
+
+        self.assertTrue(self.locks.acquire("ww001-1", "task-new"))
+        self.assertEqual(self.locks.owner("ww001-1")["task_id"], "task-new")
+
+    def test_key_for_keeps_only_safe_filename_characters(self):
+        self.assertEqual(BindWriteLockManager.key_for("ww00/1", 1009479), "ww001-1009479")
+        self.assertEqual(BindWriteLockManager.key_for("ww001"), "ww001")
+
+
+if __name__ == "__main__":
+    unittest.main()
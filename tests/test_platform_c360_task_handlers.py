@@ -70,6 +70,9 @@ class C360TaskHandlersTest(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(result["machine_id"], "win-server-001")
         self.assertNotIn("secret-value", str(result))
+        self.assertIn("hits", result["resolution_cache"])
+        self.assertIn("misses", result["resolution_cache"])
+        self.assertIn("circuits", result["admin_call_policy"])
 
     def test_unattended_write_policy_requires_env_and_payload_gate(self):
         from rpa_platform.worker.c360_task_handlers import is_unattended_write_enabled
@@ -63,6 +63,43 @@ class C360WorkerClientConfigTest(unittest.TestCase):
         self.assertEqual(hello["diagnostics"]["resolution"], "1920x1080")
         self.assertNotIn("secret-token", str(hello))
 
+    def test_hello_advertises_per_task_type_capacity_from_env(self):
+        config = load_c360_worker_config_from_env(
+            {
+                "C360_BASE_URL": "http://127.0.0.1:3601",
+                "RPA_WORKER_TOKEN": "secret-token",
+                "RPA_WORKER_CONCURRENCY": "wecom_bind_service=2, runtime_health_check=8",
+            }
+        )
+
+        hello = build_worker_hello(config, diagnostics={})
+
+        self.assertEqual(
+            hello["capacity"],
+            {"wecom_bind_service": 2, "diagnostics": 2, "runtime_health_check": 8},
+        )
+        with self.assertRaises(C360WorkerConfigError):
+            load_c360_worker_config_from_env(
+                {
+                    "C360_BASE_URL": "http://127.0.0.1:3601",
+                    "RPA_WORKER_TOKEN": "secret-token",
+                    "RPA_WORKER_CONCURRENCY": "wecom_bind_service=0",
+                }
+            )
+
+    def test_heartbeat_interval_from_env_and_hello_lists_resume_task_ids(self):
+        env = {"C360_BASE_URL": "http://127.0.0.1:3601", "RPA_WORKER_TOKEN": "secret-token"}
+        config = load_c360_worker_config_from_env(dict(env, RPA_WORKER_HEARTBEAT_SECONDS="5"))
+
+        hello = build_worker_hello(config, diagnostics={}, resume_task_ids=["task_001"])
+
+        self.assertEqual(config.heartbeat_interval_seconds, 5)
+        self.assertEqual(load_c360_worker_config_from_env(env).heartbeat_interval_seconds, 15)
+        self.assertEqual(hello["resume"], {"unacked_task_ids": ["task_001"]})
+        self.assertNotIn("resume", build_worker_hello(config, diagnostics={}))
+        with self.assertRaises(C360WorkerConfigError):
+            load_c360_worker_config_from_env(dict(env, RPA_WORKER_HEARTBEAT_SECONDS="0"))
+
     def test_build_default_diagnostics_uses_env_without_sensitive_values(self):
         config = load_c360_worker_config_from_env(
             {
@@ -1,6 +1,10 @@
 import asyncio
 import json
+import random
+import tempfile
 import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
 from unittest.mock import patch
 
 from rpa_platform.worker.c360_worker_client import load_c360_worker_config_from_env
@@ -8,10 +12,13 @@ from rpa_platform.worker import c360_worker
 from rpa_platform.worker.c360_worker_runtime import (
     AioHttpJsonTransport,
     C360WorkerRuntime,
+    CompletionOutbox,
+    DeferredTaskResult,
     HttpWorkerMessageReporter,
     WorkerTaskResult,
 )
 from rpa_platform.worker.simulated_handlers import SimulatedTaskHandlers
+from rpa_platform.worker.worker_message_outbox import WorkerMessageOutbox
 
 
 class FakeTransport:
@@ -46,6 +53,11 @@ class FailingProgressTransport(FakeTransport):
         await super().send_json(payload)
 
 
+class NoJitterRandom:
+    def random(self):
+        return 0.0
+
+
 class C360WorkerRuntimeTest(unittest.IsolatedAsyncioTestCase):
     def _config(self, simulate=True):
         return load_c360_worker_config_from_env(
@@ -435,9 +447,405 @@ class C360WorkerRuntimeTest(unittest.IsolatedAsyncioTestCase):
         self.assertNotIn("secret-token", joined)
 
 
-class C360WorkerCliTest(unittest.TestCase):
+class ConcurrentDispatchTest(unittest.IsolatedAsyncioTestCase):
+    def _config(self, concurrency=""):
+        return load_c360_worker_config_from_env(
+            {
+                "C360_BASE_URL": "http://127.0.0.1:3601",
+                "RPA_WORKER_TOKEN": "secret-token",
+                "RPA_WORKER_ID": "win-sim-001",
+                "RPA_WORKER_CONCURRENCY": concurrency,
+            }
+        )
+
+    @staticmethod
+    def _dispatch(task_id, task_type):
+        return {"type": "task.dispatch", "task_id": task_id, "task_type": task_type, "payload": {}}
+
+    async def test_health_check_completes_while_long_bind_is_running(self):
+        release_bind = asyncio.Event()
+
+        class SlowBindHandlers(SimulatedTaskHandlers):
+            async def handle(self, dispatch):
+                if dispatch["task_type"] == "wecom_bind_service":
+                    await release_bind.wait()
+                return await super().handle(dispatch)
+
+        class ReleasingTransport(FakeTransport):
+            async def receive_json(self):
+                if not self.incoming:
+                    await asyncio.sleep(0.01)
+                    release_bind.set()
+                    return None
+                return self.incoming.pop(0)
+
+        transport = ReleasingTransport(
+            [self._dispatch("task-bind", "wecom_bind_service"), self._dispatch("task-health", "runtime_health_check")]
+        )
+        runtime = C360WorkerRuntime(config=self._config(), transport=transport, handlers=SlowBindHandlers({}))
+
+        await runtime.run_until_idle()
+
+        completed = [item["task_id"] for item in transport.sent if item["type"] == "task.completed"]
+        self.assertEqual(completed, ["task-health", "task-bind"])
+
+    async def test_dispatches_of_one_task_type_respect_concurrency_limit(self):
+        running = []
+        peaks = []
+
+        class CountingHandlers(SimulatedTaskHandlers):
+            async def handle(self, dispatch):
+                running.append(dispatch["task_id"])
+                peaks.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(dispatch["task_id"])
+                return await super().handle(dispatch)
+
+        transport = FakeTransport([self._dispatch("task-%s" % index, "diagnostics") for index in range(5)])
+        runtime = C360WorkerRuntime(
+            config=self._config("diagnostics=2"),
+            transport=transport,
+            handlers=CountingHandlers({}),
+        )
+
+        await runtime.run_until_idle()
+
+        self.assertEqual(max(peaks), 2)
+        self.assertEqual(len([item for item in transport.sent if item["type"] == "task.completed"]), 5)
+
+    async def test_deferred_dispatch_frees_its_slot_until_resume(self):
+        events = []
+        resumed = asyncio.Event()
+
+        class DeferringHandlers(SimulatedTaskHandlers):
+            async def handle(self, dispatch):
+                if dispatch["task_id"] != "task-deferred":
+                    events.append("handled %s" % dispatch["task_id"])
+                    return await super().handle(dispatch)
+
+                async def resume():
+                    events.append("resumed task-deferred")
+                    resumed.set()
+                    return WorkerTaskResult(status="success", result={"resumed": True})
+
+                return DeferredTaskResult(
+                    resume_at=datetime.now() + timedelta(seconds=0.05),
+                    resume=resume,
+                    progress=[{"status": "waiting_online_delay", "message": "deferred"}],
+                )
+
+        class OpenUntilResumedTransport(FakeTransport):
+            async def receive_json(self):
+                if not self.incoming:
+                    await resumed.wait()
+                    return None
+                return self.incoming.pop(0)
+
+        transport = OpenUntilResumedTransport(
+            [self._dispatch("task-deferred", "wecom_bind_service"), self._dispatch("task-next", "wecom_bind_service")]
+        )
+        runtime = C360WorkerRuntime(
+            config=self._config("wecom_bind_service=1"),
+            transport=transport,
+            handlers=DeferringHandlers({}),
+        )
+
+        await runtime.run_until_idle()
+
+        completed = [item for item in transport.sent if item["type"] == "task.completed"]
+        self.assertEqual(events, ["handled task-next", "resumed task-deferred"])
+        self.assertEqual([item["task_id"] for item in completed], ["task-next", "task-deferred"])
+        self.assertEqual(completed[-1]["result"], {"resumed": True})
+        self.assertIn(
+            "waiting_online_delay",
+            [item.get("status") for item in transport.sent if item.get("task_id") == "task-deferred"],
+        )
+
+    async def test_disconnect_hands_deferred_wait_back_without_waiting_for_it(self):
+        resumed = []
+
+        class DeferringHandlers(SimulatedTaskHandlers):
+            async def handle(self, dispatch):
+                async def resume():
+                    resumed.append(dispatch["task_id"])
+                    return WorkerTaskResult(status="success", result={})
+
+                return DeferredTaskResult(resume_at=datetime(2026, 6, 20, 12, 5, 0), resume=resume)
+
+        transport = FakeTransport([self._dispatch("task-deferred", "wecom_bind_service")])
+        runtime = C360WorkerRuntime(config=self._config(), transport=transport, handlers=DeferringHandlers({}))
+
+        await asyncio.wait_for(runtime.run_until_idle(), timeout=1)
+
+        completed = [item for item in transport.sent if item["type"] == "task.completed"]
+        self.assertEqual(resumed, [])
+        self.assertEqual(len(completed), 1)
+        self.assertEqual(completed[0]["status"], "succeeded")
+        self.assertEqual(completed[0]["result"]["status"], "deferred")
+        self.assertEqual(completed[0]["result"]["resume_at"], "2026-06-20 12:05:00")
+        self.assertEqual(runtime.outbox.task_ids(), ["task-deferred"])
+
+    async def test_drain_timeout_cancels_and_reports_unfinished_dispatch(self):
+        class HangingHandlers(SimulatedTaskHandlers):
+            async def handle(self, dispatch):
+                await asyncio.Event().wait()
+
+        transport = FakeTransport([self._dispatch("task-hang", "wecom_bind_service")])
+        runtime = C360WorkerRuntime(
+            config=self._config(),
+            transport=transport,
+            handlers=HangingHandlers({}),
+            drain_timeout_seconds=0.01,
+        )
+
+        await runtime.run_until_idle()
+
+        self.assertEqual(transport.sent[-1]["type"], "task.completed")
+        self.assertEqual(transport.sent[-1]["task_id"], "task-hang")
+        self.assertEqual(transport.sent[-1]["status"], "failed")
+
+
+class SessionResumeTest(unittest.IsolatedAsyncioTestCase):
+    def _config(self, heartbeat_seconds="15"):
+        return load_c360_worker_config_from_env(
+            {
+                "C360_BASE_URL": "http://127.0.0.1:3601",
+                "RPA_WORKER_TOKEN": "secret-token",
+                "RPA_WORKER_ID": "win-sim-001",
+                "RPA_WORKER_HEARTBEAT_SECONDS": heartbeat_seconds,
+            }
+        )
+
+    async def test_heartbeat_reports_load_and_in_flight_task_ids(self):
+        release_bind = asyncio.Event()
+
+        class SlowBindHandlers(SimulatedTaskHandlers):
+            async def handle(self, dispatch):
+                await release_bind.wait()
+                return await super().handle(dispatch)
+
+        class ReleasingTransport(FakeTransport):
+            async def receive_json(self):
+                if not self.incoming:
+                    await asyncio.sleep(0.05)
+                    release_bind.set()
+                    return None
+                return self.incoming.pop(0)
+
+        transport = ReleasingTransport(
+            [{"type": "task.dispatch", "task_id": "task-bind", "task_type": "wecom_bind_service", "payload": {}}]
+        )
+        runtime = C360WorkerRuntime(config=self._config("0.01"), transport=transport, handlers=SlowBindHandlers({}))
+
+        await runtime.run_until_idle()
+
+        heartbeats = [item for item in transport.sent if item["type"] == "worker.heartbeat"]
+        self.assertTrue(heartbeats)
+        self.assertEqual(heartbeats[-1]["worker_id"], "win-sim-001")
+        self.assertEqual(heartbeats[-1]["in_flight_task_ids"], ["task-bind"])
+        self.assertEqual(heartbeats[-1]["load"], {"wecom_bind_service": 1})
+        self.assertEqual(transport.sent[-1]["type"], "task.completed")
+
+    async def test_unacked_completion_is_resent_on_next_connection_until_acked(self):
+        outbox = CompletionOutbox()
+        dispatch = {"type": "task.dispatch", "task_id": "task-1", "task_type": "diagnostics", "payload": {}}
+        first = C360WorkerRuntime(
+            config=self._config(),
+            transport=FailingCompletedTransport([dispatch]),
+            handlers=SimulatedTaskHandlers({}),
+            outbox=outbox,
+        )
+
+        with self.assertRaises(RuntimeError):
+            await first.run_until_idle()
+        self.assertEqual(outbox.task_ids(), ["task-1"])
+
+        transport = FakeTransport(
+            [
+                {"type": "worker.accepted", "worker_id": "win-sim-001"},
+                {"type": "task.completed.ack", "task_id": "task-1"},
+            ]
+        )
+        second = C360WorkerRuntime(
+            config=self._config(),
+            transport=transport,
+            handlers=SimulatedTaskHandlers({}),
+            outbox=outbox,
+        )
+        await second.run_until_idle()
+
+        self.assertEqual(transport.sent[0]["resume"], {"unacked_task_ids": ["task-1"]})
+        self.assertEqual(transport.sent[1]["type"], "task.completed")
+        self.assertEqual(transport.sent[1]["task_id"], "task-1")
+        self.assertEqual(len(outbox), 0)
+
+    async def test_deferred_task_cut_short_by_a_disconnect_is_redispatched_and_resumed(self):
+        outbox = CompletionOutbox()
+        dispatch = {"type": "task.dispatch", "task_id": "task-bind", "task_type": "wecom_bind_service", "payload": {}}
+        handled = []
+
+        class ResumableHandlers(SimulatedTaskHandlers):
+            """First dispatch defers; a redispatch resumes from the stored continuation."""
+
+            async def handle(self, dispatch):
+                handled.append(dispatch["task_id"])
+                if len(handled) > 1:
+                    return WorkerTaskResult(status="success", result={"resumed": True})
+
+                async def resume():
+                    return WorkerTaskResult(status="success", result={"resumed": False})
+
+                return DeferredTaskResult(resume_at=datetime.now() + timedelta(seconds=300), resume=resume)
+
+        class ControlPlaneTransport(FakeTransport):
+            async def send_json(self, payload):
+                await super().send_json(payload)
+                if payload.get("type") == "task.completed" and payload["result"].get("status") == "deferred":
+                    self.incoming.extend([{"type": "task.completed.ack", "task_id": payload["task_id"]}, dict(dispatch)])
+
+        first = C360WorkerRuntime(
+            config=self._config(),
+            transport=FailingCompletedTransport([dispatch]),
+            handlers=ResumableHandlers({}),
+            outbox=outbox,
+        )
+        await asyncio.wait_for(first.run_until_idle(), timeout=1)
+        self.assertEqual(outbox.task_ids(), ["task-bind"])
+
+        transport = ControlPlaneTransport([{"type": "worker.accepted", "worker_id": "win-sim-001"}])
+        second = C360WorkerRuntime(
+            config=self._config(),
+            transport=transport,
+            handlers=ResumableHandlers({}),
+            outbox=outbox,
+        )
+        await asyncio.wait_for(second.run_until_idle(), timeout=1)
+
+        completed = [item for item in transport.sent if item["type"] == "task.completed"]
+        self.assertEqual(transport.sent[0]["resume"], {"unacked_task_ids": ["task-bind"]})
+        self.assertEqual(handled, ["task-bind", "task-bind"])
+        self.assertEqual([item["result"] for item in completed][-1], {"resumed": True})
+
+    async def test_reported_completion_leaves_outbox(self):
+        outbox = CompletionOutbox()
+        reported = []
+        runtime = C360WorkerRuntime(
+            config=self._config(),
+            transport=FailingCompletedTransport(
+                [{"type": "task.dispatch", "task_id": "task-1", "task_type": "diagnostics", "payload": {}}]
+            ),
+            handlers=SimulatedTaskHandlers({}),
+            message_reporter=reported.append,
+            outbox=outbox,
+        )
+
+        await runtime.run_until_idle()
+
+        self.assertIn("task.completed", [item["type"] for item in reported])
+        self.assertEqual(len(outbox), 0)
+
+
+class StreamingProgressTest(unittest.IsolatedAsyncioTestCase):
     def _config(self):
         return load_c360_worker_config_from_env(
+            {
+                "C360_BASE_URL": "http://127.0.0.1:3601",
+                "RPA_WORKER_TOKEN": "secret-token",
+                "RPA_WORKER_ID": "win-sim-001",
+            }
+        )
+
+    @staticmethod
+    def _dispatch():
+        return {"type": "task.dispatch", "task_id": "task-1", "task_type": "diagnostics", "payload": {}}
+
+    async def test_emitted_progress_is_forwarded_while_handler_runs_and_coalesced(self):
+        seen_while_running = []
+        transport = FakeTransport([self._dispatch()])
+
+        class EmittingHandlers:
+            async def handle(self, dispatch, progress):
+                progress.emit("downloading", percent=10)
+                await asyncio.sleep(0.02)
+                seen_while_running.extend(item.get("status") for item in transport.sent)
+                for percent in (20, 30, 40):
+                    progress.emit("downloading", percent=percent)
+                progress.emit("uploading")
+                return {"ok": True}
+
+        runtime = C360WorkerRuntime(
+            config=self._config(),
+            transport=transport,
+            handlers=EmittingHandlers(),
+            progress_interval_seconds=0.05,
+        )
+
+        await runtime.run_until_idle()
+
+        self.assertIn("downloading", seen_while_running)
+        progress = [item for item in transport.sent if item["type"] == "task.progress"][1:]
+        self.assertEqual(
+            [(item["status"], item.get("percent")) for item in progress],
+            [("downloading", 10), ("downloading", 40), ("uploading", None)],
+        )
+        self.assertEqual(transport.sent[-1]["type"], "task.completed")
+
+    async def test_async_generator_handler_yields_progress_then_result(self):
+        class GeneratorHandlers:
+            async def handle(self, dispatch):
+                yield {"status": "step_one"}
+                yield {"status": "step_two"}
+                yield WorkerTaskResult(status="success", result={"steps": 2})
+
+        transport = FakeTransport([self._dispatch()])
+        runtime = C360WorkerRuntime(
+            config=self._config(),
+            transport=transport,
+            handlers=GeneratorHandlers(),
+            progress_interval_seconds=0,
+        )
+
+        await runtime.run_until_idle()
+
+        statuses = [item["status"] for item in transport.sent if item["type"] == "task.progress"]
+        self.assertEqual(statuses, ["running", "step_one", "step_two"])
+        self.assertEqual(transport.sent[-1]["result"], {"steps": 2})
+        self.assertEqual(transport.sent[-1]["status"], "succeeded")
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    def read(self):
+        return b'{"ok":true}'
+
+
+class FakeConnection:
+    def __init__(self, statuses, log):
+        self.statuses = statuses
+        self.log = log
+
+    def request(self, method, path, body=None, headers=None):
+        self.log.append({"method": method, "path": path, "body": json.loads(body), "headers": headers})
+
+    def getresponse(self):
+        status = self.statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return FakeResponse(status)
+
+    def close(self):
+        pass
+
+
+class HttpWorkerMessageReporterTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.outbox = WorkerMessageOutbox(str(Path(self.tmpdir.name) / "outbox.db"))
+        self.requests = []
+        self.connections = 0
+        self.config = load_c360_worker_config_from_env(
             {
                 "C360_BASE_URL": "https://jdycsm.sre.jdydevelop.com/csm-c360-api",
                 "RPA_WORKER_TOKEN": "secret-token",
@@ -445,39 +853,114 @@ class C360WorkerCliTest(unittest.TestCase):
             }
         )
 
-    def test_http_worker_message_reporter_posts_worker_message_endpoint_with_identity_headers(self):
-        reporter = HttpWorkerMessageReporter(self._config(), timeout_seconds=3.5)
-        captured = {}
+    def tearDown(self):
+        self.tmpdir.cleanup()
 
-        class FakeResponse:
-            def __enter__(self):
-                return self
+    def _reporter(self, statuses, **kwargs):
+        def connection_factory():
+            self.connections += 1
+            return FakeConnection(statuses, self.requests)
 
-            def __exit__(self, exc_type, exc, tb):
-                return False
+        return HttpWorkerMessageReporter(
+            self.config,
+            outbox=self.outbox,
+            retry_initial_seconds=0.01,
+            connection_factory=connection_factory,
+            **kwargs,
+        )
 
-            def read(self):
-                return b'{"ok":true}'
+    async def test_posts_message_endpoint_with_identity_headers_and_dedup_id(self):
+        reporter = self._reporter([200])
+
+        await reporter({"type": "task.completed", "task_id": "task-001", "status": "succeeded"})
+        self.assertTrue(await reporter.flush(timeout=1))
+        await reporter.close()
+
+        request = self.requests[0]
+        self.assertEqual(request["path"], "/csm-c360-api/v1/rpa/workers/messages")
+        self.assertEqual(request["headers"]["X-RPA-Worker-Token"], "secret-token")
+        self.assertEqual(request["headers"]["X-RPA-Worker-Id"], "win-server-001")
+        self.assertEqual(request["headers"]["Content-Type"], "application/json")
+        self.assertEqual(request["body"]["type"], "task.completed")
+        self.assertTrue(request["body"]["message_id"].startswith("completed_"))
+        self.assertEqual(request["body"]["seq"], 1)
+
+    async def test_backlog_is_batched_over_one_connection_in_seq_order(self):
+        for index in range(3):
+            self.outbox.enqueue({"type": "task.progress", "task_id": "task-001", "status": "step_%s" % index})
+        reporter = self._reporter([200, 200])
+
+        reporter.start()
+        self.assertTrue(await reporter.flush(timeout=1))
+        await reporter({"type": "task.progress", "task_id": "task-001", "status": "step_3"})
+        self.assertTrue(await reporter.flush(timeout=1))
+        await reporter.close()
+
+        self.assertEqual(self.requests[0]["path"], "/csm-c360-api/v1/rpa/workers/messages/batch")
+        self.assertEqual([item["seq"] for item in self.requests[0]["body"]["messages"]], [1, 2, 3])
+        self.assertEqual(self.requests[1]["body"]["status"], "step_3")
+        self.assertEqual(self.connections, 1)
+
+    async def test_falls_back_to_single_posts_and_retries_through_outage(self):
+        self.outbox.enqueue({"type": "task.progress", "task_id": "task-001", "status": "running"})
+        self.outbox.enqueue({"type": "task.completed", "task_id": "task-001", "status": "succeeded"})
+        reporter = self._reporter([404, 503, OSError("connection refused"), OSError("connection refused"), 200, 200])
+
+        reporter.start()
+        self.assertTrue(await reporter.flush(timeout=2))
+        await reporter.close()
+
+        delivered = [item["body"]["seq"] for item in self.requests[-2:]]
+        self.assertEqual(delivered, [1, 2])
+        self.assertTrue(all(item["path"].endswith("/messages") for item in self.requests[1:]))
+        self.assertEqual(self.outbox.count(), 0)
+
+    async def test_outbox_keeps_undelivered_messages_and_queues_completion_once(self):
+        payload = {"type": "task.completed", "task_id": "task-001", "status": "succeeded"}
+        reporter = self._reporter([OSError("connection refused")] * 10, retry_max_seconds=0.01)
+
+        await reporter(payload)
+        await reporter(dict(payload))
+        self.assertFalse(await reporter.flush(timeout=0.1))
+        await reporter.close(flush_timeout=0)
+
+        pending = self.outbox.peek()
+        self.assertEqual(len(pending), 1)
+        self.assertGreaterEqual(pending[0].attempts, 1)
+
+    async def test_runtime_keeps_completion_until_the_reporter_delivered_it(self):
+        statuses = [OSError("connection refused")] * 1000
+        reporter = self._reporter(statuses, retry_max_seconds=0.01)
+        outbox = CompletionOutbox()
+        runtime = C360WorkerRuntime(
+            config=self.config,
+            transport=FailingCompletedTransport(
+                [{"type": "task.dispatch", "task_id": "task-1", "task_type": "diagnostics", "payload": {}}]
+            ),
+            handlers=SimulatedTaskHandlers({}),
+            message_reporter=reporter,
+            outbox=outbox,
+        )
 
-        def fake_urlopen(request, timeout):
-            captured["url"] = request.full_url
-            captured["headers"] = dict(request.header_items())
-            captured["body"] = request.data.decode("utf-8")
-            captured["timeout"] = timeout
-            return FakeResponse()
+        await runtime.run_until_idle()
+        # Queued in the reporter's outbox is not delivered yet.
+        self.assertEqual(outbox.task_ids(), ["task-1"])
+        statuses[:] = [200] * 10
+        self.assertTrue(await reporter.flush(timeout=2))
+        await reporter.close()
 
-        with patch("rpa_platform.worker.c360_worker_runtime.urllib.request.urlopen", side_effect=fake_urlopen):
-            reporter._post({"type": "task.completed", "task_id": "task-001", "status": "succeeded"})
+        self.assertEqual(len(outbox), 0)
 
-        self.assertEqual(
-            captured["url"],
-            "https://jdycsm.sre.jdydevelop.com/csm-c360-api/v1/rpa/workers/messages",
+
+class C360WorkerCliTest(unittest.TestCase):
+    def _config(self):
+        return load_c360_worker_config_from_env(
+            {
+                "C360_BASE_URL": "https://jdycsm.sre.jdydevelop.com/csm-c360-api",
+                "RPA_WORKER_TOKEN": "secret-token",
+                "RPA_WORKER_ID": "win-server-001",
+            }
         )
-        self.assertEqual(captured["headers"]["X-rpa-worker-token"], "secret-token")
-        self.assertEqual(captured["headers"]["X-rpa-worker-id"], "win-server-001")
-        self.assertEqual(captured["headers"]["Content-type"], "application/json")
-        self.assertEqual(captured["timeout"], 3.5)
-        self.assertEqual(json.loads(captured["body"])["type"], "task.completed")
 
     def test_default_cli_uses_persistent_runner_with_reconnect_delay(self):
         calls = []
@@ -547,15 +1030,17 @@ class C360WorkerCliTest(unittest.TestCase):
             captured["transport"] = transport
             return transport
 
-        with patch.object(c360_worker, "connect_json_transport", side_effect=fake_connect):
-            exit_code = c360_worker.main(
-                ["--once"],
-                env={
-                    "C360_BASE_URL": "http://127.0.0.1:3601",
-                    "RPA_WORKER_TOKEN": "secret-token",
-                    "RPA_WORKER_ID": "win-sim-001",
-                },
-            )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(c360_worker, "connect_json_transport", side_effect=fake_connect):
+                exit_code = c360_worker.main(
+                    ["--once"],
+                    env={
+                        "C360_BASE_URL": "http://127.0.0.1:3601",
+                        "RPA_WORKER_TOKEN": "secret-token",
+                        "RPA_WORKER_ID": "win-sim-001",
+                        "RPA_WORKER_OUTBOX_PATH": str(Path(tmpdir) / "outbox.db"),
+                    },
+                )
 
         self.assertEqual(exit_code, 0)
         self.assertTrue(captured["transport"].closed)
@@ -574,7 +1059,7 @@ class C360WorkerPersistentLoopTest(unittest.IsolatedAsyncioTestCase):
             }
         )
 
-        async def fake_run(config, event_logger=None):
+        async def fake_run(config, event_logger=None, outbox=None, handler_graph=None):
             calls.append(config.worker_id)
             if len(calls) >= 2:
                 raise asyncio.CancelledError()
@@ -589,12 +1074,79 @@ class C360WorkerPersistentLoopTest(unittest.IsolatedAsyncioTestCase):
                     event_logger=events.append,
                     reconnect_delay_seconds=0.25,
                     sleep=fake_sleep,
+                    rng=NoJitterRandom(),
                 )
 
         self.assertEqual(calls, ["win-sim-001", "win-sim-001"])
         self.assertEqual(sleeps, [0.25])
         self.assertIn("worker reconnecting in 0.25s", "\n".join(events))
 
+    async def test_run_forever_backs_off_on_failures_and_shares_outbox(self):
+        outboxes = []
+        graphs = []
+        sleeps = []
+        outcomes = ["fail", "fail", "fail", "idle", "stop"]
+        config = load_c360_worker_config_from_env(
+            {
+                "C360_BASE_URL": "http://127.0.0.1:3601",
+                "RPA_WORKER_TOKEN": "secret-token",
+            }
+        )
+
+        async def fake_run(config, event_logger=None, outbox=None, handler_graph=None):
+            outboxes.append(outbox)
+            graphs.append(handler_graph)
+            outcome = outcomes.pop(0)
+            if outcome == "fail":
+                raise ConnectionRefusedError("control plane unavailable")
+            if outcome == "stop":
+                raise asyncio.CancelledError()
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        with self.assertRaises(asyncio.CancelledError):
+            await c360_worker._run_forever(
+                config,
+                reconnect_delay_seconds=1,
+                sleep=fake_sleep,
+                run_once=fake_run,
+                max_reconnect_delay_seconds=5,
+                rng=NoJitterRandom(),
+            )
+
+        self.assertEqual(sleeps, [2, 4, 5, 1])
+        self.assertIsInstance(outboxes[0], CompletionOutbox)
+        self.assertTrue(all(outbox is outboxes[0] for outbox in outboxes))
+        self.assertTrue(all(graph is graphs[0] for graph in graphs))
+
+    def test_handler_graph_builds_handlers_once_on_first_use(self):
+        builds = []
+        config = load_c360_worker_config_from_env(
+            {"C360_BASE_URL": "http://127.0.0.1:3601", "RPA_WORKER_TOKEN": "secret-token"}
+        )
+
+        def fake_build(config, diagnostics):
+            builds.append(diagnostics)
+            return SimulatedTaskHandlers(diagnostics)
+
+        graph = c360_worker.WorkerHandlerGraph(config)
+        with patch.object(c360_worker, "build_c360_task_handlers", side_effect=fake_build):
+            self.assertEqual(builds, [])
+            first = graph.handlers
+            second = graph.handlers
+
+        self.assertIs(first, second)
+        self.assertEqual(len(builds), 1)
+        self.assertIs(builds[0], graph.diagnostics)
+
+    def test_reconnect_delay_is_jittered_below_the_backoff(self):
+        rng = random.Random(3)
+        delays = [c360_worker._reconnect_delay(1, 3, 60, rng) for _ in range(20)]
+
+        self.assertTrue(all(4 <= delay <= 8 for delay in delays))
+        self.assertGreater(len(set(delays)), 10)
+
 
 class SimulatedTaskHandlersTest(unittest.IsolatedAsyncioTestCase):
     async def test_runtime_health_check_returns_simulated_ok(self):
@@ -0,0 +1,92 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from rpa_platform.integrations.custom_app_index import CustomAppIndex, IndexedWecomAdminClient
+from rpa_platform.integrations.wecom_admin_client import AmbiguousWecomAppError, WecomAdminClient, WecomSaveAppRequest
+from scripts.dev.run_platform_dryrun import FakeServiceWecomAdminTransport
+
+
+LIST_PATH = "/wwopen/developer/customApp/tpl/app/list"
+
+
+class PagedWecomTransport(FakeServiceWecomAdminTransport):
+    """Two pages of apps; the keyword filter behaves like the admin API's substring match."""
+
+    NAMES = ["客户%02d" % index for index in range(5)] + ["客户00"]
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def get_json(self, path, params, headers):
+        with self._lock:
+            self.calls.append({"method": "GET", "path": path, "params": dict(params), "headers": dict(headers)})
+        keyword = params.get("corp_name_keyword")
+        rows = [
+            {
+                "app_id": "app-%s" % index,
+                "authcorp_name": name,
+                "name": "简道云",
+                "sdk_auth": {"aes_app_id": "aes-%s" % index},
+            }
+            for index, name in enumerate(self.NAMES)
+            if keyword is None or keyword in name
+        ]
+        offset, limit = int(params["offset"]), int(params["limit"])
+        page = rows[offset : offset + limit]
+        return {"data": {"corpapp": page, "has_next_page": offset + limit < len(rows)}}
+
+
+class CustomAppIndexTest(unittest.TestCase):
+    def _client(self):
+        transport = PagedWecomTransport()
+        index = CustomAppIndex(WecomAdminClient(transport), page_size=4)
+        return IndexedWecomAdminClient(WecomAdminClient(transport), index), index, transport
+
+    def test_concurrent_lookups_share_one_full_listing(self):
+        client, index, transport = self._client()
+
+        def resolve(name):
+            return client.resolve_unique_custom_app(1009479, name, "简道云")
+
+        with ThreadPoolExecutor(4) as executor:
+            apps = list(executor.map(resolve, ["客户01", "客户02", "客户03", "客户04"]))
+
+        self.assertEqual([app.app_id for app in apps], ["app-1", "app-2", "app-3", "app-4"])
+        self.assertEqual([call["params"]["offset"] for call in transport.calls], [0, 4])
+        self.assertEqual(index.stats()["list_calls"], 1)
+        self.assertEqual(index.stats()["hits"], 4)
+
+    def test_duplicate_authcorp_names_stay_ambiguous(self):
+        client, _index, _transport = self._client()
+
+        with self.assertRaises(AmbiguousWecomAppError):
+            client.resolve_unique_custom_app(1009479, "客户00", "简道云")
+
+    def test_write_drops_the_app_so_the_next_lookup_reads_the_admin_api(self):
+        client, index, transport = self._client()
+        app = client.resolve_unique_custom_app(1009479, "客户01", "简道云")
+
+        client.save_development_info_raw(
+            WecomSaveAppRequest(
+                suiteid=1009479,
+                app=app,
+                homeurl="https://home",
+                callbackurl="https://callback",
+                redirect_domain="home",
+                token="token",
+                encoding_aes_key="aes",
+            )
+        )
+        refreshed = client.resolve_unique_custom_app(1009479, "客户01", "简道云")
+        client.resolve_unique_custom_app(1009479, "客户02", "简道云")
+
+        keywords = [call["params"].get("corp_name_keyword") for call in transport.calls if call["path"] == LIST_PATH]
+        self.assertEqual(refreshed.app_id, "app-1")
+        self.assertEqual(keywords, [None, None, "客户01"])
+        self.assertEqual(index.stats()["invalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
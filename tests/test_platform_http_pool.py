@@ -0,0 +1,199 @@
+import http.client
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rpa_platform.integrations.http_pool import HttpConnectionPool
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        self.rfile.read(length)
+        self.server.client_ports.add(self.client_address[1])
+        body = json.dumps({"ok": True, "user_agent": self.headers.get("user-agent")}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Drop the kept-alive connection without announcing it, like an idle timeout.
+        self.close_connection = self.server.close_after_response
+
+    def log_message(self, *_args):
+        pass
+
+
+class FakeResponse:
+    status = 200
+    reason = "OK"
+    will_close = False
+
+    def read(self):
+        return b"{}"
+
+
+class FakeConnection:
+    def __init__(self, failures, response_failures=None):
+        self.failures = failures
+        self.response_failures = response_failures or []
+        self.sock = None
+        self.timeout = None
+        self.requests = 0
+        self.closed = False
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests += 1
+        if self.failures:
+            raise self.failures.pop(0)
+
+    def getresponse(self):
+        if self.response_failures:
+            raise self.response_failures.pop(0)
+        return FakeResponse()
+
+    def close(self):
+        self.closed = True
+
+
+class CountingConnection(http.client.HTTPConnection):
+    requests = 0
+
+    def request(self, *args, **kwargs):
+        self.requests += 1
+        super().request(*args, **kwargs)
+
+
+class HttpConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        self.server.client_ports = set()
+        self.server.close_after_response = False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%s/api" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_to_one_host_reuse_a_kept_alive_connection(self):
+        pool = HttpConnectionPool()
+
+        responses = [pool.request("POST", self.url, body=b"{}") for _ in range(5)]
+        pool.close()
+
+        self.assertEqual({response.status for response in responses}, {200})
+        self.assertEqual(pool.connections_opened, 1)
+        self.assertEqual(len(self.server.client_ports), 1)
+        self.assertTrue(json.loads(responses[0].body)["user_agent"].startswith("Python-urllib/"))
+
+    def test_zero_idle_connections_opens_one_connection_per_request(self):
+        pool = HttpConnectionPool(max_idle_per_host=0)
+
+        for _ in range(3):
+            pool.request("POST", self.url, body=b"{}")
+
+        self.assertEqual(pool.connections_opened, 3)
+        self.assertEqual(len(self.server.client_ports), 3)
+
+    def test_request_on_connection_dropped_while_idle_is_sent_again_on_a_new_one(self):
+        stale = FakeConnection([])
+        fresh = FakeConnection([])
+        created = [stale, fresh]
+        pool = HttpConnectionPool(connection_factory=lambda *_args: created.pop(0))
+        pool.request("POST", "http://admin.example/api")
+        stale.failures.append(http.client.RemoteDisconnected("closed"))
+
+        response = pool.request("POST", "http://admin.example/api")
+
+        self.assertEqual(response.status, 200)
+        self.assertTrue(stale.closed)
+        self.assertEqual(fresh.requests, 1)
+
+    def test_post_whose_response_was_lost_on_a_reused_connection_is_not_sent_again(self):
+        reused = FakeConnection([])
+        created = [reused, FakeConnection([])]
+        pool = HttpConnectionPool(connection_factory=lambda *_args: created.pop(0))
+        pool.request("POST", "http://admin.example/api")
+        reused.response_failures.append(http.client.RemoteDisconnected("closed"))
+
+        with self.assertRaises(http.client.RemoteDisconnected):
+            pool.request("POST", "http://admin.example/api")
+
+        self.assertEqual(reused.requests, 2)
+        self.assertEqual(pool.connections_opened, 1)
+
+    def test_get_whose_response_was_lost_on_a_reused_connection_is_sent_again(self):
+        reused = FakeConnection([])
+        fresh = FakeConnection([])
+        created = [reused, fresh]
+        pool = HttpConnectionPool(connection_factory=lambda *_args: created.pop(0))
+        pool.request("GET", "http://admin.example/api")
+        reused.response_failures.append(http.client.RemoteDisconnected("closed"))
+
+        response = pool.request("GET", "http://admin.example/api")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(fresh.requests, 1)
+
+    def test_idle_connection_closed_by_the_server_is_replaced_before_a_post(self):
+        self.server.close_after_response = True
+        opened = []
+
+        def factory(_scheme, host, port, timeout):
+            opened.append(CountingConnection(host, port, timeout=timeout))
+            return opened[-1]
+
+        pool = HttpConnectionPool(connection_factory=factory)
+        pool.request("POST", self.url, body=b"{}")
+        time.sleep(0.05)
+
+        response = pool.request("POST", self.url, body=b"{}")
+        pool.close()
+
+        self.assertEqual(response.status, 200)
+        # The dropped connection is not written to again.
+        self.assertEqual([conn.requests for conn in opened], [1, 1])
+
+    def test_connection_errors_are_retried_for_get_but_never_for_post(self):
+        sleeps = []
+        pool = HttpConnectionPool(
+            retries=2,
+            connection_factory=lambda *_args: FakeConnection([TimeoutError("timed out")]),
+            sleep=sleeps.append,
+        )
+        attempts = []
+        factory = pool.connection_factory
+
+        def counting_factory(*args):
+            connection = factory(*args)
+            attempts.append(connection)
+            return connection
+
+        pool.connection_factory = counting_factory
+        with self.assertRaises(TimeoutError):
+            pool.request("POST", "http://admin.example/api")
+        post_attempts = len(attempts)
+        pool.connection_factory = lambda *args: (
+            counting_factory(*args) if len(attempts) < post_attempts + 2 else FakeConnection([])
+        )
+
+        response = pool.request("GET", "http://admin.example/api")
+
+        self.assertEqual(post_attempts, 1)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(sleeps, [0.5, 1.0])
+
+    def test_from_env_rejects_negative_values(self):
+        self.assertEqual(HttpConnectionPool.from_env({"RPA_ADMIN_HTTP_RETRIES": "3"}).retries, 3)
+        with self.assertRaises(ValueError):
+            HttpConnectionPool.from_env({"RPA_ADMIN_HTTP_MAX_IDLE_PER_HOST": "-1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
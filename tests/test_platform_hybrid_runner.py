@@ -8,6 +8,7 @@ from rpa_platform.domain.state_machine import TaskStatus
 from rpa_platform.integrations.jdy_admin_client import JdyAdminClient, JdyAdminTransport
 from rpa_platform.storage.sqlite_store import SQLiteStore
 from rpa_platform.worker.hybrid_runner import HybridFlowRunner
+from rpa_platform.worker.recheck_policy import RecheckPolicy
 from rpa_platform.worker.wecom_rpa import FakeWecomRpa, WecomReviewStatus
 
 
@@ -86,6 +87,7 @@ class HybridFlowRunnerTest(unittest.TestCase):
             store=self.store,
             jdy_client=JdyAdminClient(transport),
             wecom_rpa=FakeWecomRpa(),
+            recheck_policy=RecheckPolicy(jitter_ratio=0),
         )
 
         result = runner.run_claimed_task(
@@ -173,6 +175,7 @@ class HybridFlowRunnerTest(unittest.TestCase):
             store=self.store,
             jdy_client=JdyAdminClient(FakeTransport([])),
             wecom_rpa=FakeWecomRpa(review_statuses=[WecomReviewStatus.REVIEWING]),
+            recheck_policy=RecheckPolicy(jitter_ratio=0),
         )
 
         result = runner.run_claimed_task(
@@ -1,7 +1,9 @@
+import asyncio
 import unittest
 
 from rpa_platform.integrations.jdy_admin_client import (
     AmbiguousCorpDeployError,
+    AsyncJdyAdminClient,
     JdyAdminClient,
     JdyAdminTransport,
     JdyInstallRequest,
@@ -22,6 +24,12 @@ class FakeTransport(JdyAdminTransport):
         return response
 
 
+class AsyncFakeTransport(FakeTransport):
+    async def post_json(self, path, payload):
+        await asyncio.sleep(0)
+        return FakeTransport.post_json(self, path, payload)
+
+
 class JdyAdminClientTest(unittest.TestCase):
     def test_search_corp_deploy_list_normalizes_rows(self):
         transport = FakeTransport(
@@ -109,6 +117,35 @@ class JdyAdminClientTest(unittest.TestCase):
         self.assertEqual(row.corp_id, "corp-secret")
         self.assertEqual([call["payload"]["filter"] for call in transport.calls], ["安徽云速付"])
 
+    def test_resolve_unique_by_name_follows_has_more_to_later_pages(self):
+        def corp(name, corp_id):
+            return {"corp_id": corp_id, "name": name, "suite_id": 1, "suite_scenario": "main"}
+
+        transport = FakeTransport(
+            [
+                {"has_more": True, "corp_deploy_list": [corp("安徽云速付分公司", "corp-branch")]},
+                {"has_more": False, "corp_deploy_list": [corp("安徽云速付", "corp-secret")]},
+            ]
+        )
+
+        row = JdyAdminClient(transport).resolve_unique_corp(plain_corp_id="", enterprise_name="安徽云速付")
+
+        self.assertEqual(row.corp_id, "corp-secret")
+        self.assertEqual([call["payload"]["skip"] for call in transport.calls], [0, 1])
+        self.assertEqual({call["payload"]["limit"] for call in transport.calls}, {50})
+
+    def test_resolve_unique_reports_duplicates_split_across_pages(self):
+        row = {"corp_id": "corp-secret", "name": "安徽云速付", "suite_id": 1, "suite_scenario": "main"}
+        transport = FakeTransport(
+            [
+                {"has_more": True, "corp_deploy_list": [row]},
+                {"has_more": False, "corp_deploy_list": [dict(row, corp_id="corp-other")]},
+            ]
+        )
+
+        with self.assertRaises(AmbiguousCorpDeployError):
+            JdyAdminClient(transport).resolve_unique_corp("ww-demo", "")
+
     def test_resolve_unique_reports_chinese_business_errors(self):
         with self.assertRaisesRegex(MissingCorpDeployError, "根据 CorpID 未检索到企业"):
             JdyAdminClient(
@@ -230,5 +267,46 @@ class JdyAdminClientTest(unittest.TestCase):
         self.assertNotIn("tenant_id", transport.calls[1]["payload"])
 
 
+class AsyncJdyAdminClientTest(unittest.TestCase):
+    def test_resolve_and_install_match_the_blocking_client(self):
+        def corp(name, corp_id):
+            return {"corp_id": corp_id, "name": name, "tenant_id": "tenant-1", "suite_id": 1, "suite_scenario": "main"}
+
+        responses = [
+            {"has_more": True, "corp_deploy_list": [corp("安徽云速付分公司", "corp-branch")]},
+            {"has_more": False, "corp_deploy_list": [corp("安徽云速付", "corp-secret")]},
+            {"tenant_id": "tenant-1", "owner_id": "owner-1"},
+        ]
+        install = JdyInstallRequest(
+            corp_id="corp-secret",
+            corp_name="安徽云速付",
+            tenant_id="tenant-1",
+            token="token",
+            encoding_aes_key="aes",
+            suite_id=1,
+            suite_scenario="main",
+        )
+        sync_transport = FakeTransport(list(responses))
+        sync_client = JdyAdminClient(sync_transport)
+        async_transport = AsyncFakeTransport(list(responses))
+        async_client = AsyncJdyAdminClient(async_transport)
+
+        async def run_async():
+            row = await async_client.resolve_unique_corp("", "安徽云速付")
+            return row, await async_client.install_corp_deploy(install)
+
+        async_row, async_result = asyncio.run(run_async())
+
+        self.assertEqual(async_row, sync_client.resolve_unique_corp("", "安徽云速付"))
+        self.assertEqual(async_result, sync_client.install_corp_deploy(install))
+        self.assertEqual(async_transport.calls, sync_transport.calls)
+
+    def test_resolve_reports_missing_corp_with_the_same_error(self):
+        client = AsyncJdyAdminClient(AsyncFakeTransport([{"has_more": False, "corp_deploy_list": []}]))
+
+        with self.assertRaisesRegex(MissingCorpDeployError, "CorpID"):
+            asyncio.run(client.resolve_unique_corp("ww-missing", ""))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import unittest
+
+from rpa_platform.integrations.paging import aiter_pages, atake_first, iter_pages, take_first
+
+
+class IterPagesTest(unittest.TestCase):
+    def test_walks_pages_until_has_more_is_false(self):
+        pages = {0: (["a", "b"], True), 2: (["c"], False)}
+        offsets = []
+
+        def fetch_page(offset):
+            offsets.append(offset)
+            return pages[offset]
+
+        self.assertEqual(list(iter_pages(fetch_page, prefetch=False)), ["a", "b", "c"])
+        self.assertEqual(offsets, [0, 2])
+
+    def test_next_page_is_fetched_while_the_caller_filters_the_current_one(self):
+        second_page_requested = threading.Event()
+
+        def fetch_page(offset):
+            if offset:
+                second_page_requested.set()
+                return ["c"], False
+            return ["a", "b"], True
+
+        rows = iter_pages(fetch_page)
+        first = next(rows)
+
+        self.assertEqual(first, "a")
+        self.assertTrue(second_page_requested.wait(timeout=5))
+        self.assertEqual(list(rows), ["b", "c"])
+
+    def test_take_first_stops_paging_without_surfacing_a_discarded_prefetch_error(self):
+        offsets = []
+
+        def fetch_page(offset):
+            offsets.append(offset)
+            if offset:
+                raise RuntimeError("second page unavailable")
+            return ["a", "b"], True
+
+        self.assertEqual(take_first(iter_pages(fetch_page), 2), ["a", "b"])
+        self.assertEqual(take_first(iter_pages(fetch_page, prefetch=False), 2), ["a", "b"])
+        self.assertEqual(offsets.count(0), 2)
+        self.assertLessEqual(len(offsets), 3)
+
+    def test_prefetch_error_is_raised_when_the_caller_reads_that_page(self):
+        def fetch_page(offset):
+            if offset:
+                raise RuntimeError("second page unavailable")
+            return ["a"], True
+
+        with self.assertRaisesRegex(RuntimeError, "second page"):
+            list(iter_pages(fetch_page))
+
+
+class AsyncIterPagesTest(unittest.TestCase):
+    def test_next_page_request_overlaps_the_caller_reading_the_current_page(self):
+        events = []
+
+        async def fetch_page(offset):
+            events.append("fetch %s" % offset)
+            await asyncio.sleep(0)
+            if offset:
+                return ["c"], False
+            return ["a", "b"], True
+
+        async def collect():
+            rows = []
+            async for row in aiter_pages(fetch_page):
+                await asyncio.sleep(0)
+                events.append("read %s" % row)
+                rows.append(row)
+            return rows
+
+        self.assertEqual(asyncio.run(collect()), ["a", "b", "c"])
+        self.assertLess(events.index("fetch 2"), events.index("read b"))
+
+    def test_atake_first_filters_and_stops_without_surfacing_a_discarded_prefetch_error(self):
+        async def fetch_page(offset):
+            if offset:
+                raise RuntimeError("second page unavailable")
+            return ["a", "bb", "c"], True
+
+        found = asyncio.run(atake_first(aiter_pages(fetch_page), 1, lambda row: len(row) == 2))
+
+        self.assertEqual(found, ["bb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
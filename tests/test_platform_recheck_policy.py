@@ -0,0 +1,124 @@
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.recheck_policy import RecheckPolicy, RecheckSchedule
+
+
+class RecheckPolicyTest(unittest.TestCase):
+    def test_delay_grows_with_attempts_up_to_state_cap(self):
+        policy = RecheckPolicy(jitter_ratio=0)
+
+        delays = [policy.delay_seconds(TaskStatus.WAITING_WECOM_REVIEW, attempts) for attempts in range(5)]
+
+        self.assertEqual(delays, [600, 1200, 2400, 3600, 3600])
+        self.assertEqual(policy.delay_seconds(TaskStatus.WAITING_WECOM_ONLINE_DELAY, 10), 900)
+
+    def test_jitter_spreads_delays_below_the_cap(self):
+        policy = RecheckPolicy(jitter_ratio=0.2, rng=random.Random(7))
+
+        delays = {policy.delay_seconds(TaskStatus.WAITING_WECOM_REVIEW, 9) for _ in range(50)}
+
+        self.assertGreater(len(delays), 40)
+        self.assertTrue(all(2880 <= delay <= 3600 for delay in delays))
+
+    def test_history_skips_probes_before_typical_approval_time(self):
+        policy = RecheckPolicy(jitter_ratio=0)
+
+        early = policy.delay_seconds(TaskStatus.WAITING_WECOM_REVIEW, 0, waited_seconds=0, typical_wait_seconds=4000)
+        late = policy.delay_seconds(TaskStatus.WAITING_WECOM_REVIEW, 0, waited_seconds=5000, typical_wait_seconds=4000)
+
+        self.assertEqual(early, 2000)
+        self.assertEqual(late, 600)
+
+    def test_from_env_overrides_schedules_and_rejects_bad_values(self):
+        policy = RecheckPolicy.from_env(
+            {
+                "RPA_WECOM_REVIEW_RECHECK_INITIAL_SECONDS": "60",
+                "RPA_WECOM_REVIEW_RECHECK_MAX_SECONDS": "300",
+                "RPA_RECHECK_JITTER_RATIO": "0",
+            }
+        )
+
+        self.assertEqual(
+            policy.schedules[TaskStatus.WAITING_WECOM_REVIEW],
+            RecheckSchedule(initial_seconds=60, max_seconds=300),
+        )
+        self.assertEqual(policy.jitter_ratio, 0)
+        with self.assertRaises(ValueError):
+            RecheckPolicy.from_env({"RPA_RECHECK_JITTER_RATIO": "fast"})
+
+
+class WaitHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(str(Path(self.tmpdir.name) / "platform.db"))
+        self.store.init_schema()
+        self.team_id = self.store.create_team("交付团队")
+        self.flow_id = self.store.create_flow_template(self.team_id, "企微代开发应用上线", "")
+        version_id = self.store.create_flow_version(
+            self.flow_id,
+            steps=[{"key": "receive_webhook", "name": "接收 Webhook", "action": "receive_webhook"}],
+            created_by="codex",
+        )
+        self.store.publish_flow_version(self.flow_id, version_id)
+        self.robot_id = self.store.register_robot("windows-rpa-01", "WIN-RPA-01", "C:/rpa/profile")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_wait_start_survives_rechecks_and_approval_records_sample(self):
+        task_id = self._create_task("ww001")
+        self.store.set_task_status(task_id, TaskStatus.WAITING_WECOM_REVIEW, next_check_at=datetime.now())
+        wait_started = self.store.get_task(task_id)["wait_started_at_ms"]
+        self.store.claim_next_runnable_task(self.robot_id, now=datetime.now() + timedelta(seconds=1))
+        self.store.set_task_status(task_id, TaskStatus.RUNNING, expected=TaskStatus.CHECKING_LOGIN)
+        self.store.set_task_status(task_id, TaskStatus.WAITING_WECOM_REVIEW, expected=TaskStatus.RUNNING)
+
+        self.assertEqual(self.store.get_task(task_id)["wait_started_at_ms"], wait_started)
+        self.assertIsNone(self.store.get_wait_duration_quantile(TaskStatus.WAITING_WECOM_REVIEW, min_samples=1))
+
+        self.store.set_task_status(task_id, TaskStatus.READY_TO_ONLINE, expected=TaskStatus.WAITING_WECOM_REVIEW)
+
+        self.assertIsNone(self.store.get_task(task_id)["wait_started_at_ms"])
+        self.assertIsNotNone(self.store.get_wait_duration_quantile(TaskStatus.WAITING_WECOM_REVIEW, min_samples=1))
+
+    def test_next_check_uses_recorded_approval_times(self):
+        for index in range(5):
+            task_id = self._create_task("ww00%s" % index)
+            self.store.set_task_status(task_id, TaskStatus.WAITING_WECOM_REVIEW)
+            self.store.set_task_status(task_id, TaskStatus.READY_TO_ONLINE)
+        with self.store._connect() as conn:
+            conn.execute("UPDATE task_wait_samples SET waited_ms=3000000")
+        task_id = self._create_task("ww009")
+        now = datetime(2026, 6, 8, 10, 0, 0)
+
+        next_check = RecheckPolicy(jitter_ratio=0).next_check_at(
+            self.store,
+            self.store.get_task(task_id),
+            TaskStatus.WAITING_WECOM_REVIEW,
+            now,
+        )
+
+        self.assertEqual(self.store.get_wait_duration_quantile(TaskStatus.WAITING_WECOM_REVIEW), 3000)
+        self.assertEqual(next_check, now + timedelta(seconds=1500))
+
+    def _create_task(self, corp_id):
+        created = self.store.create_task_from_published_flow(
+            team_id=self.team_id,
+            flow_template_id=self.flow_id,
+            enterprise_name="上海测试客户",
+            corp_id=corp_id,
+            source_user_id="u001",
+            idempotency_key="wecom_app_launch:%s:u001" % corp_id,
+            payload={"user_id": "u001", "企业客户名称": "上海测试客户", "企业微信明文 CorpID": corp_id},
+        )
+        return created.task_id
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime
+
+from rpa_platform.integrations.jdy_admin_client import JdyAdminClient, MissingCorpDeployError
+from rpa_platform.integrations.resolution_cache import (
+    CachingJdyAdminClient,
+    CachingWecomAdminClient,
+    ResolutionCache,
+    with_resolution_cache,
+)
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
+from rpa_platform.services.wecom_bind_service import FixedWecomSecretGenerator, JdyWecomBindService
+from scripts.dev.run_platform_dryrun import FakeServiceJdyAdminTransport, FakeServiceWecomAdminTransport
+from tests.test_platform_wecom_bind_service import make_request
+
+
+CORP_LIST_PATH = "/api/fx_sa/wxwork/get_corp_deploy_list"
+APP_LIST_PATH = "/wwopen/developer/customApp/tpl/app/list"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class EmptyCorpListTransport(FakeServiceJdyAdminTransport):
+    def post_json(self, path, payload):
+        if path == CORP_LIST_PATH:
+            self.calls.append({"path": path, "payload": dict(payload)})
+            return {"has_more": False, "corp_deploy_list": []}
+        return super().post_json(path, payload)
+
+
+def _paths(transport):
+    return [call["path"] for call in transport.calls]
+
+
+class ResolutionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResolutionCache(ttl_seconds=60, negative_ttl_seconds=15, clock=self.clock)
+
+    def test_repeated_corp_resolution_reads_the_admin_api_once_until_ttl_expires(self):
+        transport = FakeServiceJdyAdminTransport()
+        client = CachingJdyAdminClient(transport, self.cache)
+
+        first = client.resolve_unique_corp("ww001", "上海测试客户")
+        second = client.resolve_unique_corp(" ww001 ", "上海测试客户")
+        self.clock.now += 61
+        third = client.resolve_unique_corp("ww001", "上海测试客户")
+
+        self.assertEqual(first, second)
+        self.assertEqual(third.corp_id, "corp-secret")
+        self.assertEqual(_paths(transport).count(CORP_LIST_PATH), 2)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_missing_corp_is_cached_for_the_negative_ttl(self):
+        transport = EmptyCorpListTransport()
+        client = CachingJdyAdminClient(transport, self.cache)
+
+        for _ in range(2):
+            with self.assertRaises(MissingCorpDeployError):
+                client.resolve_unique_corp("ww404", "")
+        self.clock.now += 16
+        with self.assertRaises(MissingCorpDeployError):
+            client.resolve_unique_corp("ww404", "")
+
+        self.assertEqual(_paths(transport).count(CORP_LIST_PATH), 2)
+        self.assertEqual(self.cache.stats()["negative_hits"], 1)
+
+    def test_bind_writes_invalidate_the_cached_corp_and_app(self):
+        jdy_transport = FakeServiceJdyAdminTransport()
+        wecom_transport = FakeServiceWecomAdminTransport()
+        jdy_client = CachingJdyAdminClient(jdy_transport, self.cache)
+        wecom_client = CachingWecomAdminClient(wecom_transport, self.cache)
+        service = JdyWecomBindService(
+            jdy_client=jdy_client,
+            wecom_client=wecom_client,
+            secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
+        )
+        jdy_client.resolve_unique_corp("ww001", "上海测试客户")
+        wecom_client.resolve_unique_custom_app(suiteid=1009479, enterprise_name="上海测试客户", suite_name="简道云")
+
+        service.start_bind(make_request(), now=datetime(2026, 6, 16, 10, 0, 0))
+        jdy_client.resolve_unique_corp("ww001", "上海测试客户")
+        wecom_client.resolve_unique_custom_app(suiteid=1009479, enterprise_name="上海测试客户", suite_name="简道云")
+
+        # start_bind reuses the preflight lookups; its writes force the next lookups to the API.
+        self.assertEqual(_paths(jdy_transport).count(CORP_LIST_PATH), 2)
+        self.assertEqual(_paths(wecom_transport).count(APP_LIST_PATH), 2)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertGreaterEqual(self.cache.stats()["invalidations"], 2)
+
+    def test_with_resolution_cache_wraps_only_plain_admin_clients(self):
+        stub = object()
+        clients = with_resolution_cache(
+            {"jdy_client": JdyAdminClient(FakeServiceJdyAdminTransport()), "wecom_client": stub},
+            self.cache,
+        )
+
+        self.assertIsInstance(clients["jdy_client"], CachingJdyAdminClient)
+        self.assertIs(clients["wecom_client"], stub)
+        self.assertIsInstance(
+            with_resolution_cache({"wecom_client": WecomAdminClient(FakeServiceWecomAdminTransport())}, self.cache)[
+                "wecom_client"
+            ],
+            CachingWecomAdminClient,
+        )
+
+    def test_from_env_reads_ttls_and_rejects_negative_values(self):
+        cache = ResolutionCache.from_env({"RPA_ADMIN_RESOLUTION_TTL_SECONDS": "0"})
+
+        self.assertEqual(cache.ttl_seconds, 0)
+        with self.assertRaises(ValueError):
+            ResolutionCache.from_env({"RPA_ADMIN_RESOLUTION_NEGATIVE_TTL_SECONDS": "-1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
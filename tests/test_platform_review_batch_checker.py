@@ -0,0 +1,159 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient, WecomAdminTransport
+from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.recheck_policy import RecheckPolicy
+from rpa_platform.worker.review_batch_checker import WecomReviewBatchChecker
+
+
+SUITEID = 1009479
+
+
+class PagedAppListTransport(WecomAdminTransport):
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get_json(self, path, params, headers):
+        self.calls.append(params)
+        index = params["offset"] // params["limit"]
+        return {
+            "data": {
+                "corpapp_list": {"corpapp": self.pages[index]},
+                "has_next_page": index + 1 < len(self.pages),
+            }
+        }
+
+    def post_json(self, path, payload, headers):
+        raise AssertionError("batch check must not write")
+
+
+class WecomReviewBatchCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(str(Path(self.tmpdir.name) / "platform.db"))
+        self.store.init_schema()
+        self.team_id = self.store.create_team("交付团队")
+        self.flow_id = self.store.create_flow_template(self.team_id, "企微代开发应用上线", "")
+        version_id = self.store.create_flow_version(
+            self.flow_id,
+            steps=[{"key": "receive_webhook", "name": "接收 Webhook", "action": "receive_webhook"}],
+            created_by="codex",
+        )
+        self.store.publish_flow_version(self.flow_id, version_id)
+        self.now = datetime(2026, 6, 16, 10, 0, 0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_settles_due_waits_with_few_list_calls_in_one_pass(self):
+        reviewing = self._waiting_task("ww001", "app-1", TaskStatus.WAITING_WECOM_REVIEW)
+        online_review = self._waiting_task("ww002", "app-2", TaskStatus.WAITING_WECOM_REVIEW)
+        online_order = self._waiting_task("ww003", "app-3", TaskStatus.WAITING_WECOM_ONLINE_DELAY)
+        unknown = self._waiting_task("ww004", "app-4", TaskStatus.WAITING_WECOM_REVIEW)
+        other_suite = self._waiting_task("ww005", "app-5", TaskStatus.WAITING_WECOM_REVIEW, suiteid=1)
+        rejected = self._waiting_task("ww006", "app-6", TaskStatus.WAITING_WECOM_REVIEW)
+        ready_to_submit = self._waiting_task("ww007", "app-7", TaskStatus.WAITING_WECOM_ONLINE_DELAY)
+        transport = PagedAppListTransport(
+            [
+                [
+                    {"app_id": "app-1", "auditorder": {"status": 1}},
+                    {"app_id": "app-2", "auditorder": {"status": 5}},
+                ],
+                [
+                    {"app_id": "app-3", "auditorder": {"status": 5}},
+                    {"app_id": "app-4"},
+                ],
+                [
+                    {"app_id": "app-6", "auditorder": {"status": 2}},
+                    {"app_id": "app-7", "auditorder": {"status": 1}},
+                ],
+            ]
+        )
+        checker = WecomReviewBatchChecker(
+            self.store,
+            WecomAdminClient(transport),
+            SUITEID,
+            recheck_policy=RecheckPolicy(jitter_ratio=0),
+            page_size=2,
+        )
+
+        summary = checker.check_due(now=self.now)
+
+        self.assertEqual(summary, {"checked": 6, "rescheduled": 1, "succeeded": 2, "handed_off": 3, "held": 0})
+        self.assertEqual(len(transport.calls), 3)
+        rescheduled = self.store.get_task(reviewing)
+        self.assertEqual(rescheduled["next_check_at"], "2026-06-16 10:20:00")
+        self.assertEqual(rescheduled["check_attempts"], 1)
+        for task_id in (online_review, online_order):
+            self.assertEqual(self.store.get_task(task_id)["status"], TaskStatus.SUCCESS.value)
+            self.assertEqual(self.store.list_task_steps(task_id)[-1]["step_key"], "wecom_batch_check")
+        # Unknown and rejected orders are left due for the per-task robot check.
+        for task_id in (unknown, rejected, other_suite):
+            self.assertEqual(self.store.get_task(task_id)["status"], TaskStatus.WAITING_WECOM_REVIEW.value)
+            self.assertEqual(self.store.get_task(task_id)["next_check_at"], "2026-06-16 09:59:00")
+        # A new online order is at status 1 until the robot submits it.
+        self.assertEqual(self.store.get_task(ready_to_submit)["status"], TaskStatus.WAITING_WECOM_ONLINE_DELAY.value)
+        self.assertEqual(self.store.get_task(ready_to_submit)["check_attempts"], 0)
+        due_ids = {task["id"] for task in self.store.list_due_waiting_tasks(now=self.now)}
+        self.assertEqual(due_ids, {unknown, rejected, other_suite, ready_to_submit})
+
+    def test_pushes_back_handed_off_waits_no_robot_claimed(self):
+        task_id = self._waiting_task("ww001", "app-1", TaskStatus.WAITING_WECOM_ONLINE_DELAY)
+        transport = PagedAppListTransport([[{"app_id": "app-1", "auditorder": {"status": 2}}]])
+        checker = WecomReviewBatchChecker(
+            self.store,
+            WecomAdminClient(transport),
+            SUITEID,
+            recheck_policy=RecheckPolicy(jitter_ratio=0),
+        )
+
+        first = checker.check_due(now=self.now)
+        second = checker.check_due(now=self.now + timedelta(seconds=1))
+        third = checker.check_due(now=self.now + timedelta(seconds=2))
+
+        self.assertEqual((first["handed_off"], first["held"]), (1, 0))
+        self.assertEqual((second["handed_off"], second["held"]), (0, 1))
+        self.assertEqual(third["checked"], 0)
+        self.assertEqual(len(transport.calls), 2)
+        self.assertEqual(self.store.get_task(task_id)["next_check_at"], "2026-06-16 10:04:01")
+
+    def test_skips_tasks_claimed_while_the_list_call_ran(self):
+        task_id = self._waiting_task("ww001", "app-1", TaskStatus.WAITING_WECOM_REVIEW)
+        robot_id = self.store.register_robot("windows-rpa-01", "WIN-RPA-01", "C:/rpa/profile")
+
+        class ClaimingTransport(PagedAppListTransport):
+            def get_json(inner, path, params, headers):
+                self.store.claim_next_runnable_task(robot_id, now=self.now)
+                return super().get_json(path, params, headers)
+
+        transport = ClaimingTransport([[{"app_id": "app-1", "auditorder": {"status": 5}}]])
+        checker = WecomReviewBatchChecker(self.store, WecomAdminClient(transport), SUITEID)
+
+        checker.check_due(now=self.now)
+
+        task = self.store.get_task(task_id)
+        self.assertEqual(task["status"], TaskStatus.CHECKING_LOGIN.value)
+        self.assertEqual(task["assigned_robot_id"], robot_id)
+
+    def _waiting_task(self, corp_id, app_id, status, suiteid=SUITEID):
+        task_id = self.store.create_task_from_published_flow(
+            team_id=self.team_id,
+            flow_template_id=self.flow_id,
+            enterprise_name="上海测试客户",
+            corp_id=corp_id,
+            source_user_id="u001",
+            idempotency_key="wecom_app_launch:%s:u001" % corp_id,
+            payload={"user_id": "u001", "企业客户名称": "上海测试客户", "企业微信明文 CorpID": corp_id},
+        ).task_id
+        self.store.merge_task_context(task_id, {"wecom": {"suiteid": suiteid, "app_id": app_id}})
+        self.store.set_task_status(task_id, status, next_check_at=self.now - timedelta(minutes=1))
+        return task_id
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.server.webhook_service import JdyWebhookService
+from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.scheduler_service import SchedulerService
+
+
+class BlockingRunner:
+    def __init__(self, store, expected_parallel=1):
+        self.store = store
+        self.barrier = threading.Barrier(expected_parallel, timeout=5)
+        self.finished = threading.Event()
+        self.task_ids = []
+
+    def run_claimed_task(self, task_id, robot_id, now=None):
+        self.task_ids.append(task_id)
+        self.barrier.wait()
+        self.store.set_task_status(task_id, TaskStatus.SUCCESS, expected=TaskStatus.CHECKING_LOGIN)
+        self.store.update_robot_status(robot_id, "idle")
+        self.finished.set()
+        return {"task_id": task_id, "status": TaskStatus.SUCCESS.value}
+
+
+class FailingRunner:
+    def run_claimed_task(self, task_id, robot_id, now=None):
+        raise RuntimeError("browser crashed")
+
+
+class SchedulerServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(str(Path(self.tmpdir.name) / "platform.db"))
+        self.store.init_schema()
+        self.team_id = self.store.create_team("交付团队")
+        self.flow_id = self.store.create_flow_template(self.team_id, "企微代开发应用上线", "")
+        version_id = self.store.create_flow_version(
+            self.flow_id,
+            steps=[{"key": "receive_webhook", "name": "接收 Webhook", "action": "receive_webhook"}],
+            created_by="codex",
+        )
+        self.store.publish_flow_version(self.flow_id, version_id)
+        self.robot_ids = [
+            self.store.register_robot("windows-rpa-0%s" % index, "WIN-RPA-0%s" % index, "C:/rpa/profile")
+            for index in range(2)
+        ]
+        self.service = None
+
+    def tearDown(self):
+        if self.service is not None:
+            self.service.stop(timeout=5)
+        self.tmpdir.cleanup()
+
+    def test_dispatches_claims_to_idle_robots_concurrently(self):
+        task_ids = {self._create_task("ww001"), self._create_task("ww002")}
+        runner = BlockingRunner(self.store, expected_parallel=2)
+        self.service = SchedulerService(self.store, runner, max_workers=2, max_idle_seconds=5)
+
+        self.service.start()
+        self._wait_until(lambda: self.service.stats()["completed_total"] == 2)
+
+        self.assertEqual(set(runner.task_ids), task_ids)
+        for task_id in task_ids:
+            self.assertEqual(self.store.get_task(task_id)["status"], TaskStatus.SUCCESS.value)
+
+    def test_sleeps_until_earliest_due_check(self):
+        task_id = self._create_task("ww001")
+        self.store.set_task_status(
+            task_id,
+            TaskStatus.WAITING_WECOM_REVIEW,
+            next_check_at=datetime.now() + timedelta(seconds=30),
+        )
+        self.service = SchedulerService(self.store, BlockingRunner(self.store), max_idle_seconds=60)
+
+        timeout, due_ms = self.service._next_wait()
+
+        self.assertEqual(due_ms, self.store.get_task(task_id)["next_check_at_ms"])
+        self.assertGreater(timeout, 28)
+        self.assertLessEqual(timeout, 30)
+
+    def test_due_task_no_robot_can_take_does_not_spin_the_loop(self):
+        task_id = self._create_task("ww001")
+        self.store.set_task_status(
+            task_id,
+            TaskStatus.WAITING_WECOM_REVIEW,
+            next_check_at=datetime.now() - timedelta(seconds=1),
+        )
+        for robot_id in self.robot_ids:
+            # Held by a runner in another process.
+            self.store.update_robot_status(robot_id, "busy")
+        runner = BlockingRunner(self.store)
+        self.service = SchedulerService(self.store, runner, max_idle_seconds=0.5, reap_interval_seconds=0.4)
+
+        self.service.start()
+        threading.Event().wait(1.0)
+        wakeups = self.service.stats()["wakeups"]
+        self.store.update_robot_status(self.robot_ids[0], "idle")
+        self.service.notify_new_task()
+        self._wait_until(lambda: self.service.stats()["claimed_total"] == 1)
+
+        self.assertEqual(wakeups["due"], 0)
+        self.assertLessEqual(wakeups["idle"], 4)
+        self.assertEqual(runner.task_ids, [task_id])
+
+    def test_new_task_notification_wakes_idle_loop(self):
+        runner = BlockingRunner(self.store)
+        self.service = SchedulerService(self.store, runner, max_idle_seconds=30)
+        webhook = JdyWebhookService(
+            self.store,
+            self.team_id,
+            self.flow_id,
+            on_task_created=self.service.notify_new_task,
+        )
+        payload = {"user_id": "u001", "企业客户名称": "上海测试客户", "企业微信明文 CorpID": "ww001"}
+        timer = threading.Timer(0.05, webhook.receive, args=[payload])
+        timer.start()
+
+        started = datetime.now()
+        self.service._wait_for_work()
+        waited = datetime.now() - started
+        self.service.dispatch_ready()
+
+        timer.join()
+        stats = self.service.stats()
+        self.assertLess(waited, timedelta(seconds=5))
+        self.assertTrue(runner.finished.is_set())
+        self.assertEqual(stats["wakeups"]["notify"], 1)
+        self.assertEqual(stats["wake_latency_ms"]["notify"]["samples"], 1)
+
+    def test_runner_failure_frees_robot_and_is_counted(self):
+        task_id = self._create_task("ww001")
+        self.service = SchedulerService(self.store, FailingRunner())
+
+        self.service.dispatch_ready()
+
+        steps = self.store.list_task_steps(task_id)
+        self.assertEqual(self.service.stats()["failed_total"], 1)
+        self.assertEqual(steps[-1]["step_key"], "scheduler_dispatch")
+        self.assertEqual(self.store.get_robot(self.robot_ids[0])["status"], "idle")
+        # Failed rather than left claimed, so the reaper does not requeue it into the same error.
+        task = self.store.get_task(task_id)
+        self.assertEqual(task["status"], TaskStatus.FAILED.value)
+        self.assertIsNone(task["assigned_robot_id"])
+        self.assertIsNone(task["lease_expires_at_ms"])
+        self.assertEqual(self.store.reap_expired_leases(now=datetime.now() + timedelta(hours=1)), [])
+
+    def test_loop_survives_a_failing_iteration(self):
+        task_id = self._create_task("ww001")
+        runner = BlockingRunner(self.store)
+        events = []
+        self.service = SchedulerService(
+            self.store,
+            runner,
+            max_idle_seconds=0.05,
+            reap_interval_seconds=0.05,
+            event_logger=events.append,
+        )
+        dispatch_ready = self.service.dispatch_ready
+        failures = iter([sqlite3.OperationalError("database is locked")])
+
+        def flaky_dispatch_ready(now=None):
+            for exc in failures:
+                raise exc
+            return dispatch_ready(now)
+
+        self.service.dispatch_ready = flaky_dispatch_ready
+        self.service.start()
+        self._wait_until(lambda: self.service.stats()["completed_total"] == 1)
+
+        self.assertTrue(self.service.stats()["running"])
+        self.assertEqual(self.store.get_task(task_id)["status"], TaskStatus.SUCCESS.value)
+        self.assertIn("scheduler loop iteration failed error=database is locked", events)
+
+    def test_maintenance_heartbeats_own_claims_and_reaps_abandoned_ones(self):
+        own_task = self._create_task("ww001")
+        abandoned_task = self._create_task("ww002")
+        claim_time = datetime.now()
+        self.store.claim_runnable_tasks(self.robot_ids, now=claim_time, lease_seconds=60)
+        own_robot = self.store.get_task(own_task)["assigned_robot_id"]
+        self.service = SchedulerService(self.store, FailingRunner(), lease_seconds=60)
+        self.service._running_robots.add(own_robot)
+
+        reaped = self.service.maintain_leases(now=claim_time + timedelta(seconds=59))
+        reaped += self.service.maintain_leases(now=claim_time + timedelta(seconds=90))
+
+        self.assertEqual(reaped, 1)
+        self.assertEqual(self.service.stats()["reaped_total"], 1)
+        self.assertEqual(self.store.get_task(own_task)["assigned_robot_id"], own_robot)
+        self.assertEqual(self.store.get_task(abandoned_task)["status"], TaskStatus.PENDING.value)
+        self.assertIsNone(self.store.get_task(abandoned_task)["assigned_robot_id"])
+
+    def _wait_until(self, predicate, timeout=5.0):
+        event = threading.Event()
+        deadline = datetime.now() + timedelta(seconds=timeout)
+        while not predicate():
+            if datetime.now() > deadline:
+                self.fail("condition not met within %ss" % timeout)
+            event.wait(0.01)
+
+    def _create_task(self, corp_id):
+        created = self.store.create_task_from_published_flow(
+            team_id=self.team_id,
+            flow_template_id=self.flow_id,
+            enterprise_name="上海测试客户",
+            corp_id=corp_id,
+            source_user_id="u001",
+            idempotency_key="wecom_app_launch:%s:u001" % corp_id,
+            payload={"user_id": "u001", "企业客户名称": "上海测试客户", "企业微信明文 CorpID": corp_id},
+        )
+        return created.task_id
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,8 @@ class TaskStateMachineTest(unittest.TestCase):
         ensure_task_transition(TaskStatus.WAITING_WECOM_REVIEW, TaskStatus.READY_TO_ONLINE)
         ensure_task_transition(TaskStatus.READY_TO_ONLINE, TaskStatus.RUNNING)
         ensure_task_transition(TaskStatus.RUNNING, TaskStatus.SUCCESS)
+        # A batch check can find the order already online.
+        ensure_task_transition(TaskStatus.WAITING_WECOM_REVIEW, TaskStatus.SUCCESS)
 
     def test_allows_waiting_wecom_online_delay_to_resume_or_finish(self):
         ensure_task_transition(TaskStatus.RUNNING, TaskStatus.WAITING_WECOM_ONLINE_DELAY)
@@ -0,0 +1,74 @@
+import threading
+import unittest
+
+from rpa_platform.services.step_graph import GraphStep, run_step_graph
+
+
+class RunStepGraphTest(unittest.TestCase):
+    def test_independent_steps_run_concurrently_and_dependents_see_their_results(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(value):
+            barrier.wait()
+            return value
+
+        results = run_step_graph(
+            [
+                GraphStep("root", lambda _done: 1),
+                GraphStep("left", lambda done: meet(done["root"] + 1), ("root",)),
+                GraphStep("right", lambda done: meet(done["root"] + 2), ("root",)),
+                GraphStep("join", lambda done: done["left"] + done["right"], ("left", "right")),
+            ],
+            max_workers=2,
+        )
+
+        self.assertEqual(results, {"root": 1, "left": 2, "right": 3, "join": 5})
+
+    def test_single_worker_runs_steps_in_declaration_order(self):
+        order = []
+
+        run_step_graph(
+            [
+                GraphStep("a", lambda _done: order.append("a")),
+                GraphStep("c", lambda _done: order.append("c"), ("b",)),
+                GraphStep("b", lambda _done: order.append("b")),
+                GraphStep("d", lambda _done: order.append("d")),
+            ],
+            max_workers=1,
+        )
+
+        self.assertEqual(order, ["a", "b", "c", "d"])
+
+    def test_failure_stops_later_steps_and_raises_earliest_declared_error(self):
+        barrier = threading.Barrier(2, timeout=5)
+        started = []
+
+        def fail(message):
+            barrier.wait()
+            raise RuntimeError(message)
+
+        with self.assertRaisesRegex(RuntimeError, "first"):
+            run_step_graph(
+                [
+                    GraphStep("first", lambda _done: fail("first")),
+                    GraphStep("second", lambda _done: fail("second")),
+                    GraphStep("after", lambda _done: started.append("after"), ("first",)),
+                    GraphStep("unrelated", lambda _done: started.append("unrelated")),
+                ],
+                max_workers=2,
+            )
+
+        self.assertEqual(started, [])
+
+    def test_rejects_unknown_dependencies_and_cycles(self):
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            run_step_graph([GraphStep("a", lambda _done: None, ("missing",))], max_workers=1)
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            run_step_graph(
+                [GraphStep("a", lambda _done: None, ("b",)), GraphStep("b", lambda _done: None, ("a",))],
+                max_workers=1,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import json
+import sqlite3
 import tempfile
 import unittest
+from datetime import datetime
 from pathlib import Path
 
 from rpa_platform.domain.state_machine import TaskStatus
@@ -48,10 +50,14 @@ class SQLiteStoreTest(unittest.TestCase):
         self.assertTrue(created.created)
         self.assertEqual(task["status"], TaskStatus.PENDING.value)
         self.assertEqual(task["flow_version_id"], published_id)
-        snapshot = json.loads(task["flow_version_snapshot_json"])
+        snapshot = self.store.get_flow_snapshot(task["flow_snapshot_hash"])
         self.assertEqual(snapshot["version_no"], 1)
         self.assertEqual(snapshot["steps"][1]["key"], "derive_urls")
 
+        snapshot["steps"].clear()
+        detail = self.store.get_task_detail(created.task_id)
+        self.assertEqual(detail["flow_version_snapshot"]["steps"][1]["key"], "derive_urls")
+
     def test_idempotent_task_creation_returns_existing_task(self):
         team_id = self.store.create_team("交付团队")
         flow_id = self.store.create_flow_template(team_id, "企微代开发应用上线", "")
@@ -85,6 +91,160 @@ class SQLiteStoreTest(unittest.TestCase):
         self.assertFalse(second.created)
         self.assertEqual(first.task_id, second.task_id)
 
+    def test_tasks_from_same_published_version_share_one_flow_snapshot_row(self):
+        team_id = self.store.create_team("交付团队")
+        flow_id = self.store.create_flow_template(team_id, "企微代开发应用上线", "")
+        version_id = self.store.create_flow_version(
+            flow_id,
+            steps=[{"key": "start", "name": "开始", "action": "receive_webhook"}],
+            created_by="codex",
+        )
+        self.store.publish_flow_version(flow_id, version_id)
+
+        task_ids = [
+            self.store.create_task_from_published_flow(
+                team_id=team_id,
+                flow_template_id=flow_id,
+                enterprise_name="客户 %s" % index,
+                corp_id="ww00%s" % index,
+                source_user_id="u00%s" % index,
+                idempotency_key="wecom_app_launch:ww00%s:u00%s" % (index, index),
+                payload={"user_id": "u00%s" % index},
+            ).task_id
+            for index in range(3)
+        ]
+
+        hashes = {self.store.get_task(task_id)["flow_snapshot_hash"] for task_id in task_ids}
+        with sqlite3.connect(str(self.db_path)) as conn:
+            snapshot_count = conn.execute("SELECT COUNT(*) FROM flow_snapshots").fetchone()[0]
+        self.assertEqual(len(hashes), 1)
+        self.assertEqual(snapshot_count, 1)
+        first = self.store.get_task_detail(task_ids[0])["flow_version_snapshot"]
+        second = self.store.get_task_detail(task_ids[1])["flow_version_snapshot"]
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(first["steps"][0]["key"], "start")
+
+    def test_init_schema_migrates_legacy_per_task_snapshot_copies(self):
+        legacy_path = Path(self.tmpdir.name) / "legacy.db"
+        snapshot = {"id": "v1", "version_no": 1, "status": "published", "published_at": "", "steps": []}
+        with sqlite3.connect(str(legacy_path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE tasks (
+                    id TEXT PRIMARY KEY,
+                    team_id TEXT NOT NULL,
+                    flow_template_id TEXT NOT NULL,
+                    flow_version_id TEXT NOT NULL,
+                    flow_version_snapshot_json TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    enterprise_name TEXT NOT NULL,
+                    corp_id TEXT NOT NULL,
+                    source_user_id TEXT NOT NULL,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    payload_json TEXT NOT NULL,
+                    current_step_key TEXT DEFAULT '',
+                    next_check_at TEXT,
+                    check_attempts INTEGER NOT NULL DEFAULT 0,
+                    assigned_robot_id TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    finished_at TEXT
+                )
+                """
+            )
+            for index in range(2):
+                conn.execute(
+                    """
+                    INSERT INTO tasks
+                        (id, team_id, flow_template_id, flow_version_id, flow_version_snapshot_json,
+                         status, enterprise_name, corp_id, source_user_id, idempotency_key,
+                         payload_json, created_at, updated_at)
+                    VALUES (?, 'team', 'flow', 'v1', ?, 'pending', '客户', 'ww001', 'u001', ?, '{}', 'now', 'now')
+                    """,
+                    ("task-%s" % index, json.dumps(snapshot, ensure_ascii=False), "key-%s" % index),
+                )
+
+        store = SQLiteStore(str(legacy_path))
+        store.init_schema()
+
+        task = store.get_task("task-0")
+        self.assertNotIn("flow_version_snapshot_json", task)
+        self.assertEqual(task["flow_snapshot_hash"], store.get_task("task-1")["flow_snapshot_hash"])
+        self.assertEqual(store.get_flow_snapshot(task["flow_snapshot_hash"]), snapshot)
+
+    def _legacy_text_schedule_store(self, extra_sql=""):
+        legacy_path = Path(self.tmpdir.name) / "legacy-text.db"
+        store = SQLiteStore(str(legacy_path))
+        store.init_schema()
+        with sqlite3.connect(str(legacy_path)) as conn:
+            for (index_name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_platform_tasks_%'"
+            ).fetchall():
+                conn.execute("DROP INDEX %s" % index_name)
+            conn.executescript(
+                """
+                DROP VIEW tasks_view;
+                ALTER TABLE tasks ADD COLUMN next_check_at TEXT;
+                ALTER TABLE tasks ADD COLUMN created_at TEXT NOT NULL DEFAULT '';
+                ALTER TABLE tasks ADD COLUMN updated_at TEXT NOT NULL DEFAULT '';
+                ALTER TABLE tasks DROP COLUMN next_check_at_ms;
+                ALTER TABLE tasks DROP COLUMN created_at_ms;
+                ALTER TABLE tasks DROP COLUMN updated_at_ms;
+                CREATE INDEX idx_platform_tasks_next_check ON tasks(next_check_at);
+                INSERT INTO flow_snapshots (hash, snapshot_json, created_at) VALUES ('h1', '{}', 'now');
+                INSERT INTO teams (id, name, created_at, updated_at) VALUES ('t', '交付团队', 'now', 'now');
+                INSERT INTO tasks
+                    (id, team_id, flow_template_id, flow_version_id, flow_snapshot_hash, status,
+                     enterprise_name, corp_id, source_user_id, idempotency_key, payload_json,
+                     next_check_at, created_at, updated_at)
+                VALUES
+                    ('due', 't', 'f', 'v', 'h1', 'waiting_wecom_review', '客户', 'ww1', 'u1', 'k1', '{}',
+                     '2026-06-08 09:58:00', '2026-06-08 09:00:00.250000', '2026-06-08 09:30:00.000000'),
+                    ('later', 't', 'f', 'v', 'h1', 'waiting_wecom_review', '客户', 'ww2', 'u2', 'k2', '{}',
+                     '2026-06-08 10:05:00', '2026-06-08 08:00:00.000000', '2026-06-08 08:00:00.000000');
+                """
+                + extra_sql
+            )
+        return store, legacy_path
+
+    def test_init_schema_converts_legacy_text_schedule_columns_to_epoch_ms(self):
+        store, legacy_path = self._legacy_text_schedule_store()
+
+        store.init_schema()
+
+        with sqlite3.connect(str(legacy_path)) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(tasks)")}
+        self.assertNotIn("next_check_at", columns)
+        self.assertIn("next_check_at_ms", columns)
+        self.assertNotIn("idx_platform_tasks_next_check", indexes)
+        self.assertIn("idx_platform_tasks_due", indexes)
+        task = store.get_task("due")
+        self.assertEqual(task["next_check_at"], "2026-06-08 09:58:00")
+        self.assertEqual(task["created_at"], "2026-06-08 09:00:00.250000")
+        self.assertEqual(task["next_check_at_ms"], round(datetime(2026, 6, 8, 9, 58).timestamp() * 1000))
+
+        robot_id = store.register_robot("robot", "host", "/tmp/profile")
+        claimed = store.claim_next_runnable_task(robot_id, now=datetime(2026, 6, 8, 10, 0))
+        self.assertEqual(claimed["id"], "due")
+
+    def test_failed_epoch_migration_leaves_the_legacy_columns_in_place(self):
+        # An index on a dropped column makes the last DROP COLUMN fail after the UPDATE ran.
+        store, legacy_path = self._legacy_text_schedule_store(
+            "CREATE INDEX custom_updated ON tasks(updated_at);"
+        )
+
+        with self.assertRaises(sqlite3.OperationalError):
+            store.init_schema()
+
+        with sqlite3.connect(str(legacy_path)) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            created_at = conn.execute("SELECT created_at FROM tasks WHERE id='due'").fetchone()[0]
+        self.assertIn("created_at", columns)
+        self.assertNotIn("created_at_ms", columns)
+        self.assertEqual(created_at, "2026-06-08 09:00:00.250000")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,7 +3,7 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.domain.state_machine import InvalidTaskTransition, TaskStatus
 from rpa_platform.storage.sqlite_store import SQLiteStore
 
 
@@ -102,15 +102,77 @@ class TaskManagementStoreTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.store.resume_task(self.task_id, handled_by="admin")
 
-    def _create_task(self):
+    def test_expected_status_write_only_applies_when_source_still_matches(self):
+        self.assertTrue(
+            self.store.set_task_status(self.task_id, TaskStatus.RUNNING, expected=TaskStatus.PENDING)
+        )
+
+        lost = self.store.set_task_status(self.task_id, TaskStatus.RUNNING, expected=TaskStatus.PENDING)
+
+        self.assertFalse(lost)
+        self.assertEqual(self.store.get_task(self.task_id)["status"], TaskStatus.RUNNING.value)
+
+    def test_expected_status_write_rejects_illegal_transition(self):
+        with self.assertRaises(InvalidTaskTransition):
+            self.store.set_task_status(self.task_id, TaskStatus.PENDING, expected=TaskStatus.SUCCESS)
+
+    def test_list_tasks_pages_newest_first_with_opaque_cursor(self):
+        task_ids = {self.task_id}
+        for index in range(2, 6):
+            task_ids.add(self._create_task("杭州客户%s" % index, "ww00%s" % index, "u00%s" % index))
+
+        seen = []
+        cursor = None
+        while True:
+            page = self.store.list_tasks(limit=2, cursor=cursor)
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(set(seen), task_ids)
+        self.assertEqual(len(seen), len(task_ids))
+        first = self.store.list_tasks(limit=1)["items"][0]
+        self.assertNotIn("payload_json", first)
+        self.assertNotIn("corp_id", first)
+        self.assertIn("corp_id_masked", first)
+
+    def test_list_tasks_filters_by_status_and_robot(self):
+        other_id = self._create_task("杭州客户", "ww002", "u002")
+        self.store.set_task_status(other_id, TaskStatus.RUNNING, assigned_robot_id="robot-1")
+
+        running = self.store.list_tasks(status=TaskStatus.RUNNING)
+        by_robot = self.store.list_tasks(assigned_robot_id="robot-1")
+        by_team = self.store.list_tasks(team_id=self.team_id, created_to="2000-01-01 00:00:00")
+
+        self.assertEqual([item["id"] for item in running["items"]], [other_id])
+        self.assertEqual([item["id"] for item in by_robot["items"]], [other_id])
+        self.assertEqual(by_team["items"], [])
+
+    def test_list_tasks_searches_enterprise_name_and_corp_id(self):
+        other_id = self._create_task("杭州云端科技有限公司", "wwcorp777", "u002")
+
+        by_name = self.store.list_tasks(query="云端科技")
+        by_corp = self.store.list_tasks(query="corp777")
+        short = self.store.list_tasks(query="杭州")
+
+        self.assertEqual([item["id"] for item in by_name["items"]], [other_id])
+        self.assertEqual([item["id"] for item in by_corp["items"]], [other_id])
+        self.assertEqual([item["id"] for item in short["items"]], [other_id])
+
+    def test_list_tasks_rejects_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            self.store.list_tasks(cursor="not-a-cursor")
+
+    def _create_task(self, enterprise_name="上海测试客户", corp_id="ww001", user_id="u001"):
         created = self.store.create_task_from_published_flow(
             team_id=self.team_id,
             flow_template_id=self.flow_id,
-            enterprise_name="上海测试客户",
-            corp_id="ww001",
-            source_user_id="u001",
-            idempotency_key="wecom_app_launch:ww001:u001",
-            payload={"user_id": "u001", "企业客户名称": "上海测试客户", "企业微信明文 CorpID": "ww001"},
+            enterprise_name=enterprise_name,
+            corp_id=corp_id,
+            source_user_id=user_id,
+            idempotency_key="wecom_app_launch:%s:%s" % (corp_id, user_id),
+            payload={"user_id": user_id, "企业客户名称": enterprise_name, "企业微信明文 CorpID": corp_id},
         )
         return created.task_id
 
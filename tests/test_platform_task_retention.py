@@ -0,0 +1,173 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.storage.sqlite_store import SQLiteStore
+
+
+class TaskRetentionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "platform.db"
+        self.archive_path = Path(self.tmpdir.name) / "platform-archive.db"
+        self.store = SQLiteStore(str(self.db_path), archive_path=str(self.archive_path))
+        self.store.init_schema()
+        self.team_id = self.store.create_team("交付团队")
+        self.flow_id = self.store.create_flow_template(self.team_id, "企微代开发应用上线", "")
+        version_id = self.store.create_flow_version(
+            self.flow_id,
+            steps=[{"key": "receive_webhook", "name": "接收 Webhook", "action": "receive_webhook"}],
+            created_by="codex",
+        )
+        self.store.publish_flow_version(self.flow_id, version_id)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_archives_old_terminal_tasks_with_children_in_batches(self):
+        done_ids = [self._create_task("ww00%s" % index) for index in range(3)]
+        for task_id in done_ids:
+            step_id = self.store.append_task_step(task_id, "wecom_submit_online", "提交上线", "success")
+            self.store.create_task_artifact(task_id, step_id, "screenshot", "screenshots/%s.png" % task_id)
+            self.store.set_task_status(task_id, TaskStatus.SUCCESS)
+        waiting_id = self._create_task("ww009")
+        self.store.set_task_status(waiting_id, TaskStatus.WAITING_WECOM_REVIEW)
+
+        result = self.store.archive_terminal_tasks(
+            older_than_days=30,
+            batch_size=2,
+            now=datetime.now() + timedelta(days=31),
+        )
+
+        self.assertEqual(result.archived_tasks, 3)
+        self.assertEqual(result.batches, 2)
+        self.assertEqual(self.store.get_task(waiting_id)["status"], TaskStatus.WAITING_WECOM_REVIEW.value)
+        with self.assertRaises(KeyError):
+            self.store.get_task(done_ids[0])
+        with sqlite3.connect(str(self.db_path)) as conn:
+            live_steps = conn.execute("SELECT COUNT(*) FROM task_steps").fetchone()[0]
+        with sqlite3.connect(str(self.archive_path)) as conn:
+            archived_artifacts = conn.execute("SELECT COUNT(*) FROM task_artifacts").fetchone()[0]
+        self.assertEqual(live_steps, 0)
+        self.assertEqual(archived_artifacts, 3)
+        self.assertEqual(self.store.list_tasks(query="ww001")["items"], [])
+
+    def test_keeps_recent_terminal_tasks(self):
+        task_id = self._create_task("ww001")
+        self.store.set_task_status(task_id, TaskStatus.FAILED)
+
+        result = self.store.archive_terminal_tasks(older_than_days=30)
+
+        self.assertEqual(result.archived_tasks, 0)
+        self.assertEqual(self.store.get_task(task_id)["status"], TaskStatus.FAILED.value)
+
+    def test_task_detail_reads_archived_task_transparently(self):
+        task_id = self._create_task("ww001")
+        self.store.append_task_step(task_id, "login_check", "检查后台登录态", "success")
+        self.store.set_task_status(task_id, TaskStatus.CANCELLED)
+        self.store.archive_terminal_tasks(older_than_days=0, now=datetime.now() + timedelta(seconds=1))
+
+        detail = self.store.get_task_detail(task_id)
+
+        self.assertTrue(detail["archived"])
+        self.assertEqual(detail["status"], TaskStatus.CANCELLED.value)
+        self.assertEqual(detail["corp_id_masked"], "ww0***001")
+        self.assertEqual(detail["steps"][0]["step_key"], "login_check")
+        self.assertEqual(detail["flow_version_snapshot"]["steps"][0]["key"], "receive_webhook")
+        with self.assertRaises(KeyError):
+            self.store.get_task_detail("missing-task")
+
+    def test_replayed_webhook_resolves_to_the_archived_task(self):
+        task_id = self._create_task("ww001")
+        self.store.set_task_status(task_id, TaskStatus.SUCCESS)
+        self.store.archive_terminal_tasks(older_than_days=0, now=datetime.now() + timedelta(seconds=1))
+
+        replayed = self.store.create_task_from_published_flow(
+            team_id=self.team_id,
+            flow_template_id=self.flow_id,
+            enterprise_name="上海测试客户",
+            corp_id="ww001",
+            source_user_id="u001",
+            idempotency_key="wecom_app_launch:ww001:u001",
+            payload={},
+        )
+
+        self.assertFalse(replayed.created)
+        self.assertEqual(replayed.task_id, task_id)
+        self.assertEqual(self.store.list_tasks()["items"], [])
+
+    def test_backfills_keys_of_tasks_archived_before_the_key_table(self):
+        task_id = self._create_task("ww001")
+        self.store.set_task_status(task_id, TaskStatus.SUCCESS)
+        self.store.archive_terminal_tasks(older_than_days=0, now=datetime.now() + timedelta(seconds=1))
+        with sqlite3.connect(str(self.db_path)) as conn:
+            conn.execute("DELETE FROM archived_task_keys")
+
+        self.store.archive_terminal_tasks(older_than_days=0)
+
+        self.assertEqual(self._create_task("ww001"), task_id)
+
+    def test_new_databases_use_incremental_auto_vacuum(self):
+        with sqlite3.connect(str(self.db_path)) as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+
+    def test_search_index_rows_keep_their_task_rowid_through_update_archive_and_vacuum(self):
+        live_id = self._create_task("ww001")
+        done_id = self._create_task("ww002")
+        self.store.set_task_status(done_id, TaskStatus.SUCCESS)
+        with sqlite3.connect(str(self.db_path)) as conn:
+            conn.execute("UPDATE tasks SET enterprise_name='杭州云端科技有限公司' WHERE id=?", (live_id,))
+
+        self.store.archive_terminal_tasks(older_than_days=0, now=datetime.now() + timedelta(seconds=1))
+        self.store.vacuum()
+
+        with sqlite3.connect(str(self.db_path)) as conn:
+            task_rowids = dict(conn.execute("SELECT id, rowid FROM tasks").fetchall())
+            index_rowids = dict(conn.execute("SELECT task_id, rowid FROM tasks_fts").fetchall())
+        self.assertEqual(index_rowids, task_rowids)
+        self.assertEqual([item["id"] for item in self.store.list_tasks(query="云端科技")["items"]], [live_id])
+
+    def test_rekeys_search_index_built_by_task_id(self):
+        task_id = self._create_task("ww001")
+        self._create_task("ww002")
+        with sqlite3.connect(str(self.db_path)) as conn:
+            conn.executescript(
+                """
+                DROP TRIGGER tasks_fts_after_update;
+                CREATE TRIGGER tasks_fts_after_update AFTER UPDATE OF enterprise_name, corp_id ON tasks
+                BEGIN
+                    DELETE FROM tasks_fts WHERE task_id=old.id;
+                    INSERT INTO tasks_fts (task_id, enterprise_name, corp_id)
+                    VALUES (new.id, new.enterprise_name, new.corp_id);
+                END;
+                UPDATE tasks SET enterprise_name='杭州云端科技有限公司';
+                """
+            )
+
+        self.store.init_schema()
+
+        with sqlite3.connect(str(self.db_path)) as conn:
+            conn.execute("UPDATE tasks SET enterprise_name='上海测试客户' WHERE id=?", (task_id,))
+            task_rowids = dict(conn.execute("SELECT id, rowid FROM tasks").fetchall())
+            index_rowids = dict(conn.execute("SELECT task_id, rowid FROM tasks_fts").fetchall())
+        self.assertEqual(index_rowids, task_rowids)
+        self.assertEqual([item["id"] for item in self.store.list_tasks(query="测试客户")["items"]], [task_id])
+
+    def _create_task(self, corp_id):
+        created = self.store.create_task_from_published_flow(
+            team_id=self.team_id,
+            flow_template_id=self.flow_id,
+            enterprise_name="上海测试客户",
+            corp_id=corp_id,
+            source_user_id="u001",
+            idempotency_key="wecom_app_launch:%s:u001" % corp_id,
+            payload={"user_id": "u001", "企业客户名称": "上海测试客户", "企业微信明文 CorpID": corp_id},
+        )
+        return created.task_id
+
+
+if __name__ == "__main__":
+    unittest.main()
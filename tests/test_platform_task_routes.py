@@ -38,6 +38,27 @@ class TaskRoutesTest(unittest.TestCase):
         self.assertEqual(detail["corp_id_masked"], "ww0***001")
         self.assertEqual(detail["steps"][0]["step_key"], "login_check")
 
+    def test_list_tasks_route_returns_summaries_and_rejects_bad_status(self):
+        route = self._route("/platform/tasks", "GET")
+        query = {
+            "task_status": "pending",
+            "team_id": self.team_id,
+            "assigned_robot_id": None,
+            "created_from": None,
+            "created_to": None,
+            "q": None,
+            "limit": 50,
+            "cursor": None,
+        }
+
+        page = route.endpoint(**query)
+        with self.assertRaises(HTTPException) as ctx:
+            route.endpoint(**dict(query, task_status="unknown"))
+
+        self.assertEqual([item["id"] for item in page["items"]], [self.task_id])
+        self.assertIsNone(page["next_cursor"])
+        self.assertEqual(ctx.exception.status_code, 422)
+
     def test_create_manual_action_route_sets_task_waiting_state(self):
         route = self._route("/platform/tasks/{task_id}/manual-actions", "POST")
 
@@ -1,7 +1,9 @@
+import asyncio
 import unittest
 
 from rpa_platform.integrations.wecom_admin_client import (
     AmbiguousWecomAppError,
+    AsyncWecomAdminClient,
     WecomAdminError,
     MissingWecomAppError,
     RetryableWecomOrderError,
@@ -33,6 +35,16 @@ class FakeTransport(WecomAdminTransport):
         return response
 
 
+class AsyncFakeTransport(FakeTransport):
+    async def get_json(self, path, params, headers):
+        await asyncio.sleep(0)
+        return FakeTransport.get_json(self, path, params, headers)
+
+    async def post_json(self, path, payload, headers):
+        await asyncio.sleep(0)
+        return FakeTransport.post_json(self, path, payload, headers)
+
+
 def make_app(raw=None):
     return WecomCustomApp(
         app_id="app-1",
@@ -69,6 +81,38 @@ def _collect_b_check_by_val(value):
 
 
 class WecomAdminClientTest(unittest.TestCase):
+    def test_list_custom_apps_pages_until_wanted_apps_are_found(self):
+        transport = FakeTransport(
+            [
+                {
+                    "data": {
+                        "corpapp_list": {
+                            "corpapp": [
+                                {"app_id": "app-1", "auditorder": {"auditorderid": "order-1", "status": 1}},
+                                {"app_id": "app-2"},
+                            ]
+                        },
+                        "has_next_page": True,
+                    }
+                },
+                {
+                    "data": {
+                        "corpapp_list": {"corpapp": [{"app_id": "app-3", "auditorder": {"status": 2}}]},
+                        "has_next_page": True,
+                    }
+                },
+            ]
+        )
+        client = WecomAdminClient(transport)
+
+        apps = client.list_custom_apps(suiteid=1, app_ids=["app-1", "app-3"], page_size=2)
+
+        self.assertEqual([app.app_id for app in apps], ["app-1", "app-3"])
+        self.assertEqual((apps[0].auditorderid, apps[0].auditorder_status), ("order-1", 1))
+        self.assertEqual(apps[1].auditorder_status, 2)
+        self.assertEqual([call["params"]["offset"] for call in transport.calls], [0, 2])
+        self.assertNotIn("corp_name_keyword", transport.calls[0]["params"])
+
     def test_resolve_unique_custom_app_uses_runbook_corpapp_response(self):
         transport = FakeTransport(
             [
@@ -118,7 +162,7 @@ class WecomAdminClientTest(unittest.TestCase):
                 "scene": 1,
                 "corp_name_keyword": "上海测试客户",
                 "offset": 0,
-                "limit": 10,
+                "limit": 50,
                 "random": 0,
             },
         )
@@ -130,6 +174,34 @@ class WecomAdminClientTest(unittest.TestCase):
             },
         )
 
+    def test_resolve_unique_custom_app_searches_every_keyword_page(self):
+        transport = FakeTransport(
+            [
+                {
+                    "data": {
+                        "corpapp": [{"app_id": "app-0", "authcorp_name": "上海测试客户分公司", "name": "简道云"}],
+                        "has_next_page": True,
+                    }
+                },
+                {
+                    "data": {
+                        "corpapp": [{"app_id": "app-1", "authcorp_name": "上海测试客户", "name": "简道云"}],
+                        "has_next_page": False,
+                    }
+                },
+            ]
+        )
+
+        app = WecomAdminClient(transport).resolve_unique_custom_app(
+            suiteid=1,
+            enterprise_name="上海测试客户",
+            suite_name="简道云",
+        )
+
+        self.assertEqual(app.app_id, "app-1")
+        self.assertEqual([call["params"]["offset"] for call in transport.calls], [0, 1])
+        self.assertEqual({call["params"]["corp_name_keyword"] for call in transport.calls}, {"上海测试客户"})
+
     def test_resolve_unique_custom_app_accepts_real_corpapp_list_wrapper(self):
         transport = FakeTransport(
             [
@@ -733,5 +805,68 @@ class WecomAdminClientTest(unittest.TestCase):
             client.submit_online_order("order-1")
 
 
+class AsyncWecomAdminClientTest(unittest.TestCase):
+    def test_list_custom_apps_stops_paging_once_wanted_apps_are_found(self):
+        transport = AsyncFakeTransport(
+            [
+                {"data": {"corpapp": [{"app_id": "app-1"}, {"app_id": "app-2"}], "has_next_page": True}},
+                {"data": {"corpapp": [{"app_id": "app-3"}], "has_next_page": True}},
+            ]
+        )
+
+        apps = asyncio.run(
+            AsyncWecomAdminClient(transport).list_custom_apps(suiteid=1, app_ids=["app-3", "app-1"], page_size=2)
+        )
+
+        self.assertEqual([app.app_id for app in apps], ["app-1", "app-3"])
+        self.assertEqual([call["params"]["offset"] for call in transport.calls], [0, 2])
+
+    def test_bind_writes_send_the_blocking_client_requests_and_return_the_same_results(self):
+        app_row = {"app_id": "app-1", "authcorp_name": "上海测试客户", "name": "简道云"}
+        responses = [
+            {"data": {"corpapp": [app_row], "has_next_page": False}},
+            {"data": {"privilege_list": [{"id": 10006, "b_check": False}]}},
+            {"data": {}},
+            {
+                "data": {
+                    "auditorder": {
+                        "auditorderid": "order-1",
+                        "corpappid": "app-1",
+                        "authcorp_name": "上海测试客户",
+                        "status": 1,
+                    }
+                }
+            },
+        ]
+        sync_transport = FakeTransport(list(responses))
+        sync_client = WecomAdminClient(sync_transport)
+        async_transport = AsyncFakeTransport(list(responses))
+        async_client = AsyncWecomAdminClient(async_transport)
+
+        async def run_async():
+            app = await async_client.resolve_unique_custom_app(1, "上海测试客户", "简道云")
+            privileges = await async_client.set_target_privileges(suiteid=1, app_id=app.app_id)
+            order = await async_client.create_online_order(suiteid=1, app_id=app.app_id)
+            return app, privileges, order
+
+        async_results = asyncio.run(run_async())
+        app = sync_client.resolve_unique_custom_app(1, "上海测试客户", "简道云")
+        sync_results = (
+            app,
+            sync_client.set_target_privileges(suiteid=1, app_id=app.app_id),
+            sync_client.create_online_order(suiteid=1, app_id=app.app_id),
+        )
+
+        self.assertEqual(async_results, sync_results)
+        self.assertEqual(async_results[1], [{"id": 10006, "b_check": True}])
+        self.assertEqual(async_transport.calls, sync_transport.calls)
+
+    def test_expired_session_raises_the_same_error(self):
+        transport = AsyncFakeTransport([{"result": {"errCode": -3, "message": "outsession"}}])
+
+        with self.assertRaises(WecomSessionExpiredError):
+            asyncio.run(AsyncWecomAdminClient(transport).resolve_unique_custom_app(1, "上海测试客户", "简道云"))
+
+
 if __name__ == "__main__":
     unittest.main()
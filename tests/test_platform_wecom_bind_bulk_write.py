@@ -0,0 +1,230 @@
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from rpa_platform.integrations.jdy_admin_client import JdyAdminClient
+from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
+from rpa_platform.services.wecom_bind_service import FixedWecomSecretGenerator
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore
+from rpa_platform.worker.bind_write_locks import BindWriteLockManager
+from scripts.dev.run_platform_dryrun import FakeServiceJdyAdminTransport, FakeServiceWecomAdminTransport
+
+
+CORPS = {
+    "ww001": "上海测试客户",
+    "ww002": "北京测试客户",
+    "ww003": "广州测试客户",
+}
+LIST_PATH = "/wwopen/developer/customApp/tpl/app/list"
+
+
+class ReversingCipher:
+    def encrypt(self, data):
+        return data[::-1]
+
+    def decrypt(self, data):
+        return data[::-1]
+
+
+class MultiCorpJdyTransport(FakeServiceJdyAdminTransport):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def post_json(self, path, payload):
+        with self._lock:
+            self.calls.append({"path": path, "payload": dict(payload)})
+        if path == "/api/fx_sa/wxwork/get_corp_deploy_list":
+            plain_corp_id = payload["filter"]
+            return {
+                "has_more": False,
+                "corp_deploy_list": [
+                    {
+                        "corp_id": "secret-%s" % plain_corp_id,
+                        "name": CORPS[plain_corp_id],
+                        "tenant_id": "",
+                        "suite_name": "简道云",
+                        "integrate_suite_name": "简道云集成",
+                        "suite_id": 1,
+                        "suite_scenario": "main",
+                    }
+                ],
+            }
+        if path == "/api/fx_sa/wxwork/install_corp_deploy":
+            return {"tenant_id": payload["tenant_id"], "owner_id": payload["tenant_id"]}
+        return super().post_json(path, payload)
+
+
+class MultiCorpWecomTransport(FakeServiceWecomAdminTransport):
+    """Lists one custom app per listed corp; ``corp_name_keyword`` narrows the list like the real API."""
+
+    def __init__(self, listed_corps):
+        super().__init__()
+        self.listed_corps = listed_corps
+        self._lock = threading.Lock()
+
+    def get_json(self, path, params, headers):
+        with self._lock:
+            self.calls.append({"method": "GET", "path": path, "params": dict(params), "headers": dict(headers)})
+        keyword = params.get("corp_name_keyword")
+        rows = [
+            {
+                "app_id": "app-%s" % plain_corp_id,
+                "authcorp_name": name,
+                "name": "简道云",
+                "logo": "logo-url",
+                "description": "desc",
+                "customized_app_status": 0,
+                "sdk_auth": {"aes_app_id": "aes-%s" % plain_corp_id},
+            }
+            for plain_corp_id, name in CORPS.items()
+            if plain_corp_id in self.listed_corps and (keyword is None or keyword in name)
+        ]
+        return {"data": {"corpapp": rows, "has_next_page": False}}
+
+    def post_json(self, path, payload, headers):
+        if path in {"/wwopen/developer/order/add", "/wwopen/developer/order/set"}:
+            with self._lock:
+                self.calls.append({"method": "POST", "path": path, "payload": dict(payload), "headers": dict(headers)})
+            order = payload["auditorder"]
+            app_id = order.get("corpappid") or order["auditorderid"].replace("order-", "", 1)
+            return {
+                "data": {
+                    "auditorder": {
+                        "auditorderid": order.get("auditorderid") or "order-%s" % app_id,
+                        "corpappid": app_id,
+                        "authcorp_name": "",
+                        "status": 5 if path.endswith("/set") else 1,
+                    }
+                }
+            }
+        with self._lock:
+            return super().post_json(path, payload, headers)
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.now = start
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += timedelta(seconds=seconds)
+
+
+def _context(plain_corp_id):
+    return {
+        "enterprise_name": CORPS[plain_corp_id],
+        "enterprise_short_name": CORPS[plain_corp_id],
+        "plain_corp_id": plain_corp_id,
+        "requested_user_id": "user-%s" % plain_corp_id,
+        "suite_id": "1",
+        "suite_scenario": "main",
+        "wecom_suiteid": "1009479",
+        "suite_name": "简道云",
+    }
+
+
+class WecomBindBulkWriteTest(unittest.TestCase):
+    def _run(self, tmpdir, wecom_transport, plain_corp_ids, **kwargs):
+        from rpa_platform.worker.wecom_bind_bulk_write import run_bulk_wecom_bind_write
+
+        reported = []
+        jdy_transport = MultiCorpJdyTransport()
+        summary = run_bulk_wecom_bind_write(
+            [("task-%s" % plain_corp_id, _context(plain_corp_id)) for plain_corp_id in plain_corp_ids],
+            jdy_client=JdyAdminClient(jdy_transport),
+            wecom_client=WecomAdminClient(wecom_transport),
+            secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
+            on_result=lambda task_id, result: reported.append((task_id, result["status"])),
+            context_store=BindWriteContextStore(str(Path(tmpdir) / "contexts.db"), cipher=ReversingCipher()),
+            locks=BindWriteLockManager(Path(tmpdir) / "locks"),
+            **kwargs,
+        )
+        return summary, reported, jdy_transport
+
+    def test_lists_custom_apps_once_and_overlaps_the_online_delays(self):
+        wecom_transport = MultiCorpWecomTransport(listed_corps=set(CORPS))
+        clock = FakeClock(datetime(2026, 6, 20, 12, 0, 0))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            summary, reported, jdy_transport = self._run(
+                tmpdir,
+                wecom_transport,
+                list(CORPS),
+                clock=clock,
+                sleep=clock.sleep,
+            )
+
+        list_calls = [call for call in wecom_transport.calls if call["path"] == LIST_PATH]
+        order_paths = [call["path"] for call in wecom_transport.calls if call["path"].startswith("/wwopen/developer/order/")]
+        installs = [call for call in jdy_transport.calls if call["path"] == "/api/fx_sa/wxwork/install_corp_deploy"]
+        self.assertEqual(len(list_calls), 1)
+        self.assertNotIn("corp_name_keyword", list_calls[0]["params"])
+        self.assertEqual(len(installs), 3)
+        # Every order is created before the first submit, after a single wait.
+        self.assertEqual(order_paths, ["/wwopen/developer/order/add"] * 3 + ["/wwopen/developer/order/set"] * 3)
+        self.assertEqual(clock.sleeps, [300.0])
+        self.assertEqual(summary["statuses"], {"success": 3})
+        self.assertEqual(summary["custom_app_index"]["list_calls"], 1)
+        self.assertEqual([row["task_id"] for row in summary["results"]], ["task-ww001", "task-ww002", "task-ww003"])
+        self.assertEqual(
+            {row["wecom"]["auditorderid"] for row in summary["results"]},
+            {"order-app-ww001", "order-app-ww002", "order-app-ww003"},
+        )
+        self.assertEqual(sorted(reported), [("task-ww001", "success"), ("task-ww002", "success"), ("task-ww003", "success")])
+
+    def test_blocked_enterprise_is_reported_before_the_others_finish_waiting(self):
+        wecom_transport = MultiCorpWecomTransport(listed_corps={"ww001", "ww002"})
+        clock = FakeClock(datetime(2026, 6, 20, 12, 0, 0))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            summary, reported, _jdy_transport = self._run(
+                tmpdir,
+                wecom_transport,
+                list(CORPS),
+                clock=clock,
+                sleep=clock.sleep,
+            )
+
+        keyword_calls = [
+            call["params"]["corp_name_keyword"]
+            for call in wecom_transport.calls
+            if call["path"] == LIST_PATH and "corp_name_keyword" in call["params"]
+        ]
+        self.assertEqual(reported[0], ("task-ww003", "business_unexecutable"))
+        self.assertEqual(sorted(reported[1:]), [("task-ww001", "success"), ("task-ww002", "success")])
+        # The enterprise missing from the listing is still looked up on its own before giving up.
+        self.assertEqual(keyword_calls, ["广州测试客户"])
+        self.assertEqual(summary["results"][2]["reason"], "wecom_app_not_unique_or_missing")
+        self.assertEqual(summary["statuses"], {"business_unexecutable": 1, "success": 2})
+
+    def test_rerun_reports_completed_enterprises_without_new_preflight(self):
+        wecom_transport = MultiCorpWecomTransport(listed_corps=set(CORPS))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._run(tmpdir, wecom_transport, ["ww001"], wait_seconds=0)
+            calls_before = len(wecom_transport.calls)
+            summary, reported, jdy_transport = self._run(tmpdir, wecom_transport, ["ww001"], wait_seconds=0)
+
+        self.assertEqual(reported, [("task-ww001", "already_completed")])
+        self.assertEqual(len(wecom_transport.calls), calls_before)
+        self.assertEqual(jdy_transport.calls, [])
+        self.assertEqual(summary["custom_app_index"]["list_calls"], 0)
+
+    def test_rejects_duplicate_task_ids(self):
+        from rpa_platform.worker.wecom_bind_bulk_write import run_bulk_wecom_bind_write
+
+        with self.assertRaises(ValueError):
+            run_bulk_wecom_bind_write(
+                [("task-1", _context("ww001")), ("task-1", _context("ww002"))],
+                jdy_client=JdyAdminClient(MultiCorpJdyTransport()),
+                wecom_client=WecomAdminClient(MultiCorpWecomTransport(set(CORPS))),
+                secret_generator=FixedWecomSecretGenerator(token="t", encoding_aes_key="a"),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -541,6 +541,29 @@ class WecomBindRealReadonlyPreflightTest(unittest.TestCase):
         self.assertEqual(result["reason"], "jdy_corp_not_unique_or_missing")
         self.assertNotIn("ww-plain-secret", serialized)
 
+    def test_readonly_preflight_reports_unavailable_backend_without_owner_fallback(self):
+        from scripts.dev.check_wecom_bind_real_readonly import JsonHttpError, run_readonly_preflight
+
+        class UnavailableJdyTransport(JdyAdminTransport):
+            def __init__(self):
+                self.paths = []
+
+            def post_json(self, path, payload):
+                self.paths.append(path)
+                raise JsonHttpError("POST https://dc.jdydevelop.com%s failed: HTTP Error 503: Service Unavailable" % path, status=503)
+
+        transport = UnavailableJdyTransport()
+        result = run_readonly_preflight(
+            make_request(),
+            jdy_client=JdyAdminClient(transport),
+            wecom_client=WecomAdminClient(RecordingWecomTransport()),
+        )
+
+        self.assertEqual(result["status"], "blocked")
+        self.assertEqual(result["reason"], "jdy_admin_unavailable")
+        self.assertEqual(result["error_msg"], "简道云后台接口暂时不可用，请稍后重试")
+        self.assertEqual(transport.paths, ["/api/fx_sa/wxwork/get_corp_deploy_list"])
+
     def test_readonly_preflight_reports_jdy_session_expired(self):
         from scripts.dev.check_wecom_bind_real_readonly import JsonHttpError, run_readonly_preflight
 
@@ -634,7 +657,7 @@ class WecomBindRealReadonlyPreflightTest(unittest.TestCase):
 
         captured = {}
 
-        def fake_request_json(method, url, payload, headers, timeout):
+        def fake_request_json(method, url, payload, headers, timeout, **_kwargs):
             captured.update({"method": method, "url": url, "payload": payload, "headers": headers})
             return {"data": {}}
 
@@ -14,6 +14,34 @@ class FakeOrchestrator:
 
 
 class WecomBindRealRecoveryTest(unittest.TestCase):
+    def test_cached_real_clients_rebuild_only_when_a_cookie_file_changes(self):
+        import os
+
+        from rpa_platform.worker.wecom_bind_real_recovery import CachedRealClients
+
+        builds = []
+
+        def builder(*, jdy_cookie_file, wecom_cookie_file):
+            builds.append((jdy_cookie_file, wecom_cookie_file))
+            return {"jdy_client": object(), "wecom_client": object()}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jdy_cookie = Path(tmpdir) / "jdy.cookie"
+            wecom_cookie = Path(tmpdir) / "wecom.cookie"
+            jdy_cookie.write_text("jdy-1", encoding="utf-8")
+            wecom_cookie.write_text("wecom-1", encoding="utf-8")
+            cache = CachedRealClients(builder)
+
+            first = cache(jdy_cookie_file=str(jdy_cookie), wecom_cookie_file=str(wecom_cookie))
+            second = cache(jdy_cookie_file=str(jdy_cookie), wecom_cookie_file=str(wecom_cookie))
+            jdy_cookie.write_text("jdy-refreshed", encoding="utf-8")
+            os.utime(jdy_cookie, ns=(1, 1))
+            third = cache(jdy_cookie_file=str(jdy_cookie), wecom_cookie_file=str(wecom_cookie))
+
+        self.assertIs(first["jdy_client"], second["jdy_client"])
+        self.assertIsNot(first["jdy_client"], third["jdy_client"])
+        self.assertEqual(len(builds), 2)
+
     def test_build_bind_input_from_flat_payload(self):
         from rpa_platform.worker.wecom_bind_real_recovery import build_bind_input_from_context
 
@@ -14,7 +14,35 @@ class FakeRecovery:
         return dict(self.result)
 
 
+class RecordingEmitter:
+    def __init__(self):
+        self.events = []
+        self.emitted_statuses = set()
+
+    def emit(self, status, message="", **fields):
+        self.events.append(status)
+        self.emitted_statuses.add(status)
+
+
 class WecomBindRecoveryTaskHandlerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_progress_from_recovery_and_skips_it_in_final_list(self):
+        class StreamingRecovery:
+            def run(self, task_id, context, progress=None):
+                progress.emit("readonly_preflight_completed")
+                progress.emit("real_write_started")
+                return {"mode": "unattended_write", "status": "success"}
+
+        emitter = RecordingEmitter()
+
+        result = await WecomBindRecoveryTaskHandler(StreamingRecovery()).handle(
+            {"task_id": "task-1", "task_type": "wecom_bind_service", "payload": {}},
+            progress=emitter,
+        )
+
+        self.assertEqual(emitter.events, ["readonly_preflight_started", "readonly_preflight_completed", "real_write_started"])
+        self.assertEqual([item["status"] for item in result.progress], ["real_write_completed"])
+        self.assertEqual(result.status, "success")
+
     def test_real_recovery_uses_default_userid_from_downstream_resolution(self):
         from rpa_platform.worker.wecom_bind_real_recovery import RealWecomBindRecovery
 
@@ -383,6 +411,39 @@ class WecomBindRecoveryTaskHandlerTest(unittest.IsolatedAsyncioTestCase):
         self.assertNotIn("real_write_started", str(result.progress))
         self.assertNotIn("real_write_failed", str(result.progress))
 
+    async def test_online_delay_pending_defers_and_resume_reports_only_new_progress(self):
+        class DeferringRecovery:
+            def __init__(self):
+                self.resumed = []
+
+            def run(self, task_id, context, progress=None):
+                progress.emit("readonly_preflight_completed")
+                progress.emit("real_write_started")
+                return {
+                    "mode": "unattended_write",
+                    "status": "online_delay_pending",
+                    "resume_at": "2026-06-20 12:05:00",
+                }
+
+            def resume(self, task_id, context):
+                self.resumed.append(task_id)
+                return {"mode": "unattended_write", "status": "success"}
+
+        recovery = DeferringRecovery()
+        emitter = RecordingEmitter()
+
+        deferred = await WecomBindRecoveryTaskHandler(recovery).handle(
+            {"task_id": "task-delay", "task_type": "wecom_bind_service", "payload": {}},
+            progress=emitter,
+        )
+        result = await deferred.resume()
+
+        self.assertEqual(deferred.resume_at.strftime("%H:%M:%S"), "12:05:00")
+        self.assertEqual([item["status"] for item in deferred.progress], ["waiting_online_delay"])
+        self.assertEqual(recovery.resumed, ["task-delay"])
+        self.assertEqual(result.status, "success")
+        self.assertEqual([item["status"] for item in result.progress], ["real_write_completed"])
+
 
 if __name__ == "__main__":
     unittest.main()
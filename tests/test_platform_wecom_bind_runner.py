@@ -4,11 +4,12 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from rpa_platform.domain.state_machine import TaskStatus
+from rpa_platform.domain.state_machine import TaskStatus, TRANSITION_LOST
 from rpa_platform.integrations.jdy_admin_client import JdyAdminClient
 from rpa_platform.integrations.wecom_admin_client import RetryableWecomOrderError, WecomAdminClient
 from rpa_platform.services.wecom_bind_service import FixedWecomSecretGenerator, JdyWecomBindService
 from rpa_platform.storage.sqlite_store import SQLiteStore
+from rpa_platform.worker.recheck_policy import RecheckPolicy
 from rpa_platform.worker.scheduler import TaskScheduler
 from rpa_platform.worker.wecom_bind_runner import WecomBindServiceRunner
 from tests.test_platform_wecom_bind_service import FakeJdyTransport, FakeWecomTransport
@@ -213,13 +214,29 @@ class WecomBindServiceRunnerTest(unittest.TestCase):
         self.assertEqual(output["error_detail"], "start bind exploded")
         self.assertEqual(self.store.get_robot(self.robot_id)["status"], "idle")
 
+    def test_runner_whose_lease_was_reclaimed_by_another_robot_loses_the_task(self):
+        other_robot_id = self.store.register_robot("windows-rpa-02", "WIN-RPA-02", "C:/rpa/chrome-profile")
+        claim_time = datetime(2026, 6, 16, 10, 0, 0)
+        self.store.claim_runnable_tasks([self.robot_id], now=claim_time, lease_seconds=60)
+        self.store.reap_expired_leases(now=datetime(2026, 6, 16, 10, 2, 0))
+        self.store.claim_runnable_tasks([other_robot_id], now=datetime(2026, 6, 16, 10, 2, 1))
+
+        # The first robot resurfaces and finds the task in the status it was claimed into.
+        result = self._make_runner().run_claimed_task(self.task_id, self.robot_id, now=claim_time)
+
+        task = self.store.get_task(self.task_id)
+        self.assertEqual(result, {"task_id": self.task_id, "status": TRANSITION_LOST})
+        self.assertEqual(task["status"], TaskStatus.CHECKING_LOGIN.value)
+        self.assertEqual(task["assigned_robot_id"], other_robot_id)
+        self.assertEqual(self._count_calls("/api/fx_sa/wxwork/get_corp_deploy_list"), 0)
+
     def _make_runner(self, wecom_transport=None):
         service = JdyWecomBindService(
             jdy_client=JdyAdminClient(FakeJdyTransport(self.call_log)),
             wecom_client=WecomAdminClient(wecom_transport or FakeWecomTransport(self.call_log)),
             secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
         )
-        return WecomBindServiceRunner(self.store, service)
+        return WecomBindServiceRunner(self.store, service, recheck_policy=RecheckPolicy(jitter_ratio=0))
 
     def _count_calls(self, path):
         return len([call for call in self.call_log if call["path"] == path])
@@ -1,4 +1,5 @@
 from datetime import datetime
+import threading
 import unittest
 
 from rpa_platform.integrations.jdy_admin_client import (
@@ -7,7 +8,12 @@ from rpa_platform.integrations.jdy_admin_client import (
     JdyAdminTransport,
     OwnerCannotBindError,
 )
-from rpa_platform.integrations.wecom_admin_client import WecomAdminClient, WecomAdminTransport
+from rpa_platform.integrations.wecom_admin_client import (
+    MissingWecomAppError,
+    WecomAdminClient,
+    WecomAdminError,
+    WecomAdminTransport,
+)
 from rpa_platform.services.wecom_bind_service import (
     FixedWecomSecretGenerator,
     JdyWecomBindInput,
@@ -391,6 +397,76 @@ class JdyWecomBindServiceTest(unittest.TestCase):
         self.assertNotIn("/wwopen/developer/customApp/tpl/corpApp", all_paths)
         self.assertNotIn("/wwopen/developer/order/add", all_paths)
 
+    def test_start_bind_checks_owner_while_looking_up_wecom_app(self):
+        call_log = []
+        service, jdy_transport, wecom_transport = make_service(call_log)
+        barrier = threading.Barrier(2, timeout=5)
+        jdy_post_json = jdy_transport.post_json
+        wecom_get_json = wecom_transport.get_json
+
+        def post_json(path, payload):
+            if path == "/api/fx_sa/wxwork/get_owner":
+                barrier.wait()
+            return jdy_post_json(path, payload)
+
+        def get_json(path, params, headers):
+            barrier.wait()
+            return wecom_get_json(path, params, headers)
+
+        jdy_transport.post_json = post_json
+        wecom_transport.get_json = get_json
+
+        result = service.start_bind(make_request(), now=datetime(2026, 6, 16, 10, 0, 0))
+
+        self.assertEqual(result.context["wecom"]["auditorderid"], "order-1")
+        all_paths = [call["path"] for call in call_log]
+        self.assertLess(
+            all_paths.index("/wwopen/developer/customApp/tpl/corpApp"),
+            all_paths.index("/wwopen/api/customApp/privilege/getCustomizedAppPrivilege"),
+        )
+        self.assertEqual(all_paths[-1], "/wwopen/developer/order/add")
+
+    def test_start_bind_reports_missing_app_before_owner_failure_without_install(self):
+        call_log = []
+        service, _jdy_transport, _wecom_transport = make_service(
+            call_log,
+            can_bind_corp_secret=False,
+            app_name="其他应用",
+        )
+
+        with self.assertRaises(MissingWecomAppError):
+            service.start_bind(make_request(), now=datetime(2026, 6, 16, 10, 0, 0))
+
+        all_paths = [call["path"] for call in call_log]
+        self.assertNotIn("/api/fx_sa/wxwork/install_corp_deploy", all_paths)
+        self.assertNotIn("/wwopen/developer/customApp/tpl/corpApp", all_paths)
+
+    def test_start_bind_stops_wecom_writes_after_a_failed_write(self):
+        call_log = []
+        service, _jdy_transport, wecom_transport = make_service(call_log)
+        wecom_post_json = wecom_transport.post_json
+
+        def post_json(path, payload, headers):
+            if path == "/wwopen/api/customApp/price/SetStandardPriceInfoForCA":
+                raise WecomAdminError("trial rule rejected")
+            return wecom_post_json(path, payload, headers)
+
+        wecom_transport.post_json = post_json
+
+        with self.assertRaises(WecomAdminError):
+            service.start_bind(make_request(), now=datetime(2026, 6, 16, 10, 0, 0))
+
+        all_paths = [call["path"] for call in call_log]
+        self.assertIn("/wwopen/api/customApp/privilege/setCustomizedAppPrivilege", all_paths)
+        sso_writes = [
+            call
+            for call in call_log
+            if call["path"] == "/wwopen/developer/customApp/tpl/corpApp"
+            and call["payload"]["corpapp"].get("sdk_auth", {}).get("redirect_domain2")
+        ]
+        self.assertEqual(sso_writes, [])
+        self.assertNotIn("/wwopen/developer/order/add", all_paths)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,18 +1,35 @@
 import json
+import os
 import tempfile
 import unittest
 from datetime import datetime
 from pathlib import Path
+from unittest import mock
 
 from rpa_platform.integrations.jdy_admin_client import JdyAdminClient
 from rpa_platform.integrations.wecom_admin_client import WecomAdminClient
 from rpa_platform.services.wecom_bind_service import FixedWecomSecretGenerator
+from rpa_platform.worker.bind_write_context_store import BindWriteContextStore
+from rpa_platform.worker.bind_write_locks import BindWriteLockManager
 from scripts.dev.run_platform_dryrun import FakeServiceJdyAdminTransport, FakeServiceWecomAdminTransport
 
 
+class ReversingCipher:
+    def encrypt(self, data):
+        return data[::-1]
+
+    def decrypt(self, data):
+        return data[::-1]
+
+
+def _context_store(tmpdir):
+    return BindWriteContextStore(str(Path(tmpdir) / "contexts.db"), cipher=ReversingCipher())
+
+
 class WecomBindUnattendedWriteTest(unittest.TestCase):
     PRIVATE_FORM_ID = "5e4ba3a09c38890006fbdf71"
     PUBLIC_FORM_ID = "6258e5f6e09e970007b0150c"
+    LOCK_KEY = "ww001-1009479"
 
     def _context(self):
         return {
@@ -47,8 +64,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 jdy_client=jdy_client,
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 now=datetime(2026, 6, 20, 12, 0, 0),
                 wait_seconds=0,
             )
@@ -83,8 +100,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 jdy_client=jdy_client,
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 now=datetime(2026, 6, 20, 12, 0, 0),
                 wait_seconds=0,
             )
@@ -117,8 +134,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 jdy_client=jdy_client,
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 now=datetime(2026, 6, 20, 12, 0, 0),
                 wait_seconds=0,
             )
@@ -153,8 +170,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
                 preflight_runner=failed_preflight,
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 wait_seconds=0,
             )
 
@@ -183,8 +200,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
                 preflight_runner=recovered_preflight,
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 wait_seconds=0,
             )
 
@@ -213,8 +230,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
                 preflight_runner=recovered_preflight,
                 login_recovery={"notify_attempts": 2, "restored": True},
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 wait_seconds=0,
             )
 
@@ -237,8 +254,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
                 preflight_runner=missing_cookie_preflight,
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 wait_seconds=0,
             )
 
@@ -247,24 +264,46 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
         self.assertEqual(result["reason"], "missing_cookie_source")
         self.assertNotIn("/api/fx_sa/wxwork/install_corp_deploy", [call["path"] for call in jdy_transport.calls])
 
+    @unittest.skipIf(os.name == "nt", "DPAPI is the default cipher on Windows")
+    def test_missing_context_cipher_blocks_before_preflight(self):
+        from rpa_platform.worker.wecom_bind_unattended_write import run_unattended_wecom_bind_write
+
+        preflights = []
+        jdy_client, wecom_client, jdy_transport, _wecom_transport = self._clients()
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.dict(os.environ, {"RPA_WORKER_CONTEXT_KEY": ""}):
+            result = run_unattended_wecom_bind_write(
+                task_id="task-no-cipher",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
+                preflight_runner=lambda *args, **kwargs: preflights.append(args),
+                context_store=BindWriteContextStore(str(Path(tmpdir) / "contexts.db")),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
+                wait_seconds=0,
+            )
+
+        self.assertEqual(result["status"], "blocked")
+        self.assertEqual(result["reason"], "context_cipher_unavailable")
+        self.assertEqual(preflights, [])
+        self.assertEqual(jdy_transport.calls, [])
+
     def test_existing_success_context_prevents_duplicate_write(self):
         from rpa_platform.worker.wecom_bind_unattended_write import run_unattended_wecom_bind_write
 
         jdy_client, wecom_client, jdy_transport, _wecom_transport = self._clients()
         with tempfile.TemporaryDirectory() as tmpdir:
-            context_file = Path(tmpdir) / "context.json"
-            context_file.write_text(
-                json.dumps(
-                    {
-                        "wecom": {
-                            "auditorderid": "au-existing",
-                            "auditorder_status": 5,
-                            "token": "token-secret",
-                            "encoding_aes_key": "aes-secret",
-                        }
+            context_store = _context_store(tmpdir)
+            context_store.save(
+                "task-success-before",
+                {
+                    "wecom": {
+                        "auditorderid": "au-existing",
+                        "auditorder_status": 5,
+                        "token": "token-secret",
+                        "encoding_aes_key": "aes-secret",
                     }
-                ),
-                encoding="utf-8",
+                },
             )
 
             result = run_unattended_wecom_bind_write(
@@ -273,8 +312,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 jdy_client=jdy_client,
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
-                context_file=context_file,
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=context_store,
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 wait_seconds=0,
             )
 
@@ -290,16 +329,16 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
 
         jdy_client, wecom_client, jdy_transport, _wecom_transport = self._clients()
         with tempfile.TemporaryDirectory() as tmpdir:
-            lock_file = Path(tmpdir) / "write.lock"
-            lock_file.write_text("task-other", encoding="utf-8")
+            locks = BindWriteLockManager(Path(tmpdir) / "locks")
+            locks.acquire(self.LOCK_KEY, "task-other")
             result = run_unattended_wecom_bind_write(
                 task_id="task-locked",
                 context=self._context(),
                 jdy_client=jdy_client,
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=lock_file,
+                context_store=_context_store(tmpdir),
+                locks=locks,
                 wait_seconds=0,
             )
 
@@ -308,6 +347,27 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
         self.assertEqual(result["reason"], "write_already_running")
         self.assertEqual(jdy_transport.calls, [])
 
+    def test_lock_of_another_enterprise_does_not_block_write(self):
+        from rpa_platform.worker.wecom_bind_unattended_write import run_unattended_wecom_bind_write
+
+        jdy_client, wecom_client, _jdy_transport, _wecom_transport = self._clients()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            locks = BindWriteLockManager(Path(tmpdir) / "locks")
+            locks.acquire("ww999-1009479", "task-other-corp")
+            result = run_unattended_wecom_bind_write(
+                task_id="task-parallel",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
+                context_store=_context_store(tmpdir),
+                locks=locks,
+                wait_seconds=0,
+            )
+
+            self.assertEqual(result["status"], "success")
+            self.assertEqual(locks.owner("ww999-1009479")["task_id"], "task-other-corp")
+
     def test_lock_is_released_when_write_raises(self):
         from rpa_platform.worker.wecom_bind_unattended_write import run_unattended_wecom_bind_write
 
@@ -316,7 +376,7 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
 
         jdy_client, wecom_client, _jdy_transport, _wecom_transport = self._clients()
         with tempfile.TemporaryDirectory() as tmpdir:
-            lock_file = Path(tmpdir) / "write.lock"
+            locks = BindWriteLockManager(Path(tmpdir) / "locks")
             result = run_unattended_wecom_bind_write(
                 task_id="task-exploding",
                 context=self._context(),
@@ -324,15 +384,113 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
                 preflight_runner=exploding_preflight,
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=lock_file,
+                context_store=_context_store(tmpdir),
+                locks=locks,
                 wait_seconds=0,
             )
 
         self.assertEqual(result["status"], "failed")
         self.assertEqual(result["mode"], "unattended_write")
         self.assertEqual(result["reason"], "real_write_failed")
-        self.assertFalse(lock_file.exists())
+        self.assertIsNone(locks.owner(self.LOCK_KEY))
+
+    def test_deferred_write_keeps_lock_and_resumes_after_online_delay(self):
+        from rpa_platform.worker.wecom_bind_unattended_write import (
+            resume_unattended_wecom_bind_write,
+            run_unattended_wecom_bind_write,
+        )
+
+        jdy_client, wecom_client, _jdy_transport, wecom_transport = self._clients()
+        secret_generator = FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            context_store = _context_store(tmpdir)
+            locks = BindWriteLockManager(Path(tmpdir) / "locks")
+            pending = run_unattended_wecom_bind_write(
+                task_id="task-deferred",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=secret_generator,
+                context_store=context_store,
+                locks=locks,
+                now=datetime(2026, 6, 20, 12, 0, 0),
+                defer=True,
+            )
+            lock_owner = locks.owner(self.LOCK_KEY)["task_id"]
+            other = run_unattended_wecom_bind_write(
+                task_id="task-other",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=secret_generator,
+                context_store=context_store,
+                locks=locks,
+                now=datetime(2026, 6, 20, 12, 1, 0),
+                defer=True,
+            )
+            orders_created = [call["path"] for call in wecom_transport.calls].count("/wwopen/developer/order/add")
+            early = resume_unattended_wecom_bind_write(
+                task_id="task-deferred",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=secret_generator,
+                context_store=context_store,
+                locks=locks,
+                now=datetime(2026, 6, 20, 12, 2, 0),
+            )
+            submitted_early = "/wwopen/developer/order/set" in [call["path"] for call in wecom_transport.calls]
+            result = resume_unattended_wecom_bind_write(
+                task_id="task-deferred",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=secret_generator,
+                context_store=context_store,
+                locks=locks,
+                now=datetime(2026, 6, 20, 12, 5, 0),
+            )
+            stored = context_store.load("task-deferred")
+            phases = [row["phase"] for row in context_store.list_tasks(corp_id="ww001")]
+
+        self.assertEqual(pending["status"], "online_delay_pending")
+        self.assertEqual(pending["resume_at"], "2026-06-20 12:05:00")
+        self.assertEqual(lock_owner, "task-deferred")
+        # A second task for the same enterprise cannot start another bind during the delay.
+        self.assertEqual(other["reason"], "write_already_running")
+        self.assertEqual(other["lock_owner_task_id"], "task-deferred")
+        self.assertEqual(orders_created, 1)
+        self.assertEqual(early["status"], "online_delay_pending")
+        self.assertFalse(submitted_early)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["preflight"]["status"], "ok")
+        self.assertEqual(result["wecom"]["auditorder_status"], 5)
+        self.assertNotIn("unattended_write", stored)
+        self.assertEqual(phases, ["completed"])
+        self.assertIsNone(locks.owner(self.LOCK_KEY))
+
+    def test_rerun_of_deferred_write_resumes_without_new_order(self):
+        from rpa_platform.worker.wecom_bind_unattended_write import run_unattended_wecom_bind_write
+
+        jdy_client, wecom_client, jdy_transport, _wecom_transport = self._clients()
+        secret_generator = FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            kwargs = dict(
+                task_id="task-rerun",
+                context=self._context(),
+                jdy_client=jdy_client,
+                wecom_client=wecom_client,
+                secret_generator=secret_generator,
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
+                defer=True,
+            )
+            run_unattended_wecom_bind_write(now=datetime(2026, 6, 20, 12, 0, 0), **kwargs)
+            calls_after_start = len(jdy_transport.calls)
+            result = run_unattended_wecom_bind_write(now=datetime(2026, 6, 20, 12, 6, 0), **kwargs)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(len(jdy_transport.calls), calls_after_start)
 
     def test_real_write_failure_returns_chinese_error_msg_for_missing_wecom_app(self):
         from rpa_platform.worker.wecom_bind_unattended_write import run_unattended_wecom_bind_write
@@ -358,8 +516,8 @@ class WecomBindUnattendedWriteTest(unittest.TestCase):
                 wecom_client=wecom_client,
                 secret_generator=FixedWecomSecretGenerator(token="token-secret", encoding_aes_key="aes-secret"),
                 preflight_runner=successful_preflight,
-                context_file=Path(tmpdir) / "context.json",
-                lock_file=Path(tmpdir) / "write.lock",
+                context_store=_context_store(tmpdir),
+                locks=BindWriteLockManager(Path(tmpdir) / "locks"),
                 wait_seconds=0,
             )
 
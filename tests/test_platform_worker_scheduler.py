@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 
@@ -206,6 +207,23 @@ class WorkerSchedulerTest(unittest.TestCase):
         self.assertEqual(robot["status"], "idle")
         self.assertEqual(steps[0]["step_key"], "worker_stub")
 
+    def test_run_once_keeps_the_lease_alive_while_the_runner_works(self):
+        task_id = self._create_task("ww001", "u001")
+        store = self.store
+
+        class SlowRunner:
+            def run_claimed_task(self, task_id, robot_id, now=None):
+                threading.Event().wait(0.5)
+                self.reaped = store.reap_expired_leases()
+                return {"task_id": task_id, "status": "slow"}
+
+        runner = SlowRunner()
+        result = self.scheduler.run_once(self.robot_id, runner, lease_seconds=0.3)
+
+        self.assertEqual(result["task_id"], task_id)
+        self.assertEqual(runner.reaped, [])
+        self.assertEqual(self.store.get_task(task_id)["assigned_robot_id"], self.robot_id)
+
     def test_run_once_claims_task_and_executes_hybrid_runner(self):
         flow_id = self.store.create_flow_template(self.team_id, "企微代开发应用上线 hybrid", "")
         version_id = self.store.create_flow_version(
@@ -272,10 +290,113 @@ class WorkerSchedulerTest(unittest.TestCase):
             ],
         )
 
-    def _create_task(self, corp_id, user_id):
+    def test_batch_claim_shares_robots_fairly_across_teams(self):
+        quiet_team_id, quiet_flow_id = self._create_team_flow("安静团队")
+        for index in range(6):
+            self._create_task("ww10%s" % index, "u10%s" % index)
+        quiet_task_ids = {
+            self._create_task("ww20%s" % index, "u20%s" % index, team_id=quiet_team_id, flow_id=quiet_flow_id)
+            for index in range(2)
+        }
+        robot_ids = [self.robot_id] + self._register_robots(3)
+
+        claimed = self.scheduler.claim_tasks(robot_ids, now=self._dt("2026-06-08 10:00:00"))
+
+        teams = [task["team_id"] for task in claimed]
+        self.assertEqual(len(claimed), 4)
+        self.assertEqual(teams.count(quiet_team_id), 2)
+        self.assertEqual({task["id"] for task in claimed if task["team_id"] == quiet_team_id}, quiet_task_ids)
+        self.assertEqual({task["assigned_robot_id"] for task in claimed}, set(robot_ids))
+        self.assertTrue(all(self.store.get_robot(robot_id)["status"] == "busy" for robot_id in robot_ids))
+
+    def test_batch_claim_follows_team_weights_and_concurrency_caps(self):
+        heavy_team_id, heavy_flow_id = self._create_team_flow("重点团队", scheduling_weight=3)
+        capped_team_id, capped_flow_id = self._create_team_flow("限流团队", max_concurrent_tasks=1)
+        for index in range(4):
+            self._create_task("ww10%s" % index, "u10%s" % index, team_id=heavy_team_id, flow_id=heavy_flow_id)
+            self._create_task("ww20%s" % index, "u20%s" % index, team_id=capped_team_id, flow_id=capped_flow_id)
+        robot_ids = [self.robot_id] + self._register_robots(4)
+
+        first = self.scheduler.claim_tasks(robot_ids[:4], now=self._dt("2026-06-08 10:00:00"))
+        second = self.scheduler.claim_tasks(robot_ids[4:], now=self._dt("2026-06-08 10:00:00"))
+
+        first_teams = [task["team_id"] for task in first]
+        self.assertEqual(first_teams.count(heavy_team_id), 3)
+        self.assertEqual(first_teams.count(capped_team_id), 1)
+        self.assertEqual([task["team_id"] for task in second], [heavy_team_id])
+
+    def test_claim_sets_lease_that_heartbeat_extends(self):
+        task_id = self._create_task("ww001", "u001")
+        self.scheduler.claim_next_task(self.robot_id, now=self._dt("2026-06-08 10:00:00"))
+        claimed_lease = self.store.get_task(task_id)["lease_expires_at_ms"]
+
+        extended = self.store.heartbeat_robot(self.robot_id, lease_seconds=300, now=self._dt("2026-06-08 10:01:00"))
+
+        self.assertEqual(claimed_lease, int(self._dt("2026-06-08 10:02:00").timestamp() * 1000))
+        self.assertEqual(extended, 1)
+        self.assertEqual(
+            self.store.get_task(task_id)["lease_expires_at_ms"],
+            int(self._dt("2026-06-08 10:06:00").timestamp() * 1000),
+        )
+        self.assertEqual(self.store.reap_expired_leases(now=self._dt("2026-06-08 10:03:00")), [])
+
+    def test_reaps_expired_lease_back_to_claimed_status(self):
+        task_id = self._create_task("ww001", "u001")
+        self.store.set_task_status(
+            task_id,
+            TaskStatus.WAITING_WECOM_REVIEW,
+            next_check_at="2026-06-08 09:58:00",
+            assigned_robot_id=None,
+        )
+        self.scheduler.claim_next_task(self.robot_id, now=self._dt("2026-06-08 10:00:00"))
+
+        reaped = self.store.reap_expired_leases(now=self._dt("2026-06-08 10:05:00"))
+
+        self.assertEqual(reaped, [{"task_id": task_id, "robot_id": self.robot_id, "status": "waiting_wecom_review"}])
+        task = self.store.get_task(task_id)
+        self.assertEqual(task["status"], TaskStatus.WAITING_WECOM_REVIEW.value)
+        self.assertIsNone(task["assigned_robot_id"])
+        self.assertIsNone(task["lease_expires_at_ms"])
+        self.assertEqual(self.store.get_robot(self.robot_id)["status"], "idle")
+        self.assertEqual(self.store.list_task_steps(task_id)[-1]["step_key"], "lease_expired")
+        self.assertFalse(
+            self.store.set_task_status(task_id, TaskStatus.SUCCESS, expected=TaskStatus.CHECKING_LOGIN)
+        )
+
+    def test_releasing_robot_clears_lease(self):
+        task_id = self._create_task("ww001", "u001")
+        self.scheduler.claim_next_task(self.robot_id, now=self._dt("2026-06-08 10:00:00"))
+
+        self.store.set_task_status(task_id, TaskStatus.SUCCESS, assigned_robot_id=None)
+
+        self.assertIsNone(self.store.get_task(task_id)["lease_expires_at_ms"])
+        self.assertEqual(self.store.reap_expired_leases(now=self._dt("2026-06-08 11:00:00")), [])
+
+    def _create_team_flow(self, name, **team_options):
+        team_id = self.store.create_team(name, **team_options)
+        flow_id = self.store.create_flow_template(team_id, "企微代开发应用上线", "")
+        version_id = self.store.create_flow_version(
+            flow_id,
+            steps=[{"key": "receive_webhook", "name": "接收 Webhook", "action": "receive_webhook"}],
+            created_by="codex",
+        )
+        self.store.publish_flow_version(flow_id, version_id)
+        return team_id, flow_id
+
+    def _register_robots(self, count):
+        return [
+            self.registry.register_robot(
+                name="windows-rpa-1%s" % index,
+                host="WIN-RPA-1%s" % index,
+                browser_profile_path="C:/rpa/chrome-profile-%s" % index,
+            )
+            for index in range(count)
+        ]
+
+    def _create_task(self, corp_id, user_id, team_id=None, flow_id=None):
         result = self.store.create_task_from_published_flow(
-            team_id=self.team_id,
-            flow_template_id=self.flow_id,
+            team_id=team_id or self.team_id,
+            flow_template_id=flow_id or self.flow_id,
             enterprise_name="上海测试客户",
             corp_id=corp_id,
             source_user_id=user_id,